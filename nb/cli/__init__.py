@@ -24,6 +24,7 @@ from nb.cli.completion import (
 )
 from nb.cli.config_cmd import register_config_commands
 from nb.cli.daemon import register_daemon_commands
+from nb.cli.debug import register_debug_commands
 from nb.cli.export import register_export_commands
 from nb.cli.git import register_git_commands
 from nb.cli.graph import register_graph_commands
@@ -33,6 +34,7 @@ from nb.cli.mcp import register_mcp_commands
 from nb.cli.note_links import register_note_link_commands
 from nb.cli.notebooks import register_notebook_commands
 from nb.cli.notes import register_note_commands, today
+from nb.cli.query import register_query_commands
 from nb.cli.record import register_record_commands
 from nb.cli.related import register_related_commands
 from nb.cli.search import register_search_commands
@@ -214,6 +216,7 @@ register_notebook_commands(cli)
 register_config_commands(cli)
 register_todo_commands(cli)
 register_search_commands(cli)
+register_query_commands(cli)
 register_link_commands(cli)
 register_note_link_commands(cli)
 register_graph_commands(cli)
@@ -236,6 +239,7 @@ register_ai_commands(cli)
 register_assistant_command(cli)
 register_daemon_commands(cli)
 register_mcp_commands(cli)
+register_debug_commands(cli)
 register_quickcapture_commands(cli)
 
 
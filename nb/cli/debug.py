@@ -0,0 +1,113 @@
+"""Debugging CLI commands."""
+
+from __future__ import annotations
+
+import click
+from rich.table import Table
+
+from nb.cli.utils import console
+
+
+def register_debug_commands(cli: click.Group) -> None:
+    """Register all debug commands with the CLI."""
+    cli.add_command(debug_group)
+
+
+@click.group("debug")
+def debug_group() -> None:
+    """Diagnostics for nb itself."""
+
+
+@debug_group.command(
+    "sql-profile",
+    context_settings={"ignore_unknown_options": True, "allow_interspersed_args": False},
+)
+@click.option("--top", "-t", default=15, help="Number of statements to show")
+@click.option(
+    "--slow-ms",
+    type=float,
+    default=None,
+    help="Capture query plans for statements slower than this (default: 5ms)",
+)
+@click.option(
+    "--sort",
+    type=click.Choice(["total", "p95", "count", "rows"]),
+    default="total",
+    help="Sort order (default: total time)",
+)
+@click.argument("command", nargs=-1, type=click.UNPROCESSED, required=True)
+@click.pass_context
+def sql_profile_cmd(
+    ctx: click.Context,
+    top: int,
+    slow_ms: float | None,
+    sort: str,
+    command: tuple[str, ...],
+) -> None:
+    """Run an nb command and show its most expensive SQL statements.
+
+    Statements are grouped by shape (literals replaced by ?), and query
+    plans are shown for the ones slower than --slow-ms. Full table scans
+    are flagged.
+
+    \b
+    Examples:
+      nb debug sql-profile -- todo
+      nb debug sql-profile --sort p95 -- stats
+      nb debug sql-profile --top 5 -- search "meeting notes"
+    """
+    from nb.index.db import start_profiling, stop_profiling
+
+    profiler = start_profiling(slow_ms)
+    profiler.reset()
+    exit_code = 0
+    try:
+        ctx.find_root().command.main(
+            list(command), prog_name="nb", standalone_mode=False
+        )
+    except click.exceptions.Exit as e:
+        exit_code = e.exit_code
+    except click.ClickException as e:
+        e.show()
+        exit_code = e.exit_code
+    except click.Abort:
+        exit_code = 1
+    except SystemExit as e:
+        exit_code = e.code if isinstance(e.code, int) else 1
+    finally:
+        stop_profiling()
+
+    stats = profiler.top(top, key=f"{sort}_ms" if sort in ("total", "p95") else sort)
+    if not stats:
+        console.print("[dim]No SQL statements were run.[/dim]")
+        raise SystemExit(exit_code)
+
+    summary = profiler.to_dict(0)
+    console.print()
+    console.print(
+        f"[bold]SQL profile[/bold] [dim]{summary['statements']} statements, "
+        f"{summary['total_ms']:.1f}ms total[/dim]"
+    )
+
+    table = Table(show_header=True, header_style="bold", show_lines=True)
+    table.add_column("Count", justify="right")
+    table.add_column("Total ms", justify="right")
+    table.add_column("p95 ms", justify="right")
+    table.add_column("Rows", justify="right")
+    table.add_column("Statement", overflow="fold")
+    for s in stats:
+        statement = s.sql
+        if s.plan:
+            statement += "\n[dim]" + "\n".join(s.plan) + "[/dim]"
+        if s.full_scans:
+            statement += "\n[red]full scan: " + ", ".join(s.full_scans) + "[/red]"
+        table.add_row(
+            str(s.count),
+            f"{s.total_ms:.2f}",
+            f"{s.p95_ms:.2f}",
+            str(s.rows),
+            statement,
+        )
+    console.print(table)
+    if exit_code:
+        raise SystemExit(exit_code)
@@ -0,0 +1,118 @@
+"""nbql query CLI command."""
+
+from __future__ import annotations
+
+import shlex
+
+import click
+
+from nb.cli.utils import console, index_for_command
+
+
+def register_query_commands(cli: click.Group) -> None:
+    """Register query commands with the CLI."""
+    cli.add_command(query_cmd)
+
+
+@click.command("query")
+@click.argument("text")
+@click.option(
+    "--limit", "-l", type=int, default=50, help="Results per page (default: 50)"
+)
+@click.option("--after", help="Cursor of the previous page, to show the next one")
+@click.option(
+    "--all",
+    "-a",
+    "show_all",
+    is_flag=True,
+    help="Include todos from excluded notes and notebooks",
+)
+@click.option("--explain", is_flag=True, help="Show the SQL and query plan instead")
+def query_cmd(
+    text: str, limit: int, after: str | None, show_all: bool, explain: bool
+) -> None:
+    """Query todos or notes with nbql.
+
+    A query names its target, then optional conditions, sort order and limit:
+
+    \b
+      todo where due < +7d and tag=work sort by priority
+      todo where status=open and not (owner=alice or owner=bob)
+      note where notebook=projects and links-to "API design"
+      note where modified > -2w sort by modified desc limit 20
+
+    Conditions combine with and/or/not and parentheses. Dates accept
+    offsets (+3d, -2w), 'today', fuzzy dates ('friday') and 'none'.
+
+    \b
+    Examples:
+      nb query "todo where due < +7d"
+      nb query "todo where tag=work" --after <cursor>
+      nb query "note where tag=meeting" --explain
+    """
+    from nb.index.nbql import (
+        NbqlError,
+        compile_query,
+        explain_query,
+        parse,
+        run_query,
+    )
+
+    try:
+        query = parse(text)
+        if explain:
+            compiled = compile_query(query, include_excluded=show_all)
+            plan = explain_query(query, include_excluded=show_all)
+        else:
+            index_for_command(todos_only=query.target == "todo")
+            page = run_query(query, after=after, limit=limit, include_excluded=show_all)
+    except NbqlError as e:
+        console.print(f"[red]Invalid query:[/red] {e}")
+        raise SystemExit(1) from None
+
+    if explain:
+        _print_explain(compiled.sql, compiled.params, plan)
+        return
+
+    if not page.items:
+        console.print("[dim]No results.[/dim]")
+        return
+
+    if query.target == "todo":
+        from nb.cli.todos.formatters import _calculate_column_widths, _print_todo
+        from nb.index.todos_repo import attach_todo_children
+
+        # Subtasks of every listed todo, in one query
+        attach_todo_children(page.items)
+        widths = _calculate_column_widths(page.items)
+        for t in page.items:
+            _print_todo(t, widths=widths)
+    else:
+        for note in page.items:
+            tags = " ".join(f"#{tag}" for tag in note.tags)
+            date_str = note.date.isoformat() if note.date else ""
+            console.print(
+                f"[cyan]{note.path.as_posix()}[/cyan]  {note.title}  "
+                f"[dim]{date_str}[/dim]  [magenta]{tags}[/magenta]"
+            )
+
+    if page.next_cursor:
+        console.print(
+            f"\n[dim]More results: nb query {shlex.quote(text)} "
+            f"--after {page.next_cursor}[/dim]"
+        )
+
+
+def _print_explain(sql: str, params: tuple, plan: list[str]) -> None:
+    """Print a compiled query and its plan, flagging full table scans."""
+    from nb.index.profiler import is_full_scan
+
+    console.print("[bold]SQL[/bold]")
+    console.print(sql, markup=False, highlight=False)
+    console.print(f"[dim]params: {list(params)}[/dim]\n")
+    console.print("[bold]Plan[/bold]")
+    for detail in plan:
+        if is_full_scan(detail):
+            console.print(f"  [yellow]{detail}  (full scan)[/yellow]")
+        else:
+            console.print(f"  {detail}")
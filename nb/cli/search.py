@@ -136,7 +136,7 @@ def search_cmd(
         )
         raise SystemExit(1)
 
-    from nb.index.search import get_search
+    from nb.index.search import get_search, keyword_search
     from nb.utils.dates import parse_date_range, parse_fuzzy_date
 
     # Determine search type
@@ -190,18 +190,30 @@ def search_cmd(
     try:
         from nb.cli.utils import spinner
 
-        search = get_search()
         with spinner("Searching"):
-            results = search.search(
-                query,
-                search_type=search_type,
-                k=limit,
-                filters=filters if filters else None,
-                date_start=date_start,
-                date_end=date_end,
-                recency_boost=recency_boost,
-                score_threshold=threshold,
-            )
+            if search_type == "keyword":
+                # Served from the SQLite full-text index; no vector store
+                results = keyword_search(
+                    query,
+                    k=limit,
+                    notebook=notebook,
+                    tag=tag,
+                    date_start=date_start,
+                    date_end=date_end,
+                    recency_boost=recency_boost,
+                    score_threshold=threshold,
+                )
+            else:
+                results = get_search().search(
+                    query,
+                    search_type=search_type,
+                    k=limit,
+                    filters=filters if filters else None,
+                    date_start=date_start,
+                    date_end=date_end,
+                    recency_boost=recency_boost,
+                    score_threshold=threshold,
+                )
     except Exception as e:
         error_msg = str(e).lower()
         console.print(f"[red]Search failed:[/red] {e}")
@@ -434,7 +446,9 @@ def grep_cmd(
 @click.command("index")
 @click.option("--force", "-f", is_flag=True, help="Force reindex all files")
 @click.option("--rebuild", is_flag=True, help="Drop and recreate the database")
-@click.option("--embeddings", "-e", is_flag=True, help="Rebuild search embeddings")
+@click.option(
+    "--embeddings", "-e", is_flag=True, help="Embed new and changed notes for search"
+)
 @click.option(
     "--vectors-only",
     "-v",
@@ -446,6 +460,29 @@ def grep_cmd(
     is_flag=True,
     help="Delete vector index before rebuilding (use when changing embedding provider/model)",
 )
+@click.option(
+    "--resume",
+    is_flag=True,
+    help="Continue the last interrupted index run from its checkpoint",
+)
+@click.option(
+    "--status", "show_status", is_flag=True, help="Show progress of recent index runs"
+)
+@click.option(
+    "--verify-vectors",
+    is_flag=True,
+    help="Check the vector index against the database and repair drift",
+)
+@click.option(
+    "--optimize",
+    is_flag=True,
+    help="Update query statistics, compact the database if fragmented, and report its size",
+)
+@click.option(
+    "--vacuum",
+    is_flag=True,
+    help="With --optimize, always rebuild (VACUUM) the database file",
+)
 @click.option(
     "--notebook",
     "-n",
@@ -458,6 +495,11 @@ def index_cmd(
     embeddings: bool,
     vectors_only: bool,
     reset_vectors: bool,
+    resume: bool,
+    show_status: bool,
+    verify_vectors: bool,
+    optimize: bool,
+    vacuum: bool,
     notebook: str | None,
 ) -> None:
     """Rebuild the notes and todos index.
@@ -465,27 +507,69 @@ def index_cmd(
     Incrementally indexes new and modified files. Use --force to reindex
     all files, or --rebuild to drop and recreate the database entirely.
 
+    Index runs are checkpointed per file: if one is interrupted (Ctrl-C,
+    crash, provider errors), --resume continues where it stopped.
+
     \b
     Examples:
       nb index               # Index new/changed files
       nb index --force       # Reindex all files
       nb index -n daily      # Only reindex the 'daily' notebook
       nb index --rebuild     # Drop database and reindex (fixes schema issues)
-      nb index --embeddings  # Rebuild semantic search vectors
+      nb index --embeddings  # Embed new and changed notes for semantic search
+      nb index --verify-vectors  # Repair notes missing from the vector index
       nb index --vectors-only  # Rebuild only vectors (e.g., after changing embedding model)
       nb index --reset-vectors --vectors-only  # Clear and rebuild vectors (after changing provider)
+      nb index --resume      # Continue an interrupted run
+      nb index --status      # Show progress and throughput of recent runs
+      nb index --optimize    # Refresh query statistics, report database size
+      nb index --optimize --vacuum  # Also compact the database file
     """
     from nb.cli.utils import progress_bar, spinner
     from nb.index.scanner import (
-        count_files_to_index,
         count_linked_notes,
         count_notes_for_search_rebuild,
-        index_all_notes,
+        create_files_job,
+        plan_index,
         remove_deleted_notes,
+        run_index_job,
         scan_linked_notes,
     )
     from nb.index.todos_repo import get_todo_stats
 
+    if show_status:
+        _print_index_jobs()
+        return
+
+    if vacuum and not optimize:
+        console.print("[red]--vacuum requires --optimize[/red]")
+        raise SystemExit(1)
+
+    if optimize:
+        _optimize_index(vacuum=True if vacuum else None)
+        return
+
+    if resume:
+        from nb.index.jobs_repo import JOB_VECTORS, get_unfinished_job
+
+        job = get_unfinished_job()
+        if job is None:
+            console.print("[dim]No interrupted index run to resume.[/dim]")
+            return
+        label = "Resuming vectors" if job.kind == JOB_VECTORS else "Resuming index"
+        try:
+            with progress_bar(label, total=job.remaining) as advance:
+                count = run_index_job(job.id, on_progress=advance)
+        except KeyboardInterrupt:
+            _print_interrupted()
+            raise SystemExit(130) from None
+        except Exception as e:
+            console.print(f"[red]Error resuming index run:[/red] {e}")
+            _print_interrupted()
+            raise SystemExit(1) from None
+        console.print(f"[green]Resumed run finished: {count} processed.[/green]")
+        return
+
     # Handle --reset-vectors: clear vector index before rebuilding
     if reset_vectors:
         if rebuild:
@@ -505,6 +589,7 @@ def index_cmd(
 
         from nb.config import get_config
         from nb.index.search import reset_search
+        from nb.index.vector_state_repo import clear_vector_state
 
         config = get_config()
         vectors_path = config.vectors_path
@@ -512,6 +597,7 @@ def index_cmd(
             reset_search()  # Close any open connections first
             shutil.rmtree(vectors_path)
             console.print("[dim]Cleared vector index.[/dim]")
+        clear_vector_state()
 
     # Handle --vectors-only: skip file indexing, just rebuild vectors
     if vectors_only:
@@ -524,19 +610,22 @@ def index_cmd(
 
         search_total = count_notes_for_search_rebuild(notebook=notebook)
         if search_total > 0:
-            from nb.index.scanner import rebuild_search_index
+            from nb.index.scanner import create_vectors_job
 
             try:
+                job_id = create_vectors_job(notebook=notebook)
                 with progress_bar("Rebuilding vectors", total=search_total) as advance:
-                    search_count = rebuild_search_index(
-                        notebook=notebook,
-                        on_progress=advance,
-                    )
+                    search_count = run_index_job(job_id, on_progress=advance)
                 console.print(
                     f"[green]Rebuilt vectors for {search_count} notes.[/green]"
                 )
+                _print_embedding_cache_stats()
+            except KeyboardInterrupt:
+                _print_interrupted()
+                raise SystemExit(130) from None
             except Exception as e:
                 console.print(f"[red]Error rebuilding vectors:[/red] {e}")
+                _print_interrupted()
                 raise SystemExit(1) from None
         else:
             console.print("[dim]No notes to rebuild vectors for.[/dim]")
@@ -566,17 +655,19 @@ def index_cmd(
     search_synced = 0
     removed_count = 0
 
-    # Count and index changed notes
-    files_count = count_files_to_index(force=force, notebook=notebook)
+    # Find and index changed notes (one scan shared by the count and the indexer)
+    plan = plan_index(force=force, notebook=notebook)
+    files_count = len(plan.to_index)
 
     if files_count > 0:
         scope = f"'{notebook}'" if notebook else "all notebooks"
-        with progress_bar(f"Scanning {scope}", total=files_count) as advance:
-            indexed_notes = index_all_notes(
-                force=force,
-                notebook=notebook,
-                on_progress=advance,
-            )
+        job_id = create_files_job(plan, notebook=notebook)
+        try:
+            with progress_bar(f"Scanning {scope}", total=files_count) as advance:
+                indexed_notes = run_index_job(job_id, on_progress=advance)
+        except KeyboardInterrupt:
+            _print_interrupted()
+            raise SystemExit(130) from None
 
     # Index linked notes (always re-scanned)
     linked_total = count_linked_notes(notebook_filter=notebook)
@@ -587,15 +678,35 @@ def index_cmd(
                 on_progress=advance,
             )
 
-    if embeddings:
-        # Rebuild semantic search vectors
-        search_total = count_notes_for_search_rebuild(notebook=notebook)
+    if verify_vectors:
+        from nb.index.scanner import verify_search_index
+
+        try:
+            with spinner("Verifying vector index"):
+                check = verify_search_index(notebook=notebook)
+        except Exception as e:
+            console.print(f"[red]Error verifying vector index:[/red] {e}")
+            raise SystemExit(1) from None
+        if check.repaired:
+            console.print(
+                f"[yellow]Vector index: repaired {check.repaired} notes[/yellow] "
+                f"[dim]({check.orphaned} orphaned, {check.missing} missing, "
+                f"{check.mismatched} incomplete)[/dim]"
+            )
+        else:
+            console.print("[dim]Vector index: consistent[/dim]")
+        search_synced = check.embedded
+    elif embeddings:
+        # Embed notes whose current revision isn't in the vector index
+        from nb.index.scanner import count_notes_to_embed
+
+        search_total = count_notes_to_embed(notebook=notebook)
         if search_total > 0:
-            from nb.index.scanner import rebuild_search_index
+            from nb.index.scanner import embed_changed_notes
 
             try:
                 with progress_bar("Building embeddings", total=search_total) as advance:
-                    search_synced = rebuild_search_index(
+                    search_synced = embed_changed_notes(
                         notebook=notebook,
                         on_progress=advance,
                     )
@@ -614,7 +725,7 @@ def index_cmd(
             raise SystemExit(1) from None
 
     # Clean up notes and todos for files that no longer exist
-    removed_count = remove_deleted_notes(notebook=notebook)
+    removed_count = remove_deleted_notes(notebook=notebook, plan=plan)
 
     # Print summary
     console.print()
@@ -627,8 +738,9 @@ def index_cmd(
         console.print(f"[dim]Linked notes: {indexed_linked} scanned[/dim]")
 
     if search_synced > 0:
-        if embeddings:
+        if embeddings or verify_vectors:
             console.print(f"[dim]Search: {search_synced} embeddings built[/dim]")
+            _print_embedding_cache_stats()
         else:
             console.print(f"[dim]Search: {search_synced} notes synced[/dim]")
 
@@ -643,6 +755,96 @@ def index_cmd(
     console.print(todo_line)
 
 
+def _optimize_index(vacuum: bool | None) -> None:
+    """Run an optimize pass over the index database and report on it."""
+    from nb.cli.utils import spinner
+    from nb.index.maintenance import optimize_db
+
+    try:
+        with spinner("Optimizing database"):
+            result = optimize_db(vacuum=vacuum)
+    except Exception as e:
+        console.print(f"[red]Error optimizing database:[/red] {e}")
+        raise SystemExit(1) from None
+
+    before, after = result.before, result.after
+    mib = 1024 * 1024
+    console.print(
+        f"[green]Optimized in {result.seconds:.1f}s:[/green] statistics updated"
+        + (
+            f", vacuumed ({before.size_bytes / mib:.2f} -> "
+            f"{after.size_bytes / mib:.2f} MiB)"
+            if result.vacuumed
+            else ""
+        )
+    )
+    console.print(
+        f"Database: {after.size_bytes / mib:.2f} MiB, "
+        f"{after.page_count} pages of {after.page_size // 1024} KiB, "
+        f"{after.freelist_count} free ({after.free_ratio:.0%})"
+    )
+    if after.tables:
+        console.print("[dim]Largest tables and indexes:[/dim]")
+        for table in after.tables[:10]:
+            console.print(
+                f"  {table.name:<32} {table.pages:>7} pages "
+                f"[dim]{table.fill_ratio:.0%} full[/dim]"
+            )
+    if not result.vacuumed and after.freelist_count:
+        console.print(
+            "[dim]Hint: Run 'nb index --optimize --vacuum' to reclaim free pages.[/dim]"
+        )
+
+
+def _print_interrupted() -> None:
+    """Tell the user how to continue an interrupted index run."""
+    console.print(
+        "[yellow]Index run interrupted.[/yellow] "
+        "[dim]Run 'nb index --resume' to continue from the last checkpoint.[/dim]"
+    )
+
+
+def _print_index_jobs() -> None:
+    """Print progress and throughput of recent index runs."""
+    from nb.index.jobs_repo import JOB_OPTIMIZE, get_recent_jobs
+
+    jobs = get_recent_jobs()
+    if not jobs:
+        console.print("[dim]No index runs recorded.[/dim]")
+        return
+
+    status_styles = {"running": "cyan", "interrupted": "yellow", "done": "green"}
+    for job in jobs:
+        style = status_styles.get(job.status, "white")
+        scope = f" ({job.notebook})" if job.notebook else ""
+        line = f"#{job.id} {job.kind}{scope}: [{style}]{job.status}[/{style}]"
+        if job.kind == JOB_OPTIMIZE:
+            # Optimize passes have no work items
+            console.print(f"{line} [dim]started {job.started_at:%Y-%m-%d %H:%M}[/dim]")
+            continue
+        line += f" {job.done}/{job.total}"
+        if job.failed:
+            line += f" [red]{job.failed} failed[/red]"
+        line += (
+            f" [dim]{job.throughput:.1f}/s, "
+            f"started {job.started_at:%Y-%m-%d %H:%M}[/dim]"
+        )
+        console.print(line)
+    if any(job.resumable for job in jobs):
+        console.print("[dim]Hint: Run 'nb index --resume' to continue.[/dim]")
+
+
+def _print_embedding_cache_stats() -> None:
+    """Print embedding cache hits and misses from this run, if it was used."""
+    from nb.index.search import get_search
+
+    cache = get_search().embedding_cache
+    if cache is not None and (cache.hits or cache.misses):
+        console.print(
+            f"[dim]Embedding cache: {cache.hits} hits, {cache.misses} misses[/dim]"
+        )
+
+
 @click.command("stream")
 @click.option(
     "--notebook", "-n", help="Filter by notebook", shell_complete=complete_notebook
@@ -14,6 +14,7 @@ from nb.cli.utils import (
     get_display_path,
     get_notebook_display_info,
     get_stdin_content,
+    index_for_command,
     resolve_note_ref,
 )
 from nb.config import get_config
@@ -23,7 +24,6 @@ from nb.core.todos import (
     set_todo_status_in_file,
     toggle_todo_in_file,
 )
-from nb.index.scanner import index_all_notes
 from nb.index.todos_repo import (
     get_todo_children,
     query_todos,
@@ -136,6 +136,11 @@ def register_todo_commands(cli: click.Group) -> None:
     help="Include todos from all sources (even excluded notebooks)",
 )
 @click.option("--include-completed", "-c", is_flag=True, help="Include completed todos")
+@click.option(
+    "--query",
+    "-q",
+    help="Filter with an nbql query (e.g. 'due < +7d and tag=work')",
+)
 @click.option("-i", "--interactive", is_flag=True, help="Open interactive todo viewer")
 @click.option("--limit", "-l", type=int, help="Limit the number of todos displayed")
 @click.option("--offset", "-o", type=int, default=0, help="Skip the first N todos")
@@ -192,6 +197,7 @@ def todo(
     sort_by: str | None,
     show_all: bool,
     include_completed: bool,
+    query: str | None,
     interactive: bool,
     limit: int | None,
     offset: int,
@@ -236,6 +242,7 @@ def todo(
       nb todo -k              Display as kanban board
       nb todo -k -b sprint    Use custom board config
       nb todo -C              Copy todo list to clipboard
+      nb todo -q 'due < +7d and tag=work'  Filter with an nbql query
     """
     # If invoking a subcommand, skip the listing logic
     if ctx.invoked_subcommand is not None:
@@ -295,10 +302,12 @@ def todo(
             include_completed = True
 
     # Index notes first
-    from nb.index.scanner import remove_deleted_notes
+    from nb.index.scanner import plan_index, remove_deleted_notes
 
-    remove_deleted_notes()
-    index_all_notes(index_vectors=False)
+    # One vault walk finds both changed and deleted notes
+    plan = plan_index()
+    remove_deleted_notes(plan=plan)
+    index_for_command(plan, todos_only=True)
 
     # Interactive mode uses TUI
     if interactive:
@@ -451,6 +460,7 @@ def todo(
         offset=offset,
         expand=expand,
         copy=copy_to_clip,
+        query=query,
     )
 
 
@@ -459,13 +469,19 @@ def todo(
 # =============================================================================
 
 
-def _complete_todo_with_children(t) -> int:
+def _complete_todo_with_children(t, children=None) -> int:
     """Complete a todo and all its children recursively.
 
+    Args:
+        t: The parent todo.
+        children: Its already-loaded children (with descendants), if any;
+            otherwise the whole subtree is loaded in one query.
+
     Returns the count of children that were completed.
     """
     children_completed = 0
-    children = get_todo_children(t.id)
+    if children is None:
+        children = get_todo_children(t.id)
 
     for child in children:
         if child.completed:
@@ -483,25 +499,36 @@ def _complete_todo_with_children(t) -> int:
             children_completed += 1
 
             # Recursively complete grandchildren
-            children_completed += _complete_todo_with_children(child)
+            children_completed += _complete_todo_with_children(
+                child, children=child.children
+            )
 
     return children_completed
 
 
-def _delete_todo_with_children(t, force: bool = False) -> int:
+def _delete_todo_with_children(t, force: bool = False, children=None) -> int:
     """Delete a todo and all its children recursively.
 
+    Args:
+        t: The todo to delete.
+        force: Skip confirmation.
+        children: Its already-loaded children (with descendants), if any;
+            otherwise the whole subtree is loaded in one query.
+
     Returns the count of children that were deleted.
     """
     from nb.core.todos import delete_todo_from_file
     from nb.index.todos_repo import delete_todo
 
     children_deleted = 0
-    children = get_todo_children(t.id)
+    if children is None:
+        children = get_todo_children(t.id)
 
     # Delete children first (bottom-up to preserve line numbers)
     for child in reversed(children):
-        children_deleted += _delete_todo_with_children(child, force=True)
+        children_deleted += _delete_todo_with_children(
+            child, force=True, children=child.children
+        )
 
     # Delete from source file (pass content to handle stale line numbers)
     try:
@@ -1244,7 +1271,9 @@ def todo_delete(todo_id: tuple[str, ...], force: bool) -> None:
 
         # Delete the todo and its children
         try:
-            deleted_count = _delete_todo_with_children(t, force=True)
+            deleted_count = _delete_todo_with_children(
+                t, force=True, children=children
+            )
             if deleted_count > 0:
                 if children_count > 0:
                     console.print(
@@ -1609,7 +1638,7 @@ def todo_completed(
       nb todo completed -t project     Show completed todos tagged #project
     """
     # Ensure todos are indexed
-    index_all_notes(index_vectors=False)
+    index_for_command(todos_only=True)
 
     config = get_config()
 
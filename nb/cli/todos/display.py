@@ -5,7 +5,7 @@ from __future__ import annotations
 from datetime import date, timedelta
 
 from nb.cli.utils import console, copy_to_clipboard
-from nb.index.todos_repo import get_sorted_todos, query_todos
+from nb.index.todos_repo import attach_todo_children, get_sorted_todos, query_todos
 from nb.utils.dates import get_week_range
 
 from .formatters import _calculate_column_widths, _print_todo, format_todo_as_checkbox
@@ -38,8 +38,15 @@ def _list_todos(
     offset: int = 0,
     expand: bool = False,
     copy: bool = False,
+    query: str | None = None,
 ) -> None:
-    """List todos with optional filters."""
+    """List todos with optional filters.
+
+    With ``query`` (nbql conditions such as ``due < +7d and tag=work``), the
+    query selects the todos in one statement instead of the filter flags;
+    only the notebook filters still apply. An explicit ``sort by`` keeps the
+    query's order within each group.
+    """
     # Determine completion filter
     completed = None if include_completed else False
 
@@ -68,7 +75,26 @@ def _list_todos(
         due_start = week_start
         due_end = week_end
 
-    if overdue:
+    if query is not None:
+        from nb.index.nbql import Condition, NbqlError, parse, run_query
+
+        try:
+            parsed = parse(query, target="todo")
+            if parsed.target != "todo":
+                raise NbqlError("Only todo queries are supported here")
+            if not include_completed and not parsed.uses_field("status"):
+                parsed = parsed.filter(Condition("status", "=", "open"))
+            for name in notebooks or []:
+                parsed = parsed.filter(Condition("notebook", "=", name))
+            for name in exclude_notebooks or []:
+                parsed = parsed.filter(Condition("notebook", "!=", name))
+            todos = run_query(
+                parsed, include_excluded=not exclude_note_excluded
+            ).items
+        except NbqlError as e:
+            console.print(f"[red]Invalid query:[/red] {e}")
+            raise SystemExit(1) from None
+    elif overdue:
         todos = query_todos(
             completed=completed,
             overdue=True,
@@ -195,8 +221,9 @@ def _list_todos(
             source = str(todo.source.path) if todo.source else ""
             return (due, created, prio, source, todo.line_number)
 
-    for group_todos in groups.values():
-        group_todos.sort(key=get_sort_key)
+    if query is None or not parsed.sort:
+        for group_todos in groups.values():
+            group_todos.sort(key=get_sort_key)
 
     # Apply offset and limit AFTER grouping and sorting
     # This ensures the user sees the first N todos in display order
@@ -274,6 +301,9 @@ def _list_todos(
         all_visible_todos, hide_notebook=hide_notebook, expand=expand
     )
 
+    # Subtasks of every visible todo, in one query
+    attach_todo_children(all_visible_todos)
+
     # Display
     for group_name, group_todos in groups.items():
         if not group_todos:
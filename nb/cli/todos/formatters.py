@@ -6,7 +6,6 @@ from datetime import date
 
 from nb.cli.utils import console, get_notebook_display_info
 from nb.config import get_config
-from nb.index.todos_repo import get_todo_children
 
 # Display length for todo IDs (internal IDs are 8 chars, display 6 for brevity)
 TODO_ID_DISPLAY_LEN = 6
@@ -881,7 +880,6 @@ def _print_todo(
 
     console.print("".join(line_parts))
 
-    # Print children
-    children = get_todo_children(t.id)
-    for child in children:
+    # Print children (loaded by attach_todo_children())
+    for child in t.children:
         _print_todo(child, indent=indent + 1, widths=widths)
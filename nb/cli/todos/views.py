@@ -2,12 +2,8 @@
 
 from __future__ import annotations
 
-from datetime import date
-
 from nb.cli.utils import console
 from nb.config import TodoViewConfig, save_config
-from nb.index.todos_repo import query_todos
-from nb.models import TodoStatus
 
 
 def _list_todo_views(config) -> None:
@@ -127,9 +123,9 @@ def _display_kanban(
     from rich.panel import Panel
 
     from nb.config import DEFAULT_KANBAN_COLUMNS, KanbanBoardConfig, get_config
+    from nb.index.nbql import count_query, query_from_kanban_filters, run_query
 
     config = get_config()
-    today = date.today()
 
     # Get board configuration
     board = config.get_kanban_board(board_name)
@@ -158,13 +154,15 @@ def _display_kanban(
     # Query todos for each column and build panels
     column_panels = []
     for col in board.columns:
-        todos = _query_todos_for_kanban_column(
-            col.filters, notebooks, exclude_notebooks, today
-        )
+        # Fetch only what fits (based on terminal height); count the rest
+        query = query_from_kanban_filters(col.filters, notebooks, exclude_notebooks)
+        page = run_query(query, limit=max_items)
+        todos = page.items
+        total = count_query(query) if page.next_cursor else len(todos)
 
         # Build column content
         lines = []
-        for t in todos[:max_items]:  # Limit items per column based on terminal height
+        for t in todos:
             # Priority indicator
             priority_str = f"[red]!{t.priority.value}[/red] " if t.priority else ""
 
@@ -175,13 +173,13 @@ def _display_kanban(
                 content = content[: max_content_len - 3] + "..."
             lines.append(content)
 
-        if len(todos) > max_items:
-            lines.append(f"[dim]+{len(todos) - max_items} more[/dim]")
+        if total > len(todos):
+            lines.append(f"[dim]+{total - len(todos)} more[/dim]")
 
         content_str = "\n".join(lines) if lines else "[dim]No items[/dim]"
         panel = Panel(
             content_str,
-            title=f"[bold {col.color}]{col.name}[/bold {col.color}] ({len(todos)})",
+            title=f"[bold {col.color}]{col.name}[/bold {col.color}] ({total})",
             border_style=col.color,
             width=column_width,
         )
@@ -194,57 +192,3 @@ def _display_kanban(
     console.print(Columns(column_panels, equal=True, expand=True))
     console.print()
 
-
-def _query_todos_for_kanban_column(
-    filters: dict,
-    notebooks: list[str] | None,
-    exclude_notebooks: list[str] | None,
-    today: date,
-) -> list:
-    """Query todos matching kanban column filters."""
-    from datetime import timedelta
-
-    # Map filter keys to query_todos parameters
-    kwargs: dict = {
-        "notebooks": notebooks,
-        "exclude_notebooks": exclude_notebooks,
-        "parent_only": True,
-        "exclude_note_excluded": True,
-    }
-
-    # Handle status filter
-    status_val = filters.get("status")
-    if status_val:
-        kwargs["status"] = TodoStatus(status_val)
-    else:
-        # Default to non-completed
-        kwargs["completed"] = False
-
-    # Handle due date filters
-    if filters.get("due_today"):
-        kwargs["due_start"] = today
-        kwargs["due_end"] = today
-
-    if filters.get("due_this_week"):
-        kwargs["due_start"] = today
-        kwargs["due_end"] = today + timedelta(days=7)
-
-    if filters.get("overdue"):
-        kwargs["overdue"] = True
-
-    # Handle priority filter
-    if filters.get("priority"):
-        kwargs["priority"] = filters["priority"]
-
-    # Handle tags filter
-    if filters.get("tags") and len(filters["tags"]) > 0:
-        kwargs["tag"] = filters["tags"][0]
-
-    # Query todos
-    todos = query_todos(**kwargs)
-
-    # Post-filter for no_due_date (can't easily do this in SQL query)
-    if filters.get("no_due_date"):
-        todos = [t for t in todos if t.due_date is None]
-
-    return todos
@@ -24,6 +24,7 @@ from nb.config import get_config, init_config
 if TYPE_CHECKING:
     from datetime import date
 
+    from nb.index.scanner import IndexPlan, IndexResult
     from nb.models import Todo
 
 # Main console for stdout (user-facing output)
@@ -287,6 +288,27 @@ def print_note(path: Path) -> None:
     console.print()
 
 
+def index_for_command(
+    plan: IndexPlan | None = None, todos_only: bool = False
+) -> IndexResult:
+    """Index changed notes before a command reads the index.
+
+    Recent notes and the inbox are indexed before returning (only their
+    todos with todos_only); if older notes are left to the background,
+    says so. The background run stops when the command exits, and is
+    picked up by the next one or by ``nb index --resume``.
+    """
+    from nb.index.scanner import index_prioritized
+
+    result = index_prioritized(plan, todos_only=todos_only)
+    if result.partial:
+        console.print(
+            f"[dim]Index partial: {result.pending} older notes are queued for "
+            "indexing (nb index --resume to finish now).[/dim]"
+        )
+    return result
+
+
 def ensure_setup() -> None:
     """Ensure nb is set up (creates config and directories on first run)."""
     config = get_config()
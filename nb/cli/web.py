@@ -23,8 +23,18 @@ from nb.cli.utils import console
     is_flag=True,
     help="Dev mode: reload CSS/JS/HTML from disk on each request (no restart needed)",
 )
+@click.option(
+    "--sql-profile",
+    is_flag=True,
+    help="Profile index queries; see /api/debug/sql-profile",
+)
 def web_cmd(
-    port: int, no_open: bool, completed: bool, notebook: str | None, dev: bool
+    port: int,
+    no_open: bool,
+    completed: bool,
+    notebook: str | None,
+    dev: bool,
+    sql_profile: bool,
 ) -> None:
     """Launch web viewer in browser.
 
@@ -32,6 +42,9 @@ def web_cmd(
     Press Ctrl+C to stop.
 
     Use -n/--notebook to scope the viewer to a single notebook.
+
+    Use --sql-profile to time every index query; the slowest statements
+    are served as JSON at /api/debug/sql-profile.
     """
     from nb.web import set_dev_mode
     from nb.webserver import run_server
@@ -56,6 +69,14 @@ def web_cmd(
             "[yellow]Dev mode: templates reload from disk on each request[/yellow]"
         )
 
+    if sql_profile:
+        from nb.index.db import start_profiling
+
+        start_profiling()
+        console.print(
+            f"[yellow]SQL profiling on: http://localhost:{port}/api/debug/sql-profile[/yellow]"
+        )
+
     console.print(f"[dim]Starting web server at http://localhost:{port}[/dim]")
     if notebook:
         console.print(f"[dim]Scoped to notebook: {notebook}[/dim]")
@@ -33,6 +33,7 @@ from .models import (
     EmbeddingsConfig,
     GitConfig,
     InboxConfig,
+    IndexConfig,
     KanbanBoardConfig,
     KanbanColumnConfig,
     LinkedNoteConfig,
@@ -118,6 +119,7 @@ __all__ = [
     "EmbeddingsConfig",
     "GitConfig",
     "InboxConfig",
+    "IndexConfig",
     "KanbanBoardConfig",
     "KanbanColumnConfig",
     "LLMConfig",
@@ -17,6 +17,7 @@ from .models import (
     Config,
     GitConfig,
     InboxConfig,
+    IndexConfig,
     LLMConfig,
     LLMModelConfig,
     McpConfig,
@@ -30,6 +31,7 @@ from .parsers import (
     _parse_embeddings,
     _parse_git_config,
     _parse_inbox_config,
+    _parse_index_config,
     _parse_kanban_boards,
     _parse_llm_config,
     _parse_mcp_config,
@@ -105,6 +107,7 @@ def load_config(config_path: Path | None = None) -> Config:
     kanban_boards = _parse_kanban_boards(data.get("kanban_boards", []))
     embeddings = _parse_embeddings(data.get("embeddings"))
     search = _parse_search(data.get("search"))
+    index_config = _parse_index_config(data.get("index"))
     todo_config = _parse_todo_config(data.get("todo"))
     recorder_config = _parse_recorder_config(data.get("recorder"))
     clip_config = _parse_clip_config(data.get("clip"))
@@ -127,6 +130,7 @@ def load_config(config_path: Path | None = None) -> Config:
         kanban_boards=kanban_boards,
         embeddings=embeddings,
         search=search,
+        index=index_config,
         todo=todo_config,
         recorder=recorder_config,
         clip=clip_config,
@@ -298,6 +302,9 @@ def save_config(config: Config) -> None:
     git_defaults = GitConfig()
     git_data = _serialize_dataclass_fields(config.git, defaults=git_defaults)
 
+    # Index: only non-default values
+    index_data = _serialize_dataclass_fields(config.index, defaults=IndexConfig())
+
     # MCP: only non-default values
     mcp_defaults = McpConfig()
     mcp_data = _serialize_dataclass_fields(config.mcp, defaults=mcp_defaults)
@@ -375,6 +382,8 @@ def save_config(config: Config) -> None:
         data["inbox"] = inbox_data
     if git_data:
         data["git"] = git_data
+    if index_data:
+        data["index"] = index_data
     if llm_data:
         data["llm"] = llm_data
     if mcp_data:
@@ -101,6 +101,7 @@ class EmbeddingsConfig:
     api_key: str | None = None  # Loaded from OPENAI_API_KEY env var (not config)
     chunk_size: int = 500  # Max tokens per chunk
     chunking_method: str = "paragraphs"  # sentences, tokens, paragraphs, sections
+    cache_size_mb: int = 512  # On-disk embedding cache limit (0 = disabled)
 
 
 @dataclass
@@ -116,6 +117,15 @@ class SearchConfig:
     serper_api_key: str | None = None  # Loaded from SERPER_API_KEY env var (not config)
 
 
+@dataclass
+class IndexConfig:
+    """Configuration for the note indexer (`nb index`, and the scan before `nb todo`)."""
+
+    paranoid: bool = False  # Always hash contents (filesystems with unreliable mtimes)
+    workers: int = 0  # Parser processes for large reindexes (0 = one per CPU)
+    optimize_hours: int = 24  # Daemon runs an optimize pass this often (0 = never)
+
+
 @dataclass
 class TodoConfig:
     """Configuration for todo behavior."""
@@ -386,6 +396,7 @@ class Config:
     kanban_boards: list[KanbanBoardConfig] = field(default_factory=list)
     embeddings: EmbeddingsConfig = field(default_factory=EmbeddingsConfig)
     search: SearchConfig = field(default_factory=SearchConfig)
+    index: IndexConfig = field(default_factory=IndexConfig)
     todo: TodoConfig = field(default_factory=TodoConfig)
     recorder: RecorderConfig = field(default_factory=RecorderConfig)
     clip: ClipConfig = field(default_factory=ClipConfig)
@@ -483,6 +494,11 @@ class Config:
         """Return path to localvectordb vectors directory."""
         return self.nb_dir / "vectors"
 
+    @property
+    def embedding_cache_path(self) -> Path:
+        """Return path to the on-disk embedding cache."""
+        return self.nb_dir / "embedding_cache.db"
+
     @property
     def attachments_path(self) -> Path:
         """Return path to attachments directory."""
@@ -536,6 +552,7 @@ embeddings:
   model: nomic-embed-text
   chunk_size: 500     # Max tokens per chunk (smaller = more precise search)
   chunking_method: paragraphs  # sentences, tokens, paragraphs, sections
+  cache_size_mb: 512  # Reuse already-computed embeddings (0 = disabled)
   # base_url: http://localhost:11434  # Optional: custom Ollama endpoint
   # api_key: null  # Required for OpenAI
 
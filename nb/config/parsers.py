@@ -12,6 +12,7 @@ from .models import (
     EmbeddingsConfig,
     GitConfig,
     InboxConfig,
+    IndexConfig,
     KanbanBoardConfig,
     KanbanColumnConfig,
     LLMConfig,
@@ -122,6 +123,7 @@ def _parse_embeddings(data: dict[str, Any] | None) -> EmbeddingsConfig:
         api_key=api_key,
         chunk_size=data.get("chunk_size", 500),
         chunking_method=data.get("chunking_method", "paragraphs"),
+        cache_size_mb=data.get("cache_size_mb", 512),
     )
 
 
@@ -310,6 +312,17 @@ def _parse_git_config(data: dict[str, Any] | None) -> GitConfig:
     )
 
 
+def _parse_index_config(data: dict[str, Any] | None) -> IndexConfig:
+    """Parse indexer configuration."""
+    if data is None:
+        return IndexConfig()
+    return IndexConfig(
+        paranoid=data.get("paranoid", False),
+        workers=data.get("workers", 0),
+        optimize_hours=data.get("optimize_hours", 24),
+    )
+
+
 def _parse_llm_models_config(data: dict[str, Any] | None) -> LLMModelConfig:
     """Parse LLM models configuration."""
     if data is None:
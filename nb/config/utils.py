@@ -20,9 +20,13 @@ CONFIGURABLE_SETTINGS = {
     "embeddings.base_url": "Custom embeddings API endpoint URL",
     "embeddings.chunk_size": "Max tokens per chunk (e.g., 500)",
     "embeddings.chunking_method": "Chunking method (sentences, tokens, paragraphs, sections)",
+    "embeddings.cache_size_mb": "On-disk embedding cache limit in MB (0 = disabled)",
     "search.vector_weight": "Hybrid search balance: 0=keyword, 1=vector (default 0.7)",
     "search.score_threshold": "Minimum score to show search results (default 0.2)",
     "search.recency_decay_days": "Half-life in days for recency boost (default 30)",
+    "index.paranoid": "Always hash note contents to detect changes, ignoring mtimes (true/false)",
+    "index.workers": "Parser processes for large reindexes (0 = one per CPU, 1 = no parallelism)",
+    "index.optimize_hours": "Hours between the daemon's database optimize passes (0 = never)",
     "todo.default_sort": "Default sort order (source, tag, priority, created)",
     "todo.inbox_file": "Name of inbox file in notes_root (default todo.md)",
     "todo.auto_complete_children": "Complete subtasks when parent done (true/false)",
@@ -315,6 +319,11 @@ def get_config_value(key: str) -> Any:
         attr = parts[1]
         if hasattr(config.git, attr):
             return getattr(config.git, attr)
+    elif parts[0] == "index" and len(parts) == 2:
+        # Indexer setting
+        attr = parts[1]
+        if hasattr(config.index, attr):
+            return getattr(config.index, attr)
     elif parts[0] == "llm" and len(parts) == 2:
         # LLM setting
         attr = parts[1]
@@ -405,6 +414,16 @@ def set_config_value(key: str, value: str) -> bool:
                     f"chunking_method must be one of: {', '.join(valid_methods)}"
                 )
             config.embeddings.chunking_method = value
+        elif attr == "cache_size_mb":
+            try:
+                size = int(value)
+            except ValueError:
+                raise ValueError(
+                    f"cache_size_mb must be an integer, got '{value}'"
+                ) from None
+            if size < 0:
+                raise ValueError("cache_size_mb must be 0 or greater")
+            config.embeddings.cache_size_mb = size
         else:
             return False
     elif parts[0] == "search" and len(parts) == 2:
@@ -534,6 +553,37 @@ def set_config_value(key: str, value: str) -> bool:
             config.git.commit_message_template = value if value else "Update {path}"
         else:
             return False
+    elif parts[0] == "index" and len(parts) == 2:
+        # Indexer setting
+        attr = parts[1]
+        if attr == "paranoid":
+            config.index.paranoid = parse_bool_strict(value, "index.paranoid")
+        elif attr == "workers":
+            try:
+                workers = int(value)
+                if workers < 0:
+                    raise ValueError("workers must be 0 or more")
+                config.index.workers = workers
+            except ValueError as e:
+                if "invalid literal" in str(e).lower():
+                    raise ValueError(
+                        f"workers must be an integer, got '{value}'"
+                    ) from None
+                raise
+        elif attr == "optimize_hours":
+            try:
+                hours = int(value)
+                if hours < 0:
+                    raise ValueError("optimize_hours must be 0 or more")
+                config.index.optimize_hours = hours
+            except ValueError as e:
+                if "invalid literal" in str(e).lower():
+                    raise ValueError(
+                        f"optimize_hours must be an integer, got '{value}'"
+                    ) from None
+                raise
+        else:
+            return False
     elif parts[0] == "llm" and len(parts) == 2:
         # LLM setting
         attr = parts[1]
@@ -140,8 +140,21 @@ def export_notebook(
             f"Unsupported format: {format}. Use: {', '.join(sorted(SUPPORTED_FORMATS))}"
         )
 
-    # Collect all markdown files
-    notes = list(notebook_path.rglob("*.md"))
+    # Collect all markdown files (.nbignore is relative to the notes root
+    # for internal notebooks, or to the notebook itself for external ones)
+    from nb.utils.walk import get_ignore_matcher, walk_notes
+
+    if notes_root and notebook_path.is_relative_to(notes_root):
+        ignore_root = notes_root
+    else:
+        ignore_root = notebook_path
+    entries = {
+        Path(entry.path): entry
+        for entry in walk_notes(
+            notebook_path, root=ignore_root, ignore=get_ignore_matcher(ignore_root)
+        )
+    }
+    notes = list(entries)
     if not notes:
         raise ValueError(f"No notes found in notebook: {notebook_path}")
 
@@ -154,7 +167,7 @@ def export_notebook(
 
         notes.sort(key=date_key, reverse=reverse)
     elif sort_by == "modified":
-        notes.sort(key=lambda p: p.stat().st_mtime, reverse=reverse)
+        notes.sort(key=lambda p: entries[p].stat().st_mtime, reverse=reverse)
     else:  # name
         notes.sort(key=lambda p: p.name.lower(), reverse=reverse)
 
@@ -2,13 +2,18 @@
 
 from __future__ import annotations
 
+import os
 from dataclasses import dataclass
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 from nb.config import get_config
 from nb.index.db import get_db
 from nb.utils.hashing import normalize_path
 
+if TYPE_CHECKING:
+    from nb.index.db import Database
+
 
 @dataclass
 class NoteLink:
@@ -71,9 +76,10 @@ def get_outgoing_links(
             pass  # External note, use as-is
     normalized = normalize_path(note_path)
 
-    # Query links from database
+    resolve_pending_links(db)
     rows = db.fetchall(
-        """SELECT target_path, display_text, link_type, is_external, line_number
+        """SELECT target_path, display_text, link_type, is_external, line_number,
+                  resolved_target_path
            FROM note_links WHERE source_path = ?""",
         (normalized,),
     )
@@ -88,12 +94,9 @@ def get_outgoing_links(
         if external_only and not is_external:
             continue
 
-        # Try to resolve internal links
         resolved_path = None
-        if not is_external:
-            resolved_path = resolve_link_target(
-                row["target_path"], note_path, config.notes_root
-            )
+        if row["resolved_target_path"]:
+            resolved_path = _key_to_path(row["resolved_target_path"], config.notes_root)
 
         links.append(
             NoteLink(
@@ -129,34 +132,12 @@ def get_backlinks(note_path: Path) -> list[Backlink]:
             pass  # External note, use as-is
     normalized = normalize_path(note_path)
 
-    # Build patterns to match different link formats
-    # Links might be stored as:
-    # - Exact path: "projects/myproject.md"
-    # - Without extension: "projects/myproject"
-    # - Just filename: "myproject"
-    # - With alias
-
-    target_patterns = [
-        normalized,
-        normalized.replace("\\", "/"),  # Normalize slashes
-    ]
-
-    # Add version without .md extension
-    if normalized.endswith(".md"):
-        target_patterns.append(normalized[:-3])
-        target_patterns.append(normalized[:-3].replace("\\", "/"))
-
-    # Add just the filename
-    stem = Path(normalized).stem
-    target_patterns.append(stem)
-
-    # Query for all matching links
-    placeholders = ", ".join("?" for _ in target_patterns)
+    resolve_pending_links(db)
     rows = db.fetchall(
-        f"""SELECT source_path, display_text, link_type, line_number
-            FROM note_links
-            WHERE is_external = 0 AND target_path IN ({placeholders})""",
-        tuple(target_patterns),
+        """SELECT source_path, display_text, link_type, line_number
+           FROM note_links
+           WHERE resolved_target_path = ? AND is_external = 0""",
+        (normalized,),
     )
 
     backlinks: list[Backlink] = []
@@ -263,6 +244,127 @@ def resolve_link_target(
     return None
 
 
+def _key_to_path(key: str, notes_root: Path) -> Path:
+    """Turn a stored note key (relative, or absolute for linked notes) into a path."""
+    path = Path(key)
+    return path if path.is_absolute() else notes_root / path
+
+
+class _LinkTargets:
+    """Resolves link targets to note keys (notes.path values).
+
+    Same rules, in the same order, as resolve_link_target(), but answered
+    from the notes table (loaded once) instead of probing the filesystem,
+    which only serves as a fallback for targets that aren't indexed notes.
+    """
+
+    def __init__(self, db: Database, notes_root: Path) -> None:
+        self.db = db
+        self.notes_root = notes_root
+        self.root_prefix = normalize_path(notes_root).rstrip("/") + "/"
+        self.keys = {row["path"] for row in db.fetchall("SELECT path FROM notes")}
+        # Filename matches ("%/stem.md", case-insensitive like LIKE)
+        self.stems: dict[str, str] = {}
+        for key in sorted(self.keys):
+            if "/" in key and key.endswith(".md"):
+                self.stems.setdefault(key.rsplit("/", 1)[1][:-3].lower(), key)
+
+    def key(self, path: Path | str) -> str:
+        normalized = normalize_path(path)
+        if normalized.startswith(self.root_prefix):
+            return normalized[len(self.root_prefix) :]
+        return normalized
+
+    def existing(self, path: Path) -> str | None:
+        key = self.key(path)
+        if key in self.keys or path.exists():
+            return key
+        return None
+
+    def resolve(self, target: str, source_key: str) -> str | None:
+        if target.startswith("./") or target.startswith("../"):
+            source = _key_to_path(source_key, self.notes_root)
+            resolved = Path(os.path.normpath(source.parent / target))
+            found = self.existing(resolved)
+            if found is None and not resolved.suffix:
+                found = self.existing(resolved.with_suffix(".md"))
+            return found
+
+        row = self.db.fetchone(
+            "SELECT path FROM note_aliases WHERE alias = ?", (target,)
+        )
+        if row:
+            found = self.existing(_key_to_path(row["path"], self.notes_root))
+            if found is not None:
+                return found
+
+        direct = self.notes_root / target
+        found = self.existing(direct)
+        if found is None and not direct.suffix:
+            found = self.existing(direct.with_suffix(".md"))
+        if found is not None:
+            return found
+
+        stem_match = self.stems.get(Path(target).stem.lower())
+        if stem_match is not None:
+            return stem_match
+
+        from nb.utils.dates import parse_fuzzy_date
+
+        parsed_date = parse_fuzzy_date(target)
+        if parsed_date:
+            from nb.core.notes import get_daily_note_path
+
+            return self.existing(get_daily_note_path(parsed_date, self.notes_root))
+
+        return None
+
+
+def resolve_pending_links(db: Database | None = None) -> int:
+    """Resolve the links whose target is not (or no longer) known.
+
+    New links are stored unresolved, and triggers mark links unresolved
+    again when a note or alias they could point to is added, removed or
+    renamed. This stores each one's target note key in
+    note_links.resolved_target_path (NULL if broken), so backlinks, broken
+    links and the graph are plain indexed queries. The indexer calls this
+    after writing notes; readers call it too, which is a no-op when nothing
+    is pending.
+
+    Args:
+        db: Optional database instance.
+
+    Returns:
+        Number of links resolved.
+    """
+    if db is None:
+        db = get_db()
+
+    rows = db.fetchall(
+        """SELECT rowid, source_path, target_path, is_external
+           FROM note_links WHERE resolved = 0"""
+    )
+    if not rows:
+        return 0
+
+    targets = _LinkTargets(db, get_config().notes_root)
+    db.executemany(
+        """UPDATE note_links SET resolved_target_path = ?, resolved = 1
+           WHERE rowid = ?""",
+        [
+            (
+                None
+                if row["is_external"]
+                else targets.resolve(row["target_path"], row["source_path"]),
+                row["rowid"],
+            )
+            for row in rows
+        ],
+    )
+    db.commit()
+    return len(rows)
+
+
 def get_broken_links(note_path: Path | None = None) -> list[BrokenLink]:
     """Find broken internal links.
 
@@ -276,7 +378,6 @@ def get_broken_links(note_path: Path | None = None) -> list[BrokenLink]:
     config = get_config()
     db = get_db()
 
-    # Query internal links
     if note_path:
         if note_path.is_absolute():
             try:
@@ -284,38 +385,37 @@ def get_broken_links(note_path: Path | None = None) -> list[BrokenLink]:
             except ValueError:
                 pass
         normalized = normalize_path(note_path)
+
+    resolve_pending_links(db)
+    if note_path:
         rows = db.fetchall(
             """SELECT source_path, target_path, display_text, link_type, line_number
-               FROM note_links WHERE source_path = ? AND is_external = 0""",
+               FROM note_links
+               WHERE source_path = ? AND resolved_target_path IS NULL
+                   AND is_external = 0""",
             (normalized,),
         )
     else:
         rows = db.fetchall(
             """SELECT source_path, target_path, display_text, link_type, line_number
-               FROM note_links WHERE is_external = 0"""
+               FROM note_links
+               WHERE resolved_target_path IS NULL AND is_external = 0"""
         )
 
     broken: list[BrokenLink] = []
 
     for row in rows:
-        source = Path(row["source_path"])
         target = row["target_path"]
-
-        # Try to resolve the link
-        resolved = resolve_link_target(target, source, config.notes_root)
-        if resolved is None:
-            # Link is broken - try to find a suggestion
-            suggestion = _find_similar_note(target, config.notes_root)
-            broken.append(
-                BrokenLink(
-                    source_path=source,
-                    target=target,
-                    display_text=row["display_text"],
-                    link_type=row["link_type"] or "wiki",
-                    line_number=row["line_number"],
-                    suggestion=suggestion,
-                )
+        broken.append(
+            BrokenLink(
+                source_path=Path(row["source_path"]),
+                target=target,
+                display_text=row["display_text"],
+                link_type=row["link_type"] or "wiki",
+                line_number=row["line_number"],
+                suggestion=_find_similar_note(target, config.notes_root),
             )
+        )
 
     return broken
 
@@ -5,6 +5,7 @@ dependency between nb.core.notes and nb.index.scanner.
 
 Functions in this module:
 - get_note(): Parse a note file into a Note model
+- build_note(): Build a Note model from already-read content
 - get_notebook_for_path(): Determine the notebook from a note's path
 - get_sections_for_path(): Extract subdirectory sections from a note's path
 
@@ -14,6 +15,7 @@ These are pure parsing functions with no database or index layer dependencies.
 from __future__ import annotations
 
 from pathlib import Path
+from typing import Any
 
 from nb.config import get_config
 from nb.models import Note
@@ -23,7 +25,7 @@ from nb.utils.markdown import (
     extract_tags,
     extract_title,
     extract_wiki_links,
-    parse_note_file,
+    parse_note_content,
 )
 
 
@@ -58,8 +60,34 @@ def get_note(path: Path, notes_root: Path | None = None) -> Note | None:
 
     # Parse the file
     content = full_path.read_text(encoding="utf-8")
-    meta, body = parse_note_file(full_path)
+    meta, body = parse_note_content(content, full_path)
 
+    return build_note(relative_path, full_path, content, meta, body)
+
+
+def build_note(
+    relative_path: Path,
+    full_path: Path,
+    content: str,
+    meta: dict[str, Any],
+    body: str,
+) -> Note:
+    """Build a Note model from already-parsed file content.
+
+    Used by get_note() and by the indexer, which reads each file once and
+    parses the frontmatter itself.
+
+    Args:
+        relative_path: Path relative to notes_root (or absolute if outside it)
+        full_path: Absolute path to the note file
+        content: Full file content (used for the content hash)
+        meta: Parsed frontmatter
+        body: Note body without frontmatter
+
+    Returns:
+        Note model.
+
+    """
     # Extract metadata
     title = extract_title(meta, body, full_path)
     note_date = extract_date(meta, full_path)
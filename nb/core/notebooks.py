@@ -6,6 +6,7 @@ from datetime import date
 from pathlib import Path
 
 from nb.config import get_config
+from nb.utils.walk import get_ignore_matcher, walk_notes
 
 
 def list_notebooks(notes_root: Path | None = None) -> list[str]:
@@ -52,17 +53,13 @@ def get_notebook_notes(notebook: str, notes_root: Path | None = None) -> list[Pa
         if not notebook_path or not notebook_path.exists():
             return []
 
-        notes = []
-        for md_file in notebook_path.rglob("*.md"):
-            # Skip hidden directories
-            try:
-                rel_parts = md_file.relative_to(notebook_path).parts
-                if any(part.startswith(".") for part in rel_parts):
-                    continue
-            except ValueError:
-                continue
-            # Return absolute paths for external notebooks
-            notes.append(md_file)
+        # Return absolute paths for external notebooks
+        notes = [
+            Path(entry.path)
+            for entry in walk_notes(
+                notebook_path, ignore=get_ignore_matcher(notebook_path)
+            )
+        ]
         return sorted(notes)
 
     # Internal notebook
@@ -70,18 +67,12 @@ def get_notebook_notes(notebook: str, notes_root: Path | None = None) -> list[Pa
     if not notebook_path.exists():
         return []
 
-    notes = []
-    for md_file in notebook_path.rglob("*.md"):
-        # Skip hidden directories
-        if any(
-            part.startswith(".") for part in md_file.relative_to(notebook_path).parts
-        ):
-            continue
-        try:
-            relative = md_file.relative_to(notes_root)
-            notes.append(relative)
-        except ValueError:
-            pass
+    notes = [
+        Path(entry.path).relative_to(notes_root)
+        for entry in walk_notes(
+            notebook_path, root=notes_root, ignore=get_ignore_matcher(notes_root)
+        )
+    ]
 
     return sorted(notes)
 
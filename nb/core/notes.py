@@ -913,17 +913,15 @@ def list_notes(
     if not search_path.exists():
         return []
 
-    # Find all markdown files
-    notes = []
-    for md_file in search_path.rglob("*.md"):
-        # Skip hidden directories and .nb
-        if any(part.startswith(".") for part in md_file.parts):
-            continue
-        try:
-            relative = md_file.relative_to(notes_root)
-            notes.append(relative)
-        except ValueError:
-            pass
+    # Find all markdown files (skips hidden and .nbignore'd paths, incl. .nb)
+    from nb.utils.walk import get_ignore_matcher, walk_notes
+
+    notes = [
+        Path(entry.path).relative_to(notes_root)
+        for entry in walk_notes(
+            search_path, root=notes_root, ignore=get_ignore_matcher(notes_root)
+        )
+    ]
 
     return sorted(notes)
 
@@ -952,10 +950,13 @@ def list_daily_notes(
         return []
 
     from nb.utils.dates import parse_date_from_filename
+    from nb.utils.walk import get_ignore_matcher, walk_notes
 
     notes = []
-    for md_file in daily_path.rglob("*.md"):
-        note_date = parse_date_from_filename(md_file.name)
+    for entry in walk_notes(
+        daily_path, root=notes_root, ignore=get_ignore_matcher(notes_root)
+    ):
+        note_date = parse_date_from_filename(entry.name)
         if note_date is None:
             continue
 
@@ -965,11 +966,7 @@ def list_daily_notes(
         if end and note_date > end:
             continue
 
-        try:
-            relative = md_file.relative_to(notes_root)
-            notes.append((note_date, relative))
-        except ValueError:
-            pass
+        notes.append((note_date, Path(entry.path).relative_to(notes_root)))
 
     # Sort by date descending
     notes.sort(key=lambda x: x[0], reverse=True)
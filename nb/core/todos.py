@@ -6,6 +6,7 @@ import logging
 import re
 from datetime import date, datetime
 from pathlib import Path
+from typing import Any
 
 from nb.config import get_config
 from nb.models import Attachment, Priority, Todo, TodoSource, TodoStatus
@@ -15,7 +16,7 @@ from nb.utils.dates import (
     parse_fuzzy_datetime,
     parse_fuzzy_datetime_future,
 )
-from nb.utils.hashing import make_attachment_id, make_todo_id
+from nb.utils.hashing import make_attachment_id, make_todo_id, normalize_path
 from nb.utils.markdown import is_valid_tag
 from nb.utils.patterns import (
     ATTACH_PATTERN_SIMPLE as ATTACH_PATTERN,
@@ -148,22 +149,68 @@ def extract_todos(
         Todos inherit tags from note frontmatter in addition to inline tags.
 
     """
-    if notes_root is None:
-        notes_root = get_config().notes_root
-
     if not path.exists():
         return []
 
     content = path.read_text(encoding="utf-8")
+
+    return extract_todos_from_content(
+        content,
+        path,
+        source_type=source_type,
+        external=external,
+        alias=alias,
+        notes_root=notes_root,
+        notebook=notebook,
+        sections_override=sections_override,
+    )
+
+
+def extract_todos_from_content(
+    content: str,
+    path: Path,
+    source_type: str = "note",
+    external: bool = False,
+    alias: str | None = None,
+    notes_root: Path | None = None,
+    notebook: str | None = None,
+    sections_override: list[str] | None = None,
+    meta: dict[str, Any] | None = None,
+) -> list[Todo]:
+    """Extract all todos from already-loaded markdown content.
+
+    Same as extract_todos() but does not touch the disk, so the indexer can
+    parse a file it has already read. ``path`` is only used for todo IDs,
+    the source reference, and project/section inference.
+
+    Args:
+        content: Full file content (including frontmatter)
+        path: Path the content was read from
+        source_type: Type of source ("note", "inbox", "linked")
+        external: Whether this is an external file
+        alias: Optional alias for linked files
+        notes_root: Notes root for determining project
+        notebook: Override notebook/project name (for linked notes)
+        sections_override: Explicit sections list (for linked notes with a section)
+        meta: Already-parsed frontmatter. Parsed from ``content`` if omitted.
+
+    Returns:
+        List of Todo objects with hierarchy built.
+
+    """
+    if notes_root is None:
+        notes_root = get_config().notes_root
+
     lines = content.splitlines()
 
     # Extract tags from note frontmatter only to inherit to todos
     # (Inline body tags are parsed per-todo, not inherited to all todos)
     note_tags: list[str] = []
     try:
-        from nb.utils.markdown import parse_note_file
+        if meta is None:
+            from nb.utils.markdown import parse_note_content
 
-        meta, _ = parse_note_file(path)
+            meta, _ = parse_note_content(content, path)
         # Only extract frontmatter tags, not inline body tags
         if "tags" in meta:
             fm_tags = meta["tags"]
@@ -699,6 +746,14 @@ def find_matching_sections(
     return partial_matches
 
 
+def _note_key(path: Path, notes_root: Path) -> str:
+    """Get the notes-table key of a note file (relative if under notes_root)."""
+    try:
+        return normalize_path(path.relative_to(notes_root))
+    except ValueError:
+        return normalize_path(path)
+
+
 def add_todo_to_note(
     text: str,
     note_path: Path,
@@ -881,7 +936,7 @@ def add_todo_to_note(
     # Insert into database immediately
     from nb.index.todos_repo import upsert_todos_batch
 
-    upsert_todos_batch([todo])
+    upsert_todos_batch([todo], note_path=_note_key(full_path, notes_root))
 
     return todo
 
@@ -1163,7 +1218,9 @@ def add_todo_to_daily_note(text: str, dt: date | None = None) -> Todo:
     # Insert into database immediately
     from nb.index.todos_repo import upsert_todos_batch
 
-    upsert_todos_batch([todo])
+    upsert_todos_batch(
+        [todo], note_path=_note_key(note_path, get_config().notes_root)
+    )
 
     return todo
 
@@ -1184,6 +1241,27 @@ def normalize_due_dates_in_file(path: Path) -> int:
         return 0
 
     content = path.read_text(encoding="utf-8")
+    new_content, changes = normalize_due_dates(content)
+
+    # Write back only if changes were made
+    if changes > 0:
+        path.write_text(new_content, encoding="utf-8")
+
+    return changes
+
+
+def normalize_due_dates(content: str) -> tuple[str, int]:
+    """Normalize relative due dates in markdown text to absolute dates.
+
+    In-memory counterpart of normalize_due_dates_in_file().
+
+    Args:
+        content: The markdown text to normalize.
+
+    Returns:
+        Tuple of (content, number of due dates normalized). The content is
+        returned unchanged if nothing needed normalizing.
+    """
     lines = content.splitlines()
     changes = 0
     modified_lines = []
@@ -1210,11 +1288,10 @@ def normalize_due_dates_in_file(path: Path) -> int:
 
         modified_lines.append(new_line)
 
-    # Write back only if changes were made
-    if changes > 0:
-        path.write_text("\n".join(modified_lines) + "\n", encoding="utf-8")
+    if changes == 0:
+        return content, 0
 
-    return changes
+    return "\n".join(modified_lines) + "\n", changes
 
 
 def get_todo_raw_line(
@@ -17,10 +17,17 @@ from pathlib import Path
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
+
     from watchdog.events import FileSystemEvent
 
 logger = logging.getLogger("nb.daemon")
 
+# Scheduled optimize passes: how often to check if one is due, and how long
+# the watched folders must have been quiet before running it
+OPTIMIZE_CHECK_SECONDS = 600
+OPTIMIZE_IDLE_SECONDS = 60
+
 
 class NoteChangeHandler:
     """Handle filesystem changes to markdown files."""
@@ -31,6 +38,8 @@ class NoteChangeHandler:
         self.pending_paths: set[Path] = set()
         self.last_change: float = 0.0
         self.stats = {"indexed": 0, "errors": 0, "removed": 0}
+        # Index job recording the backlog, so a restart picks up unfinished work
+        self.job: int | None = None
 
     def _should_handle(self, path: str) -> bool:
         """Check if this path should trigger indexing."""
@@ -83,51 +92,75 @@ class NoteChangeHandler:
         if time.time() - self.last_change < self.debounce_seconds:
             return 0  # Wait for changes to settle
 
+        from nb.index.jobs_repo import (
+            complete_job_items,
+            enqueue_job_items,
+            fail_job_item,
+        )
+
         paths = self.pending_paths.copy()
         self.pending_paths.clear()
         processed = 0
+        self._track(enqueue_job_items, [str(path) for path in paths])
 
+        deleted: list[Path] = []
         for path in paths:
+            if not path.exists():
+                # File was deleted - removed from the index in one batch below
+                deleted.append(path)
+                continue
             try:
-                if path.exists():
-                    self._index_file(path)
-                    logger.debug("Indexed: %s", path)
-                else:
-                    # File was deleted - remove from index
-                    self._remove_from_index(path)
-                    logger.debug("Removed: %s", path)
-                    self.stats["removed"] += 1
+                self._index_file(path)
+                logger.debug("Indexed: %s", path)
                 processed += 1
                 self.stats["indexed"] += 1
+                self._track(complete_job_items, [str(path)])
             except Exception as e:
                 logger.warning("Failed to index %s: %s", path, e)
                 self.stats["errors"] += 1
+                self._track(fail_job_item, str(path), str(e))
+
+        if deleted:
+            try:
+                self._remove_from_index(deleted)
+                logger.debug("Removed %d deleted file(s)", len(deleted))
+                processed += len(deleted)
+                self.stats["indexed"] += len(deleted)
+                self.stats["removed"] += len(deleted)
+                self._track(complete_job_items, [str(path) for path in deleted])
+            except Exception as e:
+                logger.warning(
+                    "Failed to remove %d deleted file(s): %s", len(deleted), e
+                )
+                self.stats["errors"] += 1
+                for path in deleted:
+                    self._track(fail_job_item, str(path), str(e))
 
         return processed
 
+    def _track(self, operation: Callable[..., None], *args: object) -> None:
+        """Record backlog progress in the daemon's index job, if it has one.
+
+        Bookkeeping failures are logged and never stop indexing.
+        """
+        if self.job is None:
+            return
+        try:
+            operation(self.job, *args)
+        except Exception as e:
+            logger.warning("Failed to update index job: %s", e)
+
     def _index_file(self, path: Path) -> None:
         """Index a single file using thread-safe indexing."""
         from nb.index.scanner import index_note_threadsafe
 
         index_note_threadsafe(path, self.notes_root, index_vectors=False)
 
-    def _remove_from_index(self, path: Path) -> None:
-        """Remove a deleted file from the index."""
-        from nb.index.db import get_db
-        from nb.index.todos_repo import delete_todos_for_source
-        from nb.utils.hashing import normalize_path
-
-        db = get_db()
-        try:
-            rel_path = path.relative_to(self.notes_root)
-            normalized = normalize_path(rel_path)
-        except ValueError:
-            # Path outside notes_root (linked file)
-            normalized = normalize_path(path)
+    def _remove_from_index(self, paths: list[Path]) -> None:
+        """Remove deleted files from the index in one transaction."""
+        from nb.index.scanner import remove_notes_from_index
 
-        db.execute("DELETE FROM notes WHERE path = ?", (normalized,))
-        db.commit()
-        delete_todos_for_source(path)
+        remove_notes_from_index(paths, self.notes_root)
 
 
 class LinkedFileHandler:
@@ -265,6 +298,78 @@ def _read_file_with_retry(path: Path, max_attempts: int = 3, delay: float = 0.2)
     raise last_error  # type: ignore[misc]
 
 
+def _start_backlog_job(handlers: list[NoteChangeHandler]) -> int | None:
+    """Attach an index job to the note handlers to record their backlog.
+
+    A job left unfinished by a previous daemon (killed, crashed) is taken
+    over, and its queued files are handed back to the handler watching
+    them so they are indexed straight away.
+    """
+    from nb.index.jobs_repo import (
+        JOB_DAEMON,
+        create_job,
+        get_job_items,
+        get_unfinished_job,
+        restart_job,
+    )
+
+    try:
+        unfinished = get_unfinished_job(JOB_DAEMON)
+        if unfinished is None:
+            job = create_job(JOB_DAEMON)
+            backlog: list[str] = []
+        else:
+            job = unfinished.id
+            restart_job(job)
+            backlog = get_job_items(job)
+    except Exception as e:
+        logger.warning("Failed to start index job, backlog won't be saved: %s", e)
+        return None
+
+    for handler in handlers:
+        handler.job = job
+    for item in backlog:
+        path = Path(item)
+        owner = next(
+            (h for h in handlers if path.is_relative_to(h.notes_root)), handlers[0]
+        )
+        owner.pending_paths.add(path)
+    if backlog:
+        logger.info("Resuming %d queued file(s) from index job %d", len(backlog), job)
+    return job
+
+
+def _finish_backlog_job(job: int | None) -> None:
+    """Finish the daemon's index job, leaving it open if files are still queued."""
+    if job is None:
+        return
+    from nb.index.jobs_repo import finish_job, get_job_items
+
+    try:
+        finish_job(job, interrupted=bool(get_job_items(job)))
+    except Exception as e:
+        logger.warning("Failed to finish index job: %s", e)
+
+
+def _run_scheduled_optimize(hours: int) -> None:
+    """Run a database optimize pass if index.optimize_hours says one is due."""
+    from nb.index.maintenance import optimize_db, optimize_due
+
+    try:
+        if not optimize_due(hours):
+            return
+        result = optimize_db()
+    except Exception as e:
+        logger.warning("Database optimize failed: %s", e)
+        return
+    logger.info(
+        "Optimized database in %.1fs%s (%.1f MiB)",
+        result.seconds,
+        ", vacuumed" if result.vacuumed else "",
+        result.after.size_bytes / 1024 / 1024,
+    )
+
+
 def run_daemon(notes_root: Path, nb_dir: Path, foreground: bool = False) -> None:
     """Run the indexing daemon."""
     try:
@@ -377,8 +482,13 @@ def run_daemon(notes_root: Path, nb_dir: Path, foreground: bool = False) -> None
                 "Watching linked notes: %s @ %s", linked_note.alias, linked_note.path
             )
 
+    job = _start_backlog_job(
+        [h for h in our_handlers if isinstance(h, NoteChangeHandler)]
+    )
+
     observer.start()
     logger.info("Daemon started (PID: %d)", os.getpid())
+    next_optimize_check = time.time()
 
     try:
         while running:
@@ -400,6 +510,16 @@ def run_daemon(notes_root: Path, nb_dir: Path, foreground: bool = False) -> None
                             if isinstance(h, NoteChangeHandler)
                         )
 
+            # Optimize the database while nothing is waiting to be indexed
+            now = time.time()
+            if (
+                now >= next_optimize_check
+                and now - state.last_activity >= OPTIMIZE_IDLE_SECONDS
+                and not any(h.pending_paths for h in our_handlers)
+            ):
+                next_optimize_check = now + OPTIMIZE_CHECK_SECONDS
+                _run_scheduled_optimize(config.index.optimize_hours)
+
             # Update state file periodically
             state.write()
 
@@ -410,6 +530,7 @@ def run_daemon(notes_root: Path, nb_dir: Path, foreground: bool = False) -> None
     finally:
         observer.stop()
         observer.join()
+        _finish_backlog_job(job)
         pid_file.unlink(missing_ok=True)
         state_file.unlink(missing_ok=True)
         logger.info("Daemon stopped")
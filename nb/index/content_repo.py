@@ -0,0 +1,60 @@
+"""Note body storage for nb.
+
+Note bodies live in the note_content table, packed by
+nb.utils.compression.pack_text(), instead of in the notes table that
+listings and joins read all the time. Only callers that need a body read
+it: in Python through get_note_content(), or in SQL through the
+note_text(body [, max_chars]) function every connection registers.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from nb.index.db import get_db
+from nb.utils.compression import pack_text, unpack_text
+
+if TYPE_CHECKING:
+    from nb.index.db import Database
+
+
+def set_note_content(
+    note_path: str, content: str | None, db: Database | None = None
+) -> None:
+    """Store a note's body, replacing the previous one.
+
+    Empty bodies aren't stored. The notes row must already exist. Does not
+    commit; callers commit with the rest of the note's rows.
+
+    Args:
+        note_path: The note's notes.path.
+        content: The full note content.
+        db: Optional database instance.
+    """
+    if db is None:
+        db = get_db()
+    if not content:
+        db.execute("DELETE FROM note_content WHERE note_path = ?", (note_path,))
+        return
+    db.execute(
+        "INSERT OR REPLACE INTO note_content (note_path, body) VALUES (?, ?)",
+        (note_path, pack_text(content)),
+    )
+
+
+def get_note_content(note_path: str, db: Database | None = None) -> str | None:
+    """Get a note's indexed body.
+
+    Args:
+        note_path: The note's notes.path.
+        db: Optional database instance.
+
+    Returns:
+        The content, or None if the note isn't indexed or is empty.
+    """
+    if db is None:
+        db = get_db()
+    row = db.fetchone(
+        "SELECT body FROM note_content WHERE note_path = ?", (note_path,)
+    )
+    return unpack_text(row["body"]) if row else None
@@ -2,18 +2,26 @@
 
 from __future__ import annotations
 
+import functools
+import json
 import logging
 import sqlite3
 import threading
+import time
 from collections.abc import Iterator
 from contextlib import contextmanager
-from pathlib import Path
-from typing import Any
+from pathlib import Path, PurePosixPath
+from typing import TYPE_CHECKING, Any
+
+from nb.utils.compression import pack_text, unpack_text, unpack_text_near
+
+if TYPE_CHECKING:
+    from nb.index.profiler import QueryProfiler
 
 _logger = logging.getLogger(__name__)
 
 # Current schema version
-SCHEMA_VERSION = 20
+SCHEMA_VERSION = 31
 
 # Phase 1 schema: notes, tags, links
 SCHEMA_V1 = """
@@ -362,6 +370,497 @@ ALTER TABLE todos ADD COLUMN owner TEXT;
 CREATE INDEX IF NOT EXISTS idx_todos_owner ON todos(owner);
 """
 
+# Phase 21 additions: stat manifest for fast change detection
+SCHEMA_V21 = """
+-- Per-file stat tuple recorded at index time. A file whose current stat
+-- matches its row is treated as unchanged without being opened.
+CREATE TABLE IF NOT EXISTS file_manifest (
+    path TEXT PRIMARY KEY REFERENCES notes(path) ON DELETE CASCADE,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    ctime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    device INTEGER NOT NULL
+);
+"""
+
+# Phase 22: Directory listing manifest
+SCHEMA_V22 = """
+-- Directory listings recorded by the last vault walk. A directory whose
+-- mtime still matches its row is not listed again; its note files and
+-- subdirectories are taken from here instead.
+CREATE TABLE IF NOT EXISTS dir_manifest (
+    path TEXT PRIMARY KEY,          -- Absolute directory path
+    root TEXT NOT NULL,             -- Walk root (notes root or external notebook)
+    mtime_ns INTEGER NOT NULL,
+    ignore_key TEXT NOT NULL,       -- Signature of the .nbignore patterns applied
+    subdirs TEXT NOT NULL,          -- JSON list of subdirectory names
+    files TEXT NOT NULL             -- JSON list of note file names
+);
+
+CREATE INDEX IF NOT EXISTS idx_dir_manifest_root ON dir_manifest(root);
+"""
+
+# Phase 23: Vector index state
+SCHEMA_V23 = """
+-- Which revision of each note is embedded in the vector index, written by
+-- NoteSearch after every successful upsert or delete. Notes whose
+-- content_hash or embedding settings differ from their row need embedding.
+CREATE TABLE IF NOT EXISTS vector_state (
+    path TEXT PRIMARY KEY,          -- Normalized note path (notes.path)
+    content_hash TEXT NOT NULL,     -- notes.content_hash that was embedded
+    model TEXT NOT NULL,            -- Embedding settings key (provider|model|chunking)
+    chunk_count INTEGER,            -- Chunks stored for the note
+    embedded_at TEXT NOT NULL
+);
+"""
+
+# Phase 24: Resumable index jobs
+SCHEMA_V24 = """
+-- Long index runs and the daemon's backlog, with progress counters
+CREATE TABLE IF NOT EXISTS index_jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,             -- 'files', 'vectors' or 'daemon'
+    notebook TEXT,                  -- Notebook filter, if any
+    status TEXT NOT NULL,           -- 'running', 'interrupted' or 'done'
+    total INTEGER NOT NULL DEFAULT 0,
+    done INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    started_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    finished_at TEXT
+);
+
+-- Work queue of each job; a row is deleted when its item is done
+CREATE TABLE IF NOT EXISTS index_job_items (
+    job_id INTEGER NOT NULL REFERENCES index_jobs(id) ON DELETE CASCADE,
+    path TEXT NOT NULL,
+    error TEXT,                     -- Last error, if the item failed
+    PRIMARY KEY (job_id, path)
+);
+"""
+
+# Phase 25 additions: trigram full-text index over note content, for grep
+# prefiltering and keyword search without the vector store. It's an
+# external-content table kept in sync with notes by triggers (REPLACE
+# deletes fire the delete trigger because connections enable
+# recursive_triggers).
+SCHEMA_V25 = """
+CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+    content,
+    content='notes',
+    content_rowid='rowid',
+    tokenize='trigram'
+);
+
+CREATE TRIGGER IF NOT EXISTS notes_fts_insert AFTER INSERT ON notes BEGIN
+    INSERT INTO notes_fts(rowid, content) VALUES (new.rowid, new.content);
+END;
+
+CREATE TRIGGER IF NOT EXISTS notes_fts_delete AFTER DELETE ON notes BEGIN
+    INSERT INTO notes_fts(notes_fts, rowid, content)
+    VALUES ('delete', old.rowid, old.content);
+END;
+
+CREATE TRIGGER IF NOT EXISTS notes_fts_update AFTER UPDATE OF content ON notes BEGIN
+    INSERT INTO notes_fts(notes_fts, rowid, content)
+    VALUES ('delete', old.rowid, old.content);
+    INSERT INTO notes_fts(rowid, content) VALUES (new.rowid, new.content);
+END;
+
+INSERT INTO notes_fts(notes_fts) VALUES ('rebuild');
+"""
+
+# Phase 26 additions: each todo stores the key of its source note and a
+# copy of the note's todo_exclude flag, so `nb todo` filters on an indexed
+# column instead of joining notes on a path suffix. Triggers copy the flag
+# when the note row changes.
+SCHEMA_V26 = """
+ALTER TABLE todos ADD COLUMN note_path TEXT;        -- notes.path of the source note
+ALTER TABLE todos ADD COLUMN todo_exclude INTEGER DEFAULT 0;
+
+CREATE INDEX IF NOT EXISTS idx_todos_note_path ON todos(note_path);
+CREATE INDEX IF NOT EXISTS idx_todos_todo_exclude ON todos(todo_exclude);
+
+CREATE TRIGGER IF NOT EXISTS notes_todo_exclude_insert AFTER INSERT ON notes BEGIN
+    UPDATE todos SET todo_exclude = COALESCE(new.todo_exclude, 0)
+    WHERE note_path = new.path;
+END;
+
+CREATE TRIGGER IF NOT EXISTS notes_todo_exclude_update AFTER UPDATE OF todo_exclude ON notes BEGIN
+    UPDATE todos SET todo_exclude = COALESCE(new.todo_exclude, 0)
+    WHERE note_path = new.path;
+END;
+
+-- Backfill with the old join: linked notes are keyed by their normalized
+-- absolute path (= source_path), internal notes by the path suffix
+UPDATE todos SET note_path = (
+    SELECT n.path FROM notes n
+    WHERE todos.source_path = n.path
+        OR (todos.source_alias IS NULL
+            AND n.path NOT LIKE '_:/%' AND n.path NOT LIKE '/%'
+            AND todos.source_path LIKE '%/' || n.path)
+    ORDER BY length(n.path) DESC
+    LIMIT 1
+);
+
+UPDATE todos SET todo_exclude = COALESCE(
+    (SELECT n.todo_exclude FROM notes n WHERE n.path = todos.note_path), 0
+);
+"""
+
+# Phase 27 additions: link targets resolved at index time. resolved = 0
+# marks links to (re)resolve (new links, and links that triggers invalidate
+# when notes or aliases change); nb.core.note_links.resolve_pending_links()
+# resolves them and stores the target note key in resolved_target_path
+# (NULL when the link is broken or external).
+SCHEMA_V27 = """
+ALTER TABLE note_links ADD COLUMN resolved_target_path TEXT;
+ALTER TABLE note_links ADD COLUMN resolved INTEGER DEFAULT 0;
+
+CREATE INDEX IF NOT EXISTS idx_note_links_resolved_target
+    ON note_links(resolved_target_path, is_external);
+CREATE INDEX IF NOT EXISTS idx_note_links_pending
+    ON note_links(resolved) WHERE resolved = 0;
+
+-- A removed (or replaced) note: links to it may now be broken
+CREATE TRIGGER IF NOT EXISTS notes_links_delete AFTER DELETE ON notes BEGIN
+    UPDATE note_links SET resolved = 0 WHERE resolved_target_path = old.path;
+END;
+
+-- A new note: broken links may now resolve to it
+CREATE TRIGGER IF NOT EXISTS notes_links_insert AFTER INSERT ON notes BEGIN
+    UPDATE note_links SET resolved = 0
+    WHERE resolved_target_path IS NULL AND is_external = 0 AND resolved = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS note_aliases_links_insert AFTER INSERT ON note_aliases BEGIN
+    UPDATE note_links SET resolved = 0 WHERE target_path = new.alias;
+END;
+
+CREATE TRIGGER IF NOT EXISTS note_aliases_links_update AFTER UPDATE ON note_aliases BEGIN
+    UPDATE note_links SET resolved = 0 WHERE target_path IN (old.alias, new.alias);
+END;
+
+CREATE TRIGGER IF NOT EXISTS note_aliases_links_delete AFTER DELETE ON note_aliases BEGIN
+    UPDATE note_links SET resolved = 0 WHERE target_path = old.alias;
+END;
+"""
+
+# Phase 28 additions: aggregates for nb stats and the tag cloud, kept up to
+# date by triggers so stats read a few precomputed rows instead of grouping
+# the todos table. Only top-level todos (parent_id IS NULL) are counted, like
+# the stats always did. NULL keys are stored as '' (or priority 0) so they
+# can be part of the primary key. Todo tags are counted when the tag row is
+# written; when a todo is deleted its tags are uncounted by a BEFORE DELETE
+# trigger, because by the time the cascade deletes todo_tags the todo row
+# (with the notebook and status to uncount) is gone. Note tags likewise.
+SCHEMA_V28 = """
+-- Top-level todos by notebook, priority, status and due day
+CREATE TABLE IF NOT EXISTS todo_counts (
+    project TEXT NOT NULL,          -- todos.project, '' for none
+    priority INTEGER NOT NULL,      -- 0 for none
+    status TEXT NOT NULL,
+    due_day TEXT NOT NULL,          -- DATE(due_date), '' for none
+    count INTEGER NOT NULL,
+    PRIMARY KEY (project, priority, status, due_day)
+) WITHOUT ROWID;
+
+-- Top-level todos created and completed per day and notebook
+CREATE TABLE IF NOT EXISTS todo_activity (
+    day TEXT NOT NULL,
+    project TEXT NOT NULL,
+    created INTEGER NOT NULL DEFAULT 0,
+    completed INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, project)
+) WITHOUT ROWID;
+
+-- Tags of top-level todos by notebook, source file and completion
+CREATE TABLE IF NOT EXISTS todo_tag_counts (
+    tag TEXT NOT NULL,
+    project TEXT NOT NULL,
+    source_path TEXT NOT NULL,
+    completed INTEGER NOT NULL,     -- 1 if status = 'completed'
+    count INTEGER NOT NULL,
+    PRIMARY KEY (tag, project, source_path, completed)
+) WITHOUT ROWID;
+
+-- Note tags by notebook
+CREATE TABLE IF NOT EXISTS note_tag_counts (
+    tag TEXT NOT NULL,
+    notebook TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (tag, notebook)
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS todo_stats_insert AFTER INSERT ON todos
+WHEN new.parent_id IS NULL BEGIN
+    INSERT INTO todo_counts (project, priority, status, due_day, count)
+    VALUES (COALESCE(new.project, ''), COALESCE(new.priority, 0),
+            COALESCE(new.status, ''), COALESCE(DATE(new.due_date), ''), 1)
+    ON CONFLICT (project, priority, status, due_day) DO UPDATE SET count = count + 1;
+    INSERT INTO todo_activity (day, project, created)
+    SELECT DATE(new.created_date), COALESCE(new.project, ''), 1
+    WHERE DATE(new.created_date) IS NOT NULL
+    ON CONFLICT (day, project) DO UPDATE SET created = created + 1;
+    INSERT INTO todo_activity (day, project, completed)
+    SELECT DATE(new.completed_date), COALESCE(new.project, ''), 1
+    WHERE DATE(new.completed_date) IS NOT NULL
+    ON CONFLICT (day, project) DO UPDATE SET completed = completed + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS todo_stats_delete AFTER DELETE ON todos
+WHEN old.parent_id IS NULL BEGIN
+    UPDATE todo_counts SET count = count - 1
+    WHERE project = COALESCE(old.project, '') AND priority = COALESCE(old.priority, 0)
+        AND status = COALESCE(old.status, '') AND due_day = COALESCE(DATE(old.due_date), '');
+    UPDATE todo_activity SET created = created - 1
+    WHERE day = DATE(old.created_date) AND project = COALESCE(old.project, '');
+    UPDATE todo_activity SET completed = completed - 1
+    WHERE day = DATE(old.completed_date) AND project = COALESCE(old.project, '');
+    DELETE FROM todo_counts
+    WHERE project = COALESCE(old.project, '') AND priority = COALESCE(old.priority, 0)
+        AND status = COALESCE(old.status, '') AND due_day = COALESCE(DATE(old.due_date), '')
+        AND count <= 0;
+    DELETE FROM todo_activity
+    WHERE day IN (DATE(old.created_date), DATE(old.completed_date))
+        AND project = COALESCE(old.project, '') AND created <= 0 AND completed <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS todo_stats_update_old
+AFTER UPDATE OF project, priority, status, due_date, created_date, completed_date, parent_id ON todos
+WHEN old.parent_id IS NULL BEGIN
+    UPDATE todo_counts SET count = count - 1
+    WHERE project = COALESCE(old.project, '') AND priority = COALESCE(old.priority, 0)
+        AND status = COALESCE(old.status, '') AND due_day = COALESCE(DATE(old.due_date), '');
+    UPDATE todo_activity SET created = created - 1
+    WHERE day = DATE(old.created_date) AND project = COALESCE(old.project, '');
+    UPDATE todo_activity SET completed = completed - 1
+    WHERE day = DATE(old.completed_date) AND project = COALESCE(old.project, '');
+    DELETE FROM todo_counts
+    WHERE project = COALESCE(old.project, '') AND priority = COALESCE(old.priority, 0)
+        AND status = COALESCE(old.status, '') AND due_day = COALESCE(DATE(old.due_date), '')
+        AND count <= 0;
+    DELETE FROM todo_activity
+    WHERE day IN (DATE(old.created_date), DATE(old.completed_date))
+        AND project = COALESCE(old.project, '') AND created <= 0 AND completed <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS todo_stats_update_new
+AFTER UPDATE OF project, priority, status, due_date, created_date, completed_date, parent_id ON todos
+WHEN new.parent_id IS NULL BEGIN
+    INSERT INTO todo_counts (project, priority, status, due_day, count)
+    VALUES (COALESCE(new.project, ''), COALESCE(new.priority, 0),
+            COALESCE(new.status, ''), COALESCE(DATE(new.due_date), ''), 1)
+    ON CONFLICT (project, priority, status, due_day) DO UPDATE SET count = count + 1;
+    INSERT INTO todo_activity (day, project, created)
+    SELECT DATE(new.created_date), COALESCE(new.project, ''), 1
+    WHERE DATE(new.created_date) IS NOT NULL
+    ON CONFLICT (day, project) DO UPDATE SET created = created + 1;
+    INSERT INTO todo_activity (day, project, completed)
+    SELECT DATE(new.completed_date), COALESCE(new.project, ''), 1
+    WHERE DATE(new.completed_date) IS NOT NULL
+    ON CONFLICT (day, project) DO UPDATE SET completed = completed + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS todo_tag_counts_insert AFTER INSERT ON todo_tags BEGIN
+    INSERT INTO todo_tag_counts (tag, project, source_path, completed, count)
+    SELECT new.tag, COALESCE(t.project, ''), COALESCE(t.source_path, ''),
+           t.status IS 'completed', 1
+    FROM todos t WHERE t.id = new.todo_id AND t.parent_id IS NULL
+    ON CONFLICT (tag, project, source_path, completed) DO UPDATE SET count = count + 1;
+END;
+
+-- Only fires with the todo still there when a tag is removed from it; on
+-- cascades the todo is gone and todo_tag_counts_todo_delete did the work
+CREATE TRIGGER IF NOT EXISTS todo_tag_counts_delete AFTER DELETE ON todo_tags BEGIN
+    UPDATE todo_tag_counts SET count = count - 1
+    WHERE (tag, project, source_path, completed) IN (
+        SELECT old.tag, COALESCE(t.project, ''), COALESCE(t.source_path, ''),
+               t.status IS 'completed'
+        FROM todos t WHERE t.id = old.todo_id AND t.parent_id IS NULL
+    );
+    DELETE FROM todo_tag_counts WHERE tag = old.tag AND count <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS todo_tag_counts_todo_delete BEFORE DELETE ON todos
+WHEN old.parent_id IS NULL BEGIN
+    UPDATE todo_tag_counts SET count = count - 1
+    WHERE project = COALESCE(old.project, '') AND source_path = COALESCE(old.source_path, '')
+        AND completed = (old.status IS 'completed')
+        AND tag IN (SELECT tag FROM todo_tags WHERE todo_id = old.id);
+    DELETE FROM todo_tag_counts
+    WHERE project = COALESCE(old.project, '') AND source_path = COALESCE(old.source_path, '')
+        AND tag IN (SELECT tag FROM todo_tags WHERE todo_id = old.id) AND count <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS todo_tag_counts_todo_update
+AFTER UPDATE OF project, source_path, status, parent_id ON todos BEGIN
+    UPDATE todo_tag_counts SET count = count - 1
+    WHERE old.parent_id IS NULL
+        AND project = COALESCE(old.project, '') AND source_path = COALESCE(old.source_path, '')
+        AND completed = (old.status IS 'completed')
+        AND tag IN (SELECT tag FROM todo_tags WHERE todo_id = old.id);
+    INSERT INTO todo_tag_counts (tag, project, source_path, completed, count)
+    SELECT tag, COALESCE(new.project, ''), COALESCE(new.source_path, ''),
+           new.status IS 'completed', 1
+    FROM todo_tags WHERE todo_id = new.id AND new.parent_id IS NULL
+    ON CONFLICT (tag, project, source_path, completed) DO UPDATE SET count = count + 1;
+    DELETE FROM todo_tag_counts
+    WHERE project = COALESCE(old.project, '') AND source_path = COALESCE(old.source_path, '')
+        AND tag IN (SELECT tag FROM todo_tags WHERE todo_id = old.id) AND count <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS note_tag_counts_insert AFTER INSERT ON note_tags BEGIN
+    INSERT INTO note_tag_counts (tag, notebook, count)
+    SELECT new.tag, COALESCE(n.notebook, ''), 1 FROM notes n WHERE n.path = new.note_path
+    ON CONFLICT (tag, notebook) DO UPDATE SET count = count + 1;
+END;
+
+-- As for todo tags, cascades from a deleted note are handled before it goes
+CREATE TRIGGER IF NOT EXISTS note_tag_counts_delete AFTER DELETE ON note_tags BEGIN
+    UPDATE note_tag_counts SET count = count - 1
+    WHERE tag = old.tag AND notebook = (
+        SELECT COALESCE(n.notebook, '') FROM notes n WHERE n.path = old.note_path
+    );
+    DELETE FROM note_tag_counts WHERE tag = old.tag AND count <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS note_tag_counts_note_delete BEFORE DELETE ON notes BEGIN
+    UPDATE note_tag_counts SET count = count - 1
+    WHERE notebook = COALESCE(old.notebook, '')
+        AND tag IN (SELECT tag FROM note_tags WHERE note_path = old.path);
+    DELETE FROM note_tag_counts
+    WHERE notebook = COALESCE(old.notebook, '')
+        AND tag IN (SELECT tag FROM note_tags WHERE note_path = old.path) AND count <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS note_tag_counts_note_update AFTER UPDATE OF notebook ON notes BEGIN
+    UPDATE note_tag_counts SET count = count - 1
+    WHERE notebook = COALESCE(old.notebook, '')
+        AND tag IN (SELECT tag FROM note_tags WHERE note_path = old.path);
+    INSERT INTO note_tag_counts (tag, notebook, count)
+    SELECT tag, COALESCE(new.notebook, ''), 1 FROM note_tags WHERE note_path = new.path
+    ON CONFLICT (tag, notebook) DO UPDATE SET count = count + 1;
+    DELETE FROM note_tag_counts
+    WHERE notebook = COALESCE(old.notebook, '')
+        AND tag IN (SELECT tag FROM note_tags WHERE note_path = old.path) AND count <= 0;
+END;
+
+-- Backfill from the current index
+INSERT INTO todo_counts (project, priority, status, due_day, count)
+SELECT COALESCE(project, ''), COALESCE(priority, 0), COALESCE(status, ''),
+       COALESCE(DATE(due_date), ''), COUNT(*)
+FROM todos WHERE parent_id IS NULL
+GROUP BY 1, 2, 3, 4;
+
+INSERT INTO todo_activity (day, project, created)
+SELECT DATE(created_date), COALESCE(project, ''), COUNT(*)
+FROM todos WHERE parent_id IS NULL AND DATE(created_date) IS NOT NULL
+GROUP BY 1, 2;
+
+INSERT INTO todo_activity (day, project, completed)
+SELECT DATE(completed_date), COALESCE(project, ''), COUNT(*)
+FROM todos WHERE parent_id IS NULL AND DATE(completed_date) IS NOT NULL
+GROUP BY 1, 2
+ON CONFLICT (day, project) DO UPDATE SET completed = excluded.completed;
+
+INSERT INTO todo_tag_counts (tag, project, source_path, completed, count)
+SELECT tt.tag, COALESCE(t.project, ''), COALESCE(t.source_path, ''),
+       t.status IS 'completed', COUNT(*)
+FROM todo_tags tt JOIN todos t ON t.id = tt.todo_id
+WHERE t.parent_id IS NULL
+GROUP BY 1, 2, 3, 4;
+
+INSERT INTO note_tag_counts (tag, notebook, count)
+SELECT nt.tag, COALESCE(n.notebook, ''), COUNT(*)
+FROM note_tags nt JOIN notes n ON n.path = nt.note_path
+GROUP BY 1, 2;
+"""
+
+# Phase 29 additions: note bodies move out of the notes table into
+# note_content, packed by pack_text() (a codec/raw-length header and zlib
+# data), so metadata queries over notes read small rows and only callers
+# that need a body decompress it, with note_text(). notes_fts becomes a
+# contentless index fed by triggers on note_content; its rowid is the
+# note_content rowid. Both SQL functions are registered on every connection
+# by _open_connection(). Empty bodies get no row.
+SCHEMA_V29 = """
+CREATE TABLE IF NOT EXISTS note_content (
+    note_path TEXT PRIMARY KEY REFERENCES notes(path) ON DELETE CASCADE,
+    body BLOB NOT NULL              -- pack_note_text() of the note's content
+);
+
+INSERT INTO note_content (note_path, body)
+SELECT path, pack_note_text(content) FROM notes
+WHERE content IS NOT NULL AND content != '';
+
+DROP TRIGGER IF EXISTS notes_fts_insert;
+DROP TRIGGER IF EXISTS notes_fts_delete;
+DROP TRIGGER IF EXISTS notes_fts_update;
+DROP TABLE IF EXISTS notes_fts;
+
+CREATE VIRTUAL TABLE notes_fts USING fts5(
+    content,
+    content='',
+    tokenize='trigram'
+);
+
+CREATE TRIGGER IF NOT EXISTS note_content_fts_insert AFTER INSERT ON note_content BEGIN
+    INSERT INTO notes_fts(rowid, content) VALUES (new.rowid, note_text(new.body));
+END;
+
+CREATE TRIGGER IF NOT EXISTS note_content_fts_delete AFTER DELETE ON note_content BEGIN
+    INSERT INTO notes_fts(notes_fts, rowid, content)
+    VALUES ('delete', old.rowid, note_text(old.body));
+END;
+
+CREATE TRIGGER IF NOT EXISTS note_content_fts_update AFTER UPDATE OF body ON note_content BEGIN
+    INSERT INTO notes_fts(notes_fts, rowid, content)
+    VALUES ('delete', old.rowid, note_text(old.body));
+    INSERT INTO notes_fts(rowid, content) VALUES (new.rowid, note_text(new.body));
+END;
+
+INSERT INTO notes_fts(rowid, content)
+SELECT rowid, note_text(body) FROM note_content;
+
+ALTER TABLE notes DROP COLUMN content;
+"""
+
+# Phase 30 additions: indexes matched to the hot read paths. The sidebar
+# tree and notebook listings order by (notebook, date, mtime); "recent"
+# cards and the latest-note lookups order by mtime, per notebook or
+# overall; view history groups by note or orders by time. The composite
+# indexes cover those without a sort, and make idx_notes_notebook and the
+# single-column note_views indexes redundant.
+SCHEMA_V30 = """
+CREATE INDEX IF NOT EXISTS idx_notes_listing
+    ON notes(notebook, COALESCE(date, '') DESC, mtime DESC);
+CREATE INDEX IF NOT EXISTS idx_notes_recent ON notes(notebook, mtime);
+CREATE INDEX IF NOT EXISTS idx_notes_mtime ON notes(mtime);
+DROP INDEX IF EXISTS idx_notes_notebook;
+
+CREATE INDEX IF NOT EXISTS idx_note_views_note_time ON note_views(note_path, viewed_at);
+CREATE INDEX IF NOT EXISTS idx_note_views_time_note ON note_views(viewed_at, note_path);
+DROP INDEX IF EXISTS idx_note_views_path;
+DROP INDEX IF EXISTS idx_note_views_time;
+"""
+
+# Phase 31 additions: a new note only invalidates the broken links that could
+# name it (same file stem, or a date target when the note has a date; see
+# _link_may_name()) instead of every broken link in the vault. The indexer
+# writes notes with ON CONFLICT(path) DO UPDATE, so reindexing an existing
+# note fires neither this trigger nor notes_links_delete.
+SCHEMA_V31 = """
+DROP TRIGGER IF EXISTS notes_links_insert;
+
+CREATE TRIGGER notes_links_insert AFTER INSERT ON notes BEGIN
+    UPDATE note_links SET resolved = 0
+    WHERE resolved_target_path IS NULL AND is_external = 0 AND resolved = 1
+        AND link_may_name(target_path, new.path, new.date);
+END;
+"""
+
 # Migration scripts (indexed by target version)
 MIGRATIONS: dict[int, str] = {
     1: SCHEMA_V1,
@@ -384,37 +883,337 @@ MIGRATIONS: dict[int, str] = {
     18: SCHEMA_V18,
     19: SCHEMA_V19,
     20: SCHEMA_V20,
+    21: SCHEMA_V21,
+    22: SCHEMA_V22,
+    23: SCHEMA_V23,
+    24: SCHEMA_V24,
+    25: SCHEMA_V25,
+    26: SCHEMA_V26,
+    27: SCHEMA_V27,
+    28: SCHEMA_V28,
+    29: SCHEMA_V29,
+    30: SCHEMA_V30,
+    31: SCHEMA_V31,
 }
 
 
+# Connection tuning. WAL lets readers run alongside the writer, and with
+# it synchronous=NORMAL only risks the last commits on power loss, not
+# corruption.
+BUSY_TIMEOUT_MS = 5000
+CACHE_SIZE_KIB = 16 * 1024
+MMAP_SIZE = 256 * 1024 * 1024
+
+
+def _open_connection(path: Path) -> sqlite3.Connection:
+    """Open a connection to the index with nb's pragmas applied."""
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    # Keeps notes_fts in sync when INSERT OR REPLACE deletes a note_content row
+    conn.execute("PRAGMA recursive_triggers = ON")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+    conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KIB}")
+    conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+    # Note bodies are stored packed (see SCHEMA_V29)
+    conn.create_function("pack_note_text", 1, _pack_note_text, deterministic=True)
+    conn.create_function("note_text", 1, _note_text, deterministic=True)
+    conn.create_function("note_text", 2, _note_text, deterministic=True)
+    conn.create_function("note_text_near", 3, _note_text_near, deterministic=True)
+    # Narrows link invalidation when a note is added (see SCHEMA_V31)
+    conn.create_function("link_may_name", 3, _link_may_name, deterministic=True)
+    return conn
+
+
+def _pack_note_text(text: str | None) -> bytes | None:
+    """SQL function pack_note_text(text): pack a note body for note_content."""
+    return None if text is None else pack_text(text)
+
+
+def _note_text(body: bytes | None, max_chars: int | None = None) -> str | None:
+    """SQL function note_text(body [, max_chars]): unpack a note_content body."""
+    return None if body is None else unpack_text(body, max_chars)
+
+
+def _note_text_near(body: bytes | None, terms: str, after: int) -> str | None:
+    """SQL function note_text_near(body, terms, after): unpack a body up to a term.
+
+    terms is a JSON array; see unpack_text_near().
+    """
+    return None if body is None else unpack_text_near(body, json.loads(terms), after)
+
+
+def _link_may_name(target: str | None, path: str, note_date: str | None) -> bool:
+    """SQL function link_may_name(target, path, date): could a link resolve to a note?
+
+    Every resolution rule of nb.core.note_links (relative paths, paths under
+    the notes root with or without .md, filename matches) needs the target's
+    stem to match the note's, except daily-note dates, which only dated
+    notes can satisfy. Aliases are invalidated by their own triggers.
+    """
+    if target is None:
+        return False
+    if PurePosixPath(target).stem.lower() == PurePosixPath(path).stem.lower():
+        return True
+    return note_date is not None and _is_date_target(target)
+
+
+@functools.lru_cache(maxsize=4096)
+def _is_date_target(target: str) -> bool:
+    from nb.utils.dates import parse_fuzzy_date
+
+    return parse_fuzzy_date(target) is not None
+
+
+# Active statement profiler, shared by every Database (see start_profiling())
+_profiler: QueryProfiler | None = None
+
+
+def start_profiling(slow_ms: float | None = None) -> QueryProfiler:
+    """Start recording statement timings for every Database.
+
+    Opt-in instrumentation for finding slow queries; statements run
+    untimed while no profiler is active.
+
+    Args:
+        slow_ms: Capture EXPLAIN QUERY PLAN for statements slower than
+            this many milliseconds. Defaults to the profiler's threshold.
+
+    Returns:
+        The active profiler. An already active one is reused.
+    """
+    from nb.index.profiler import DEFAULT_SLOW_MS, QueryProfiler
+
+    global _profiler
+    if _profiler is None:
+        _profiler = QueryProfiler(DEFAULT_SLOW_MS if slow_ms is None else slow_ms)
+    elif slow_ms is not None:
+        _profiler.slow_ms = slow_ms
+    return _profiler
+
+
+def stop_profiling() -> QueryProfiler | None:
+    """Stop recording statement timings.
+
+    Returns:
+        The profiler that was active, with everything it recorded.
+    """
+    global _profiler
+    profiler, _profiler = _profiler, None
+    return profiler
+
+
+def get_profiler() -> QueryProfiler | None:
+    """Get the active statement profiler, if profiling is on."""
+    return _profiler
+
+
+def _fetch(
+    conn: sqlite3.Connection, sql: str, params: tuple[Any, ...], one: bool = False
+) -> Any:
+    """Run a query and fetch one or all rows, timing it while profiling."""
+    profiler = _profiler
+    if profiler is None:
+        cursor = conn.execute(sql, params)
+        return cursor.fetchone() if one else cursor.fetchall()
+    start = time.perf_counter()
+    cursor = conn.execute(sql, params)
+    if one:
+        result = cursor.fetchone()
+        rows = 0 if result is None else 1
+    else:
+        result = cursor.fetchall()
+        rows = len(result)
+    profiler.record(conn, sql, params, time.perf_counter() - start, rows)
+    return result
+
+
+class BulkWriter:
+    """A bulk-write session on a Database, created by Database.bulk().
+
+    Groups many units of work (typically one note each) into a few large
+    transactions instead of committing after every note. Each unit runs in
+    item(), inside a savepoint, so a failing note is rolled back on its own
+    without losing the rest of the batch. The batch is committed once
+    batch_size items have completed or max_seconds have passed since it
+    started, whichever comes first.
+
+    The database lock is held from the first write of a batch until it is
+    committed, so other threads wait at most one batch.
+    """
+
+    def __init__(self, db: Database, batch_size: int, max_seconds: float) -> None:
+        self.db = db
+        self.batch_size = batch_size
+        self.max_seconds = max_seconds
+        self.committed = 0  # Items committed so far
+        self.rolled_back = 0  # Items rolled back (individually or with a batch)
+        self.batches = 0  # Transactions committed
+        self._pending = 0
+        self._batch_started: float | None = None
+
+    @contextmanager
+    def item(self) -> Iterator[sqlite3.Connection]:
+        """Run one unit of work inside the current batch.
+
+        If the block raises, only its own writes are undone and the
+        exception propagates to the caller.
+        """
+        conn = self._begin()
+        conn.execute("SAVEPOINT nb_bulk_item")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK TO nb_bulk_item")
+            conn.execute("RELEASE nb_bulk_item")
+            self.rolled_back += 1
+            raise
+        conn.execute("RELEASE nb_bulk_item")
+        self._pending += 1
+        started = self._batch_started
+        assert started is not None  # Set by _begin() until the batch ends
+        if (
+            self._pending >= self.batch_size
+            or time.monotonic() - started >= self.max_seconds
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        """Commit the current batch, if any.
+
+        If the commit fails the whole batch is rolled back and the error
+        is re-raised.
+        """
+        if self._batch_started is None:
+            return
+        conn = self.db.connect()
+        try:
+            conn.commit()
+            self.committed += self._pending
+            self.batches += 1
+        except Exception:
+            conn.rollback()
+            self.rolled_back += self._pending
+            raise
+        finally:
+            self._end_batch()
+
+    def rollback(self) -> None:
+        """Discard the current batch, if any."""
+        if self._batch_started is None:
+            return
+        try:
+            self.db.connect().rollback()
+            self.rolled_back += self._pending
+        finally:
+            self._end_batch()
+
+    def _begin(self) -> sqlite3.Connection:
+        conn = self.db.connect()
+        if self._batch_started is None:
+            self.db._lock.acquire()
+            self._batch_started = time.monotonic()
+            if not conn.in_transaction:
+                conn.execute("BEGIN")
+        return conn
+
+    def _end_batch(self) -> None:
+        self._pending = 0
+        self._batch_started = None
+        self.db._writers.clear()
+        self.db._lock.release()
+
+
 class Database:
-    """SQLite database connection manager."""
+    """SQLite database connection manager.
+
+    The database runs in WAL mode with one writer connection and a pool of
+    read-only connections, one per reading thread. Writes (execute(),
+    executemany(), transactions and bulk sessions) go through the writer
+    and are serialized by a lock. fetchone() and fetchall() use the calling
+    thread's read connection, so web requests keep reading while an index
+    run holds the writer, and only see committed data. A thread with its
+    own uncommitted writes reads through the writer to see them.
+    """
 
     def __init__(self, path: Path):
         self.path = path
         self._conn: sqlite3.Connection | None = None
-        # Re-entrant lock serializing access to the single shared connection.
+        # Re-entrant lock serializing access to the writer connection.
         # The web viewer (FastAPI/uvicorn) dispatches request handlers across a
         # threadpool, so the connection is opened with check_same_thread=False
         # and every statement is guarded by this lock to keep one-writer-at-a-time
         # semantics. The CLI is single-threaded, so the lock is uncontended there.
         self._lock = threading.RLock()
+        # Active bulk-write session, and the thread that owns it
+        self._bulk: BulkWriter | None = None
+        self._bulk_owner: int | None = None
+        # Read pool: each thread's read connection, and all of them for close()
+        self._wal = False
+        self._local = threading.local()
+        self._readers: list[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+        # Threads with writes in the writer's open transaction
+        self._writers: set[int] = set()
 
     def connect(self) -> sqlite3.Connection:
-        """Get or create a database connection."""
+        """Get or create the writer connection."""
         if self._conn is None:
-            self.path.parent.mkdir(parents=True, exist_ok=True)
-            self._conn = sqlite3.connect(self.path, check_same_thread=False)
-            self._conn.row_factory = sqlite3.Row
-            # Enable foreign keys
-            self._conn.execute("PRAGMA foreign_keys = ON")
+            with self._lock:
+                if self._conn is None:
+                    self.path.parent.mkdir(parents=True, exist_ok=True)
+                    conn = _open_connection(self.path)
+                    try:
+                        mode = conn.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+                    except sqlite3.OperationalError as e:
+                        # Another process is mid-write; keep its journal mode
+                        _logger.debug("Could not enable WAL mode: %s", e)
+                        mode = None
+                    self._wal = mode == "wal"
+                    self._conn = conn
         return self._conn
 
+    def _reader(self) -> sqlite3.Connection:
+        """Get the connection the calling thread should read through.
+
+        Falls back to the writer when the database isn't in WAL mode (readers
+        would block on the writer anyway) or when this thread has uncommitted
+        writes of its own.
+        """
+        writer = self.connect()
+        if not self._wal or self._has_pending_writes():
+            return writer
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = _open_connection(self.path)
+            conn.execute("PRAGMA query_only = ON")
+            self._local.conn = conn
+            with self._readers_lock:
+                self._readers.append(conn)
+        return conn
+
+    def _has_pending_writes(self) -> bool:
+        """Check if the calling thread has writes the writer hasn't committed."""
+        if self._in_bulk():
+            return True
+        return (
+            self._conn is not None
+            and self._conn.in_transaction
+            and threading.get_ident() in self._writers
+        )
+
     def close(self) -> None:
-        """Close the database connection."""
+        """Close the writer and all read connections."""
+        with self._readers_lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers.clear()
+            self._local = threading.local()
         if self._conn is not None:
             self._conn.close()
             self._conn = None
+            self._writers.clear()
 
     @contextmanager
     def transaction(self) -> Iterator[sqlite3.Connection]:
@@ -422,39 +1221,140 @@ class Database:
         # Hold the lock for the whole transaction so interleaved statements from
         # another thread can't land between this transaction's writes and commit.
         with self._lock:
+            if self._in_bulk():
+                # Nest inside the bulk session's batch instead of committing it
+                with self._bulk.item() as conn:  # type: ignore[union-attr]
+                    yield conn
+                return
             conn = self.connect()
+            self._writers.add(threading.get_ident())
             try:
                 yield conn
                 conn.commit()
             except Exception:
                 conn.rollback()
                 raise
+            finally:
+                self._writers.clear()
+
+    @contextmanager
+    def bulk(
+        self, batch_size: int = 500, max_seconds: float = 1.0
+    ) -> Iterator[BulkWriter]:
+        """Open a bulk-write session for large index writes.
+
+        Inside the session, commit() calls from this thread are deferred:
+        the session commits once per batch of batch_size items (or every
+        max_seconds) instead. If the block raises, the uncommitted batch is
+        rolled back; batches committed earlier are kept. Opening a session
+        while one is already active on this thread joins the outer session.
+
+        Example:
+            with db.bulk() as bulk:
+                for note in notes:
+                    with bulk.item():
+                        write_note(note)
+
+        Args:
+            batch_size: Items per transaction.
+            max_seconds: Commit a batch after this long even if it isn't full.
+        """
+        if self._in_bulk():
+            yield self._bulk  # type: ignore[misc]
+            return
+
+        writer = BulkWriter(self, batch_size, max_seconds)
+        with self._lock:
+            self._bulk = writer
+            self._bulk_owner = threading.get_ident()
+        try:
+            yield writer
+            writer.flush()
+            # Commit writes made outside item() blocks
+            with self._lock:
+                if self._conn is not None and self._conn.in_transaction:
+                    self._conn.commit()
+        except BaseException:
+            writer.rollback()
+            with self._lock:
+                if self._conn is not None and self._conn.in_transaction:
+                    self._conn.rollback()
+            raise
+        finally:
+            with self._lock:
+                self._bulk = None
+                self._bulk_owner = None
+                self._writers.clear()
+
+    def _in_bulk(self) -> bool:
+        """Check if the calling thread has a bulk-write session open."""
+        return self._bulk is not None and self._bulk_owner == threading.get_ident()
 
     def execute(self, sql: str, params: tuple[Any, ...] = ()) -> sqlite3.Cursor:
-        """Execute a SQL statement."""
+        """Execute a SQL statement on the writer connection."""
         with self._lock:
-            return self.connect().execute(sql, params)
+            conn = self.connect()
+            profiler = _profiler
+            if profiler is None:
+                cursor = conn.execute(sql, params)
+            else:
+                start = time.perf_counter()
+                cursor = conn.execute(sql, params)
+                profiler.record(
+                    conn, sql, params, time.perf_counter() - start, cursor.rowcount
+                )
+            if conn.in_transaction:
+                self._writers.add(threading.get_ident())
+            return cursor
 
     def executemany(self, sql: str, params: list[tuple[Any, ...]]) -> None:
         """Execute a SQL statement for multiple parameter sets."""
         with self._lock:
-            self.connect().executemany(sql, params)
+            conn = self.connect()
+            profiler = _profiler
+            if profiler is None:
+                conn.executemany(sql, params)
+            else:
+                start = time.perf_counter()
+                cursor = conn.executemany(sql, params)
+                profiler.record(
+                    conn,
+                    sql,
+                    params[0] if params else (),
+                    time.perf_counter() - start,
+                    cursor.rowcount,
+                )
+            if conn.in_transaction:
+                self._writers.add(threading.get_ident())
 
     def fetchone(self, sql: str, params: tuple[Any, ...] = ()) -> sqlite3.Row | None:
         """Execute a query and fetch one row."""
+        conn = self._reader()
+        if conn is not self._conn:
+            return _fetch(conn, sql, params, one=True)
         with self._lock:
-            return self.connect().execute(sql, params).fetchone()
+            return _fetch(conn, sql, params, one=True)
 
     def fetchall(self, sql: str, params: tuple[Any, ...] = ()) -> list[sqlite3.Row]:
         """Execute a query and fetch all rows."""
+        conn = self._reader()
+        if conn is not self._conn:
+            return _fetch(conn, sql, params)
         with self._lock:
-            return self.connect().execute(sql, params).fetchall()
+            return _fetch(conn, sql, params)
 
     def commit(self) -> None:
-        """Commit the current transaction."""
+        """Commit the current transaction.
+
+        Deferred while this thread has a bulk() session open; the session
+        commits once per batch instead.
+        """
         with self._lock:
+            if self._in_bulk():
+                return
             if self._conn is not None:
                 self._conn.commit()
+                self._writers.clear()
 
 
 def get_schema_version(db: Database) -> int:
@@ -528,8 +1428,20 @@ def rebuild_db(db: Database) -> None:
 
     Also clears the localvectordb index to prevent ghost search results.
     """
+    # Drop triggers first: they'd otherwise run (and fail on tables already
+    # dropped) during the implicit DELETE of each DROP TABLE
+    for row in db.fetchall("SELECT name FROM sqlite_master WHERE type = 'trigger'"):
+        db.execute(f"DROP TRIGGER IF EXISTS {row['name']}")
+
     # Drop all tables in reverse dependency order
     tables = [
+        "notes_fts",
+        "note_content",
+        "index_job_items",
+        "index_jobs",
+        "vector_state",
+        "dir_manifest",
+        "file_manifest",
         "todo_sections",
         "note_sections",
         "todo_tags",
@@ -542,6 +1454,10 @@ def rebuild_db(db: Database) -> None:
         "attachments",
         "todos",
         "notes",
+        "todo_counts",
+        "todo_activity",
+        "todo_tag_counts",
+        "note_tag_counts",
         "linked_files",
         "linked_notes",
         "schema_version",
@@ -0,0 +1,246 @@
+"""Content-addressed on-disk cache of embedding vectors.
+
+Vectors are keyed by the embedding settings (provider, model, chunking
+method and size, task) and the sha256 of the embedded text, so text that was
+already embedded with the same settings is served from disk instead of the
+embeddings API. This covers ``nb index --reset-vectors --vectors-only``,
+``--rebuild``, notes moved or copied between notebooks, and rebuilding a
+corrupted vector store.
+
+The cache lives in its own SQLite file under ``.nb/`` (outside the vectors
+directory, so resetting the vector store keeps it) and is bounded in size:
+once it grows past its limit, the least recently used vectors are evicted.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from collections.abc import Sequence
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from nb.config import EmbeddingsConfig
+
+_logger = logging.getLogger(__name__)
+
+# Evict down to this fraction of the limit, so eviction doesn't run on every put
+EVICT_TARGET = 0.9
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    namespace TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    vector BLOB NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (namespace, digest)
+);
+CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings(last_used);
+"""
+
+
+def text_digest(text: str) -> str:
+    """Get the cache key for a piece of text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def embedding_settings_key(embeddings: EmbeddingsConfig) -> str:
+    """Identify the embedding settings that determine a note's vectors.
+
+    Changing the provider, model or chunking parameters changes the key.
+    """
+    return "|".join(
+        [
+            embeddings.provider,
+            embeddings.model,
+            embeddings.chunking_method,
+            str(embeddings.chunk_size),
+        ]
+    )
+
+
+def cache_namespace(embeddings: EmbeddingsConfig, task: str = "document") -> str:
+    """Get the cache namespace for a set of embedding settings.
+
+    Vectors are only reused between identical settings: changing the
+    provider, model or chunking parameters starts a fresh namespace.
+    """
+    return f"{embedding_settings_key(embeddings)}|{task}"
+
+
+class EmbeddingCache:
+    """Size-bounded LRU cache of embedding vectors in a SQLite file.
+
+    Thread-safe: localvectordb embeds from its pipeline worker threads.
+    ``hits``, ``misses`` and ``evictions`` count vectors since the cache
+    was opened.
+    """
+
+    def __init__(self, path: Path, max_bytes: int) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        row = self._conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+        ).fetchone()
+        self._bytes: int = row[0]
+
+    @property
+    def size_bytes(self) -> int:
+        """Total size of the cached vectors."""
+        return self._bytes
+
+    def get_many(self, namespace: str, texts: Sequence[str]) -> list[np.ndarray | None]:
+        """Look up vectors for texts, with None for each miss."""
+        digests = [text_digest(text) for text in texts]
+        found: dict[str, np.ndarray] = {}
+        with self._lock:
+            unique = list(dict.fromkeys(digests))
+            for start in range(0, len(unique), 500):
+                batch = unique[start : start + 500]
+                rows = self._conn.execute(
+                    "SELECT digest, vector FROM embeddings "
+                    f"WHERE namespace = ? AND digest IN ({','.join('?' * len(batch))})",
+                    (namespace, *batch),
+                ).fetchall()
+                for digest, blob in rows:
+                    found[digest] = np.frombuffer(blob, dtype=np.float32)
+            if found:
+                # Touch hits so eviction drops the least recently used vectors
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE namespace = ? AND digest = ?",
+                    [(now, namespace, digest) for digest in found],
+                )
+                self._conn.commit()
+
+        result = [found.get(digest) for digest in digests]
+        hits = sum(1 for vector in result if vector is not None)
+        self.hits += hits
+        self.misses += len(result) - hits
+        return result
+
+    def put_many(
+        self, namespace: str, texts: Sequence[str], vectors: np.ndarray
+    ) -> None:
+        """Store vectors for texts, evicting old entries if over the limit."""
+        now = time.time()
+        rows = [
+            (
+                namespace,
+                text_digest(text),
+                np.asarray(vector, np.float32).tobytes(),
+                now,
+            )
+            for text, vector in zip(texts, vectors, strict=True)
+        ]
+        with self._lock:
+            for _, digest, blob, _ in rows:
+                old = self._conn.execute(
+                    "SELECT LENGTH(vector) FROM embeddings WHERE namespace = ? AND digest = ?",
+                    (namespace, digest),
+                ).fetchone()
+                self._bytes += len(blob) - (old[0] if old else 0)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO embeddings (namespace, digest, vector, last_used) "
+                    "VALUES (?, ?, ?, ?)",
+                    (namespace, digest, blob, now),
+                )
+            if self._bytes > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """Drop least recently used vectors until under the target size."""
+        target = int(self.max_bytes * EVICT_TARGET)
+        doomed: list[int] = []
+        freed = 0
+        cursor = self._conn.execute(
+            "SELECT rowid, LENGTH(vector) FROM embeddings ORDER BY last_used"
+        )
+        for rowid, size in cursor:
+            if self._bytes - freed <= target:
+                break
+            doomed.append(rowid)
+            freed += size
+        cursor.close()
+        self._conn.executemany(
+            "DELETE FROM embeddings WHERE rowid = ?", [(rowid,) for rowid in doomed]
+        )
+        self._bytes -= freed
+        self.evictions += len(doomed)
+        _logger.debug("Embedding cache: evicted %d vectors", len(doomed))
+
+    def clear(self) -> None:
+        """Remove every cached vector."""
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+            self._bytes = 0
+
+    def close(self) -> None:
+        """Close the cache file."""
+        with self._lock:
+            self._conn.close()
+
+
+def attach_cache(
+    provider: Any, cache: EmbeddingCache, embeddings: EmbeddingsConfig
+) -> None:
+    """Route a localvectordb embedding provider through an EmbeddingCache.
+
+    Every embedding localvectordb requests (chunks, metadata fields and
+    queries, sync or async) goes through the provider's ``embed_batch``,
+    so wrapping that one method on the instance is enough. Only the texts
+    missing from the cache are sent to the provider.
+    """
+    original = provider.embed_batch
+
+    async def embed_batch(
+        texts: list[str],
+        batch_size: int | None = None,
+        progress_callback: Any = None,
+        *,
+        task: str = "document",
+    ) -> np.ndarray:
+        if not texts:
+            return await original(texts, batch_size, progress_callback, task=task)
+
+        namespace = cache_namespace(embeddings, task)
+        vectors = cache.get_many(namespace, texts)
+        missing = list(
+            dict.fromkeys(
+                text
+                for text, vector in zip(texts, vectors, strict=True)
+                if vector is None
+            )
+        )
+        computed: dict[str, np.ndarray] = {}
+        if missing:
+            fresh = np.asarray(
+                await original(missing, batch_size, progress_callback, task=task),
+                dtype=np.float32,
+            )
+            cache.put_many(namespace, missing, fresh)
+            computed = dict(zip(missing, fresh, strict=True))
+        # Every miss is now computed, so each slot holds a vector
+        filled: list[np.ndarray] = [
+            computed[text] if vector is None else vector
+            for text, vector in zip(texts, vectors, strict=True)
+        ]
+        return np.vstack(filled).astype(np.float32, copy=False)
+
+    provider.embed_batch = embed_batch
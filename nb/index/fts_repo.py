@@ -0,0 +1,141 @@
+"""Full-text index database operations for nb.
+
+The notes_fts table is a contentless trigram FTS5 index over the note
+bodies in note_content, kept in sync with it by triggers; its rowid is the
+note_content rowid. A trigram index can find any
+substring of three or more characters (case-insensitively), which is what
+`nb grep` needs to narrow a regex down to candidate notes and what
+`nb search --keyword` uses to rank notes without the vector store.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+
+from nb.index.db import get_db
+
+if TYPE_CHECKING:
+    import sqlite3
+
+    from nb.index.db import Database
+
+# Shortest substring a trigram index can look up
+MIN_TERM_LENGTH = 3
+
+
+def fts_phrase(text: str) -> str:
+    """Quote text as an FTS5 phrase (matched as a substring by trigrams)."""
+    return '"' + text.replace('"', '""') + '"'
+
+
+def find_notes_containing(
+    terms: list[str], db: Database | None = None
+) -> set[str] | None:
+    """Get the notes whose indexed content contains every term.
+
+    Matching is case-insensitive.
+
+    Args:
+        terms: Substrings that must all appear.
+        db: Optional database instance.
+
+    Returns:
+        Matching notes.path values, or None if no term is long enough for
+        the index to look up (every note is a candidate).
+    """
+    terms = [t for t in terms if len(t) >= MIN_TERM_LENGTH]
+    if not terms:
+        return None
+    if db is None:
+        db = get_db()
+
+    rows = db.fetchall(
+        """
+        SELECT c.note_path AS path FROM notes_fts f
+        JOIN note_content c ON c.rowid = f.rowid
+        WHERE notes_fts MATCH ?
+        """,
+        (" AND ".join(fts_phrase(t) for t in terms),),
+    )
+    return {row["path"] for row in rows}
+
+
+def search_notes_fts(
+    terms: list[str],
+    limit: int = 20,
+    notebook: str | None = None,
+    tag: str | None = None,
+    date_start: str | None = None,
+    date_end: str | None = None,
+    context: int | None = None,
+    db: Database | None = None,
+) -> list[sqlite3.Row]:
+    """Rank notes containing any of the terms by BM25.
+
+    Args:
+        terms: Search terms; ones shorter than MIN_TERM_LENGTH are ignored.
+        limit: Maximum number of notes.
+        notebook: Only notes in this notebook.
+        tag: Only notes with this tag.
+        date_start: Only notes dated on or after this (ISO format).
+        date_end: Only notes dated on or before this (ISO format).
+        context: If given, content is only unpacked up to the first
+            occurrence of a term plus this many characters (enough for a
+            snippet) instead of in full.
+        db: Optional database instance.
+
+    Returns:
+        Rows with path, title, notebook, date, content and rank (lower is
+        better), best first.
+    """
+    terms = [t for t in terms if len(t) >= MIN_TERM_LENGTH]
+    if not terms:
+        return []
+    if db is None:
+        db = get_db()
+
+    conditions = ["notes_fts MATCH ?"]
+    params: list[str | int] = [" OR ".join(fts_phrase(t) for t in terms)]
+    if notebook:
+        conditions.append("n.notebook = ?")
+        params.append(notebook)
+    if tag:
+        conditions.append(
+            "EXISTS (SELECT 1 FROM note_tags t WHERE t.note_path = n.path AND t.tag = ?)"
+        )
+        params.append(tag)
+    if date_start:
+        conditions.append("n.date >= ?")
+        params.append(date_start)
+    if date_end:
+        conditions.append("n.date <= ?")
+        params.append(date_end)
+    params.append(limit)
+    if context is None:
+        content = "note_text(c.body)"
+    else:
+        content = "note_text_near(c.body, ?, ?)"
+        params.extend([json.dumps(terms), context])
+
+    # Only the bodies of the notes kept after the LIMIT are decompressed
+    return db.fetchall(
+        f"""
+        WITH hits AS (
+            SELECT c.rowid AS content_id, n.path, n.title, n.notebook, n.date,
+                   f.rank
+            FROM notes_fts f
+            JOIN note_content c ON c.rowid = f.rowid
+            JOIN notes n ON n.path = c.note_path
+            WHERE {" AND ".join(conditions)}
+            ORDER BY f.rank
+            LIMIT ?
+        )
+        SELECT h.path, h.title, h.notebook, h.date, {content} AS content,
+               h.rank
+        FROM hits h
+        JOIN note_content c ON c.rowid = h.content_id
+        ORDER BY h.rank
+        """,
+        tuple(params),
+    )
@@ -0,0 +1,338 @@
+"""Index job database operations for nb.
+
+Long index runs (``nb index --force``, ``--vectors-only``) and the daemon's
+backlog are recorded as jobs, each with a persistent work queue in the
+index_job_items table. An item is deleted when its work is done, in the
+same transaction as that work where possible, so an interrupted job can be
+resumed from exactly where it stopped.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+from nb.index.db import get_db
+
+if TYPE_CHECKING:
+    from nb.index.db import Database
+
+# Job kinds
+JOB_FILES = "files"  # Parse and index note files (items are absolute paths)
+JOB_VECTORS = "vectors"  # Re-embed notes (items are notes.path values)
+JOB_DAEMON = "daemon"  # Daemon backlog of changed files (absolute paths)
+JOB_OPTIMIZE = "optimize"  # Database maintenance pass (no items)
+
+# Kinds `nb index --resume` can continue
+RESUMABLE_KINDS = (JOB_FILES, JOB_VECTORS)
+
+# Job statuses
+JOB_RUNNING = "running"
+JOB_INTERRUPTED = "interrupted"
+JOB_DONE = "done"
+
+# Finished jobs kept for `nb index --status`
+JOB_HISTORY = 20
+
+# Keep IN (...) lists under SQLite's host parameter limit
+_PATH_CHUNK = 500
+
+
+@dataclass
+class IndexJob:
+    """An index run and its progress."""
+
+    id: int
+    kind: str
+    notebook: str | None
+    status: str
+    total: int
+    done: int
+    failed: int
+    started_at: datetime
+    updated_at: datetime
+    finished_at: datetime | None = None
+
+    @property
+    def remaining(self) -> int:
+        """Items not yet completed (including failed ones)."""
+        return self.total - self.done
+
+    @property
+    def resumable(self) -> bool:
+        return self.status != JOB_DONE and self.kind in RESUMABLE_KINDS
+
+    @property
+    def throughput(self) -> float:
+        """Items completed per second over the life of the job."""
+        end = self.finished_at or self.updated_at
+        elapsed = (end - self.started_at).total_seconds()
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+
+def _row_to_job(row) -> IndexJob:
+    """Convert a database row to an IndexJob object."""
+    return IndexJob(
+        id=row["id"],
+        kind=row["kind"],
+        notebook=row["notebook"],
+        status=row["status"],
+        total=row["total"],
+        done=row["done"],
+        failed=row["failed"],
+        started_at=datetime.fromisoformat(row["started_at"]),
+        updated_at=datetime.fromisoformat(row["updated_at"]),
+        finished_at=(
+            datetime.fromisoformat(row["finished_at"]) if row["finished_at"] else None
+        ),
+    )
+
+
+def create_job(
+    kind: str,
+    paths: list[str] | None = None,
+    notebook: str | None = None,
+    db: Database | None = None,
+) -> int:
+    """Create a job with an optional initial work queue.
+
+    Also forgets finished jobs beyond the newest JOB_HISTORY.
+
+    Args:
+        kind: One of JOB_FILES, JOB_VECTORS, JOB_DAEMON or JOB_OPTIMIZE.
+        paths: Items to queue.
+        notebook: Notebook the job is limited to, if any.
+        db: Optional database instance.
+
+    Returns:
+        The new job's id.
+    """
+    if db is None:
+        db = get_db()
+
+    now = datetime.now().isoformat()
+    with db.transaction():
+        # Queued items go with their job (ON DELETE CASCADE)
+        db.execute(
+            """
+            DELETE FROM index_jobs WHERE id IN (
+                SELECT id FROM index_jobs WHERE status = ?
+                ORDER BY id DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (JOB_DONE, JOB_HISTORY),
+        )
+        cursor = db.execute(
+            """
+            INSERT INTO index_jobs (kind, notebook, status, started_at, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (kind, notebook, JOB_RUNNING, now, now),
+        )
+        job_id = cursor.lastrowid
+    if job_id is None:
+        raise RuntimeError(f"Failed to create {kind} index job")
+    if paths:
+        enqueue_job_items(job_id, paths, db=db)
+    return job_id
+
+
+def enqueue_job_items(
+    job_id: int, paths: list[str], db: Database | None = None, commit: bool = True
+) -> None:
+    """Add items to a job's work queue (items already queued are kept once)."""
+    if not paths:
+        return
+    if db is None:
+        db = get_db()
+
+    before = db.fetchone(
+        "SELECT COUNT(*) as cnt FROM index_job_items WHERE job_id = ?", (job_id,)
+    )
+    db.executemany(
+        "INSERT OR IGNORE INTO index_job_items (job_id, path) VALUES (?, ?)",
+        [(job_id, path) for path in paths],
+    )
+    after = db.fetchone(
+        "SELECT COUNT(*) as cnt FROM index_job_items WHERE job_id = ?", (job_id,)
+    )
+    # COUNT(*) always yields a row
+    assert before is not None and after is not None
+    db.execute(
+        "UPDATE index_jobs SET total = total + ?, updated_at = ? WHERE id = ?",
+        (after["cnt"] - before["cnt"], datetime.now().isoformat(), job_id),
+    )
+    if commit:
+        db.commit()
+
+
+def complete_job_items(
+    job_id: int, paths: list[str], db: Database | None = None, commit: bool = True
+) -> None:
+    """Mark items done by removing them from the job's work queue.
+
+    Pass commit=False to make the marker part of a larger transaction,
+    such as the bulk session that wrote the item's note.
+    """
+    if not paths:
+        return
+    if db is None:
+        db = get_db()
+
+    done = 0
+    failed = 0
+    for start in range(0, len(paths), _PATH_CHUNK):
+        chunk = paths[start : start + _PATH_CHUNK]
+        placeholders = ",".join("?" * len(chunk))
+        row = db.fetchone(
+            f"""
+            SELECT COUNT(*) as cnt, COALESCE(SUM(error IS NOT NULL), 0) as failed
+            FROM index_job_items WHERE job_id = ? AND path IN ({placeholders})
+            """,
+            (job_id, *chunk),
+        )
+        assert row is not None  # aggregates always yield a row
+        db.execute(
+            f"DELETE FROM index_job_items WHERE job_id = ? AND path IN ({placeholders})",
+            (job_id, *chunk),
+        )
+        done += row["cnt"]
+        failed += row["failed"]
+    db.execute(
+        """
+        UPDATE index_jobs SET done = done + ?, failed = failed - ?, updated_at = ?
+        WHERE id = ?
+        """,
+        (done, failed, datetime.now().isoformat(), job_id),
+    )
+    if commit:
+        db.commit()
+
+
+def fail_job_item(
+    job_id: int, path: str, error: str, db: Database | None = None, commit: bool = True
+) -> None:
+    """Record that an item failed; it stays queued and is retried on resume."""
+    if db is None:
+        db = get_db()
+
+    cursor = db.execute(
+        """
+        UPDATE index_job_items SET error = ?
+        WHERE job_id = ? AND path = ? AND error IS NULL
+        """,
+        (error, job_id, path),
+    )
+    db.execute(
+        "UPDATE index_jobs SET failed = failed + ?, updated_at = ? WHERE id = ?",
+        (cursor.rowcount, datetime.now().isoformat(), job_id),
+    )
+    if commit:
+        db.commit()
+
+
+def get_job_items(job_id: int, db: Database | None = None) -> list[str]:
+    """Get the items still queued for a job, ordered by path."""
+    if db is None:
+        db = get_db()
+    rows = db.fetchall(
+        "SELECT path FROM index_job_items WHERE job_id = ? ORDER BY path",
+        (job_id,),
+    )
+    return [row["path"] for row in rows]
+
+
+def finish_job(
+    job_id: int, interrupted: bool = False, db: Database | None = None
+) -> None:
+    """Mark a job finished, or interrupted so that it can be resumed.
+
+    A job that still has queued items (failed ones) is finished as done;
+    its failures are kept for `nb index --status`.
+    """
+    if db is None:
+        db = get_db()
+
+    now = datetime.now().isoformat()
+    with db.transaction():
+        if interrupted:
+            db.execute(
+                "UPDATE index_jobs SET status = ?, updated_at = ? WHERE id = ?",
+                (JOB_INTERRUPTED, now, job_id),
+            )
+        else:
+            db.execute(
+                """
+                UPDATE index_jobs SET status = ?, updated_at = ?, finished_at = ?
+                WHERE id = ?
+                """,
+                (JOB_DONE, now, now, job_id),
+            )
+
+
+def restart_job(job_id: int, db: Database | None = None) -> None:
+    """Mark an interrupted job as running again."""
+    if db is None:
+        db = get_db()
+    with db.transaction():
+        db.execute(
+            "UPDATE index_jobs SET status = ?, updated_at = ? WHERE id = ?",
+            (JOB_RUNNING, datetime.now().isoformat(), job_id),
+        )
+
+
+def get_job(job_id: int, db: Database | None = None) -> IndexJob | None:
+    """Get a job by id."""
+    if db is None:
+        db = get_db()
+    row = db.fetchone("SELECT * FROM index_jobs WHERE id = ?", (job_id,))
+    return _row_to_job(row) if row else None
+
+
+def get_recent_jobs(
+    limit: int = 5, kind: str | None = None, db: Database | None = None
+) -> list[IndexJob]:
+    """Get the most recent jobs, newest first."""
+    if db is None:
+        db = get_db()
+    if kind:
+        rows = db.fetchall(
+            "SELECT * FROM index_jobs WHERE kind = ? ORDER BY id DESC LIMIT ?",
+            (kind, limit),
+        )
+    else:
+        rows = db.fetchall(
+            "SELECT * FROM index_jobs ORDER BY id DESC LIMIT ?", (limit,)
+        )
+    return [_row_to_job(row) for row in rows]
+
+
+def get_unfinished_job(
+    kind: str | None = None, db: Database | None = None
+) -> IndexJob | None:
+    """Get the most recent job that was not finished (crashed or interrupted).
+
+    Without kind, only resumable jobs (RESUMABLE_KINDS) are considered: the
+    daemon resumes its own backlog when it starts, and an interrupted
+    optimize pass is simply run again.
+    """
+    if db is None:
+        db = get_db()
+    if kind:
+        row = db.fetchone(
+            """
+            SELECT * FROM index_jobs WHERE status != ? AND kind = ?
+            ORDER BY id DESC LIMIT 1
+            """,
+            (JOB_DONE, kind),
+        )
+    else:
+        row = db.fetchone(
+            """
+            SELECT * FROM index_jobs WHERE status != ? AND kind IN (?, ?)
+            ORDER BY id DESC LIMIT 1
+            """,
+            (JOB_DONE, *RESUMABLE_KINDS),
+        )
+    return _row_to_job(row) if row else None
@@ -0,0 +1,196 @@
+"""Index database maintenance for nb.
+
+An optimize pass refreshes the query planner's statistics (ANALYZE, then
+PRAGMA optimize), truncates the write-ahead log, and rebuilds the database
+file with VACUUM once enough of it is free pages left behind by deleted
+notes and rewritten rows. It runs from `nb index --optimize` and, every
+index.optimize_hours, from the daemon. Each pass is recorded as a
+JOB_OPTIMIZE index job, so `nb index --status` shows when it last ran.
+"""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from nb.index.db import get_db
+from nb.index.jobs_repo import JOB_OPTIMIZE, create_job, finish_job, get_recent_jobs
+
+if TYPE_CHECKING:
+    from nb.index.db import Database
+
+_logger = logging.getLogger(__name__)
+
+# VACUUM (when not forced either way) once this share of pages is free
+VACUUM_FREE_RATIO = 0.2
+
+
+@dataclass
+class TableStats:
+    """Space used by one table or index.
+
+    Attributes:
+        name: Table or index name.
+        pages: Pages it occupies.
+        size_bytes: Total size of those pages.
+        unused_bytes: Bytes in those pages that hold no data.
+    """
+
+    name: str
+    pages: int
+    size_bytes: int
+    unused_bytes: int
+
+    @property
+    def fill_ratio(self) -> float:
+        """Share of the table's pages holding data."""
+        if not self.size_bytes:
+            return 1.0
+        return 1 - self.unused_bytes / self.size_bytes
+
+
+@dataclass
+class DbStats:
+    """Page counts and fragmentation of the index database.
+
+    Attributes:
+        page_size: Bytes per page.
+        page_count: Pages in the database file.
+        freelist_count: Pages no longer used by any table (reclaimed by VACUUM).
+        wal_bytes: Size of the write-ahead log.
+        tables: Per-table and per-index usage, largest first. Empty when
+            the SQLite build lacks the dbstat table.
+    """
+
+    page_size: int
+    page_count: int
+    freelist_count: int
+    wal_bytes: int = 0
+    tables: list[TableStats] = field(default_factory=list)
+
+    @property
+    def size_bytes(self) -> int:
+        """Size of the database file."""
+        return self.page_size * self.page_count
+
+    @property
+    def free_ratio(self) -> float:
+        """Share of the file's pages that are free."""
+        if not self.page_count:
+            return 0.0
+        return self.freelist_count / self.page_count
+
+
+@dataclass
+class OptimizeResult:
+    """Outcome of an optimize pass.
+
+    Attributes:
+        before: Database statistics before the pass.
+        after: Database statistics after it.
+        vacuumed: Whether the file was rebuilt with VACUUM.
+        seconds: Time the pass took.
+    """
+
+    before: DbStats
+    after: DbStats
+    vacuumed: bool
+    seconds: float
+
+
+def _pragma_int(db: Database, name: str, default: int = 0) -> int:
+    """Read an integer PRAGMA, or default if it returns no row."""
+    row = db.fetchone(f"PRAGMA {name}")
+    return int(row[0]) if row is not None else default
+
+
+def get_db_stats(db: Database | None = None) -> DbStats:
+    """Get page counts and per-table usage of the index database."""
+    if db is None:
+        db = get_db()
+    stats = DbStats(
+        page_size=_pragma_int(db, "page_size"),
+        page_count=_pragma_int(db, "page_count"),
+        freelist_count=_pragma_int(db, "freelist_count"),
+    )
+    wal = Path(f"{db.path}-wal")
+    if wal.exists():
+        stats.wal_bytes = wal.stat().st_size
+    try:
+        rows = db.fetchall(
+            """
+            SELECT name, pageno AS pages, pgsize, unused FROM dbstat
+            WHERE aggregate = 1 ORDER BY pageno DESC
+            """
+        )
+    except sqlite3.OperationalError as e:
+        _logger.debug("dbstat unavailable: %s", e)
+        rows = []
+    stats.tables = [
+        TableStats(row["name"], row["pages"], row["pgsize"], row["unused"])
+        for row in rows
+    ]
+    return stats
+
+
+def optimize_db(
+    vacuum: bool | None = None, db: Database | None = None
+) -> OptimizeResult:
+    """Run an optimize pass over the index database.
+
+    Must not run inside a transaction or bulk() session of the calling
+    thread.
+
+    Args:
+        vacuum: True to always VACUUM, False to never; None to VACUUM only
+            when at least VACUUM_FREE_RATIO of the pages are free.
+        db: Optional database instance.
+    """
+    if db is None:
+        db = get_db()
+    start = time.perf_counter()
+    before = get_db_stats(db)
+    if vacuum is None:
+        vacuum = before.free_ratio >= VACUUM_FREE_RATIO
+
+    job_id = create_job(JOB_OPTIMIZE, db=db)
+    try:
+        db.execute("ANALYZE")
+        db.execute("PRAGMA optimize")
+        if vacuum:
+            db.execute("VACUUM")
+        db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    except BaseException:
+        finish_job(job_id, interrupted=True, db=db)
+        raise
+    finish_job(job_id, db=db)
+
+    return OptimizeResult(
+        before=before,
+        after=get_db_stats(db),
+        vacuumed=vacuum,
+        seconds=time.perf_counter() - start,
+    )
+
+
+def optimize_due(hours: float, db: Database | None = None) -> bool:
+    """Check if a scheduled optimize pass is due.
+
+    A pass is due when none has started in the last ``hours``. Failed
+    passes count, so a pass that keeps failing isn't retried in a loop.
+
+    Args:
+        hours: Interval between passes; 0 or less disables scheduling.
+        db: Optional database instance.
+    """
+    if hours <= 0:
+        return False
+    jobs = get_recent_jobs(1, kind=JOB_OPTIMIZE, db=db)
+    if not jobs:
+        return True
+    return datetime.now() - jobs[0].started_at >= timedelta(hours=hours)
@@ -0,0 +1,811 @@
+"""nbql: a query language for todos and notes.
+
+    todo where notebook=work and (due < +7d or priority=high) sort by due limit 50
+    note where tag=#research and modified > -30d
+
+A query is parsed into a Query (with Condition, And, Or and Not
+expressions) and compiled to one parameterized SELECT. Conditions map to
+comparisons on indexed columns (date ranges stay sargable, tag and link
+conditions become EXISTS lookups on their primary keys), and sorting,
+limiting and paging happen in the same statement. Pages are fetched with a
+keyset cursor, the sort values of the last row, instead of OFFSET, so
+every page costs the same.
+
+Grammar (keywords are case-insensitive):
+
+    query   := [target] [where] [expr] [sort by key ("," key)*] [limit N]
+    target  := todo | todos | note | notes
+    expr    := term (or term)*
+    term    := factor (and factor)*
+    factor  := not factor | "(" expr ")" | field op value
+    op      := = | != | < | <= | > | >= | ~        (~ means "contains")
+    key     := field [asc | desc]
+
+Values are bare words or quoted strings. Date fields take ISO dates,
+offsets from today (+7d, -2w) and anything parse_fuzzy_date() accepts
+("today", "next friday"). ``none`` matches a missing value.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import re
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from nb.index.db import get_db
+from nb.utils.dates import parse_fuzzy_date
+
+if TYPE_CHECKING:
+    from nb.index.db import Database
+    from nb.models import Note
+
+TARGETS = {"todo": "todo", "todos": "todo", "note": "note", "notes": "note"}
+
+_KEYWORDS = {"where", "and", "or", "not", "sort", "by", "limit", "asc", "desc"}
+# Fields that read as verbs and may omit the = operator
+_VERB_FIELDS = {"links-to", "links_to"}
+
+_TOKEN = re.compile(
+    r"""\s*(?:
+        (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+      | (?P<op><=|>=|!=|=|<|>|~)
+      | (?P<punct>[(),])
+      | (?P<word>[^\s()<>=!~,"']+)
+    )""",
+    re.VERBOSE,
+)
+_OFFSET = re.compile(r"([+-])(\d+)([dw])")
+
+
+class NbqlError(ValueError):
+    """An nbql query that can't be parsed or compiled."""
+
+
+# =============================================================================
+# Syntax tree
+# =============================================================================
+
+
+@dataclass(frozen=True)
+class Condition:
+    """A ``field op value`` comparison."""
+
+    field: str
+    op: str
+    value: str
+
+
+@dataclass(frozen=True)
+class And:
+    items: tuple[Expr, ...]
+
+
+@dataclass(frozen=True)
+class Or:
+    items: tuple[Expr, ...]
+
+
+@dataclass(frozen=True)
+class Not:
+    item: Expr
+
+
+Expr = Condition | And | Or | Not
+
+
+@dataclass(frozen=True)
+class SortKey:
+    field: str
+    descending: bool = False
+
+
+@dataclass(frozen=True)
+class Query:
+    """A parsed nbql query.
+
+    Attributes:
+        target: "todo" or "note".
+        where: The filter expression, if any.
+        sort: Sort keys; empty for the target's default order.
+        limit: Maximum number of results, if any.
+    """
+
+    target: str
+    where: Expr | None = None
+    sort: tuple[SortKey, ...] = ()
+    limit: int | None = None
+
+    def filter(self, expr: Expr) -> Query:
+        """Get a copy of the query with another condition ANDed in."""
+        where = expr if self.where is None else And((self.where, expr))
+        return replace(self, where=where)
+
+    def uses_field(self, name: str) -> bool:
+        """Check if any condition of the query compares the given field."""
+        pending = [self.where] if self.where is not None else []
+        while pending:
+            expr = pending.pop()
+            if isinstance(expr, Condition):
+                if _canonical_field(self.target, expr.field) == name:
+                    return True
+            elif isinstance(expr, Not):
+                pending.append(expr.item)
+            else:
+                pending.extend(expr.items)
+        return False
+
+
+# =============================================================================
+# Parser
+# =============================================================================
+
+
+@dataclass
+class _Token:
+    kind: str  # word, string, op, punct
+    value: str
+    pos: int
+
+    def is_keyword(self, *words: str) -> bool:
+        return self.kind == "word" and self.value.lower() in words
+
+
+def _tokenize(text: str) -> list[_Token]:
+    tokens: list[_Token] = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        match = _TOKEN.match(text, pos)
+        if match is None or match.end() == pos:
+            raise NbqlError(f"Unexpected character at column {pos + 1}: {text[pos:]!r}")
+        kind = match.lastgroup or "word"
+        value = match.group(kind)
+        if kind == "string":
+            value = re.sub(r"\\(.)", r"\1", value[1:-1])
+        tokens.append(_Token(kind, value, match.start(kind)))
+        pos = match.end()
+    return tokens
+
+
+class _Parser:
+    def __init__(self, text: str) -> None:
+        self.tokens = _tokenize(text)
+        self.index = 0
+
+    def peek(self) -> _Token | None:
+        return self.tokens[self.index] if self.index < len(self.tokens) else None
+
+    def next(self, expected: str) -> _Token:
+        token = self.peek()
+        if token is None:
+            raise NbqlError(f"Expected {expected}, got end of query")
+        self.index += 1
+        return token
+
+    def accept(self, *words: str) -> bool:
+        token = self.peek()
+        if token is not None and token.is_keyword(*words):
+            self.index += 1
+            return True
+        return False
+
+    def parse(self, default_target: str | None) -> Query:
+        token = self.peek()
+        if token is not None and token.kind == "word" and token.value.lower() in TARGETS:
+            target = TARGETS[token.value.lower()]
+            self.index += 1
+        elif default_target is not None:
+            target = default_target
+        else:
+            raise NbqlError("A query starts with 'todo' or 'note'")
+
+        where = None
+        if self.accept("where") or self._starts_expr():
+            where = self.parse_or()
+
+        sort: list[SortKey] = []
+        if self.accept("sort"):
+            if not self.accept("by"):
+                raise NbqlError("Expected 'by' after 'sort'")
+            while True:
+                name = self.next("a sort field")
+                if name.kind != "word" or name.value.lower() in _KEYWORDS:
+                    raise NbqlError(f"Expected a sort field at column {name.pos + 1}")
+                descending = self.accept("desc")
+                if not descending:
+                    self.accept("asc")
+                sort.append(SortKey(name.value.lower(), descending))
+                token = self.peek()
+                if token is None or token.value != ",":
+                    break
+                self.index += 1
+
+        limit = None
+        if self.accept("limit"):
+            token = self.next("a number after 'limit'")
+            if not token.value.isdigit() or int(token.value) < 1:
+                raise NbqlError(f"Invalid limit: {token.value!r}")
+            limit = int(token.value)
+
+        token = self.peek()
+        if token is not None:
+            raise NbqlError(f"Unexpected {token.value!r} at column {token.pos + 1}")
+        return Query(target, where, tuple(sort), limit)
+
+    def _starts_expr(self) -> bool:
+        token = self.peek()
+        if token is None:
+            return False
+        if token.value == "(" or token.is_keyword("not"):
+            return True
+        return token.kind in ("word", "string") and not token.is_keyword(*_KEYWORDS)
+
+    def parse_or(self) -> Expr:
+        items = [self.parse_and()]
+        while self.accept("or"):
+            items.append(self.parse_and())
+        return items[0] if len(items) == 1 else Or(tuple(items))
+
+    def parse_and(self) -> Expr:
+        items = [self.parse_not()]
+        while self.accept("and"):
+            items.append(self.parse_not())
+        return items[0] if len(items) == 1 else And(tuple(items))
+
+    def parse_not(self) -> Expr:
+        if self.accept("not"):
+            return Not(self.parse_not())
+        token = self.peek()
+        if token is not None and token.value == "(" and token.kind == "punct":
+            self.index += 1
+            expr = self.parse_or()
+            closing = self.next("')'")
+            if closing.value != ")":
+                raise NbqlError(f"Expected ')' at column {closing.pos + 1}")
+            return expr
+        return self.parse_condition()
+
+    def parse_condition(self) -> Condition:
+        name = self.next("a field")
+        if name.kind != "word" or name.value.lower() in _KEYWORDS:
+            raise NbqlError(f"Expected a field at column {name.pos + 1}, got {name.value!r}")
+        op = self.next(f"an operator after {name.value!r}")
+        if op.kind in ("word", "string") and name.value.lower() in _VERB_FIELDS:
+            # links-to "API design" reads as links-to = "API design"
+            return Condition(name.value.lower(), "=", op.value)
+        if op.kind != "op":
+            raise NbqlError(
+                f"Expected an operator after {name.value!r} at column {op.pos + 1}"
+            )
+        value = self.next(f"a value after '{name.value} {op.value}'")
+        if value.kind not in ("word", "string"):
+            raise NbqlError(f"Expected a value at column {value.pos + 1}")
+        return Condition(name.value.lower(), op.value, value.value)
+
+
+def parse(text: str, target: str | None = None) -> Query:
+    """Parse an nbql query.
+
+    Args:
+        text: The query.
+        target: Target to assume when the query doesn't start with one,
+            so that bare conditions ("due < +7d and tag=work") are accepted.
+
+    Raises:
+        NbqlError: If the query is malformed.
+    """
+    return _Parser(text).parse(target)
+
+
+# =============================================================================
+# Planner
+# =============================================================================
+
+
+@dataclass(frozen=True)
+class _Field:
+    kind: str  # text, lower, path, status, priority, date, timestamp, tag, links
+    column: str
+    sortable: bool = True
+
+
+_TODO_FIELDS = {
+    "notebook": _Field("text", "t.project"),
+    "status": _Field("status", "t.status"),
+    "due": _Field("date", "t.due_date"),
+    "created": _Field("date", "t.created_date"),
+    "completed": _Field("date", "t.completed_date"),
+    "priority": _Field("priority", "t.priority"),
+    "tag": _Field("tag", "todo_tags", sortable=False),
+    "owner": _Field("lower", "t.owner"),
+    "section": _Field("text", "t.section"),
+    "note": _Field("path", "t.note_path"),
+    "text": _Field("text", "t.content"),
+}
+
+_NOTE_FIELDS = {
+    "notebook": _Field("text", "n.notebook"),
+    "tag": _Field("tag", "note_tags", sortable=False),
+    "date": _Field("date", "n.date"),
+    "modified": _Field("timestamp", "n.mtime"),
+    "title": _Field("text", "n.title"),
+    "path": _Field("path", "n.path"),
+    "links-to": _Field("links", "note_links", sortable=False),
+}
+
+_FIELD_ALIASES = {
+    "project": "notebook",
+    "tags": "tag",
+    "content": "text",
+    "due_date": "due",
+    "created_date": "created",
+    "completed_date": "completed",
+    "mtime": "modified",
+    "links_to": "links-to",
+}
+
+_DEFAULT_SORT = {
+    "todo": (SortKey("due"), SortKey("created"), SortKey("priority")),
+    "note": (SortKey("modified", descending=True),),
+}
+
+# Unique column that breaks ties between equal sort values
+_TIEBREAK = {"todo": "t.id", "note": "n.path"}
+
+_STATUSES = {
+    "pending": ("pending",),
+    "in_progress": ("in_progress",),
+    "in-progress": ("in_progress",),
+    "completed": ("completed",),
+    "done": ("completed",),
+    "open": ("pending", "in_progress"),
+}
+_PRIORITIES = {"high": 1, "medium": 2, "low": 3, "1": 1, "2": 2, "3": 3}
+
+
+def _fields(target: str) -> dict[str, _Field]:
+    return _TODO_FIELDS if target == "todo" else _NOTE_FIELDS
+
+
+def _canonical_field(target: str, name: str) -> str:
+    name = _FIELD_ALIASES.get(name, name)
+    if name not in _fields(target):
+        known = ", ".join(sorted(_fields(target)))
+        raise NbqlError(f"Unknown {target} field {name!r} (fields: {known})")
+    return name
+
+
+_RELATIVE_DAYS = {"yesterday": -1, "today": 0, "tomorrow": 1}
+
+
+def _parse_date(value: str, today: date) -> date:
+    if value.lower() in _RELATIVE_DAYS:
+        return today + timedelta(days=_RELATIVE_DAYS[value.lower()])
+    match = _OFFSET.fullmatch(value.lower())
+    if match:
+        days = int(match.group(2)) * (7 if match.group(3) == "w" else 1)
+        return today + timedelta(days=days if match.group(1) == "+" else -days)
+    parsed = parse_fuzzy_date(value)
+    if parsed is None:
+        raise NbqlError(f"Not a date: {value!r}")
+    return parsed
+
+
+def _like(value: str) -> str:
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+class _Compiler:
+    def __init__(self, target: str, today: date) -> None:
+        self.target = target
+        self.today = today
+        self.params: list[Any] = []
+
+    def expr(self, expr: Expr) -> str:
+        if isinstance(expr, And):
+            return "(" + " AND ".join(self.expr(e) for e in expr.items) + ")"
+        if isinstance(expr, Or):
+            return "(" + " OR ".join(self.expr(e) for e in expr.items) + ")"
+        if isinstance(expr, Not):
+            # A comparison with a missing value is NULL, not false: "not
+            # section=archived" must still match todos without a section
+            return f"({self.expr(expr.item)}) IS NOT TRUE"
+        return self.condition(expr)
+
+    def condition(self, cond: Condition) -> str:
+        name = _canonical_field(self.target, cond.field)
+        spec = _fields(self.target)[name]
+        op, value, col = cond.op, cond.value, spec.column
+
+        if value.lower() == "none" and spec.kind not in ("tag", "links"):
+            if op == "=":
+                return f"{col} IS NULL"
+            if op == "!=":
+                return f"{col} IS NOT NULL"
+            raise NbqlError(f"Only = and != compare {name} with none")
+
+        allowed = {
+            "text": ("=", "!=", "~"),
+            "lower": ("=", "!=", "~"),
+            "path": ("=", "!=", "~"),
+            "status": ("=", "!="),
+            "tag": ("=", "!=", "~"),
+            "links": ("=", "!="),
+        }.get(spec.kind, ("=", "!=", "<", "<=", ">", ">="))
+        if op not in allowed:
+            raise NbqlError(f"Operator {op!r} isn't supported for {name}")
+
+        if spec.kind in ("text", "lower", "path"):
+            if spec.kind == "lower":
+                value = value.lower()
+            elif spec.kind == "path":
+                value = value.replace("\\", "/")
+            if op == "~":
+                self.params.append(_like(value))
+                return f"{col} LIKE ? ESCAPE '\\'"
+            if spec.kind == "path" and not value.endswith(".md"):
+                value += ".md"
+            self.params.append(value)
+            return f"{col} = ?" if op == "=" else f"({col} IS NULL OR {col} != ?)"
+
+        if spec.kind == "status":
+            statuses = _STATUSES.get(value.lower())
+            if statuses is None:
+                raise NbqlError(
+                    f"Unknown status {value!r} (pending, in_progress, completed, open)"
+                )
+            self.params.extend(statuses)
+            marks = ", ".join("?" for _ in statuses)
+            return f"{col} {'IN' if op == '=' else 'NOT IN'} ({marks})"
+
+        if spec.kind == "priority":
+            priority = _PRIORITIES.get(value.lower())
+            if priority is None:
+                raise NbqlError(f"Unknown priority {value!r} (high, medium, low or 1-3)")
+            self.params.append(priority)
+            if op == "!=":
+                return f"({col} IS NULL OR {col} != ?)"
+            return f"{col} {op} ?"
+
+        if spec.kind == "tag":
+            tag = value.lstrip("#").lower()
+            owner = "todo_id = t.id" if self.target == "todo" else "note_path = n.path"
+            if op == "~":
+                self.params.append(_like(tag))
+                return (
+                    f"EXISTS (SELECT 1 FROM {col} WHERE {owner} "
+                    "AND tag LIKE ? ESCAPE '\\')"
+                )
+            self.params.append(tag)
+            exists = f"EXISTS (SELECT 1 FROM {col} WHERE {owner} AND tag = ?)"
+            return exists if op == "=" else f"NOT {exists}"
+
+        if spec.kind == "links":
+            # By path (with or without .md) or by the target note's title
+            path = value if value.endswith(".md") else f"{value}.md"
+            self.params.extend([value, path, value])
+            exists = (
+                "EXISTS (SELECT 1 FROM note_links l WHERE l.source_path = n.path "
+                "AND (l.resolved_target_path IN (?, ?) OR l.resolved_target_path "
+                "IN (SELECT path FROM notes WHERE title = ?)))"
+            )
+            return exists if op == "=" else f"NOT {exists}"
+
+        # Dates. Columns may hold a time after the date ("2025-01-07 14:00"),
+        # so day comparisons become half-open ranges on the raw column,
+        # which an index on it can serve.
+        day = _parse_date(value, self.today)
+        start: Any = day
+        end: Any = day + timedelta(days=1)
+        if spec.kind == "timestamp":
+            start = datetime.combine(start, datetime.min.time()).timestamp()
+            end = datetime.combine(end, datetime.min.time()).timestamp()
+        else:
+            start, end = start.isoformat(), end.isoformat()
+        if op == "=":
+            self.params.extend([start, end])
+            return f"({col} >= ? AND {col} < ?)"
+        if op == "!=":
+            self.params.extend([start, end])
+            return f"({col} IS NULL OR {col} < ? OR {col} >= ?)"
+        bound, sql_op = {
+            "<": (start, "<"),
+            "<=": (end, "<"),
+            ">": (end, ">="),
+            ">=": (start, ">="),
+        }[op]
+        self.params.append(bound)
+        return f"{col} {sql_op} ?"
+
+    def sort_expr(self, key: SortKey) -> str:
+        name = _canonical_field(self.target, key.field)
+        spec = _fields(self.target)[name]
+        if not spec.sortable:
+            raise NbqlError(f"Can't sort by {name}")
+        # Missing values sort last in either direction
+        if spec.kind == "date":
+            missing = "''" if key.descending else "'9999-12-31'"
+        elif spec.kind == "timestamp":
+            missing = "-1e308" if key.descending else "1e308"
+        elif spec.kind == "priority":
+            missing = "0" if key.descending else "9"
+        else:
+            missing = "''"
+        return f"COALESCE({spec.column}, {missing})"
+
+
+@dataclass(frozen=True)
+class CompiledQuery:
+    """A query compiled to SQL.
+
+    Attributes:
+        target: "todo" or "note".
+        sql: The SELECT statement. Besides the target's columns, it selects
+            the sort values of each row as _k0, _k1, ... (the last one is
+            the tiebreaker), from which the next page's cursor is built.
+        params: Parameters for sql.
+        limit: Page size (the statement fetches one more row, to tell if
+            there is a next page), or None for all rows.
+        sort_keys: Number of _k columns.
+        count_sql: Statement counting every match (ignoring the cursor).
+        count_params: Parameters for count_sql.
+    """
+
+    target: str
+    sql: str
+    params: tuple[Any, ...]
+    limit: int | None = None
+    sort_keys: int = 0
+    count_sql: str = field(default="", repr=False)
+    count_params: tuple[Any, ...] = field(default=(), repr=False)
+
+
+def encode_cursor(values: list[Any]) -> str:
+    """Encode a row's sort values as an opaque page cursor."""
+    raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str, size: int) -> list[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded))
+    except ValueError:
+        raise NbqlError("Invalid page cursor") from None
+    if not isinstance(values, list) or len(values) != size:
+        raise NbqlError("Page cursor doesn't match this query")
+    return values
+
+
+def compile_query(
+    query: Query | str,
+    after: str | None = None,
+    limit: int | None = None,
+    include_excluded: bool = False,
+    today: date | None = None,
+) -> CompiledQuery:
+    """Compile a query to a single SQL statement.
+
+    Todo queries only match top-level todos, and skip todos from notes
+    marked todo_exclude unless include_excluded is set.
+
+    Args:
+        query: A parsed query, or nbql text.
+        after: Cursor of the previous page (QueryPage.next_cursor).
+        limit: Page size. Defaults to the query's own limit; when both are
+            given the smaller one wins. None with no query limit returns
+            every match.
+        include_excluded: Include todos from todo_exclude notes.
+        today: Date relative dates are counted from (default: today).
+
+    Raises:
+        NbqlError: If the query uses unknown fields, operators or values.
+    """
+    if isinstance(query, str):
+        query = parse(query)
+    compiler = _Compiler(query.target, today or date.today())
+
+    table = "todos t" if query.target == "todo" else "notes n"
+    columns = "t.*" if query.target == "todo" else "n.*"
+    conditions: list[str] = []
+    if query.target == "todo":
+        conditions.append("t.parent_id IS NULL")
+        if not include_excluded:
+            conditions.append("t.todo_exclude = 0")
+    if query.where is not None:
+        conditions.append(compiler.expr(query.where))
+    filter_params = list(compiler.params)
+
+    sort = query.sort or _DEFAULT_SORT[query.target]
+    keys = [(compiler.sort_expr(k), k.descending) for k in sort]
+    keys.append((_TIEBREAK[query.target], False))
+
+    count_where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    count_sql = f"SELECT COUNT(*) FROM {table}{count_where}"
+
+    params = list(filter_params)
+    if after is not None:
+        values = _decode_cursor(after, len(keys))
+        # (k0 > v0) OR (k0 = v0 AND k1 > v1) OR ..., flipped for descending keys
+        clauses = []
+        for i, (expr, descending) in enumerate(keys):
+            parts = [f"{keys[j][0]} = ?" for j in range(i)]
+            parts.append(f"{expr} {'<' if descending else '>'} ?")
+            params.extend(values[: i + 1])
+            clauses.append("(" + " AND ".join(parts) + ")")
+        conditions.append("(" + " OR ".join(clauses) + ")")
+
+    selected = ", ".join(f"{expr} AS _k{i}" for i, (expr, _) in enumerate(keys))
+    order = ", ".join(
+        f"_k{i} {'DESC' if descending else 'ASC'}" for i, (_, descending) in enumerate(keys)
+    )
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    sql = f"SELECT {columns}, {selected} FROM {table}{where} ORDER BY {order}"
+
+    if query.limit is not None:
+        limit = query.limit if limit is None else min(limit, query.limit)
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit + 1)
+
+    return CompiledQuery(
+        target=query.target,
+        sql=sql,
+        params=tuple(params),
+        limit=limit,
+        sort_keys=len(keys),
+        count_sql=count_sql,
+        count_params=tuple(filter_params),
+    )
+
+
+# =============================================================================
+# Execution
+# =============================================================================
+
+
+@dataclass
+class QueryPage:
+    """One page of query results.
+
+    Attributes:
+        items: Todo objects (with tags and sections) or Note objects (with
+            tags), in query order.
+        next_cursor: Cursor for the next page, or None on the last one.
+    """
+
+    items: list[Any]
+    next_cursor: str | None = None
+
+
+def _notes_from_rows(rows, db: Database) -> list[Note]:
+    from nb.models import Note
+    from nb.utils.hashing import make_note_id
+
+    if not rows:
+        return []
+    tags: dict[str, list[str]] = {}
+    for row in db.fetchall(
+        """
+        SELECT note_path, tag FROM note_tags
+        WHERE note_path IN (SELECT value FROM json_each(?))
+        ORDER BY note_path, tag
+        """,
+        (json.dumps([row["path"] for row in rows]),),
+    ):
+        tags.setdefault(row["note_path"], []).append(row["tag"])
+    return [
+        Note(
+            id=row["id"] or make_note_id(Path(row["path"])),
+            path=Path(row["path"]),
+            title=row["title"] or "",
+            date=date.fromisoformat(row["date"]) if row["date"] else None,
+            tags=tags.get(row["path"], []),
+            notebook=row["notebook"] or "",
+            content_hash=row["content_hash"] or "",
+        )
+        for row in rows
+    ]
+
+
+def run_query(
+    query: Query | str,
+    after: str | None = None,
+    limit: int | None = None,
+    include_excluded: bool = False,
+    db: Database | None = None,
+) -> QueryPage:
+    """Run a query and get one page of results.
+
+    Takes the same arguments as compile_query().
+
+    Example:
+        page = run_query("todo where due < +7d sort by due", limit=50)
+        more = run_query("todo where due < +7d sort by due", limit=50,
+                         after=page.next_cursor)
+    """
+    if db is None:
+        db = get_db()
+    compiled = compile_query(query, after, limit, include_excluded)
+    rows = db.fetchall(compiled.sql, compiled.params)
+
+    next_cursor = None
+    if compiled.limit is not None and len(rows) > compiled.limit:
+        rows = rows[: compiled.limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(
+            [last[f"_k{i}"] for i in range(compiled.sort_keys)]
+        )
+
+    if compiled.target == "todo":
+        from nb.index.todos_repo import todos_from_rows
+
+        items: list[Any] = todos_from_rows(rows, db)
+    else:
+        items = _notes_from_rows(rows, db)
+    return QueryPage(items, next_cursor)
+
+
+def count_query(
+    query: Query | str, include_excluded: bool = False, db: Database | None = None
+) -> int:
+    """Count every match of a query, ignoring its sort and limit."""
+    if db is None:
+        db = get_db()
+    compiled = compile_query(query, include_excluded=include_excluded)
+    row = db.fetchone(compiled.count_sql, compiled.count_params)
+    return row[0] if row else 0
+
+
+def explain_query(
+    query: Query | str, include_excluded: bool = False, db: Database | None = None
+) -> list[str]:
+    """Get the query plan SQLite chooses for a query's statement."""
+    if db is None:
+        db = get_db()
+    compiled = compile_query(query, include_excluded=include_excluded)
+    rows = db.fetchall(f"EXPLAIN QUERY PLAN {compiled.sql}", compiled.params)
+    return [row["detail"] for row in rows]
+
+
+def query_from_kanban_filters(
+    filters: dict[str, Any],
+    notebooks: list[str] | None = None,
+    exclude_notebooks: list[str] | None = None,
+) -> Query:
+    """Build the todo query for a kanban column.
+
+    Understands the column filter keys of KanbanColumnConfig (status,
+    due_today, due_this_week, overdue, no_due_date, priority, tags), plus
+    ``query``: nbql conditions ANDed with the rest.
+    """
+    query = parse(filters["query"], target="todo") if filters.get("query") else Query("todo")
+
+    status = filters.get("status")
+    query = query.filter(Condition("status", "=", status or "open"))
+    if filters.get("due_today"):
+        query = query.filter(Condition("due", "=", "today"))
+    if filters.get("due_this_week"):
+        query = query.filter(
+            And((Condition("due", ">=", "today"), Condition("due", "<=", "+7d")))
+        )
+    if filters.get("overdue"):
+        query = query.filter(Condition("due", "<", "today"))
+    if filters.get("no_due_date"):
+        query = query.filter(Condition("due", "=", "none"))
+    if filters.get("priority"):
+        query = query.filter(Condition("priority", "=", str(filters["priority"])))
+    if filters.get("tags"):
+        query = query.filter(Condition("tag", "=", filters["tags"][0]))
+    if notebooks:
+        query = query.filter(
+            Or(tuple(Condition("notebook", "=", name) for name in notebooks))
+        )
+    for name in exclude_notebooks or []:
+        query = query.filter(Condition("notebook", "!=", name))
+    return query
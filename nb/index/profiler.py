@@ -0,0 +1,196 @@
+"""Opt-in SQL statement profiler for the index layer.
+
+While a profiler is active (see ``nb.index.db.start_profiling``), every
+statement run through ``Database`` is timed and recorded under its SQL
+shape: the statement with literals replaced by ``?`` and whitespace
+collapsed, so the same query built with different values or ``IN`` list
+lengths is counted once. The first time a shape runs slower than the
+threshold, its ``EXPLAIN QUERY PLAN`` is captured, and full-table scans
+in that plan are logged.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from typing import Any
+
+_logger = logging.getLogger(__name__)
+
+# Default slow-statement threshold, in milliseconds
+DEFAULT_SLOW_MS = 5.0
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+# Statements EXPLAIN QUERY PLAN can describe
+_EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "REPLACE")
+
+
+def normalize_sql(sql: str) -> str:
+    """Reduce a statement to its shape.
+
+    String and number literals become ``?``, lists of placeholders (``IN``
+    lists, ``VALUES`` rows) collapse to ``(?...)`` and whitespace is
+    collapsed.
+
+    Example:
+        >>> normalize_sql("SELECT * FROM todos WHERE id IN (?, ?, ?) LIMIT 10")
+        'SELECT * FROM todos WHERE id IN (?...) LIMIT ?'
+    """
+    shape = _STRING.sub("?", sql)
+    shape = _NUMBER.sub("?", shape)
+    shape = _WHITESPACE.sub(" ", shape).strip()
+    return _PLACEHOLDER_LIST.sub("(?...)", shape)
+
+
+def is_full_scan(detail: str) -> bool:
+    """Check if a query plan step reads a whole table without an index."""
+    return detail.startswith("SCAN ") and "INDEX" not in detail
+
+
+@dataclass
+class StatementStats:
+    """Timings for one SQL shape.
+
+    Attributes:
+        sql: The normalized statement.
+        count: Times the statement ran.
+        total_ms: Total time spent, in milliseconds.
+        max_ms: Slowest run, in milliseconds.
+        rows: Rows returned (reads) or affected (writes), summed.
+        durations: Every run's time in milliseconds, for percentiles.
+        plan: ``EXPLAIN QUERY PLAN`` details, captured on the first slow run.
+        full_scans: Plan steps that scan a whole table.
+    """
+
+    sql: str
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    rows: int = 0
+    durations: list[float] = field(default_factory=list)
+    plan: list[str] | None = None
+    full_scans: list[str] = field(default_factory=list)
+
+    @property
+    def p95_ms(self) -> float:
+        """95th percentile run time, in milliseconds."""
+        if not self.durations:
+            return 0.0
+        ordered = sorted(self.durations)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to a JSON-serializable dict."""
+        return {
+            "sql": self.sql,
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "p95_ms": round(self.p95_ms, 3),
+            "max_ms": round(self.max_ms, 3),
+            "rows": self.rows,
+            "plan": self.plan,
+            "full_scans": self.full_scans,
+        }
+
+
+class QueryProfiler:
+    """Collects per-shape statement timings.
+
+    Safe to share between threads: the web viewer and the scanner's
+    worker threads record into the same profiler.
+    """
+
+    def __init__(self, slow_ms: float = DEFAULT_SLOW_MS) -> None:
+        self.slow_ms = slow_ms
+        self._stats: dict[str, StatementStats] = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        conn: sqlite3.Connection,
+        sql: str,
+        params: Any,
+        elapsed: float,
+        rows: int,
+    ) -> None:
+        """Record one statement run.
+
+        Args:
+            conn: The connection the statement ran on, used for
+                ``EXPLAIN QUERY PLAN`` when the statement is slow.
+            sql: The statement as executed.
+            params: Its parameters (one set, for executemany()).
+            elapsed: Run time in seconds.
+            rows: Rows returned or affected.
+        """
+        shape = normalize_sql(sql)
+        ms = elapsed * 1000
+        with self._lock:
+            stats = self._stats.get(shape)
+            if stats is None:
+                stats = self._stats[shape] = StatementStats(shape)
+            stats.count += 1
+            stats.total_ms += ms
+            stats.max_ms = max(stats.max_ms, ms)
+            stats.rows += max(rows, 0)
+            stats.durations.append(ms)
+            explain = ms >= self.slow_ms and stats.plan is None
+            if explain:
+                # Claim the plan so concurrent slow runs don't explain it too
+                stats.plan = []
+        if explain:
+            self._explain(conn, sql, params, stats)
+
+    def _explain(
+        self, conn: sqlite3.Connection, sql: str, params: Any, stats: StatementStats
+    ) -> None:
+        """Capture the query plan for a slow statement and log full scans."""
+        if not sql.lstrip().upper().startswith(_EXPLAINABLE):
+            return
+        try:
+            plan = [
+                row[3]
+                for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+            ]
+        except sqlite3.Error as e:
+            _logger.debug("Could not explain %s: %s", stats.sql, e)
+            return
+        scans = [detail for detail in plan if is_full_scan(detail)]
+        with self._lock:
+            stats.plan = plan
+            stats.full_scans = scans
+        for detail in scans:
+            _logger.warning("Full table scan (%s) in: %s", detail, stats.sql)
+
+    def top(self, n: int = 20, key: str = "total_ms") -> list[StatementStats]:
+        """Get the most expensive statements.
+
+        Args:
+            n: Number of statements to return.
+            key: Sort field: ``total_ms``, ``p95_ms``, ``count`` or ``rows``.
+        """
+        with self._lock:
+            stats = list(self._stats.values())
+        return sorted(stats, key=lambda s: getattr(s, key), reverse=True)[:n]
+
+    def reset(self) -> None:
+        """Discard everything recorded so far."""
+        with self._lock:
+            self._stats.clear()
+
+    def to_dict(self, n: int = 50) -> dict[str, Any]:
+        """Summarize the profile as a JSON-serializable dict."""
+        with self._lock:
+            stats = list(self._stats.values())
+        return {
+            "slow_ms": self.slow_ms,
+            "statements": sum(s.count for s in stats),
+            "total_ms": round(sum(s.total_ms for s in stats), 3),
+            "top": [s.to_dict() for s in self.top(n)],
+        }
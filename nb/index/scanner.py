@@ -2,34 +2,74 @@
 
 from __future__ import annotations
 
-import fnmatch
+import functools
+import json
 import logging
+import mmap
+import os
+import queue
 import threading
-from collections.abc import Callable
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from dataclasses import dataclass
-from datetime import datetime
+import time
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from datetime import date, datetime
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 from nb.config import get_config
 
 if TYPE_CHECKING:
-    from nb.models import Note
+    from nb.models import Attachment, Note, Todo
+from nb.core.note_links import resolve_pending_links
 from nb.core.note_parser import get_note
-from nb.core.todos import extract_todos, normalize_due_dates_in_file
+from nb.core.todos import (
+    extract_todos,
+    extract_todos_from_content,
+    normalize_due_dates,
+    normalize_due_dates_in_file,
+)
 from nb.index.attachments_repo import (
     delete_attachments_for_note,
     extract_attachments_from_content,
     upsert_attachments_batch,
 )
+from nb.index.content_repo import set_note_content
 from nb.index.db import Database, get_db
+from nb.index.jobs_repo import (
+    JOB_FILES,
+    JOB_VECTORS,
+    complete_job_items,
+    create_job,
+    enqueue_job_items,
+    fail_job_item,
+    finish_job,
+    get_job,
+    get_job_items,
+    get_unfinished_job,
+    restart_job,
+)
 from nb.index.todos_repo import (
     delete_todos_for_source,
     get_todo_dates_for_source,
     upsert_todos_batch,
 )
+from nb.index.vector_state_repo import STALE_NOTE_CONDITION
 from nb.utils.hashing import make_note_hash, make_note_id, normalize_path
+from nb.utils.walk import (
+    RACY_WINDOW_NS,
+    DirListing,
+    DirManifest,
+    IgnoreMatcher,
+    get_ignore_matcher,
+    walk_notes,
+    walk_notes_cached,
+)
+
+if TYPE_CHECKING:
+    import sqlite3
+
+    from nb.config import Config
+    from nb.index.search import NoteSearch
 
 # Thread-local storage for database connections
 _thread_local = threading.local()
@@ -41,6 +81,31 @@ ENABLE_VECTOR_INDEXING = True
 # Lock for vector indexing (localvectordb may not be thread-safe)
 _vector_lock = threading.Lock()
 
+# Minimum number of changed files before index_all_notes() parses in a
+# process pool; below this, process startup costs more than it saves.
+PROCESS_POOL_THRESHOLD = 64
+
+# Notes written per SQLite transaction when indexing many files
+WRITE_BATCH_SIZE = 200
+
+# Byte sequence every todo line contains (see TODO_PATTERN)
+TODO_MARKER = b"- ["
+
+# index_prioritized(): at most this many changed files are indexed before
+# returning to the command (the inbox and the most recently modified notes
+# first); the rest are indexed in a background thread
+PRIORITY_FOREGROUND_LIMIT = 200
+# Notes modified this recently are indexed in the foreground
+PRIORITY_RECENT_SECONDS = 2 * 24 * 60 * 60
+
+# Embedding queue used by index_all_notes(): a batch is sent to
+# index_notes_batch() once its estimated size reaches EMBED_BATCH_TOKENS, or
+# EMBED_FLUSH_SECONDS after its first note was queued, whichever comes first.
+EMBED_BATCH_TOKENS = 32_000
+EMBED_FLUSH_SECONDS = 2.0
+EMBED_QUEUE_SIZE = 256  # Max notes waiting to be embedded before the writer blocks
+CHARS_PER_TOKEN = 4  # Rough estimate used for the token budget
+
 # Logger for vector indexing issues
 _logger = logging.getLogger(__name__)
 
@@ -49,13 +114,46 @@ _logger = logging.getLogger(__name__)
 LinkTuple = tuple[str, str, str, bool]
 
 
+@dataclass(frozen=True)
+class FileStat:
+    """Stat tuple recorded in the file manifest for change detection."""
+
+    size: int
+    mtime_ns: int
+    ctime_ns: int
+    inode: int
+    device: int
+
+    @classmethod
+    def from_stat_result(cls, st: os.stat_result) -> FileStat:
+        """Build a FileStat from an os.stat() result."""
+        return cls(
+            size=st.st_size,
+            mtime_ns=st.st_mtime_ns,
+            ctime_ns=st.st_ctime_ns,
+            inode=st.st_ino,
+            device=st.st_dev,
+        )
+
+    def is_racy(self) -> bool:
+        """Check if the file was modified too recently to trust its stat.
+
+        Racy files are not recorded in the stat manifest. On filesystems with
+        coarse timestamps a second write within the same tick would leave the
+        stat tuple unchanged, so such files are hashed on the next run instead
+        (the same "racy" rule git uses for its index).
+        """
+        return time.time_ns() - self.mtime_ns < RACY_WINDOW_NS
+
+
 @dataclass
 class NoteData:
     """Data extracted from a note file for indexing.
 
     This dataclass holds all the information extracted from a note file
-    that is needed for database operations. It's used to share logic
-    between index_note() and index_note_threadsafe().
+    that is needed for database operations. It's produced by a single read
+    of the file (see _extract_note_data()) and shared between index_note()
+    and index_note_threadsafe(), so no later stage needs to touch the disk.
     """
 
     note: Note
@@ -67,13 +165,65 @@ class NoteData:
     normalized_path: str
     note_id: str
     sections: list[str]
+    file_stat: FileStat | None = None
+    source_type: str = "note"
+    todos: list[Todo] = field(default_factory=list)
+    attachments: list[tuple[Attachment, str, str]] = field(default_factory=list)
+
+
+def read_note_text(path: Path) -> str | None:
+    """Read a note file's bytes once and decode them.
+
+    Newlines are translated the same way Path.read_text() does, so content
+    hashes match those computed elsewhere from read_text().
+
+    Returns:
+        The decoded text, or None if the file doesn't exist.
+    """
+    try:
+        raw = path.read_bytes()
+    except FileNotFoundError:
+        return None
+    return _decode_note_bytes(raw)
+
+
+def _decode_note_bytes(raw: bytes) -> str:
+    """Decode note bytes, translating newlines like Path.read_text()."""
+    text = raw.decode("utf-8")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+def read_todo_candidate(path: Path) -> str | None:
+    """Read a note only if it can contain todos.
+
+    The file is memory-mapped and searched for the ``- [`` byte sequence
+    every todo line starts with, so notes without todos are never decoded.
+
+    Returns:
+        The decoded text, "" if the note has no todo marker, or None if
+        the file doesn't exist.
+    """
+    try:
+        with path.open("rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return ""
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if mm.find(TODO_MARKER) < 0:
+                    return ""
+                raw = mm[:]
+    except FileNotFoundError:
+        return None
+    return _decode_note_bytes(raw)
 
 
 def _extract_note_data(path: Path, notes_root: Path) -> NoteData | None:
     """Extract all data from a note file needed for indexing.
 
-    This function handles the common data extraction logic shared between
-    index_note() and index_note_threadsafe().
+    This is the ingestion stage shared between index_note() and
+    index_note_threadsafe(). The file is read once; frontmatter, body,
+    links, tags, todos and attachments are all parsed from that buffer.
 
     Args:
         path: Path to the note file.
@@ -82,43 +232,60 @@ def _extract_note_data(path: Path, notes_root: Path) -> NoteData | None:
     Returns:
         NoteData if successful, None if the note couldn't be parsed.
     """
-    # Resolve full path first
+    # Resolve full and relative paths
     if path.is_absolute():
         full_path = path
+        try:
+            relative_path = path.relative_to(notes_root)
+        except ValueError:
+            # Path is outside notes_root
+            relative_path = path
     else:
         full_path = notes_root / path
+        relative_path = path
 
-    # Normalize relative due dates FIRST (e.g., @due(today) -> @due(2025-12-01))
-    # This must happen before reading content/hash to avoid re-indexing next time
-    normalize_due_dates_in_file(full_path)
+    try:
+        stat_before = FileStat.from_stat_result(full_path.stat())
+    except FileNotFoundError:
+        return None
 
-    # Now read the normalized content and compute hash
-    note = get_note(path, notes_root)
-    if not note:
+    content = read_note_text(full_path)
+    if content is None:
         return None
 
-    # Read the full content for storage and vector indexing
-    try:
-        content = full_path.read_text(encoding="utf-8")
-    except (OSError, UnicodeDecodeError):
-        content = ""
+    # Normalize relative due dates FIRST (e.g., @due(today) -> @due(2025-12-01))
+    # and write them back, so the stored hash matches the file next time
+    content, changes = normalize_due_dates(content)
+    if changes:
+        full_path.write_text(content, encoding="utf-8")
 
     # Get file mtime for caching (after normalization)
     try:
-        mtime = full_path.stat().st_mtime
+        st = full_path.stat()
+        mtime: float | None = st.st_mtime
+        stat_after: FileStat | None = FileStat.from_stat_result(st)
     except OSError:
         mtime = None
+        stat_after = None
 
-    # Check for todo_exclude in frontmatter and extract links
+    # Only record the stat tuple if it describes the content we just read
+    file_stat = stat_after if changes or stat_after == stat_before else None
+    if file_stat is not None and file_stat.is_racy():
+        file_stat = None
+
+    from nb.core.note_parser import build_note, get_sections_for_path
     from nb.utils.markdown import (
         extract_all_links,
         extract_frontmatter_links,
         extract_todo_exclude,
-        parse_note_file,
+        parse_note_content,
     )
 
+    meta, body = parse_note_content(content, full_path)
+    note = build_note(relative_path, full_path, content, meta, body)
+
+    # Check for todo_exclude in frontmatter and extract links
     try:
-        meta, body = parse_note_file(full_path)
         todo_exclude = 1 if extract_todo_exclude(meta) else 0
         # Extract all links from body (wiki + markdown) and frontmatter
         body_links = extract_all_links(body)
@@ -130,14 +297,31 @@ def _extract_note_data(path: Path, notes_root: Path) -> NoteData | None:
         all_links = []
 
     # Get sections for path-based subdirectory hierarchy
-    from nb.core.note_parser import get_sections_for_path
-
     sections = get_sections_for_path(note.path)
 
     # Compute normalized path and note ID
     normalized_path = normalize_path(note.path)
     note_id = make_note_id(note.path)
 
+    # Todos and attachments come from the same buffer
+    config = get_config()
+    inbox_path = (notes_root / config.todo.inbox_file).resolve()
+    source_type = "inbox" if full_path.resolve() == inbox_path else "note"
+
+    todos = extract_todos_from_content(
+        content,
+        full_path,
+        source_type=source_type,
+        notes_root=notes_root,
+        meta=meta,
+    )
+    attachments = extract_attachments_from_content(
+        content,
+        parent_type="note",
+        parent_id=normalized_path,
+        source_path=full_path,
+    )
+
     return NoteData(
         note=note,
         full_path=full_path,
@@ -148,24 +332,36 @@ def _extract_note_data(path: Path, notes_root: Path) -> NoteData | None:
         normalized_path=normalized_path,
         note_id=note_id,
         sections=sections,
+        file_stat=file_stat,
+        source_type=source_type,
+        todos=todos,
+        attachments=attachments,
     )
 
 
-def _persist_note_to_db(data: NoteData, db: Database) -> None:
+def _persist_note_to_db(data: NoteData, db: Database, commit: bool = True) -> None:
     """Persist extracted note data to the database.
 
     This function handles the common database operations shared between
-    index_note() and index_note_threadsafe().
+    index_note(), index_note_threadsafe() and the parallel index writer.
 
     Args:
         data: The extracted note data.
         db: The database connection to use.
+        commit: If True, commit immediately. The parallel index writer
+            passes False and commits once per batch of notes.
     """
-    # Upsert note
+    # Upsert note. An update in place (not REPLACE) keeps the delete/insert
+    # triggers and cascades for notes that are really added or removed.
     db.execute(
         """
-        INSERT OR REPLACE INTO notes (id, path, title, date, notebook, content_hash, content, mtime, todo_exclude, updated_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        INSERT INTO notes (id, path, title, date, notebook, content_hash, mtime, todo_exclude, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(path) DO UPDATE SET
+            id = excluded.id, title = excluded.title, date = excluded.date,
+            notebook = excluded.notebook, content_hash = excluded.content_hash,
+            mtime = excluded.mtime, todo_exclude = excluded.todo_exclude,
+            updated_at = excluded.updated_at
         """,
         (
             data.note_id,
@@ -174,12 +370,18 @@ def _persist_note_to_db(data: NoteData, db: Database) -> None:
             data.note.date.isoformat() if data.note.date else None,
             data.note.notebook,
             data.note.content_hash,
-            data.content,
             data.mtime,
             data.todo_exclude,
             datetime.now().isoformat(),
         ),
     )
+    set_note_content(data.normalized_path, data.content, db=db)
+
+    # Update the stat manifest (no row means "hash it next time")
+    if data.file_stat is not None:
+        _write_manifest(db, [(data.normalized_path, data.file_stat)])
+    else:
+        db.execute("DELETE FROM file_manifest WHERE path = ?", (data.normalized_path,))
 
     # Update tags
     db.execute("DELETE FROM note_tags WHERE note_path = ?", (data.normalized_path,))
@@ -220,7 +422,8 @@ def _persist_note_to_db(data: NoteData, db: Database) -> None:
             ],
         )
 
-    db.commit()
+    if commit:
+        db.commit()
 
 
 def _index_note_vectors(data: NoteData, use_lock: bool = False) -> None:
@@ -251,59 +454,265 @@ def _index_note_vectors(data: NoteData, use_lock: bool = False) -> None:
 
 def _index_note_todos_and_attachments(
     data: NoteData,
-    notes_root: Path,
     db: Database | None = None,
+    commit: bool = True,
 ) -> None:
     """Index todos and attachments from a note.
 
+    Todos and attachments were already extracted by _extract_note_data(),
+    so this only writes them to the database.
+
     Args:
         data: The extracted note data.
-        notes_root: The notes root directory.
         db: Optional database connection (for thread-safe operations).
+        commit: If True, commit after each step. The parallel index writer
+            passes False and commits once per batch of notes.
     """
-    config = get_config()
-    inbox_path = (notes_root / config.todo.inbox_file).resolve()
-    if data.full_path.resolve() == inbox_path:
-        source_type = "inbox"
-    else:
-        source_type = "note"
-
     # Preserve dates before deleting (so we can restore them after re-indexing)
     if db:
         preserved_dates = get_todo_dates_for_source(data.full_path, db=db)
-        delete_todos_for_source(data.full_path, db=db)
+        delete_todos_for_source(data.full_path, db=db, commit=commit)
     else:
         preserved_dates = get_todo_dates_for_source(data.full_path)
-        delete_todos_for_source(data.full_path)
+        delete_todos_for_source(data.full_path, commit=commit)
 
-    # Extract and index new todos (batch for performance)
-    todos = extract_todos(
-        data.full_path, source_type=source_type, notes_root=notes_root
-    )
+    # Index new todos (batch for performance)
     if db:
-        upsert_todos_batch(todos, db=db, preserved_dates=preserved_dates)
+        upsert_todos_batch(
+            data.todos,
+            db=db,
+            preserved_dates=preserved_dates,
+            commit=commit,
+            note_path=data.normalized_path,
+        )
     else:
-        upsert_todos_batch(todos, preserved_dates=preserved_dates)
+        upsert_todos_batch(
+            data.todos,
+            preserved_dates=preserved_dates,
+            commit=commit,
+            note_path=data.normalized_path,
+        )
 
-    # Index attachments (delete existing first, then extract from content)
+    # Index attachments (delete existing first)
     if db:
-        delete_attachments_for_note(data.full_path, db=db)
+        delete_attachments_for_note(data.full_path, db=db, commit=commit)
     else:
-        delete_attachments_for_note(data.full_path)
-
-    if data.content:
-        # Extract note-level attachments
-        note_attachments = extract_attachments_from_content(
-            data.content,
-            parent_type="note",
-            parent_id=data.normalized_path,
-            source_path=data.full_path,
+        delete_attachments_for_note(data.full_path, commit=commit)
+
+    if data.attachments:
+        if db:
+            upsert_attachments_batch(data.attachments, db=db, commit=commit)
+        else:
+            upsert_attachments_batch(data.attachments, commit=commit)
+
+
+def _index_note_todos_fast(path: Path, notes_root: Path, db: Database) -> int:
+    """Re-index only the todos of a note (see index_todos_only()).
+
+    Returns:
+        Number of todos indexed.
+    """
+    full_path = path if path.is_absolute() else notes_root / path
+    content = read_todo_candidate(full_path)
+    if content is None:
+        return 0
+
+    preserved_dates = get_todo_dates_for_source(full_path, db=db)
+    delete_todos_for_source(full_path, db=db, commit=False)
+    if not content:
+        return 0
+
+    content, changes = normalize_due_dates(content)
+    if changes:
+        full_path.write_text(content, encoding="utf-8")
+
+    from nb.utils.markdown import extract_todo_exclude, parse_note_content
+
+    # Frontmatter is only parsed when there is some (for inherited tags
+    # and todo_exclude)
+    meta: dict[str, Any] = {}
+    if content.startswith("---"):
+        meta, _ = parse_note_content(content, full_path)
+    todo_exclude = extract_todo_exclude(meta)
+    note_path = _manifest_key(full_path, notes_root)
+    cursor = db.execute(
+        "UPDATE notes SET todo_exclude = ? WHERE path = ?",
+        (1 if todo_exclude else 0, note_path),
+    )
+    if todo_exclude and cursor.rowcount == 0:
+        # A new note can't be excluded yet; the full pass stores its todos
+        return 0
+
+    config = get_config()
+    inbox_path = (notes_root / config.todo.inbox_file).resolve()
+    source_type = "inbox" if full_path.resolve() == inbox_path else "note"
+    todos = extract_todos_from_content(
+        content,
+        full_path,
+        source_type=source_type,
+        notes_root=notes_root,
+        meta=meta,
+    )
+    upsert_todos_batch(
+        todos,
+        db=db,
+        preserved_dates=preserved_dates,
+        commit=False,
+        note_path=note_path,
+    )
+    return len(todos)
+
+
+def index_todos_only(
+    files: list[Path],
+    notes_root: Path | None = None,
+    on_progress: Callable[[int], None] | None = None,
+) -> int:
+    """Bring the todos of changed notes up to date, skipping everything else.
+
+    For commands that only read todos. Notes without a todo marker are
+    never decoded (see read_todo_candidate()); the others only have their
+    frontmatter and todos parsed. Titles, links, tags, attachments and the
+    notes row are left alone, and so is the stat manifest, so the files
+    stay stale until a full index_all_notes() pass catches up.
+
+    Args:
+        files: Changed note files, e.g. from plan_index().
+        notes_root: Root path for notes. Defaults to config.notes_root.
+        on_progress: Optional callback called after each file.
+
+    Returns:
+        Number of files processed.
+    """
+    if notes_root is None:
+        notes_root = get_config().notes_root
+
+    db = get_db()
+    count = 0
+    with db.bulk(batch_size=WRITE_BATCH_SIZE) as bulk:
+        for path in files:
+            try:
+                with bulk.item():
+                    _index_note_todos_fast(path, notes_root, db)
+                count += 1
+                if on_progress:
+                    on_progress(1)
+            except Exception as e:
+                _logger.warning("Failed to index todos of %s: %s", path, e)
+    return count
+
+
+def _embed_batch(batch: list[tuple[Note, str]]) -> int:
+    """Embed a batch of notes into the vector index.
+
+    Uses NoteSearch.index_notes_batch() so the embedding provider sees one
+    request per batch, falling back to one note at a time if the batch fails.
+    Vector state rows are deferred until _EmbeddingStage.close().
+
+    Args:
+        batch: (note, content) pairs to embed.
+
+    Returns:
+        Number of notes embedded.
+    """
+    from nb.index.search import get_search
+
+    search = get_search()
+    try:
+        return search.index_notes_batch(batch, defer_state=True)
+    except Exception as e:
+        _logger.debug("Batch vector indexing failed, retrying per note: %s", e)
+
+    indexed = 0
+    for note, content in batch:
+        try:
+            search.index_note(note, content, defer_state=True)
+            indexed += 1
+        except Exception as e:
+            _logger.debug("Vector indexing failed for %s: %s", note.path, e)
+    return indexed
+
+
+class _EmbeddingStage:
+    """Background thread that embeds indexed notes in batches.
+
+    The index writer hands each persisted note to put() and moves on to the
+    next file. Notes collect in a bounded queue and are embedded on a
+    separate thread via index_notes_batch(), one call per batch instead of
+    one per note. A batch is flushed when its estimated size reaches the
+    token budget, or when the oldest queued note has waited flush_interval
+    seconds, so embedding overlaps with parsing the next files.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = EMBED_BATCH_TOKENS,
+        flush_interval: float = EMBED_FLUSH_SECONDS,
+        max_queued: int = EMBED_QUEUE_SIZE,
+    ) -> None:
+        self.token_budget = token_budget
+        self.flush_interval = flush_interval
+        self.indexed = 0
+        self.flushes = 0
+        self._queue: queue.Queue[tuple[Note, str] | None] = queue.Queue(
+            maxsize=max_queued
         )
-        if note_attachments:
-            if db:
-                upsert_attachments_batch(note_attachments, db=db)
-            else:
-                upsert_attachments_batch(note_attachments)
+        self._thread = threading.Thread(target=self._run, name="nb-embed", daemon=True)
+        self._thread.start()
+
+    def put(self, note: Note, content: str) -> None:
+        """Queue a note for embedding (blocks while the queue is full)."""
+        if content:
+            self._queue.put((note, content))
+
+    def close(self) -> None:
+        """Flush pending notes and wait for the embedding thread to finish.
+
+        Then records the embedded notes in vector_state from the calling
+        thread, which no longer holds the database for a bulk session.
+        """
+        self._queue.put(None)
+        self._thread.join()
+        if self.indexed:
+            from nb.index.search import flush_search_state
+
+            try:
+                flush_search_state()
+            except Exception as e:
+                _logger.debug("Failed to record vector state: %s", e)
+
+    def _run(self) -> None:
+        batch: list[tuple[Note, str]] = []
+        tokens = 0
+        deadline: float | None = None
+        while True:
+            timeout = None
+            if deadline is not None:
+                timeout = max(deadline - time.monotonic(), 0)
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                # The oldest queued note has waited long enough
+                self._flush(batch)
+                batch, tokens, deadline = [], 0, None
+                continue
+            if item is None:
+                break
+            batch.append(item)
+            tokens += len(item[1]) // CHARS_PER_TOKEN
+            if deadline is None:
+                deadline = time.monotonic() + self.flush_interval
+            if tokens >= self.token_budget:
+                self._flush(batch)
+                batch, tokens, deadline = [], 0, None
+        self._flush(batch)
+
+    def _flush(self, batch: list[tuple[Note, str]]) -> None:
+        if not batch:
+            return
+        with _vector_lock:
+            self.indexed += _embed_batch(batch)
+        self.flushes += 1
 
 
 def _get_thread_db() -> Database:
@@ -320,32 +729,9 @@ def _get_thread_db() -> Database:
     return _thread_local.db
 
 
-def load_nbignore(notes_root: Path) -> list[str]:
-    """Load ignore patterns from .nbignore file.
-
-    The .nbignore file uses fnmatch-style patterns (similar to .gitignore but simpler).
-    Each line is a pattern, blank lines and lines starting with # are ignored.
-
-    Example .nbignore:
-        # Ignore archive folders
-        archive
-        old_*
-        temp/
-    """
-    ignore_file = notes_root / ".nbignore"
-    if not ignore_file.exists():
-        return []
-
-    patterns = []
-    try:
-        for line in ignore_file.read_text(encoding="utf-8").splitlines():
-            line = line.strip()
-            # Skip empty lines and comments
-            if line and not line.startswith("#"):
-                patterns.append(line)
-    except Exception as e:
-        _logger.debug("Could not read .nbignore file %s: %s", ignore_file, e)
-    return patterns
+@functools.lru_cache(maxsize=32)
+def _compile_ignore_patterns(patterns: tuple[str, ...]) -> IgnoreMatcher:
+    return IgnoreMatcher(list(patterns))
 
 
 def should_ignore(path: Path, patterns: list[str], notes_root: Path) -> bool:
@@ -367,22 +753,106 @@ def should_ignore(path: Path, patterns: list[str], notes_root: Path) -> bool:
     except ValueError:
         return False
 
-    rel_str = str(rel_path).replace("\\", "/")
+    return _compile_ignore_patterns(tuple(patterns)).is_ignored(rel_path.as_posix())
+
+
+def _scan_note_entries(
+    notes_root: Path,
+    db: Database | None = None,
+    trust_manifest: bool = False,
+) -> list[tuple[Path, os.DirEntry[str] | None]]:
+    """Find all note files, with their directory entries (for cached stats).
+
+    Walks notes_root and every external notebook, each with its own
+    .nbignore. With a database, directory listings are recorded in the
+    dir_manifest table (the caller commits); with trust_manifest as well,
+    directories whose mtime hasn't changed are not listed again, and their
+    files come back with a None entry.
+    """
+    roots = [notes_root] if notes_root.exists() else []
+    roots.extend(
+        nb.path
+        for nb in get_config().external_notebooks()
+        if nb.path and nb.path.exists()
+    )
+
+    entries: list[tuple[Path, os.DirEntry[str] | None]] = []
+    for root in roots:
+        ignore = get_ignore_matcher(root)
+        if db is None:
+            entries.extend(
+                (Path(entry.path), entry) for entry in walk_notes(root, ignore=ignore)
+            )
+        else:
+            entries.extend(_walk_with_dir_manifest(db, root, ignore, trust_manifest))
+
+    if db is not None:
+        # Forget roots that are no longer walked (moved notes root, removed notebook)
+        db.execute(
+            f"DELETE FROM dir_manifest WHERE root NOT IN ({','.join('?' * len(roots))})",
+            tuple(str(root) for root in roots),
+        )
+
+    entries.sort(key=lambda item: item[0])
+    return entries
+
+
+def _walk_with_dir_manifest(
+    db: Database, root: Path, ignore: IgnoreMatcher, trust: bool
+) -> list[tuple[Path, os.DirEntry[str] | None]]:
+    """Walk one root with walk_notes_cached() and store the new listings."""
+    root_key = str(root)
+    listings: dict[str, DirListing] = {}
+    if trust:
+        db.execute(
+            "DELETE FROM dir_manifest WHERE root = ? AND ignore_key != ?",
+            (root_key, ignore.signature),
+        )
+        for row in db.fetchall(
+            "SELECT path, mtime_ns, subdirs, files FROM dir_manifest WHERE root = ?",
+            (root_key,),
+        ):
+            listings[row["path"]] = DirListing(
+                mtime_ns=row["mtime_ns"],
+                subdirs=json.loads(row["subdirs"]),
+                files=json.loads(row["files"]),
+            )
+    else:
+        db.execute("DELETE FROM dir_manifest WHERE root = ?", (root_key,))
+
+    manifest = DirManifest(listings=listings)
+    found = list(walk_notes_cached(root, manifest, ignore=ignore))
 
-    for pattern in patterns:
-        # Match against full relative path
-        if fnmatch.fnmatch(rel_str, pattern):
-            return True
-        # Match with wildcard prefix for nested matches
-        if fnmatch.fnmatch(rel_str, f"*/{pattern}"):
-            return True
-        if fnmatch.fnmatch(rel_str, f"**/{pattern}"):
-            return True
-        # Check if any path component matches the pattern
-        for part in rel_path.parts:
-            if fnmatch.fnmatch(part, pattern):
-                return True
-    return False
+    stale = manifest.removed()
+    stale.extend(path for path, listing in manifest.changed.items() if listing is None)
+    if stale:
+        db.executemany(
+            "DELETE FROM dir_manifest WHERE path = ?", [(path,) for path in stale]
+        )
+    db.executemany(
+        """INSERT OR REPLACE INTO dir_manifest
+           (path, root, mtime_ns, ignore_key, subdirs, files)
+           VALUES (?, ?, ?, ?, ?, ?)""",
+        [
+            (
+                path,
+                root_key,
+                listing.mtime_ns,
+                ignore.signature,
+                json.dumps(listing.subdirs),
+                json.dumps(listing.files),
+            )
+            for path, listing in manifest.changed.items()
+            if listing is not None
+        ],
+    )
+    _logger.debug(
+        "Walked %s: listed %d of %d directories",
+        root,
+        manifest.relisted,
+        len(manifest.visited),
+    )
+    return found
 
 
 def scan_notes(notes_root: Path | None = None) -> list[Path]:
@@ -396,43 +866,7 @@ def scan_notes(notes_root: Path | None = None) -> list[Path]:
     if notes_root is None:
         notes_root = get_config().notes_root
 
-    notes = []
-
-    # Load .nbignore patterns
-    ignore_patterns = load_nbignore(notes_root)
-
-    # Scan notes_root
-    if notes_root.exists():
-        for md_file in notes_root.rglob("*.md"):
-            rel_parts = md_file.relative_to(notes_root).parts
-            # Skip hidden directories and hidden files (starting with .)
-            if any(part.startswith(".") for part in rel_parts):
-                continue
-            # Skip files matching .nbignore patterns
-            if should_ignore(md_file, ignore_patterns, notes_root):
-                continue
-            notes.append(md_file)
-
-    # Scan external notebooks
-    config = get_config()
-    for nb in config.external_notebooks():
-        if nb.path and nb.path.exists():
-            # Load .nbignore for external notebook if present
-            ext_ignore_patterns = load_nbignore(nb.path)
-            for md_file in nb.path.rglob("*.md"):
-                # Skip hidden directories and hidden files
-                try:
-                    rel_parts = md_file.relative_to(nb.path).parts
-                    if any(part.startswith(".") for part in rel_parts):
-                        continue
-                    # Skip files matching .nbignore patterns
-                    if should_ignore(md_file, ext_ignore_patterns, nb.path):
-                        continue
-                except ValueError:
-                    continue
-                notes.append(md_file)
-
-    return sorted(notes)
+    return [path for path, _ in _scan_note_entries(notes_root)]
 
 
 def get_file_hash(path: Path) -> str:
@@ -441,12 +875,101 @@ def get_file_hash(path: Path) -> str:
     return make_note_hash(content)
 
 
-def needs_reindex(path: Path, notes_root: Path | None = None) -> bool:
+def _write_manifest(db: Database, entries: list[tuple[str, FileStat]]) -> None:
+    """Record stat tuples in the file manifest (caller commits)."""
+    db.executemany(
+        """INSERT OR REPLACE INTO file_manifest
+           (path, size, mtime_ns, ctime_ns, inode, device)
+           VALUES (?, ?, ?, ?, ?, ?)""",
+        [
+            (path, st.size, st.mtime_ns, st.ctime_ns, st.inode, st.device)
+            for path, st in entries
+        ],
+    )
+
+
+_MANIFEST_QUERY = """
+    SELECT n.path, n.content_hash,
+           m.size, m.mtime_ns, m.ctime_ns, m.inode, m.device
+    FROM notes n
+    LEFT JOIN file_manifest m ON m.path = n.path
+"""
+
+
+def _manifest_key(path: Path, notes_root: Path) -> str:
+    """Get the notes-table key for a scanned file."""
+    try:
+        relative = path.relative_to(notes_root)
+    except ValueError:
+        relative = path
+    return normalize_path(relative)
+
+
+def _check_file(
+    path: Path,
+    row: sqlite3.Row | None,
+    paranoid: bool,
+    st: os.stat_result | None = None,
+) -> tuple[bool, FileStat | None]:
+    """Decide whether a file needs reindexing.
+
+    The stat tuple is compared first; the file is only opened and hashed
+    when the stat changed (or always, in paranoid mode).
+
+    Args:
+        path: Absolute path to the file.
+        row: The file's row from _MANIFEST_QUERY, or None if not indexed.
+        paranoid: If True, always compare content hashes.
+        st: The file's stat result if the caller already has it (e.g. from
+            the directory walk), to avoid another stat call.
+
+    Returns:
+        Tuple of (needs_reindex, stat to refresh in the manifest or None).
+    """
+    if row is None:
+        return True, None  # New file
+
+    try:
+        current = FileStat.from_stat_result(st if st is not None else path.stat())
+    except OSError:
+        return True, None  # Let index_note() report the problem
+
+    if not paranoid and row["mtime_ns"] is not None:
+        recorded = FileStat(
+            size=row["size"],
+            mtime_ns=row["mtime_ns"],
+            ctime_ns=row["ctime_ns"],
+            inode=row["inode"],
+            device=row["device"],
+        )
+        if current == recorded:
+            return False, None  # Fast path: stat unchanged, file not opened
+
+    # Stat changed (e.g. touched, or copied back in place): hash is the tiebreaker
+    try:
+        current_hash = get_file_hash(path)
+    except (OSError, UnicodeDecodeError):
+        return True, None
+    if row["content_hash"] != current_hash:
+        return True, None
+
+    # Content unchanged - remember the new stat so the next run skips it
+    return False, None if current.is_racy() else current
+
+
+def needs_reindex(
+    path: Path,
+    notes_root: Path | None = None,
+    paranoid: bool | None = None,
+) -> bool:
     """Check if a file needs to be reindexed.
 
-    Compares the file's content hash against the stored hash in the database.
-    This approach was chosen over mtime-based checking due to occasional
-    mtime inconsistencies on some platforms (particularly Windows).
+    Compares the file's stat tuple (size, mtime_ns, ctime_ns, inode, device)
+    against the file manifest recorded at index time. Only when the stat
+    differs is the content hash compared against the stored hash.
+
+    In paranoid mode (``index.paranoid`` in config) the content hash is
+    always compared, for filesystems with unreliable mtimes.
 
     Returns True if:
     - File is not in the database
@@ -454,37 +977,167 @@ def needs_reindex(path: Path, notes_root: Path | None = None) -> bool:
     """
     if notes_root is None:
         notes_root = get_config().notes_root
+    if paranoid is None:
+        paranoid = get_config().index.paranoid
 
-    try:
-        relative = path.relative_to(notes_root)
-    except ValueError:
-        relative = path
+    db = get_db()
+    key = _manifest_key(path, notes_root)
+    row = db.fetchone(_MANIFEST_QUERY + " WHERE n.path = ?", (key,))
+
+    reindex, refreshed = _check_file(path, row, paranoid)
+    if refreshed is not None:
+        _write_manifest(db, [(key, refreshed)])
+        db.commit()
+    return reindex
+
+
+def get_unchanged_files(paths: list[Path], notes_root: Path) -> set[Path]:
+    """Get the files whose indexed content is known to be current.
+
+    A file qualifies when its stat tuple still matches the manifest, so
+    its stored content (and full-text index entry) can stand in for the
+    file. Nothing qualifies in paranoid mode, where stats aren't trusted.
+
+    Args:
+        paths: Absolute paths of note files.
+        notes_root: Root path for notes.
+    """
+    if get_config().index.paranoid:
+        return set()
+
+    manifest = {
+        row[0]: tuple(row[1:])
+        for row in get_db().fetchall(
+            "SELECT path, size, mtime_ns, ctime_ns, inode, device FROM file_manifest"
+        )
+    }
+    # Same keys as _manifest_key(), on strings: raw os calls instead of
+    # pathlib, which is slow per file on large vaults
+    prefix = os.path.join(str(notes_root), "")  # noqa: PTH118
+    unchanged: set[Path] = set()
+    for path in paths:
+        name = str(path)
+        key = name[len(prefix) :] if name.startswith(prefix) else name
+        recorded = manifest.get(key if os.sep == "/" else key.replace(os.sep, "/"))
+        if recorded is None:
+            continue
+        try:
+            st = os.stat(name)  # noqa: PTH116
+        except OSError:
+            continue
+        current = (st.st_size, st.st_mtime_ns, st.st_ctime_ns, st.st_ino, st.st_dev)
+        if current == recorded:
+            unchanged.add(path)
+    return unchanged
+
+
+@dataclass
+class IndexPlan:
+    """Result of one change-detection pass over the notes root.
+
+    Produced by plan_index() and shared by count_files_to_index() and
+    index_all_notes(), so callers that report progress don't scan and
+    check the vault twice.
+    """
+
+    notes_root: Path
+    files: list[Path]
+    to_index: list[Path]
+    # Every note file the walk found, before any notebook filter; lets
+    # remove_deleted_notes() find deletions without walking again
+    scanned: list[Path] = field(default_factory=list)
+
+
+def _filter_to_notebook(
+    note_files: list[Path], notebook: str, notes_root: Path
+) -> list[Path]:
+    """Filter scanned files to a single notebook."""
+    notebook_config = get_config().get_notebook(notebook)
+    if not notebook_config:
+        return note_files
+    if notebook_config.path:
+        # External notebook - filter by its path
+        notebook_path = notebook_config.path
+    else:
+        # Internal notebook - filter by notebook directory
+        notebook_path = notes_root / notebook
+    return [
+        f for f in note_files if notebook_path in f.parents or f.parent == notebook_path
+    ]
+
+
+def plan_index(
+    notes_root: Path | None = None,
+    force: bool = False,
+    notebook: str | None = None,
+    paranoid: bool | None = None,
+) -> IndexPlan:
+    """Scan the notes root and work out which files need indexing.
+
+    Loads the whole manifest in one query, then checks each file's stat
+    tuple against it (see needs_reindex()). Stat tuples of files whose
+    content turned out to be unchanged are refreshed in one batch.
+
+    Args:
+        notes_root: Override notes root directory
+        force: If True, every file needs indexing
+        notebook: If specified, only consider files in this notebook
+        paranoid: Always compare content hashes. Defaults to ``index.paranoid``.
 
-    # Get current file mtime
-    # try:
-    #     _current_mtime = path.stat().st_mtime
-    # except OSError:
-    #     return True  # File doesn't exist or can't be read
+    Returns:
+        IndexPlan to pass to index_all_notes().
+    """
+    config = get_config()
+    if notes_root is None:
+        notes_root = config.notes_root
+    if paranoid is None:
+        paranoid = config.index.paranoid
 
+    # Directory listings are trusted unless forced or paranoid (mtimes unreliable)
     db = get_db()
-    row = db.fetchone(
-        "SELECT mtime, content_hash FROM notes WHERE path = ?",
-        (normalize_path(relative),),
+    entries = dict(
+        _scan_note_entries(notes_root, db=db, trust_manifest=not (force or paranoid))
     )
+    note_files = list(entries)
+    if notebook:
+        note_files = _filter_to_notebook(note_files, notebook, notes_root)
 
-    if not row:
-        return True  # New file
+    if force:
+        db.commit()
+        return IndexPlan(
+            notes_root=notes_root,
+            files=note_files,
+            to_index=note_files,
+            scanned=list(entries),
+        )
 
-    # Fast path: mtime unchanged AND hash matches means file unchanged
-    # Note: We can't trust mtime alone due to potential race conditions
-    # where mtime was captured but old content was read during indexing.
-    # Always verify with content hash for correctness.
-    current_hash = get_file_hash(path)
-    if row["content_hash"] == current_hash:
-        return False  # Content unchanged, no reindex needed
+    manifest = {row["path"]: row for row in db.fetchall(_MANIFEST_QUERY)}
 
-    # Content changed (hash mismatch), needs reindex
-    return True
+    to_index: list[Path] = []
+    refreshed: list[tuple[str, FileStat]] = []
+    for path in note_files:
+        key = _manifest_key(path, notes_root)
+        entry = entries[path]
+        try:
+            st = entry.stat() if entry is not None else None
+        except OSError:
+            st = None
+        reindex, stat = _check_file(path, manifest.get(key), paranoid, st)
+        if reindex:
+            to_index.append(path)
+        elif stat is not None:
+            refreshed.append((key, stat))
+
+    if refreshed:
+        _write_manifest(db, refreshed)
+    db.commit()
+
+    return IndexPlan(
+        notes_root=notes_root,
+        files=note_files,
+        to_index=to_index,
+        scanned=list(entries),
+    )
 
 
 def index_note(
@@ -519,7 +1172,27 @@ def index_note(
         _index_note_vectors(data, use_lock=False)
 
     # Index todos and attachments
-    _index_note_todos_and_attachments(data, notes_root)
+    _index_note_todos_and_attachments(data)
+
+
+def _index_note_queued(
+    path: Path, notes_root: Path, embedder: _EmbeddingStage | None
+) -> None:
+    """Index a single note, handing its vector work to an embedding stage.
+
+    Same as index_note(), except that embedding is queued on embedder
+    (if given) instead of being done inline.
+    """
+    data = _extract_note_data(path, notes_root)
+    if not data:
+        return
+
+    db = get_db()
+    _persist_note_to_db(data, db)
+    _index_note_todos_and_attachments(data, db=db)
+
+    if embedder is not None:
+        embedder.put(data.note, data.content)
 
 
 def count_files_to_index(
@@ -529,8 +1202,9 @@ def count_files_to_index(
 ) -> int:
     """Count the number of files that need to be indexed.
 
-    This is useful for progress reporting - call before index_all_notes()
-    to know the total count.
+    This is useful for progress reporting. Callers that go on to index
+    should call plan_index() instead and pass the plan to index_all_notes(),
+    so the vault is only checked once.
 
     Args:
         notes_root: Override notes root directory
@@ -540,39 +1214,130 @@ def count_files_to_index(
     Returns:
         Number of files that need indexing.
     """
-    config = get_config()
-    if notes_root is None:
-        notes_root = config.notes_root
+    return len(plan_index(notes_root, force=force, notebook=notebook).to_index)
 
-    note_files = scan_notes(notes_root)
 
-    # Filter to specific notebook if requested
-    if notebook:
-        notebook_config = config.get_notebook(notebook)
-        if notebook_config:
-            if notebook_config.path:
-                notebook_path = notebook_config.path
-            else:
-                notebook_path = notes_root / notebook
-            note_files = [
-                f
-                for f in note_files
-                if notebook_path in f.parents or f.parent == notebook_path
-            ]
+def _init_index_worker(config: Config) -> None:
+    """Process-pool initializer: install the parent's config in the worker.
 
-    if force:
-        return len(note_files)
+    Workers are started with the "spawn" method, so they would otherwise
+    load the config from disk (and miss any in-memory overrides).
+    """
+    import nb.config as config_module
+
+    config_module._config = config
 
-    return len([path for path in note_files if needs_reindex(path, notes_root)])
+
+def _parse_note_worker(
+    path: Path, notes_root: Path
+) -> tuple[Path, NoteData | None, str | None]:
+    """Process-pool task: read and parse one note into a picklable NoteData.
+
+    Returns:
+        (path, data, error) - error is a message if parsing failed.
+    """
+    try:
+        return path, _extract_note_data(path, notes_root), None
+    except Exception as e:
+        return path, None, str(e)
+
+
+def _resolve_index_workers(max_workers: int | None) -> int:
+    """Resolve the number of parser processes (config index.workers, 0 = auto)."""
+    if max_workers is None:
+        max_workers = get_config().index.workers
+    if max_workers <= 0:
+        max_workers = os.cpu_count() or 1
+    return max_workers
+
+
+def _index_notes_parallel(
+    files: list[Path],
+    notes_root: Path,
+    index_vectors: bool,
+    max_workers: int,
+    on_progress: Callable[[int], None] | None = None,
+    job: int | None = None,
+) -> int:
+    """Index files with a process pool for parsing and a single writer.
+
+    Reading and parsing notes (frontmatter YAML, todo and link regexes) is
+    CPU-bound, so it runs in worker processes. The calling thread is the only
+    SQLite writer: it drains parsed NoteData as it arrives inside a
+    Database.bulk() session, committing every WRITE_BATCH_SIZE notes. Vector
+    work goes to an _EmbeddingStage thread. If job is given, each file is
+    marked done in the same transaction as its note.
+
+    Returns:
+        Number of files indexed.
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    db = get_db()
+    embedder = _EmbeddingStage() if index_vectors and ENABLE_VECTOR_INDEXING else None
+    chunksize = max(1, min(32, len(files) // (max_workers * 4)))
+
+    count = 0
+    try:
+        with (
+            db.bulk(batch_size=WRITE_BATCH_SIZE) as bulk,
+            ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_index_worker,
+                initargs=(get_config(),),
+            ) as executor,
+        ):
+            results = executor.map(
+                _parse_note_worker,
+                files,
+                [notes_root] * len(files),
+                chunksize=chunksize,
+            )
+            for path, data, error in results:
+                if error is not None:
+                    _logger.warning("Failed to index note %s: %s", path, error)
+                    if job is not None:
+                        fail_job_item(job, str(path), error, db=db, commit=False)
+                    continue
+                if data is not None:
+                    try:
+                        with bulk.item():
+                            _persist_note_to_db(data, db, commit=False)
+                            _index_note_todos_and_attachments(data, db=db, commit=False)
+                            if job is not None:
+                                complete_job_items(
+                                    job, [str(path)], db=db, commit=False
+                                )
+                    except Exception as e:
+                        _logger.warning("Failed to index note %s: %s", path, e)
+                        if job is not None:
+                            fail_job_item(job, str(path), str(e), db=db, commit=False)
+                        continue
+                    if embedder is not None:
+                        embedder.put(data.note, data.content)
+                elif job is not None:
+                    complete_job_items(job, [str(path)], db=db, commit=False)
+                count += 1
+                if on_progress:
+                    on_progress(1)  # Advance by 1 (not cumulative count)
+    finally:
+        if embedder is not None:
+            embedder.close()
+
+    return count
 
 
 def index_all_notes(
     notes_root: Path | None = None,
     force: bool = False,
     index_vectors: bool = True,
-    max_workers: int = 4,
+    max_workers: int | None = None,
     notebook: str | None = None,
     on_progress: Callable[[int], None] | None = None,
+    plan: IndexPlan | None = None,
+    job: int | None = None,
 ) -> int:
     """Index all notes in the notes root.
 
@@ -580,81 +1345,220 @@ def index_all_notes(
         notes_root: Override notes root directory
         force: If True, reindex all files even if unchanged
         index_vectors: Whether to also index to localvectordb for search
-        max_workers: Maximum number of parallel workers (default 4)
+        max_workers: Number of parser processes for large batches. Defaults
+            to the index.workers config setting (0 = one per CPU).
         notebook: If specified, only index files in this notebook
         on_progress: Optional callback called after each file is indexed.
             The callback receives the number of files indexed so far.
+        plan: Result of an earlier plan_index() call. When given, the
+            vault is not scanned again and force/notebook are ignored.
+        job: Index job (see nb.index.jobs_repo) whose queue holds the
+            files to index. Each file is removed from the queue in the
+            same transaction as its note, so if the run is interrupted the
+            job resumes after the last committed batch.
 
     Returns:
         Number of files indexed.
 
     """
-    config = get_config()
-    if notes_root is None:
-        notes_root = config.notes_root
-
-    note_files = scan_notes(notes_root)
-
-    # Filter to specific notebook if requested
-    if notebook:
-        notebook_config = config.get_notebook(notebook)
-        if notebook_config:
-            if notebook_config.path:
-                # External notebook - filter by its path
-                notebook_path = notebook_config.path
-            else:
-                # Internal notebook - filter by notebook directory
-                notebook_path = notes_root / notebook
-            note_files = [
-                f
-                for f in note_files
-                if notebook_path in f.parents or f.parent == notebook_path
-            ]
-
-    # Filter to files that need reindexing
-    files_to_index = [
-        path for path in note_files if force or needs_reindex(path, notes_root)
-    ]
+    if plan is None:
+        plan = plan_index(notes_root, force=force, notebook=notebook)
+    notes_root = plan.notes_root
+    files_to_index = plan.to_index
 
     if not files_to_index:
         return 0
 
-    # For small batches or when vectors are needed, use sequential processing
-    # (vector indexing may not be thread-safe)
-    if len(files_to_index) <= 3 or (index_vectors and ENABLE_VECTOR_INDEXING):
-        count = 0
-        for path in files_to_index:
-            try:
-                index_note(path, notes_root, index_vectors=index_vectors)
-                count += 1
-                if on_progress:
-                    on_progress(1)  # Advance by 1 (not cumulative count)
-            except Exception as e:
-                _logger.warning("Failed to index note %s: %s", path, e)
+    db = get_db()
+
+    # Large batches: parse in worker processes, write from this thread
+    workers = _resolve_index_workers(max_workers)
+    if workers > 1 and len(files_to_index) >= PROCESS_POOL_THRESHOLD:
+        count = _index_notes_parallel(
+            files_to_index, notes_root, index_vectors, workers, on_progress, job=job
+        )
+        resolve_pending_links(db)
         return count
 
-    # Parallel processing for larger batches without vector indexing
+    # Small batches aren't worth the process startup cost. Embeddings are
+    # still batched, and run while the next files are parsed.
+    embedder = _EmbeddingStage() if index_vectors and ENABLE_VECTOR_INDEXING else None
     count = 0
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = {
-            executor.submit(
-                index_note_threadsafe, path, notes_root, index_vectors
-            ): path
-            for path in files_to_index
-        }
-        for future in as_completed(futures):
-            path = futures[future]
-            try:
-                future.result()
-                count += 1
-                if on_progress:
-                    on_progress(1)  # Advance by 1 (not cumulative count)
-            except Exception as e:
-                _logger.warning("Failed to index note %s: %s", path, e)
-
+    try:
+        with db.bulk(batch_size=WRITE_BATCH_SIZE) as bulk:
+            for path in files_to_index:
+                try:
+                    with bulk.item():
+                        _index_note_queued(path, notes_root, embedder)
+                        if job is not None:
+                            complete_job_items(job, [str(path)], db=db, commit=False)
+                    count += 1
+                    if on_progress:
+                        on_progress(1)  # Advance by 1 (not cumulative count)
+                except Exception as e:
+                    _logger.warning("Failed to index note %s: %s", path, e)
+                    if job is not None:
+                        fail_job_item(job, str(path), str(e), db=db, commit=False)
+    finally:
+        if embedder is not None:
+            embedder.close()
+    resolve_pending_links(db)
     return count
 
 
+@dataclass
+class IndexResult:
+    """Outcome of index_prioritized()."""
+
+    indexed: int  # Files indexed before returning
+    pending: int = 0  # Files whose todos are left to the background thread
+    job: int | None = None  # Index job of the background work
+
+    @property
+    def partial(self) -> bool:
+        """True if some changed notes are not indexed yet."""
+        return self.pending > 0
+
+
+# Thread finishing the long tail of index_prioritized()
+_background_index: threading.Thread | None = None
+
+
+def _prioritize(plan: IndexPlan) -> tuple[list[Path], list[Path]]:
+    """Split a plan's files into those to index now and those that can wait.
+
+    The inbox and notes modified in the last PRIORITY_RECENT_SECONDS come
+    first, newest first, up to PRIORITY_FOREGROUND_LIMIT files.
+    """
+    inbox = (plan.notes_root / get_config().todo.inbox_file).resolve()
+    cutoff = time.time() - PRIORITY_RECENT_SECONDS
+
+    ranked: list[tuple[float, Path]] = []
+    later: list[Path] = []
+    for path in plan.to_index:
+        try:
+            mtime = path.stat().st_mtime
+        except OSError:
+            mtime = 0.0
+        if path.resolve() == inbox:
+            ranked.append((float("inf"), path))
+        elif mtime >= cutoff:
+            ranked.append((mtime, path))
+        else:
+            later.append(path)
+
+    ranked.sort(key=lambda item: item[0], reverse=True)
+    now = [path for _, path in ranked[:PRIORITY_FOREGROUND_LIMIT]]
+    later = [path for _, path in ranked[PRIORITY_FOREGROUND_LIMIT:]] + later
+    return now, later
+
+
+def index_prioritized(
+    plan: IndexPlan | None = None,
+    on_progress: Callable[[int], None] | None = None,
+    todos_only: bool = False,
+) -> IndexResult:
+    """Index changed notes, returning once the ones that matter most are fresh.
+
+    For commands that need an up-to-date index (todo lists, reviews) but
+    shouldn't wait for thousands of stale files after a first run, a branch
+    switch or a share sync. The inbox and recently modified notes are
+    indexed straight away (see _prioritize()); the rest are queued as an
+    index job and indexed in a background thread, without vectors. Until
+    that finishes, the result is marked partial.
+
+    With todos_only, the prioritized notes only get their todos indexed
+    (see index_todos_only()). They stay stale, so their full metadata is
+    left to the next full pass (``nb index``, the daemon, or a command
+    that indexes without todos_only); only the files past
+    PRIORITY_FOREGROUND_LIMIT go to the background job.
+
+    The thread is a daemon thread, so a CLI process exits as soon as the
+    command is done. Whatever the tail didn't get to stays queued in its
+    job: the next tail takes it over (see _tail_job()), or it can be
+    resumed with ``nb index --resume``. The files are also still stale for
+    the next plan_index().
+
+    Args:
+        plan: Result of an earlier plan_index() call.
+        on_progress: Called after each foreground file is indexed.
+        todos_only: Only index todos before returning.
+
+    Returns:
+        What was indexed now and what was left to the background.
+    """
+    global _background_index
+
+    if plan is None:
+        plan = plan_index()
+    later: list[Path] = []
+    if len(plan.to_index) <= PRIORITY_FOREGROUND_LIMIT:
+        now = plan.to_index
+    else:
+        now, later = _prioritize(plan)
+
+    if todos_only:
+        indexed = index_todos_only(now, plan.notes_root, on_progress)
+    else:
+        indexed = index_all_notes(
+            index_vectors=False,
+            plan=IndexPlan(notes_root=plan.notes_root, files=now, to_index=now),
+            on_progress=on_progress,
+        )
+    if not later:
+        return IndexResult(indexed=indexed)
+
+    if _background_index is not None and _background_index.is_alive():
+        # One tail at a time: files outside the running job's queue stay
+        # stale and are found again by the next plan_index()
+        return IndexResult(indexed=indexed, pending=len(later))
+
+    job = _tail_job(later)
+    _background_index = threading.Thread(
+        target=_run_background_index, args=(job,), name="nb-index-tail", daemon=True
+    )
+    _background_index.start()
+    return IndexResult(indexed=indexed, pending=len(later), job=job)
+
+
+def _tail_job(files: list[Path]) -> int:
+    """Get the index job queueing the files of a background tail.
+
+    A tail cut short by its process exiting leaves an unfinished files job
+    for the whole vault (as does an interrupted ``nb index``): its queue is
+    extended instead of starting another job, so unfinished tails don't
+    pile up.
+    """
+    paths = [str(path) for path in files]
+    unfinished = get_unfinished_job(JOB_FILES)
+    if unfinished is None or unfinished.notebook is not None:
+        return create_job(JOB_FILES, paths)
+    enqueue_job_items(unfinished.id, paths)
+    return unfinished.id
+
+
+def _run_background_index(job: int) -> None:
+    try:
+        run_index_job(job, index_vectors=False)
+    except Exception as e:
+        # The job stays queued for `nb index --resume`, and the files stay
+        # stale for the next plan_index()
+        _logger.warning("Background indexing failed: %s", e)
+
+
+def wait_for_background_index(timeout: float | None = None) -> bool:
+    """Wait for the background run started by index_prioritized(), if any.
+
+    Returns:
+        True if no background run is left.
+    """
+    thread = _background_index
+    if thread is not None:
+        thread.join(timeout)
+        return not thread.is_alive()
+    return True
+
+
 def index_note_threadsafe(
     path: Path,
     notes_root: Path,
@@ -668,21 +1572,168 @@ def index_note_threadsafe(
     if notes_root is None:
         notes_root = get_config().notes_root
 
-    # Extract all note data (handles path resolution, due date normalization, parsing)
-    data = _extract_note_data(path, notes_root)
-    if not data:
-        return
+    # Extract all note data (handles path resolution, due date normalization, parsing)
+    data = _extract_note_data(path, notes_root)
+    if not data:
+        return
+
+    # Persist to database using thread-local connection
+    db = _get_thread_db()
+    _persist_note_to_db(data, db)
+
+    # Index to vector search (with lock for thread safety)
+    if index_vectors:
+        _index_note_vectors(data, use_lock=True)
+
+    # Index todos and attachments (using thread-local db)
+    _index_note_todos_and_attachments(data, db=db)
+
+
+# Notes read per query when streaming notes into the search index
+SEARCH_PAGE_SIZE = 500
+
+_SEARCH_ROWS_QUERY = """
+    SELECT n.path, n.title, n.date, n.notebook, note_text(c.body) AS content,
+           n.content_hash,
+           (SELECT json_group_array(t.tag) FROM note_tags t
+            WHERE t.note_path = n.path) AS tags
+    FROM notes n
+    JOIN note_content c ON c.note_path = n.path
+    WHERE n.path > ?
+"""
+
+
+def _iter_search_rows(
+    db: Database,
+    notebook: str | None = None,
+    page_size: int | None = None,
+    stale_for: str | None = None,
+    job: int | None = None,
+) -> Iterator[list[sqlite3.Row]]:
+    """Stream notes with content (and their tags) in pages ordered by path.
+
+    Each page is its own query, continuing after the last path seen (keyset
+    pagination), so memory stays flat however large the vault is and no
+    read lock is held while a page is being embedded.
+
+    If stale_for (an embedding settings key) is given, only notes whose
+    current revision isn't recorded in vector_state for it are returned.
+    If job is given, only notes still queued for that index job are.
+    """
+    if page_size is None:
+        page_size = SEARCH_PAGE_SIZE
+    sql = _SEARCH_ROWS_QUERY
+    params: tuple[Any, ...] = ()
+    if notebook:
+        sql += " AND n.notebook = ?"
+        params = (notebook,)
+    if stale_for is not None:
+        sql += f" AND {STALE_NOTE_CONDITION}"
+        params = (*params, stale_for)
+    if job is not None:
+        sql += " AND n.path IN (SELECT path FROM index_job_items WHERE job_id = ?)"
+        params = (*params, job)
+    sql += " ORDER BY n.path LIMIT ?"
+
+    last_path = ""
+    while True:
+        rows = db.fetchall(sql, (last_path, *params, page_size))
+        if not rows:
+            return
+        yield rows
+        if len(rows) < page_size:
+            return
+        last_path = rows[-1]["path"]
+
+
+def _search_note_from_row(row: sqlite3.Row) -> Note:
+    """Build the Note that the search index needs from a _SEARCH_ROWS_QUERY row."""
+    from nb.models import Note
+
+    note_path = Path(row["path"])
+    note_date = None
+    if row["date"]:
+        try:
+            note_date = date.fromisoformat(row["date"])
+        except ValueError:
+            pass
+    return Note(
+        id=make_note_id(note_path),
+        path=note_path,
+        title=row["title"] or "",
+        date=note_date,
+        tags=[tag for tag in json.loads(row["tags"]) if tag is not None],
+        links=[],
+        attachments=[],
+        notebook=row["notebook"] or "",
+        content_hash=row["content_hash"] or "",
+    )
+
+
+def _index_for_search(
+    search: NoteSearch,
+    notes: Iterable[tuple[Note, str]],
+    on_progress: Callable[[int], None] | None,
+    batch_size: int,
+    job: int | None = None,
+) -> int:
+    """Index (note, content) pairs into the search index in batches.
+
+    Falls back to one-by-one indexing when a batch fails. If nothing could
+    be indexed, the first error is raised. If job is given, each batch's
+    notes are marked done in that index job once the batch is indexed.
+
+    Returns:
+        Number of notes indexed.
+    """
+    count = 0
+    first_error: Exception | None = None  # Track first error for reporting
+
+    def flush(batch: list[tuple[Note, str]]) -> int:
+        nonlocal first_error
+        try:
+            indexed = search.index_notes_batch(batch)
+            if job is not None:
+                complete_job_items(job, [normalize_path(note.path) for note, _ in batch])
+            return indexed
+        except Exception as e:
+            # Capture first error for reporting
+            if first_error is None:
+                first_error = e
+            # Fall back to one-by-one indexing on batch failure
+            indexed = 0
+            for note, content in batch:
+                try:
+                    search.index_note(note, content)
+                    indexed += 1
+                    if job is not None:
+                        complete_job_items(job, [normalize_path(note.path)])
+                except Exception as e2:
+                    _logger.debug("Failed to index note %s: %s", note.path, e2)
+                    if job is not None:
+                        fail_job_item(job, normalize_path(note.path), str(e2))
+            return indexed
 
-    # Persist to database using thread-local connection
-    db = _get_thread_db()
-    _persist_note_to_db(data, db)
+    batch: list[tuple[Note, str]] = []
+    for item in notes:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            count += flush(batch)
+            if on_progress:
+                on_progress(len(batch))  # Advance by batch size
+            batch = []
 
-    # Index to vector search (with lock for thread safety)
-    if index_vectors:
-        _index_note_vectors(data, use_lock=True)
+    # Flush any remaining notes
+    if batch:
+        count += flush(batch)
+        if on_progress:
+            on_progress(len(batch))  # Advance by remaining count
 
-    # Index todos and attachments (using thread-local db)
-    _index_note_todos_and_attachments(data, notes_root, db=db)
+    # If no notes were indexed but we had notes to index, raise the first error
+    if count == 0 and first_error is not None:
+        raise first_error
+
+    return count
 
 
 def rebuild_search_index(
@@ -690,10 +1741,11 @@ def rebuild_search_index(
     notebook: str | None = None,
     on_progress: Callable[[int], None] | None = None,
     batch_size: int = 25,
+    job: int | None = None,
 ) -> int:
     """Rebuild the localvectordb search index from scratch.
 
-    Reads all notes from the database and indexes them to localvectordb.
+    Streams all notes from the database and indexes them to localvectordb.
     Useful when the vector index is corrupted or needs to be regenerated.
 
     Uses batch indexing for significantly better performance - batching
@@ -702,19 +1754,16 @@ def rebuild_search_index(
     Args:
         notes_root: Override notes root directory
         notebook: If specified, only rebuild index for this notebook
-        on_progress: Optional callback called after each note is indexed.
-            The callback receives the number of notes indexed so far.
+        on_progress: Optional callback called after each batch is indexed.
+            The callback receives the number of notes in the batch.
         batch_size: Number of notes to index in each batch (default 25).
+        job: Index job from create_vectors_job(). Only the notes still
+            queued for it are indexed, and each batch is marked done.
 
     Returns:
         Number of notes indexed.
 
     """
-    from nb.models import Note
-
-    if notes_root is None:
-        notes_root = get_config().notes_root
-
     if not ENABLE_VECTOR_INDEXING:
         return 0
 
@@ -723,104 +1772,89 @@ def rebuild_search_index(
     db = get_db()
     search = get_search()
 
-    # Get notes from database (optionally filtered by notebook)
-    if notebook:
-        rows = db.fetchall(
-            "SELECT path, title, date, notebook, content FROM notes WHERE notebook = ?",
-            (notebook,),
-        )
-    else:
-        rows = db.fetchall("SELECT path, title, date, notebook, content FROM notes")
+    notes = (
+        (_search_note_from_row(row), row["content"])
+        for rows in _iter_search_rows(db, notebook, job=job)
+        for row in rows
+    )
+    return _index_for_search(search, notes, on_progress, batch_size, job)
 
-    if not rows:
-        return 0
 
-    count = 0
-    batch: list[tuple[Note, str]] = []
-    pending_progress = 0  # Track notes added to batch but not yet reported
-    first_error: Exception | None = None  # Track first error for reporting
+def create_files_job(plan: IndexPlan, notebook: str | None = None) -> int:
+    """Create an index job queueing the files a plan_index() call found.
 
-    def flush_batch() -> int:
-        """Flush the current batch to the search index."""
-        nonlocal batch, first_error
-        if not batch:
-            return 0
-        try:
-            indexed = search.index_notes_batch(batch)
-            batch = []
-            return indexed
-        except Exception as e:
-            # Capture first error for reporting
-            if first_error is None:
-                first_error = e
-            # Fall back to one-by-one indexing on batch failure
-            indexed = 0
-            for note, content in batch:
-                try:
-                    search.index_note(note, content)
-                    indexed += 1
-                except Exception as e2:
-                    _logger.debug("Failed to index note %s: %s", note.path, e2)
-            batch = []
-            return indexed
+    Args:
+        plan: The plan whose to_index files are queued.
+        notebook: Notebook the plan was limited to, if any.
 
-    for row in rows:
-        if not row["content"]:
-            continue
+    Returns:
+        The job id.
+    """
+    return create_job(JOB_FILES, [str(path) for path in plan.to_index], notebook)
 
-        # Build a simple note-like object for indexing
-        note_path = Path(row["path"])
-        note = Note(
-            id=make_note_id(note_path),
-            path=note_path,
-            title=row["title"] or "",
-            date=None,  # Will be parsed from string if needed
-            tags=[],  # We'd need to query tags separately
-            links=[],
-            attachments=[],
-            notebook=row["notebook"] or "",
-            content_hash="",
-        )
 
-        # Get tags for this note
-        tag_rows = db.fetchall(
-            "SELECT tag FROM note_tags WHERE note_path = ?",
-            (row["path"],),
-        )
-        note.tags = [r["tag"] for r in tag_rows]
+def create_vectors_job(notebook: str | None = None) -> int:
+    """Create an index job queueing every note rebuild_search_index() indexes.
 
-        # Parse date if present
-        if row["date"]:
-            from datetime import date as date_type
+    Args:
+        notebook: If specified, only notes in this notebook.
 
-            try:
-                note.date = date_type.fromisoformat(row["date"])
-            except ValueError:
-                pass
+    Returns:
+        The job id.
+    """
+    sql = "SELECT n.path FROM notes n JOIN note_content c ON c.note_path = n.path"
+    params: tuple[Any, ...] = ()
+    if notebook:
+        sql += " WHERE n.notebook = ?"
+        params = (notebook,)
+    paths = [row["path"] for row in get_db().fetchall(sql, params)]
+    return create_job(JOB_VECTORS, paths, notebook=notebook)
 
-        batch.append((note, row["content"]))
-        pending_progress += 1
 
-        # Flush batch when it reaches the batch size
-        if len(batch) >= batch_size:
-            indexed = flush_batch()
-            count += indexed
-            # Report progress for all notes in the batch
-            if on_progress:
-                on_progress(pending_progress)  # Advance by batch size
-            pending_progress = 0
+def run_index_job(
+    job_id: int,
+    on_progress: Callable[[int], None] | None = None,
+    index_vectors: bool = True,
+) -> int:
+    """Work through the queue of an index job, new or interrupted.
 
-    # Flush any remaining notes
-    if batch:
-        indexed = flush_batch()
-        count += indexed
-        if on_progress:
-            on_progress(pending_progress)  # Advance by remaining count
+    The job is marked done when its queue has been worked through, or
+    interrupted if that fails (including Ctrl-C), so that it can be resumed.
 
-    # If no notes were indexed but we had notes to index, raise the first error
-    if count == 0 and first_error is not None:
-        raise first_error
+    Args:
+        job_id: A JOB_FILES or JOB_VECTORS job.
+        on_progress: Passed to index_all_notes() or rebuild_search_index().
+        index_vectors: Whether a JOB_FILES job also embeds its notes.
 
+    Returns:
+        Number of items processed.
+    """
+    job = get_job(job_id)
+    if job is None:
+        raise ValueError(f"Index job {job_id} not found")
+    restart_job(job.id)
+    try:
+        if job.kind == JOB_FILES:
+            files = [Path(path) for path in get_job_items(job.id)]
+            plan = IndexPlan(
+                notes_root=get_config().notes_root, files=files, to_index=files
+            )
+            count = index_all_notes(
+                index_vectors=index_vectors,
+                plan=plan,
+                on_progress=on_progress,
+                job=job.id,
+            )
+        elif job.kind == JOB_VECTORS:
+            count = rebuild_search_index(
+                notebook=job.notebook, on_progress=on_progress, job=job.id
+            )
+        else:
+            raise ValueError(f"Cannot run {job.kind} index job")
+    except BaseException:
+        finish_job(job.id, interrupted=True)
+        raise
+    finish_job(job.id)
     return count
 
 
@@ -839,13 +1873,13 @@ def count_notes_for_search_rebuild(notebook: str | None = None) -> int:
     db = get_db()
     if notebook:
         row = db.fetchone(
-            "SELECT COUNT(*) as cnt FROM notes WHERE notebook = ? AND content IS NOT NULL AND content != ''",
+            """SELECT COUNT(*) as cnt FROM notes n
+               JOIN note_content c ON c.note_path = n.path
+               WHERE n.notebook = ?""",
             (notebook,),
         )
     else:
-        row = db.fetchone(
-            "SELECT COUNT(*) as cnt FROM notes WHERE content IS NOT NULL AND content != ''"
-        )
+        row = db.fetchone("SELECT COUNT(*) as cnt FROM note_content")
     return row["cnt"] if row else 0
 
 
@@ -857,20 +1891,20 @@ def sync_search_index(
     """Sync notes from SQLite to VectorDB that are missing from VectorDB.
 
     This is more efficient than a full rebuild when only some notes are missing.
+    Notes are streamed a page at a time, and each page is checked against
+    VectorDB by id, so every note is compared however large the vault is.
     Uses batch indexing for better performance.
 
     Args:
         notebook: If specified, only sync notes from this notebook
         on_progress: Optional callback called after each batch is synced.
-            The callback receives the number of notes synced so far.
+            The callback receives the number of notes in the batch.
         batch_size: Number of notes to index in each batch (default 25).
 
     Returns:
         Number of notes synced.
 
     """
-    from nb.models import Note
-
     if not ENABLE_VECTOR_INDEXING:
         return 0
 
@@ -879,121 +1913,163 @@ def sync_search_index(
     db = get_db()
     search = get_search()
 
-    # Get all note paths from SQLite (optionally filtered by notebook)
+    def missing_notes() -> Iterator[tuple[Note, str]]:
+        for rows in _iter_search_rows(db, notebook):
+            try:
+                present = search.db.exists([row["path"] for row in rows])
+            except Exception as e:
+                # If VectorDB query fails, treat as empty
+                _logger.debug("VectorDB query failed, treating as empty: %s", e)
+                present = [False] * len(rows)
+            for row, found in zip(rows, present, strict=True):
+                if not found:
+                    yield _search_note_from_row(row), row["content"]
+
+    return _index_for_search(search, missing_notes(), on_progress, batch_size)
+
+
+def count_notes_to_embed(notebook: str | None = None) -> int:
+    """Count notes whose current revision is not in the vector index.
+
+    Args:
+        notebook: If specified, only count notes in this notebook.
+
+    Returns:
+        Number of notes embed_changed_notes() would index.
+    """
+    if not ENABLE_VECTOR_INDEXING:
+        return 0
+
+    from nb.index.embedding_cache import embedding_settings_key
+
+    sql = (
+        "SELECT COUNT(*) as cnt FROM notes n"
+        " JOIN note_content c ON c.note_path = n.path"
+        f" WHERE {STALE_NOTE_CONDITION}"
+    )
+    params: tuple[Any, ...] = (embedding_settings_key(get_config().embeddings),)
     if notebook:
-        sqlite_rows = db.fetchall(
-            "SELECT path, title, date, notebook, content FROM notes WHERE notebook = ?",
-            (notebook,),
-        )
-    else:
-        sqlite_rows = db.fetchall(
-            "SELECT path, title, date, notebook, content FROM notes"
-        )
+        sql += " AND n.notebook = ?"
+        params = (*params, notebook)
+    row = get_db().fetchone(sql, params)
+    return row["cnt"] if row else 0
+
+
+def embed_changed_notes(
+    notebook: str | None = None,
+    on_progress: Callable[[int], None] | None = None,
+    batch_size: int = 25,
+) -> int:
+    """Index notes that are new or changed since they were last embedded.
+
+    The notes to embed are found by comparing each note's content_hash with
+    the vector_state table in SQL, so unchanged notes cost nothing and
+    VectorDB is not queried for them. Changing the embedding provider,
+    model or chunking makes every note stale.
+
+    Args:
+        notebook: If specified, only embed notes from this notebook
+        on_progress: Optional callback called after each batch is indexed.
+            The callback receives the number of notes in the batch.
+        batch_size: Number of notes to index in each batch (default 25).
 
-    if not sqlite_rows:
+    Returns:
+        Number of notes indexed.
+    """
+    if not ENABLE_VECTOR_INDEXING:
         return 0
 
-    # Get all note paths from VectorDB
-    try:
-        vector_filter = {"notebook": notebook} if notebook else {}
-        vector_docs = search.db.filter(where=vector_filter, limit=10000)
-        vector_paths = {d.metadata.get("path") for d in vector_docs}
-    except Exception as e:
-        # If VectorDB query fails, treat as empty
-        _logger.debug("VectorDB query failed, treating as empty: %s", e)
-        vector_paths = set()
+    from nb.index.embedding_cache import embedding_settings_key
+    from nb.index.search import get_search
 
-    count = 0
-    batch: list[tuple[Note, str]] = []
-    pending_progress = 0  # Track notes added to batch but not yet reported
-    first_error: Exception | None = None  # Track first error for reporting
+    db = get_db()
+    search = get_search()
+    model = embedding_settings_key(get_config().embeddings)
 
-    def flush_batch() -> int:
-        """Flush the current batch to the search index."""
-        nonlocal batch, first_error
-        if not batch:
-            return 0
-        try:
-            indexed = search.index_notes_batch(batch)
-            batch = []
-            return indexed
-        except Exception as e:
-            # Capture first error for reporting
-            if first_error is None:
-                first_error = e
-            # Fall back to one-by-one indexing on batch failure
-            indexed = 0
-            for note, content in batch:
-                try:
-                    search.index_note(note, content)
-                    indexed += 1
-                except Exception as e2:
-                    _logger.debug("Failed to index note %s: %s", note.path, e2)
-            batch = []
-            return indexed
+    notes = (
+        (_search_note_from_row(row), row["content"])
+        for rows in _iter_search_rows(db, notebook, stale_for=model)
+        for row in rows
+    )
+    return _index_for_search(search, notes, on_progress, batch_size)
 
-    # Find notes in SQLite but not in VectorDB
-    for row in sqlite_rows:
-        if row["path"] in vector_paths:
-            continue
 
-        if not row["content"]:
-            continue
+@dataclass
+class VectorCheck:
+    """Drift between vector_state and the vector index found by verify_search_index()."""
 
-        # Build note object
-        note_path = Path(row["path"])
-        note = Note(
-            id=make_note_id(note_path),
-            path=note_path,
-            title=row["title"] or "",
-            date=None,
-            tags=[],
-            links=[],
-            attachments=[],
-            notebook=row["notebook"] or "",
-            content_hash="",
-        )
+    orphaned: int = 0  # Embedded notes no longer in the notes table (deleted)
+    missing: int = 0  # Notes recorded as embedded but absent from VectorDB
+    mismatched: int = 0  # Stored chunk count differs from the recorded one (deleted)
+    embedded: int = 0  # Notes (re-)embedded afterwards
 
-        # Get tags
-        tag_rows = db.fetchall(
-            "SELECT tag FROM note_tags WHERE note_path = ?",
-            (row["path"],),
-        )
-        note.tags = [r["tag"] for r in tag_rows]
+    @property
+    def repaired(self) -> int:
+        return self.orphaned + self.missing + self.mismatched
 
-        # Parse date
-        if row["date"]:
-            from datetime import date as date_type
 
-            try:
-                note.date = date_type.fromisoformat(row["date"])
-            except ValueError:
-                pass
+def verify_search_index(
+    notebook: str | None = None,
+    on_progress: Callable[[int], None] | None = None,
+    batch_size: int = 25,
+) -> VectorCheck:
+    """Check vector_state against the vector index and repair any drift.
 
-        batch.append((note, row["content"]))
-        pending_progress += 1
+    Orphaned documents are removed from the vector index, notes whose
+    vectors are missing or incomplete lose their vector_state row (and
+    their partial vectors), and embed_changed_notes() then re-embeds them.
 
-        # Flush batch when it reaches the batch size
-        if len(batch) >= batch_size:
-            indexed = flush_batch()
-            count += indexed
-            # Report progress for all notes in the batch
-            if on_progress:
-                on_progress(pending_progress)  # Advance by batch size
-            pending_progress = 0
+    Args:
+        notebook: If specified, only check notes in this notebook.
+        on_progress: Passed to embed_changed_notes().
+        batch_size: Passed to embed_changed_notes().
 
-    # Flush any remaining notes
-    if batch:
-        indexed = flush_batch()
-        count += indexed
-        if on_progress:
-            on_progress(pending_progress)  # Advance by remaining count
+    Returns:
+        What was found and repaired.
+    """
+    check = VectorCheck()
+    if not ENABLE_VECTOR_INDEXING:
+        return check
 
-    # If no notes were synced but we had notes to sync, raise the first error
-    if count == 0 and first_error is not None:
-        raise first_error
+    from nb.index.search import get_search
+    from nb.index.vector_state_repo import forget_embedded, get_vector_state
 
-    return count
+    db = get_db()
+    search = get_search()
+    state = get_vector_state(notebook)
+
+    if not notebook:
+        known = {row["path"] for row in db.fetchall("SELECT path FROM notes")}
+        orphans = [path for path in state if path not in known]
+        if orphans:
+            with _vector_lock:
+                search.delete_notes(orphans)
+            check.orphaned = len(orphans)
+            for path in orphans:
+                del state[path]
+
+    missing: list[str] = []
+    mismatched: list[str] = []
+    paths = list(state)
+    for start in range(0, len(paths), SEARCH_PAGE_SIZE):
+        page = paths[start : start + SEARCH_PAGE_SIZE]
+        stored = search.stored_chunk_counts(page)
+        for path in page:
+            recorded = state[path][2]
+            if path not in stored:
+                missing.append(path)
+            elif recorded is not None and stored[path] != recorded:
+                mismatched.append(path)
+
+    forget_embedded(missing)
+    if mismatched:
+        with _vector_lock:
+            search.delete_notes(mismatched)
+    check.missing = len(missing)
+    check.mismatched = len(mismatched)
+
+    check.embedded = embed_changed_notes(notebook, on_progress, batch_size)
+    return check
 
 
 def index_todos_from_file(path: Path, notes_root: Path | None = None) -> int:
@@ -1026,7 +2102,11 @@ def index_todos_from_file(path: Path, notes_root: Path | None = None) -> int:
 
     # Extract and index new todos (batch for performance)
     todos = extract_todos(path, source_type=source_type, notes_root=notes_root)
-    upsert_todos_batch(todos, preserved_dates=preserved_dates)
+    upsert_todos_batch(
+        todos,
+        preserved_dates=preserved_dates,
+        note_path=_manifest_key(path, notes_root),
+    )
 
     return len(todos)
 
@@ -1041,31 +2121,33 @@ def scan_linked_files() -> int:
     linked_files = list_linked_files()
     total_todos = 0
 
-    for linked in linked_files:
-        if not linked.path.exists():
-            continue
+    with get_db().bulk() as bulk:
+        for linked in linked_files:
+            if not linked.path.exists():
+                continue
 
-        # Preserve dates before deleting
-        preserved_dates = get_todo_dates_for_source(linked.path)
+            with bulk.item():
+                # Preserve dates before deleting
+                preserved_dates = get_todo_dates_for_source(linked.path)
 
-        # Delete existing todos for this linked file
-        delete_todos_for_source(linked.path)
+                # Delete existing todos for this linked file
+                delete_todos_for_source(linked.path)
 
-        # Normalize relative due dates if sync is enabled
-        if linked.sync:
-            normalize_due_dates_in_file(linked.path)
+                # Normalize relative due dates if sync is enabled
+                if linked.sync:
+                    normalize_due_dates_in_file(linked.path)
 
-        # Extract and index todos (batch for performance)
-        todos = extract_todos(
-            linked.path,
-            source_type="linked",
-            notes_root=get_config().notes_root,
-            external=True,
-            alias=linked.alias,
-        )
+                # Extract and index todos (batch for performance)
+                todos = extract_todos(
+                    linked.path,
+                    source_type="linked",
+                    notes_root=get_config().notes_root,
+                    external=True,
+                    alias=linked.alias,
+                )
 
-        upsert_todos_batch(todos, preserved_dates=preserved_dates)
-        total_todos += len(todos)
+                upsert_todos_batch(todos, preserved_dates=preserved_dates)
+            total_todos += len(todos)
 
     return total_todos
 
@@ -1105,16 +2187,23 @@ def index_linked_file(path: Path, alias: str | None = None) -> int:
 
 
 def remove_deleted_notes(
-    notes_root: Path | None = None, notebook: str | None = None
+    notes_root: Path | None = None,
+    notebook: str | None = None,
+    plan: IndexPlan | None = None,
 ) -> int:
     """Remove notes from the database that no longer exist on disk.
 
-    Also removes associated todos and entries from the localvectordb search index.
+    Deleted notes are found as the set difference between the indexed paths
+    and the paths found by walking the vault, rather than by checking each
+    indexed path on disk. Pass the plan from plan_index() to reuse its walk.
+    Also removes associated todos and entries from the localvectordb search
+    index (see remove_notes_from_index()).
 
     Args:
         notes_root: Root path for notes. Defaults to config.notes_root.
         notebook: Optional notebook name to limit cleanup to. If provided, only
             notes within that notebook's directory are checked.
+        plan: Result of plan_index() for the same notes root.
 
     Returns the number of notes removed.
     """
@@ -1131,62 +2220,88 @@ def remove_deleted_notes(
             if notebook_config.path:
                 # External notebook - external=1 in db, path is absolute
                 rows = db.fetchall(
-                    "SELECT path, external FROM notes WHERE external = 1 AND source_alias = ?",
+                    "SELECT path FROM notes WHERE external = 1 AND source_alias = ?",
                     (notebook,),
                 )
-                # For external notebooks, path is absolute
-                check_root = Path()  # Use path as-is
             else:
                 # Internal notebook - filter by path prefix
                 notebook_prefix = f"{notebook}/"
                 rows = db.fetchall(
-                    "SELECT path, external FROM notes WHERE (external IS NULL OR external = 0) "
+                    "SELECT path FROM notes WHERE (external IS NULL OR external = 0) "
                     "AND (path LIKE ? OR path LIKE ?)",
                     (f"{notebook_prefix}%", f"{notebook}\\%"),
                 )
-                check_root = notes_root
         else:
             # Invalid notebook name, nothing to remove
             return 0
     else:
         # Only check internal notes (external=0 or NULL)
         rows = db.fetchall(
-            "SELECT path, external FROM notes WHERE external IS NULL OR external = 0"
+            "SELECT path FROM notes WHERE external IS NULL OR external = 0"
         )
-        check_root = notes_root
 
-    removed = 0
-    removed_paths = []
+    if plan is not None:
+        scanned = plan.scanned
+    else:
+        scanned = [
+            path
+            for path, _ in _scan_note_entries(
+                notes_root, db=db, trust_manifest=not config.index.paranoid
+            )
+        ]
+        db.commit()
 
-    for row in rows:
-        if notebook and notebook_config and notebook_config.path:
-            # External notebook: path is absolute
-            full_path = Path(row["path"])
-        else:
-            full_path = check_root / row["path"]
+    on_disk = {_manifest_key(path, notes_root) for path in scanned}
+    deleted = [
+        Path(row["path"]) for row in rows if normalize_path(row["path"]) not in on_disk
+    ]
+    return remove_notes_from_index(deleted, notes_root)
 
-        if not full_path.exists():
-            # Delete todos for this note first
-            delete_todos_for_source(full_path)
-            # Then delete the note
-            db.execute("DELETE FROM notes WHERE path = ?", (row["path"],))
-            removed_paths.append(row["path"])
-            removed += 1
 
-    if removed:
-        db.commit()
+def remove_notes_from_index(paths: list[Path], notes_root: Path | None = None) -> int:
+    """Remove notes, their todos and their vectors from the index.
 
-        # Remove from localvectordb search index
-        if ENABLE_VECTOR_INDEXING:
-            try:
-                from nb.index.search import get_search
+    All database deletes are applied in one transaction, and the vector
+    deletes are sent as one batch. Used by remove_deleted_notes() and by the
+    daemon for file delete events.
 
-                search = get_search()
-                for path in removed_paths:
-                    search.delete_note(path)
-            except Exception as e:
-                # Don't fail if vector search cleanup fails
-                _logger.debug("Vector cleanup failed: %s", e)
+    Args:
+        paths: Note paths, absolute or relative to notes_root.
+        notes_root: Root path for notes. Defaults to config.notes_root.
+
+    Returns the number of notes removed.
+    """
+    if not paths:
+        return 0
+    if notes_root is None:
+        notes_root = get_config().notes_root
+
+    db = get_db()
+    keys: list[str] = []
+    removed = 0
+    with db.transaction():
+        for path in paths:
+            full_path = path if path.is_absolute() else notes_root / path
+            keys.append(_manifest_key(full_path, notes_root))
+            delete_todos_for_source(full_path, db=db, commit=False)
+        for start in range(0, len(keys), 500):
+            chunk = keys[start : start + 500]
+            cursor = db.execute(
+                f"DELETE FROM notes WHERE path IN ({','.join('?' * len(chunk))})",
+                tuple(chunk),
+            )
+            removed += cursor.rowcount
+
+    # Remove from localvectordb search index
+    if ENABLE_VECTOR_INDEXING:
+        try:
+            from nb.index.search import get_search
+
+            with _vector_lock:
+                get_search().delete_notes(keys)
+        except Exception as e:
+            # Don't fail if vector search cleanup fails
+            _logger.debug("Vector cleanup failed: %s", e)
 
     return removed
 
@@ -1284,12 +2399,19 @@ def index_linked_note(
     note_path = normalize_path(path)
     note_id = make_note_id(path)
 
-    # Upsert note with external flag and todo_exclude
+    # Upsert note with external flag and todo_exclude (in place, like
+    # _persist_note_to_db())
     db.execute(
         """
-        INSERT OR REPLACE INTO notes
-        (id, path, title, date, notebook, content_hash, content, mtime, external, source_alias, todo_exclude, updated_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        INSERT INTO notes
+        (id, path, title, date, notebook, content_hash, mtime, external, source_alias, todo_exclude, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(path) DO UPDATE SET
+            id = excluded.id, title = excluded.title, date = excluded.date,
+            notebook = excluded.notebook, content_hash = excluded.content_hash,
+            mtime = excluded.mtime, external = excluded.external,
+            source_alias = excluded.source_alias,
+            todo_exclude = excluded.todo_exclude, updated_at = excluded.updated_at
         """,
         (
             note_id,
@@ -1298,7 +2420,6 @@ def index_linked_note(
             note.date.isoformat() if note.date else None,
             notebook,
             note.content_hash,
-            content,
             mtime,
             1,  # external = True
             alias,
@@ -1306,6 +2427,7 @@ def index_linked_note(
             datetime.now().isoformat(),
         ),
     )
+    set_note_content(note_path, content, db=db)
 
     # Update tags
     db.execute("DELETE FROM note_tags WHERE note_path = ?", (note_path,))
@@ -1369,7 +2491,7 @@ def index_linked_note(
         notebook=notebook,
         sections_override=[section] if section else None,
     )
-    upsert_todos_batch(todos, preserved_dates=preserved_dates)
+    upsert_todos_batch(todos, preserved_dates=preserved_dates, note_path=note_path)
 
 
 def scan_linked_notes(
@@ -1389,33 +2511,37 @@ def scan_linked_notes(
 
     linked_notes = list_linked_notes()
     total_notes = 0
+    db = get_db()
 
-    for linked in linked_notes:
-        if not linked.path.exists():
-            continue
-
-        notebook = linked.notebook
+    with db.bulk(batch_size=WRITE_BATCH_SIZE) as bulk:
+        for linked in linked_notes:
+            if not linked.path.exists():
+                continue
 
-        # Filter by notebook if specified
-        if notebook_filter and notebook != notebook_filter:
-            continue
+            notebook = linked.notebook
 
-        # Get all files from this linked source
-        files = scan_linked_note_files(linked)
+            # Filter by notebook if specified
+            if notebook_filter and notebook != notebook_filter:
+                continue
 
-        for file_path in files:
-            index_linked_note(
-                file_path,
-                notebook=notebook,
-                alias=linked.alias,
-                todo_exclude=linked.todo_exclude,
-                sync=linked.sync,
-                section=linked.section,
-            )
-            total_notes += 1
-            if on_progress:
-                on_progress(1)  # Advance by 1 (not cumulative count)
+            # Get all files from this linked source
+            files = scan_linked_note_files(linked)
+
+            for file_path in files:
+                with bulk.item():
+                    index_linked_note(
+                        file_path,
+                        notebook=notebook,
+                        alias=linked.alias,
+                        todo_exclude=linked.todo_exclude,
+                        sync=linked.sync,
+                        section=linked.section,
+                    )
+                total_notes += 1
+                if on_progress:
+                    on_progress(1)  # Advance by 1 (not cumulative count)
 
+    resolve_pending_links(db)
     return total_notes
 
 
@@ -1465,17 +2591,21 @@ def index_single_linked_note(alias: str) -> int:
 
     files = scan_linked_note_files(linked)
     notebook = linked.notebook
+    db = get_db()
 
-    for file_path in files:
-        index_linked_note(
-            file_path,
-            notebook=notebook,
-            alias=linked.alias,
-            todo_exclude=linked.todo_exclude,
-            sync=linked.sync,
-            section=linked.section,
-        )
+    with db.bulk(batch_size=WRITE_BATCH_SIZE) as bulk:
+        for file_path in files:
+            with bulk.item():
+                index_linked_note(
+                    file_path,
+                    notebook=notebook,
+                    alias=linked.alias,
+                    todo_exclude=linked.todo_exclude,
+                    sync=linked.sync,
+                    section=linked.section,
+                )
 
+    resolve_pending_links(db)
     return len(files)
 
 
@@ -2,8 +2,10 @@
 
 from __future__ import annotations
 
+import hashlib
 import logging
 import re
+import sqlite3
 from dataclasses import dataclass
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
@@ -11,6 +13,13 @@ from typing import TYPE_CHECKING, Any
 from localvectordb import VectorDB
 from localvectordb.core import MetadataField, MetadataFieldType
 
+from nb.index.embedding_cache import (
+    EmbeddingCache,
+    attach_cache,
+    embedding_settings_key,
+)
+from nb.index.vector_state_repo import forget_embedded, record_embedded
+
 if TYPE_CHECKING:
     from nb.config import Config
     from nb.models import Note
@@ -20,6 +29,9 @@ _logger = logging.getLogger(__name__)
 
 SNIPPET_SEPARATOR = "  …  "
 
+# Characters in a keyword search snippet
+KEYWORD_SNIPPET_CHARS = 200
+
 
 @dataclass
 class SearchResult:
@@ -108,6 +120,43 @@ def _embeddable_text(note: Note, content: str) -> str:
     return note.title or note.path.name
 
 
+def _note_metadata(note: Note) -> dict[str, Any]:
+    """Build the VectorDB metadata for a note."""
+    return {
+        "path": str(note.path),
+        "title": note.title,
+        "notebook": note.notebook,
+        "date": note.date.isoformat() if note.date else None,
+        "tags": note.tags,
+    }
+
+
+def _content_hash(text: str) -> str:
+    """Hash document text the way VectorDB does (Document.content_hash)."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _metadata_changed(stored: dict[str, Any], metadata: dict[str, Any]) -> bool:
+    """Check whether note metadata differs from what VectorDB has stored."""
+    for key, value in metadata.items():
+        old = stored.get(key)
+        if old is not None and hasattr(old, "isoformat"):
+            old = old.isoformat()
+        if old != value:
+            return True
+    return False
+
+
+@dataclass
+class ChunkStats:
+    """Running counts of chunk-level work done by NoteSearch upserts."""
+
+    embedded: int = 0  # New or edited chunks sent for embedding
+    reused: int = 0  # Unchanged chunks whose vectors were kept
+    removed: int = 0  # Stored chunks dropped because they left the note
+    unchanged_notes: int = 0  # Notes skipped because their text was unchanged
+
+
 class NoteSearch:
     """Unified search interface using localvectordb.
 
@@ -124,10 +173,26 @@ class NoteSearch:
         """
         self.config = config
         self._db: Any = None
+        self._cache: EmbeddingCache | None = None
+        self.chunk_stats = ChunkStats()
+        # (path, content_hash, chunk_count) rows not yet written to vector_state
+        self._pending_state: list[tuple[str, str, int | None]] = []
 
     def __del__(self):
         if self._db is not None:
             self._db.close()
+        if self._cache is not None:
+            self._cache.close()
+
+    @property
+    def embedding_cache(self) -> EmbeddingCache | None:
+        """The on-disk embedding cache, or None if disabled (cache_size_mb = 0)."""
+        if self._cache is None and self.config.embeddings.cache_size_mb > 0:
+            self._cache = EmbeddingCache(
+                self.config.embedding_cache_path,
+                max_bytes=self.config.embeddings.cache_size_mb * 1024 * 1024,
+            )
+        return self._cache
 
     @property
     def db(self) -> Any:
@@ -150,37 +215,38 @@ class NoteSearch:
                 chunking_method=self.config.embeddings.chunking_method,
                 chunk_size=self.config.embeddings.chunk_size,
             )
+            # Serve already-computed embeddings from disk instead of the API
+            cache = self.embedding_cache
+            if cache is not None:
+                attach_cache(self._db.embedding_provider, cache, self.config.embeddings)
         return self._db
 
-    def index_note(self, note: Note, content: str) -> None:
+    def index_note(self, note: Note, content: str, defer_state: bool = False) -> None:
         """Add or update a note in the search index.
 
+        Only what changed is re-embedded (see _upsert_changed()), so appending
+        to a long note costs an embedding for the new chunk rather than the
+        whole note.
+
         Args:
             note: The note to index.
             content: The full text content of the note.
+            defer_state: Hold the note's vector_state row until flush_state()
+                instead of writing it now.
 
         """
         # Strip images (especially base64) to avoid exceeding embedding token limits;
         # falls back to title/filename if the note is empty after stripping.
         clean_content = _embeddable_text(note, content)
-
-        self.db.upsert(
-            documents=[clean_content],
-            metadata=[
-                {
-                    "path": str(note.path),
-                    "title": note.title,
-                    "notebook": note.notebook,
-                    "date": note.date.isoformat() if note.date else None,
-                    "tags": note.tags,
-                }
-            ],
-            ids=[str(note.path)],
+        chunk_counts = self._upsert_changed(
+            [(str(note.path), clean_content, _note_metadata(note))]
         )
+        self._record_state([note], chunk_counts, defer_state)
 
     def index_notes_batch(
         self,
         notes: list[tuple[Note, str]],
+        defer_state: bool = False,
     ) -> int:
         """Add or update multiple notes in the search index in a single batch.
 
@@ -189,6 +255,8 @@ class NoteSearch:
 
         Args:
             notes: List of (note, content) tuples to index.
+            defer_state: Hold the notes' vector_state rows until
+                flush_state() instead of writing them now.
 
         Returns:
             Number of notes successfully indexed.
@@ -197,36 +265,152 @@ class NoteSearch:
             return 0
 
         documents = []
-        metadata_list = []
-        ids = []
-
+        indexed = []
         for note, content in notes:
             if not content:
                 continue
             # Strip images (especially base64) to avoid exceeding embedding token limits;
             # falls back to title/filename if the note is empty after stripping.
             clean_content = _embeddable_text(note, content)
-            documents.append(clean_content)
-            metadata_list.append(
-                {
-                    "path": str(note.path),
-                    "title": note.title,
-                    "notebook": note.notebook,
-                    "date": note.date.isoformat() if note.date else None,
-                    "tags": note.tags,
-                }
-            )
-            ids.append(str(note.path))
+            documents.append((str(note.path), clean_content, _note_metadata(note)))
+            indexed.append(note)
 
         if not documents:
             return 0
 
+        chunk_counts = self._upsert_changed(documents)
+        self._record_state(indexed, chunk_counts, defer_state)
+        return len(documents)
+
+    def _record_state(
+        self, notes: list[Note], chunk_counts: dict[str, int], defer: bool
+    ) -> None:
+        """Queue vector_state rows for indexed notes, and write them unless deferred.
+
+        Notes without a content_hash can't be compared against the notes
+        table, so they get no row and are simply checked again next time.
+        """
+        self._pending_state.extend(
+            (str(note.path), note.content_hash, chunk_counts.get(str(note.path)))
+            for note in notes
+            if note.content_hash
+        )
+        if not defer:
+            self.flush_state()
+
+    def flush_state(self) -> None:
+        """Write pending vector_state rows to the database.
+
+        The index writer holds the database lock while it waits on the
+        embedding thread's queue, so that thread defers its rows and the
+        writer flushes them once its bulk session has ended. A failed write
+        only costs a re-check of those notes on the next sync.
+        """
+        pending, self._pending_state = self._pending_state, []
+        if not pending:
+            return
+        try:
+            record_embedded(pending, embedding_settings_key(self.config.embeddings))
+        except sqlite3.Error as e:
+            _logger.debug("Failed to record vector state for %d notes: %s", len(pending), e)
+
+    def _upsert_changed(
+        self, documents: list[tuple[str, str, dict[str, Any]]]
+    ) -> dict[str, int]:
+        """Upsert (id, text, metadata) documents, re-embedding only what changed.
+
+        localvectordb stores a content hash for every chunk and, on upsert,
+        keeps the vector of each chunk whose hash is unchanged at the same
+        position, embedding only new or edited chunks and dropping removed
+        ones. Chunking is greedy from the start of the note, so an append
+        only re-embeds the tail. Documents whose text
+        is unchanged skip the upsert entirely: their metadata is updated in
+        place if it differs (re-embedding the title only if it changed).
+        Chunk counts are accumulated in ``chunk_stats``.
+
+        Returns:
+            Number of stored chunks for each upserted document (documents
+            skipped as unchanged are not included).
+        """
+        stored = self._stored_documents([doc_id for doc_id, _, _ in documents])
+
+        changed = []
+        for doc_id, text, metadata in documents:
+            doc = stored.get(doc_id)
+            if doc is not None and doc.content_hash == _content_hash(text):
+                if _metadata_changed(doc.metadata, metadata):
+                    self.db.update(doc_id, metadata=metadata)
+                self.chunk_stats.unchanged_notes += 1
+            else:
+                changed.append((doc_id, text, metadata))
+
+        if not changed:
+            return {}
+
+        before = {
+            doc_id: self._chunk_vector_ids(doc_id)
+            for doc_id, _, _ in changed
+            if doc_id in stored
+        }
         self.db.upsert(
-            documents=documents,
-            metadata=metadata_list,
-            ids=ids,
+            documents=[text for _, text, _ in changed],
+            metadata=[metadata for _, _, metadata in changed],
+            ids=[doc_id for doc_id, _, _ in changed],
         )
-        return len(documents)
+
+        stats = self.chunk_stats
+        chunk_counts = {}
+        for doc_id, _, _ in changed:
+            old = before.get(doc_id, set())
+            new = self._chunk_vector_ids(doc_id)
+            chunk_counts[doc_id] = len(new)
+            stats.reused += len(new & old)
+            stats.embedded += len(new - old)
+            stats.removed += len(old - new)
+        _logger.debug(
+            "Vector index: %d notes upserted (chunks: %d embedded, %d reused, %d removed)",
+            len(changed),
+            stats.embedded,
+            stats.reused,
+            stats.removed,
+        )
+        return chunk_counts
+
+    def _stored_documents(self, ids: list[str]) -> dict[str, Any]:
+        """Get the stored VectorDB documents for the ids that exist."""
+        if not ids:
+            return {}
+        present = [
+            doc_id
+            for doc_id, found in zip(ids, self.db.exists(ids), strict=True)
+            if found
+        ]
+        if not present:
+            return {}
+        return {doc.id: doc for doc in self.db.get(present)}
+
+    def stored_chunk_counts(self, ids: list[str]) -> dict[str, int]:
+        """Get the number of chunks with a vector for each stored document.
+
+        Used to check vector_state against the index: ids missing from the
+        result are not in the index at all, and a chunk whose vector was
+        lost doesn't count.
+        """
+        if not ids:
+            return {}
+        return {
+            doc_id: len(self._chunk_vector_ids(doc_id))
+            for doc_id, found in zip(ids, self.db.exists(ids), strict=True)
+            if found
+        }
+
+    def _chunk_vector_ids(self, doc_id: str) -> set[int]:
+        """Get the vector ids of a document's stored chunks."""
+        return {
+            chunk.faiss_id
+            for chunk in self.db.get_chunks(doc_id)
+            if chunk.faiss_id is not None
+        }
 
     def delete_note(self, path: str) -> None:
         """Remove a note from the search index.
@@ -235,11 +419,28 @@ class NoteSearch:
             path: The path of the note to remove.
 
         """
+        self.delete_notes([path])
+
+    def delete_notes(self, paths: list[str]) -> None:
+        """Remove several notes from the search index in one call.
+
+        Args:
+            paths: The paths of the notes to remove.
+
+        """
+        if not paths:
+            return
         try:
-            self.db.delete([path])
+            self.db.delete(paths)
         except Exception as e:
-            # Ignore errors if note doesn't exist in index
-            _logger.debug("Failed to delete note %s from vector index: %s", path, e)
+            # Ignore errors if notes don't exist in index
+            _logger.debug(
+                "Failed to delete %d notes from vector index: %s", len(paths), e
+            )
+        try:
+            forget_embedded(list(paths))
+        except sqlite3.Error as e:
+            _logger.debug("Failed to forget vector state: %s", e)
 
     def search(
         self,
@@ -475,33 +676,9 @@ class NoteSearch:
             Results re-sorted with recency boost applied.
 
         """
-        from datetime import date as date_type
-
-        today = date_type.today()
-        decay_days = self.config.search.recency_decay_days
-
-        for r in results:
-            if r.date:
-                try:
-                    # Parse date and calculate age in days
-                    note_date = date_type.fromisoformat(r.date)
-                    age_days = (today - note_date).days
-
-                    # Exponential decay with configurable half-life
-                    # recency_factor is 1.0 for today, ~0.5 for decay_days ago, etc.
-                    recency_factor = 2 ** (-age_days / decay_days)
-
-                    # Combine relevance score with recency
-                    # Final score = (1-weight)*relevance + weight*recency
-                    r.score = (
-                        1 - boost_weight
-                    ) * r.score + boost_weight * recency_factor
-                except (ValueError, TypeError):
-                    pass  # Keep original score if date parsing fails
-
-        # Re-sort by new score
-        results.sort(key=lambda x: x.score, reverse=True)
-        return results
+        return _apply_recency_boost(
+            results, boost_weight, self.config.search.recency_decay_days
+        )
 
     def search_by_tag(self, tag: str, k: int = 20) -> list[SearchResult]:
         """Find notes with a specific tag.
@@ -543,6 +720,99 @@ class NoteSearch:
             self._db = None
 
 
+def _required_literals(pattern: str) -> list[str]:
+    """Get literal substrings that every match of a regex must contain.
+
+    Conservative: only literal runs outside groups, classes and optional
+    quantifiers count, and a top-level alternation gives nothing. Missing
+    a literal only makes the grep prefilter less selective.
+    """
+    literals: list[str] = []
+    run: list[str] = []
+
+    def end_run() -> None:
+        if run:
+            literals.append("".join(run))
+            run.clear()
+
+    depth = 0
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        i += 1
+        if c == "\\":
+            escaped = pattern[i : i + 1]
+            i += 1
+            if depth == 0 and escaped and not escaped.isalnum():
+                run.append(escaped)
+            else:
+                end_run()  # Class or special escape (\d, \b, \1, ...)
+        elif c == "[":
+            # Skip the character class ("]" first, or escaped, is literal)
+            if pattern[i : i + 1] == "^":
+                i += 1
+            if pattern[i : i + 1] == "]":
+                i += 1
+            while i < len(pattern) and pattern[i] != "]":
+                i += 2 if pattern[i] == "\\" else 1
+            i += 1
+            end_run()
+        elif c in "*?{":
+            # The preceding character may be absent
+            if depth == 0 and run:
+                run.pop()
+            end_run()
+            if c == "{":
+                close = pattern.find("}", i)
+                if close < 0:
+                    break
+                i = close + 1
+        elif c == "(":
+            depth += 1
+            end_run()
+        elif c == ")":
+            depth -= 1
+            end_run()
+        elif c == "|":
+            if depth == 0:
+                return []
+        elif c in "+.^$":
+            end_run()  # After "+" the preceding character is still required
+        elif depth == 0:
+            run.append(c)
+    end_run()
+    return literals
+
+
+def _prefilter_grep_files(
+    regex: re.Pattern[str], files: list[Path], notes_root: Path
+) -> list[Path]:
+    """Drop files the full-text index shows can't match a grep regex.
+
+    A file is skipped only when its indexed content is current (see
+    get_unchanged_files()) and lacks one of the regex's required literals;
+    everything else is still read and matched line by line.
+    """
+    from nb.index.fts_repo import find_notes_containing
+
+    if regex.flags & re.VERBOSE:
+        return files
+    try:
+        candidates = find_notes_containing(_required_literals(regex.pattern))
+    except sqlite3.Error as e:
+        _logger.debug("Full-text prefilter unavailable: %s", e)
+        return files
+    if candidates is None:
+        return files
+
+    from nb.index.scanner import get_unchanged_files
+
+    # notes.path is relative to notes_root, or absolute for external notes
+    matching = {notes_root / path for path in candidates}
+    unchanged = get_unchanged_files(files, notes_root)
+    return [f for f in files if f not in unchanged or f in matching]
+
+
 def grep_notes(
     pattern: str,
     notes_root: Path,
@@ -556,7 +826,9 @@ def grep_notes(
     """Search notes with regex pattern matching.
 
     Unlike the localvectordb search, this performs raw regex matching
-    on the markdown files directly.
+    on the markdown files directly. Files whose indexed content is current
+    and lacks a literal the pattern requires are skipped using the
+    full-text index (notes_fts).
 
     Args:
         pattern: Regex pattern to search for.
@@ -603,23 +875,18 @@ def grep_notes(
                     # Internal notebook
                     notebook_path = notes_root / notebook
 
-        # Scan notes_root
-        for md_file in notes_root.rglob("*.md"):
-            # Skip hidden directories and .nb
-            if any(
-                part.startswith(".") for part in md_file.relative_to(notes_root).parts
-            ):
-                continue
-
-            # Apply notebook filter
-            if notebook_path:
-                if (
-                    notebook_path not in md_file.parents
-                    and md_file.parent != notebook_path
-                ):
-                    continue
+        from nb.utils.walk import get_ignore_matcher, walk_notes
 
-            files_to_search.append(md_file)
+        # Scan notes_root (only the notebook's directory when filtering)
+        if notebook_path is None or notebook_path.is_relative_to(notes_root):
+            top = notebook_path or notes_root
+            if top.is_dir():
+                files_to_search.extend(
+                    Path(entry.path)
+                    for entry in walk_notes(
+                        top, root=notes_root, ignore=get_ignore_matcher(notes_root)
+                    )
+                )
 
         # Also search external notebooks
         for nb in config.external_notebooks():
@@ -628,15 +895,10 @@ def grep_notes(
                 if notebook and nb.name != notebook:
                     continue
 
-                for md_file in nb.path.rglob("*.md"):
-                    # Skip hidden directories
-                    try:
-                        rel_parts = md_file.relative_to(nb.path).parts
-                        if any(part.startswith(".") for part in rel_parts):
-                            continue
-                    except ValueError:
-                        continue
-                    files_to_search.append(md_file)
+                files_to_search.extend(
+                    Path(entry.path)
+                    for entry in walk_notes(nb.path, ignore=get_ignore_matcher(nb.path))
+                )
 
     # Apply section filters before grepping
     if include_sections or exclude_sections:
@@ -659,6 +921,9 @@ def grep_notes(
             filtered_files.append(f)
         files_to_search = filtered_files
 
+    if not note_path:
+        files_to_search = _prefilter_grep_files(regex, files_to_search, notes_root)
+
     for md_file in files_to_search:
         # Skip hidden directories and .nb
         if any(part.startswith(".") for part in md_file.parts):
@@ -693,6 +958,119 @@ def grep_notes(
     return results
 
 
+def _apply_recency_boost(
+    results: list[SearchResult], boost_weight: float, decay_days: float
+) -> list[SearchResult]:
+    """Boost results by recency (see NoteSearch._apply_recency_boost())."""
+    from datetime import date as date_type
+
+    today = date_type.today()
+
+    for r in results:
+        if r.date:
+            try:
+                # Parse date and calculate age in days
+                note_date = date_type.fromisoformat(r.date)
+                age_days = (today - note_date).days
+
+                # Exponential decay with configurable half-life
+                # recency_factor is 1.0 for today, ~0.5 for decay_days ago, etc.
+                recency_factor = 2 ** (-age_days / decay_days)
+
+                # Combine relevance score with recency
+                # Final score = (1-weight)*relevance + weight*recency
+                r.score = (1 - boost_weight) * r.score + boost_weight * recency_factor
+            except (ValueError, TypeError):
+                pass  # Keep original score if date parsing fails
+
+    # Re-sort by new score
+    results.sort(key=lambda x: x.score, reverse=True)
+    return results
+
+
+def _keyword_snippet(
+    content: str, terms: list[str], width: int = KEYWORD_SNIPPET_CHARS
+) -> str:
+    """Cut a snippet of content around the first occurrence of any term."""
+    lowered = content.lower()
+    positions = [p for p in (lowered.find(t.lower()) for t in terms) if p >= 0]
+    start = max(0, min(positions) - width // 4) if positions else 0
+    snippet = content[start : start + width].replace("\n", " ").strip()
+    return ("…" if start > 0 else "") + snippet
+
+
+def keyword_search(
+    query: str,
+    k: int = 10,
+    notebook: str | None = None,
+    tag: str | None = None,
+    date_start: str | None = None,
+    date_end: str | None = None,
+    recency_boost: float = 0.0,
+    score_threshold: float | None = None,
+) -> list[SearchResult]:
+    """Search notes by keyword using only the SQLite full-text index.
+
+    Unlike NoteSearch.search(search_type="keyword"), this never opens the
+    vector store. Notes containing any query word (three characters or
+    more, matched as substrings) are ranked by BM25; scores are scaled
+    so the best match is 1.0.
+
+    Args:
+        query: The search query.
+        k: Maximum number of results to return.
+        notebook: Filter to notes in this notebook.
+        tag: Filter to notes with this tag.
+        date_start: Filter to notes on or after this date (ISO format).
+        date_end: Filter to notes on or before this date (ISO format).
+        recency_boost: Weight (0-1) to boost recent results. 0 = no boost.
+        score_threshold: Minimum score for result to be displayed.
+                        If None, uses config.search.score_threshold.
+
+    Returns:
+        List of search results sorted by relevance (with optional recency boost).
+    """
+    from nb.config import get_config
+    from nb.index.fts_repo import search_notes_fts
+
+    config = get_config()
+    if score_threshold is None:
+        score_threshold = config.search.score_threshold
+
+    terms = query.split()
+    rows = search_notes_fts(
+        terms,
+        limit=k,
+        notebook=notebook,
+        tag=tag,
+        date_start=date_start,
+        date_end=date_end,
+        context=KEYWORD_SNIPPET_CHARS,
+    )
+    if not rows:
+        return []
+
+    # FTS5 ranks are negative BM25 scores, lower is better
+    best = rows[0]["rank"] or -1.0
+    results = [
+        SearchResult(
+            path=row["path"],
+            title=row["title"],
+            snippet=_keyword_snippet(row["content"] or "", terms),
+            score=row["rank"] / best,
+            notebook=row["notebook"],
+            date=row["date"],
+        )
+        for row in rows
+    ]
+    results = [r for r in results if r.score >= score_threshold]
+    if recency_boost > 0 and results:
+        results = _apply_recency_boost(
+            results, recency_boost, config.search.recency_decay_days
+        )
+    return results
+
+
 # Singleton search instance
 _search: NoteSearch | None = None
 
@@ -711,6 +1089,12 @@ def get_search() -> NoteSearch:
     return _search
 
 
+def flush_search_state() -> None:
+    """Write vector_state rows deferred by the global search instance, if any."""
+    if _search is not None:
+        _search.flush_state()
+
+
 def reset_search() -> None:
     """Reset the search instance (useful for testing)."""
     global _search
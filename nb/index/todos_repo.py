@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import json
 from datetime import date, datetime, time
 from pathlib import Path
 from typing import TYPE_CHECKING
@@ -12,6 +13,8 @@ from nb.utils.dates import format_datetime
 from nb.utils.hashing import normalize_path
 
 if TYPE_CHECKING:
+    import sqlite3
+
     from nb.index.db import Database
 
 
@@ -78,24 +81,46 @@ def _row_to_todo(row) -> Todo:
     )
 
 
-def _load_todo_tags(todo_id: str) -> list[str]:
-    """Load tags for a todo from the database."""
-    db = get_db()
-    rows = db.fetchall("SELECT tag FROM todo_tags WHERE todo_id = ?", (todo_id,))
-    return [row["tag"] for row in rows]
+def _hydrate_todos(rows, db: Database | None = None) -> list[Todo]:
+    """Convert todo rows to Todo objects with their tags and sections.
 
+    Tags and sections for the whole result set are loaded with one query
+    each, instead of two queries per todo.
+    """
+    todos = [_row_to_todo(row) for row in rows]
+    if not todos:
+        return todos
+    if db is None:
+        db = get_db()
 
-def _load_todo_sections(todo_id: str) -> list[str]:
-    """Load sections for a todo from the database.
+    # json_each() keeps the id list out of SQLite's host parameter limit
+    ids = json.dumps([todo.id for todo in todos])
+    tags: dict[str, list[str]] = {}
+    for row in db.fetchall(
+        """
+        SELECT todo_id, tag FROM todo_tags
+        WHERE todo_id IN (SELECT value FROM json_each(?))
+        ORDER BY todo_id, tag
+        """,
+        (ids,),
+    ):
+        tags.setdefault(row["todo_id"], []).append(row["tag"])
+    # Sections in order of depth (shallowest to deepest)
+    sections: dict[str, list[str]] = {}
+    for row in db.fetchall(
+        """
+        SELECT todo_id, section FROM todo_sections
+        WHERE todo_id IN (SELECT value FROM json_each(?))
+        ORDER BY todo_id, depth, section
+        """,
+        (ids,),
+    ):
+        sections.setdefault(row["todo_id"], []).append(row["section"])
 
-    Returns sections in order of depth (shallowest to deepest).
-    """
-    db = get_db()
-    rows = db.fetchall(
-        "SELECT section FROM todo_sections WHERE todo_id = ? ORDER BY depth",
-        (todo_id,),
-    )
-    return [row["section"] for row in rows]
+    for todo in todos:
+        todo.tags = tags.get(todo.id, [])
+        todo.sections = sections.get(todo.id, [])
+    return todos
 
 
 def upsert_todo(
@@ -103,11 +128,13 @@ def upsert_todo(
     commit: bool = True,
     db: Database | None = None,
     preserved_dates: dict[str, tuple[str | None, str | None]] | None = None,
+    note_path: str | None = None,
 ) -> None:
     """Insert or update a todo in the database.
 
     Preserves created_date for existing todos.
     Sets completed_date when status changes to completed.
+    Copies todo_exclude from the source note (if note_path is given).
 
     Args:
         todo: The Todo to upsert.
@@ -116,6 +143,8 @@ def upsert_todo(
             Pass a thread-local db when called from parallel indexing.
         preserved_dates: Optional dict mapping todo_id to (created_date, completed_date).
             Used to preserve dates when re-indexing after deletion.
+        note_path: Key (notes.path) of the note the todo comes from, or None
+            for todos outside indexed notes (inbox, linked todo files).
     """
     if db is None:
         db = get_db()
@@ -172,8 +201,12 @@ def upsert_todo(
         INSERT OR REPLACE INTO todos (
             id, content, raw_content, completed, status, source_type, source_path,
             source_external, source_alias, line_number, created_date, completed_date,
-            due_date, priority, project, parent_id, content_hash, details, section, owner
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            due_date, priority, project, parent_id, content_hash, details, section, owner,
+            note_path, todo_exclude
+        ) VALUES (
+            ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?,
+            COALESCE((SELECT todo_exclude FROM notes WHERE path = ?), 0)
+        )
         """,
         (
             todo.id,
@@ -196,6 +229,8 @@ def upsert_todo(
             todo.details,
             todo.section,
             todo.owner,
+            note_path,
+            note_path,
         ),
     )
 
@@ -223,6 +258,8 @@ def upsert_todos_batch(
     todos: list[Todo],
     db: Database | None = None,
     preserved_dates: dict[str, tuple[str | None, str | None]] | None = None,
+    commit: bool = True,
+    note_path: str | None = None,
 ) -> None:
     """Insert or update multiple todos in a single transaction.
 
@@ -234,6 +271,8 @@ def upsert_todos_batch(
             Pass a thread-local db when called from parallel indexing.
         preserved_dates: Optional dict mapping todo_id to (created_date, completed_date).
             Used to preserve dates when re-indexing after deletion.
+        commit: If True, commit after all upserts.
+        note_path: Key (notes.path) of the note all the todos come from.
     """
     if not todos:
         return
@@ -242,9 +281,16 @@ def upsert_todos_batch(
         db = get_db()
 
     for todo in todos:
-        upsert_todo(todo, commit=False, db=db, preserved_dates=preserved_dates)
+        upsert_todo(
+            todo,
+            commit=False,
+            db=db,
+            preserved_dates=preserved_dates,
+            note_path=note_path,
+        )
 
-    db.commit()
+    if commit:
+        db.commit()
 
 
 def get_todo_by_id(todo_id: str) -> Todo | None:
@@ -255,10 +301,7 @@ def get_todo_by_id(todo_id: str) -> Todo | None:
     if not row:
         return None
 
-    todo = _row_to_todo(row)
-    todo.tags = _load_todo_tags(todo_id)
-    todo.sections = _load_todo_sections(todo_id)
-    return todo
+    return _hydrate_todos([row], db)[0]
 
 
 def delete_todo(todo_id: str) -> None:
@@ -301,7 +344,9 @@ def get_todo_dates_for_source(
     return {row["id"]: (row["created_date"], row["completed_date"]) for row in rows}
 
 
-def delete_todos_for_source(source_path: Path, db: Database | None = None) -> None:
+def delete_todos_for_source(
+    source_path: Path, db: Database | None = None, commit: bool = True
+) -> None:
     """Delete all todos from a specific source file.
 
     Handles both normalized (forward slashes) and legacy (backslashes) paths
@@ -311,6 +356,7 @@ def delete_todos_for_source(source_path: Path, db: Database | None = None) -> No
         source_path: Path to the source file.
         db: Optional database instance (uses global get_db() if not provided).
             Pass a thread-local db when called from parallel indexing.
+        commit: If True, commit immediately.
     """
     if db is None:
         db = get_db()
@@ -326,7 +372,8 @@ def delete_todos_for_source(source_path: Path, db: Database | None = None) -> No
         )
     else:
         db.execute("DELETE FROM todos WHERE source_path = ?", (normalized,))
-    db.commit()
+    if commit:
+        db.commit()
 
 
 def update_todo_completion(todo_id: str, completed: bool) -> None:
@@ -397,6 +444,15 @@ def update_todo_due_date_db(todo_id: str, new_date: datetime | date | None) -> N
     db.commit()
 
 
+def todos_from_rows(rows, db: Database | None = None) -> list[Todo]:
+    """Build Todo objects, with tags and sections, from rows of todos.
+
+    For statements built outside this module (compiled nbql queries) that
+    select the todos columns.
+    """
+    return _hydrate_todos(rows, db)
+
+
 def query_todos(
     completed: bool | None = None,
     status: TodoStatus | None = None,
@@ -457,34 +513,22 @@ def query_todos(
     """
     db = get_db()
 
-    sql = "SELECT DISTINCT t.* FROM todos t"
+    sql = "SELECT t.* FROM todos t"
     params: list = []
     conditions: list[str] = []
     joins: list[str] = []
 
-    # Join with tags if filtering by tag
+    # Join with tags if filtering by tag. One tag matches at most one
+    # todo_tags row per todo (its primary key), so no DISTINCT is needed.
     if tag:
         joins.append("JOIN todo_tags tt ON t.id = tt.todo_id")
         conditions.append("tt.tag = ?")
         params.append(tag.lower())
 
-    # Join with notes if filtering by note-level todo_exclude
-    # Strategy:
-    # - For linked todos (source_alias set): match via source_alias (unambiguous)
-    # - For internal todos (no source_alias): match via path suffix
-    # This avoids false matches where linked todo paths accidentally match internal note paths
+    # Note-level todo_exclude is copied onto each todo row (kept in sync
+    # with the source note by triggers), so no join with notes is needed
     if exclude_note_excluded:
-        joins.append(
-            """LEFT JOIN notes n ON (
-                (t.source_alias IS NOT NULL AND n.source_alias = t.source_alias)
-                OR (t.source_alias IS NULL AND (
-                    t.source_path = n.path
-                    OR (n.path NOT LIKE '_:/%' AND n.path NOT LIKE '/%'
-                        AND t.source_path LIKE '%/' || n.path)
-                ))
-            )"""
-        )
-        conditions.append("(n.todo_exclude IS NULL OR n.todo_exclude = 0)")
+        conditions.append("t.todo_exclude = 0")
 
     # Add joins to SQL
     if joins:
@@ -649,35 +693,60 @@ def query_todos(
         sql += " WHERE " + " AND ".join(conditions)
 
     rows = db.fetchall(sql, tuple(params))
+    return _hydrate_todos(rows, db)
 
-    todos = []
-    for row in rows:
-        todo = _row_to_todo(row)
-        todo.tags = _load_todo_tags(todo.id)
-        todo.sections = _load_todo_sections(todo.id)
-        todos.append(todo)
 
-    return todos
+def get_todo_subtrees(parent_ids: list[str]) -> dict[str, list[Todo]]:
+    """Get the child todos of many parents, with all their descendants.
 
+    The whole forest is loaded with one recursive query (plus one each for
+    tags and sections) and assembled in memory: each child's children
+    attribute holds its own children, ordered by line number.
 
-def get_todo_children(parent_id: str) -> list[Todo]:
-    """Get child todos of a parent."""
+    Returns:
+        Mapping of parent id to its children; parents without children
+        are left out.
+    """
+    if not parent_ids:
+        return {}
     db = get_db()
     rows = db.fetchall(
-        "SELECT * FROM todos WHERE parent_id = ? ORDER BY line_number",
-        (parent_id,),
+        """
+        WITH RECURSIVE subtree(id) AS (
+            SELECT id FROM todos WHERE parent_id IN (SELECT value FROM json_each(?))
+            UNION
+            SELECT t.id FROM todos t JOIN subtree s ON t.parent_id = s.id
+        )
+        SELECT t.* FROM todos t JOIN subtree s ON s.id = t.id
+        ORDER BY t.line_number
+        """,
+        (json.dumps(list(parent_ids)),),
     )
 
-    children = []
-    for row in rows:
-        todo = _row_to_todo(row)
-        todo.tags = _load_todo_tags(todo.id)
-        todo.sections = _load_todo_sections(todo.id)
-        # Recursively load children
-        todo.children = get_todo_children(todo.id)
-        children.append(todo)
+    by_parent: dict[str | None, list[Todo]] = {}
+    for todo in _hydrate_todos(rows, db):
+        by_parent.setdefault(todo.parent_id, []).append(todo)
+    for children in by_parent.values():
+        for child in children:
+            child.children = by_parent.get(child.id, [])
+    return {pid: by_parent[pid] for pid in parent_ids if pid in by_parent}
 
-    return children
+
+def attach_todo_children(todos: list[Todo]) -> list[Todo]:
+    """Fill in the children (and their descendants) of todos in one pass.
+
+    Returns:
+        The same todos, for chaining.
+    """
+    subtrees = get_todo_subtrees([todo.id for todo in todos])
+    for todo in todos:
+        todo.children = subtrees.get(todo.id, [])
+    return todos
+
+
+def get_todo_children(parent_id: str) -> list[Todo]:
+    """Get child todos of a parent, with their descendants loaded."""
+    return get_todo_subtrees([parent_id]).get(parent_id, [])
 
 
 def get_sorted_todos(
@@ -768,36 +837,69 @@ def get_sorted_todos(
     return sorted(todos, key=sort_key)
 
 
+def _notebook_filter(
+    column: str,
+    notebooks: list[str] | None = None,
+    exclude_notebooks: list[str] | None = None,
+) -> tuple[list[str], list]:
+    """Build WHERE conditions for a notebook include/exclude filter.
+
+    For the stats aggregate tables, where no notebook is stored as ''.
+    """
+    conditions: list[str] = []
+    params: list = []
+    if notebooks:
+        placeholders = ", ".join("?" for _ in notebooks)
+        conditions.append(f"{column} IN ({placeholders})")
+        params.extend(notebooks)
+    if exclude_notebooks:
+        placeholders = ", ".join("?" for _ in exclude_notebooks)
+        conditions.append(f"{column} NOT IN ({placeholders})")
+        params.extend(exclude_notebooks)
+    return conditions, params
+
+
+def _todo_count_rows(
+    db: Database,
+    notebooks: list[str] | None = None,
+    exclude_notebooks: list[str] | None = None,
+) -> list[sqlite3.Row]:
+    """Get the todo_counts rows (top-level todos by notebook, priority,
+    status and due day) for the given notebooks."""
+    conditions, params = _notebook_filter("project", notebooks, exclude_notebooks)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return db.fetchall(
+        f"SELECT project, priority, status, due_day, count FROM todo_counts {where}",
+        tuple(params),
+    )
+
+
 def get_todo_stats() -> dict[str, int]:
     """Get todo statistics."""
     db = get_db()
+    today = date.today().isoformat()
 
-    total = db.fetchone("SELECT COUNT(*) as count FROM todos WHERE parent_id IS NULL")
-    completed = db.fetchone(
-        "SELECT COUNT(*) as count FROM todos WHERE parent_id IS NULL AND status = ?",
-        (TodoStatus.COMPLETED.value,),
-    )
-    in_progress = db.fetchone(
-        "SELECT COUNT(*) as count FROM todos WHERE parent_id IS NULL AND status = ?",
-        (TodoStatus.IN_PROGRESS.value,),
-    )
-    overdue = db.fetchone(
-        "SELECT COUNT(*) as count FROM todos WHERE parent_id IS NULL AND status != ? AND DATE(due_date) < ?",
-        (TodoStatus.COMPLETED.value, date.today().isoformat()),
-    )
-    due_today = db.fetchone(
-        "SELECT COUNT(*) as count FROM todos WHERE parent_id IS NULL AND status != ? AND DATE(due_date) = ?",
-        (TodoStatus.COMPLETED.value, date.today().isoformat()),
-    )
+    total = completed = in_progress = overdue = due_today = 0
+    for row in _todo_count_rows(db):
+        count = row["count"]
+        total += count
+        if row["status"] == TodoStatus.COMPLETED.value:
+            completed += count
+            continue
+        if row["status"] == TodoStatus.IN_PROGRESS.value:
+            in_progress += count
+        if row["due_day"] and row["due_day"] < today:
+            overdue += count
+        elif row["due_day"] == today:
+            due_today += count
 
     return {
-        "total": total["count"] if total else 0,
-        "completed": completed["count"] if completed else 0,
-        "in_progress": in_progress["count"] if in_progress else 0,
-        "open": (total["count"] if total else 0)
-        - (completed["count"] if completed else 0),
-        "overdue": overdue["count"] if overdue else 0,
-        "due_today": due_today["count"] if due_today else 0,
+        "total": total,
+        "completed": completed,
+        "in_progress": in_progress,
+        "open": total - completed,
+        "overdue": overdue,
+        "due_today": due_today,
     }
 
 
@@ -807,6 +909,9 @@ def get_extended_todo_stats(
 ) -> dict:
     """Get extended todo statistics for dashboard.
 
+    Reads the todo_counts aggregate, so the cost depends on the number of
+    distinct (notebook, priority, status, due day) groups, not of todos.
+
     Returns:
         {
             "total": int,
@@ -825,100 +930,52 @@ def get_extended_todo_stats(
 
     db = get_db()
     today = date.today()
-    week_end = today + timedelta(days=7)
-
-    # Build base WHERE clause for notebook filtering
-    base_conditions = ["parent_id IS NULL"]
-    params: list = []
-
-    if notebooks:
-        placeholders = ", ".join("?" for _ in notebooks)
-        base_conditions.append(f"project IN ({placeholders})")
-        params.extend(notebooks)
-
-    if exclude_notebooks:
-        placeholders = ", ".join("?" for _ in exclude_notebooks)
-        base_conditions.append(f"(project IS NULL OR project NOT IN ({placeholders}))")
-        params.extend(exclude_notebooks)
-
-    base_where = " AND ".join(base_conditions)
-
-    # Get total count
-    total_row = db.fetchone(
-        f"SELECT COUNT(*) as count FROM todos WHERE {base_where}", tuple(params)
-    )
-    total = total_row["count"] if total_row else 0
-
-    # Get status counts
-    status_rows = db.fetchall(
-        f"SELECT status, COUNT(*) as count FROM todos WHERE {base_where} GROUP BY status",
-        tuple(params),
-    )
-    status_counts = {row["status"]: row["count"] for row in status_rows}
+    today_str = today.isoformat()
+    week_end_str = (today + timedelta(days=7)).isoformat()
 
-    completed = status_counts.get(TodoStatus.COMPLETED.value, 0)
-    in_progress = status_counts.get(TodoStatus.IN_PROGRESS.value, 0)
-    pending = status_counts.get(TodoStatus.PENDING.value, 0)
-
-    # Get overdue count
-    overdue_row = db.fetchone(
-        f"SELECT COUNT(*) as count FROM todos WHERE {base_where} AND status != ? AND DATE(due_date) < ?",
-        tuple(params) + (TodoStatus.COMPLETED.value, today.isoformat()),
-    )
-    overdue = overdue_row["count"] if overdue_row else 0
-
-    # Get due today count
-    due_today_row = db.fetchone(
-        f"SELECT COUNT(*) as count FROM todos WHERE {base_where} AND status != ? AND DATE(due_date) = ?",
-        tuple(params) + (TodoStatus.COMPLETED.value, today.isoformat()),
-    )
-    due_today = due_today_row["count"] if due_today_row else 0
-
-    # Get due this week count (excluding today)
-    due_week_row = db.fetchone(
-        f"SELECT COUNT(*) as count FROM todos WHERE {base_where} AND status != ? AND DATE(due_date) > ? AND DATE(due_date) <= ?",
-        tuple(params)
-        + (TodoStatus.COMPLETED.value, today.isoformat(), week_end.isoformat()),
-    )
-    due_this_week = due_week_row["count"] if due_week_row else 0
-
-    # Get stats by priority
-    priority_rows = db.fetchall(
-        f"SELECT priority, status, COUNT(*) as count FROM todos WHERE {base_where} GROUP BY priority, status",
-        tuple(params),
-    )
+    total = 0
+    status_counts: dict[str, int] = {}
+    overdue = due_today = due_this_week = 0
     by_priority: dict[int | None, dict[str, int]] = {}
-    for row in priority_rows:
-        p = row["priority"]
+    by_notebook: dict[str, dict[str, int]] = {}
+
+    for row in _todo_count_rows(db, notebooks, exclude_notebooks):
+        count = row["count"]
+        is_completed = row["status"] == TodoStatus.COMPLETED.value
+        due_day = row["due_day"]
+        is_overdue = not is_completed and bool(due_day) and due_day < today_str
+
+        total += count
+        status_counts[row["status"]] = status_counts.get(row["status"], 0) + count
+        if is_overdue:
+            overdue += count
+        elif not is_completed and due_day == today_str:
+            due_today += count
+        elif not is_completed and today_str < due_day <= week_end_str:
+            due_this_week += count
+
+        p = row["priority"] or None
         if p not in by_priority:
             by_priority[p] = {"total": 0, "completed": 0}
-        by_priority[p]["total"] += row["count"]
-        if row["status"] == TodoStatus.COMPLETED.value:
-            by_priority[p]["completed"] += row["count"]
-
-    # Get stats by notebook
-    notebook_rows = db.fetchall(
-        f"""SELECT project, status,
-            SUM(CASE WHEN DATE(due_date) < ? AND status != ? THEN 1 ELSE 0 END) as overdue_count,
-            COUNT(*) as count
-            FROM todos WHERE {base_where} GROUP BY project, status""",
-        tuple(params) + (today.isoformat(), TodoStatus.COMPLETED.value),
-    )
-    by_notebook: dict[str, dict[str, int]] = {}
-    for row in notebook_rows:
+        by_priority[p]["total"] += count
+        if is_completed:
+            by_priority[p]["completed"] += count
+
         nb = row["project"] or "(none)"
         if nb not in by_notebook:
             by_notebook[nb] = {"total": 0, "completed": 0, "overdue": 0}
-        by_notebook[nb]["total"] += row["count"]
-        if row["status"] == TodoStatus.COMPLETED.value:
-            by_notebook[nb]["completed"] += row["count"]
-        by_notebook[nb]["overdue"] += row["overdue_count"] or 0
+        by_notebook[nb]["total"] += count
+        if is_completed:
+            by_notebook[nb]["completed"] += count
+        if is_overdue:
+            by_notebook[nb]["overdue"] += count
 
+    completed = status_counts.get(TodoStatus.COMPLETED.value, 0)
     return {
         "total": total,
         "completed": completed,
-        "in_progress": in_progress,
-        "pending": pending,
+        "in_progress": status_counts.get(TodoStatus.IN_PROGRESS.value, 0),
+        "pending": status_counts.get(TodoStatus.PENDING.value, 0),
         "overdue": overdue,
         "due_today": due_today,
         "due_this_week": due_this_week,
@@ -945,46 +1002,26 @@ def get_todo_activity(
     from datetime import timedelta
 
     db = get_db()
-    today = date.today()
-    start_date = today - timedelta(days=days)
+    start_date = date.today() - timedelta(days=days)
 
-    # Build base WHERE clause
-    base_conditions = ["parent_id IS NULL"]
-    params: list = []
-
-    if notebooks:
-        placeholders = ", ".join("?" for _ in notebooks)
-        base_conditions.append(f"project IN ({placeholders})")
-        params.extend(notebooks)
+    conditions, params = _notebook_filter("project", notebooks, exclude_notebooks)
+    conditions.insert(0, "day >= ?")
+    params.insert(0, start_date.isoformat())
 
-    if exclude_notebooks:
-        placeholders = ", ".join("?" for _ in exclude_notebooks)
-        base_conditions.append(f"(project IS NULL OR project NOT IN ({placeholders}))")
-        params.extend(exclude_notebooks)
-
-    base_where = " AND ".join(base_conditions)
-
-    # Get created by day
-    created_rows = db.fetchall(
-        f"""SELECT DATE(created_date) as day, COUNT(*) as count
-            FROM todos WHERE {base_where} AND created_date >= ?
-            GROUP BY DATE(created_date) ORDER BY day""",
-        tuple(params) + (start_date.isoformat(),),
-    )
-    created_by_day = [(row["day"], row["count"]) for row in created_rows]
-
-    # Get completed by day (uses completed_date column)
-    completed_rows = db.fetchall(
-        f"""SELECT DATE(completed_date) as day, COUNT(*) as count
-            FROM todos WHERE {base_where} AND completed_date >= ?
-            GROUP BY DATE(completed_date) ORDER BY day""",
-        tuple(params) + (start_date.isoformat(),),
+    rows = db.fetchall(
+        f"""SELECT day, SUM(created) as created, SUM(completed) as completed
+            FROM todo_activity WHERE {" AND ".join(conditions)}
+            GROUP BY day ORDER BY day""",
+        tuple(params),
     )
-    completed_by_day = [(row["day"], row["count"]) for row in completed_rows]
 
     return {
-        "created_by_day": created_by_day,
-        "completed_by_day": completed_by_day,
+        "created_by_day": [
+            (row["day"], row["created"]) for row in rows if row["created"]
+        ],
+        "completed_by_day": [
+            (row["day"], row["completed"]) for row in rows if row["completed"]
+        ],
         "days": days,
     }
 
@@ -998,6 +1035,9 @@ def get_tag_stats(
 ) -> list[dict]:
     """Get tag usage statistics.
 
+    Counts come from the todo_tag_counts and note_tag_counts aggregates;
+    sources take one more query per kind, not one per tag.
+
     Args:
         include_sources: Include source notebooks/notes for each tag
         notebooks: Filter by specific notebooks
@@ -1023,144 +1063,95 @@ def get_tag_stats(
     db = get_db()
     tag_counts: dict[str, dict] = {}
 
+    def tag_entry(tag: str) -> dict:
+        if tag not in tag_counts:
+            tag_counts[tag] = {
+                "tag": tag,
+                "count": 0,
+                "todo_count": 0,
+                "note_count": 0,
+            }
+        return tag_counts[tag]
+
     # Get todo tags if requested
     if source in ("todos", "all"):
-        # Build base conditions for todos
-        base_conditions = ["t.parent_id IS NULL"]
-        params: list = []
-
-        if notebooks:
-            placeholders = ", ".join("?" for _ in notebooks)
-            base_conditions.append(f"t.project IN ({placeholders})")
-            params.extend(notebooks)
-
-        if exclude_notebooks:
-            placeholders = ", ".join("?" for _ in exclude_notebooks)
-            base_conditions.append(
-                f"(t.project IS NULL OR t.project NOT IN ({placeholders}))"
-            )
-            params.extend(exclude_notebooks)
-
+        conditions, params = _notebook_filter("project", notebooks, exclude_notebooks)
         if completed is not None:
-            if completed:
-                base_conditions.append("t.status = ?")
-                params.append(TodoStatus.COMPLETED.value)
-            else:
-                base_conditions.append("t.status != ?")
-                params.append(TodoStatus.COMPLETED.value)
-
-        base_where = " AND ".join(base_conditions)
+            conditions.append("completed = ?")
+            params.append(1 if completed else 0)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
 
-        # Get todo tag counts
         tag_rows = db.fetchall(
-            f"""SELECT tt.tag, COUNT(DISTINCT tt.todo_id) as count
-                FROM todo_tags tt
-                JOIN todos t ON tt.todo_id = t.id
-                WHERE {base_where}
-                GROUP BY tt.tag""",
+            f"""SELECT tag, SUM(count) as count FROM todo_tag_counts {where}
+                GROUP BY tag ORDER BY tag""",
             tuple(params),
         )
-
         for row in tag_rows:
-            tag = row["tag"]
-            if tag not in tag_counts:
-                tag_counts[tag] = {
-                    "tag": tag,
-                    "count": 0,
-                    "todo_count": 0,
-                    "note_count": 0,
-                }
-            tag_counts[tag]["todo_count"] = row["count"]
-            tag_counts[tag]["count"] += row["count"]
+            entry = tag_entry(row["tag"])
+            entry["todo_count"] = row["count"]
+            entry["count"] += row["count"]
 
         # Get sources if requested (only for todos)
         if include_sources:
-            for tag in tag_counts:
-                source_rows = db.fetchall(
-                    f"""SELECT t.project as notebook, t.source_path, COUNT(*) as count
-                        FROM todo_tags tt
-                        JOIN todos t ON tt.todo_id = t.id
-                        WHERE {base_where} AND tt.tag = ?
-                        GROUP BY t.project, t.source_path
-                        ORDER BY count DESC""",
-                    tuple(params) + (tag,),
-                )
-                tag_counts[tag]["sources"] = [
+            for entry in tag_counts.values():
+                entry["sources"] = []
+            source_rows = db.fetchall(
+                f"""SELECT tag, project, source_path, SUM(count) as count
+                    FROM todo_tag_counts {where}
+                    GROUP BY tag, project, source_path
+                    ORDER BY count DESC""",
+                tuple(params),
+            )
+            for r in source_rows:
+                tag_counts[r["tag"]]["sources"].append(
                     {
-                        "notebook": r["notebook"] or "(none)",
-                        "path": r["source_path"],
+                        "notebook": r["project"] or "(none)",
+                        "path": r["source_path"] or None,
                         "count": r["count"],
                         "type": "todo",
                     }
-                    for r in source_rows
-                ]
+                )
 
     # Get note tags if requested
     if source in ("notes", "all"):
-        # Build conditions for notes
-        note_conditions = ["1=1"]
-        note_params: list = []
-
-        if notebooks:
-            placeholders = ", ".join("?" for _ in notebooks)
-            note_conditions.append(f"n.notebook IN ({placeholders})")
-            note_params.extend(notebooks)
-
-        if exclude_notebooks:
-            placeholders = ", ".join("?" for _ in exclude_notebooks)
-            note_conditions.append(
-                f"(n.notebook IS NULL OR n.notebook NOT IN ({placeholders}))"
-            )
-            note_params.extend(exclude_notebooks)
+        conditions, params = _notebook_filter("notebook", notebooks, exclude_notebooks)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
 
-        note_where = " AND ".join(note_conditions)
-
-        # Get note tag counts
         note_tag_rows = db.fetchall(
-            f"""SELECT nt.tag, COUNT(DISTINCT nt.note_path) as count
-                FROM note_tags nt
-                JOIN notes n ON nt.note_path = n.path
-                WHERE {note_where}
-                GROUP BY nt.tag""",
-            tuple(note_params),
+            f"""SELECT tag, SUM(count) as count FROM note_tag_counts {where}
+                GROUP BY tag ORDER BY tag""",
+            tuple(params),
         )
-
         for row in note_tag_rows:
-            tag = row["tag"]
-            if tag not in tag_counts:
-                tag_counts[tag] = {
-                    "tag": tag,
-                    "count": 0,
-                    "todo_count": 0,
-                    "note_count": 0,
-                }
-            tag_counts[tag]["note_count"] = row["count"]
-            tag_counts[tag]["count"] += row["count"]
-
-        # Get note sources if requested
+            entry = tag_entry(row["tag"])
+            entry["note_count"] = row["count"]
+            entry["count"] += row["count"]
+
+        # Get note sources if requested (a note has each tag once)
         if include_sources:
-            for tag in tag_counts:
-                note_source_rows = db.fetchall(
-                    f"""SELECT n.notebook, nt.note_path, COUNT(*) as count
-                        FROM note_tags nt
-                        JOIN notes n ON nt.note_path = n.path
-                        WHERE {note_where} AND nt.tag = ?
-                        GROUP BY n.notebook, nt.note_path
-                        ORDER BY count DESC""",
-                    tuple(note_params) + (tag,),
+            for entry in tag_counts.values():
+                entry.setdefault("sources", [])
+            conditions, params = _notebook_filter(
+                "COALESCE(n.notebook, '')", notebooks, exclude_notebooks
+            )
+            where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+            note_source_rows = db.fetchall(
+                f"""SELECT nt.tag, n.notebook, nt.note_path
+                    FROM note_tags nt
+                    JOIN notes n ON nt.note_path = n.path
+                    {where}
+                    ORDER BY nt.note_path""",
+                tuple(params),
+            )
+            for r in note_source_rows:
+                tag_counts[r["tag"]]["sources"].append(
+                    {
+                        "notebook": r["notebook"] or "(none)",
+                        "path": r["note_path"],
+                        "count": 1,
+                        "type": "note",
+                    }
                 )
-                # Merge with existing sources or create new list
-                existing_sources = tag_counts[tag].get("sources", [])
-                for r in note_source_rows:
-                    existing_sources.append(
-                        {
-                            "notebook": r["notebook"] or "(none)",
-                            "path": r["note_path"],
-                            "count": r["count"],
-                            "type": "note",
-                        }
-                    )
-                tag_counts[tag]["sources"] = existing_sources
 
     # Convert to sorted list
     result = sorted(tag_counts.values(), key=lambda x: -x["count"])
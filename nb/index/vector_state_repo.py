@@ -0,0 +1,134 @@
+"""Vector index state database operations for nb.
+
+The vector_state table records which revision of each note (its
+notes.content_hash) is embedded in the localvectordb index, and with which
+embedding settings. Comparing it against the notes table tells which notes
+need embedding with a single query, without asking VectorDB.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from nb.index.db import get_db
+from nb.utils.hashing import normalize_path
+
+if TYPE_CHECKING:
+    from nb.index.db import Database
+
+# Keep IN (...) lists under SQLite's host parameter limit
+_PATH_CHUNK = 500
+
+# Matches notes (aliased n) with no up-to-date vector_state row; takes the
+# embedding settings key as its only parameter
+STALE_NOTE_CONDITION = """
+    NOT EXISTS (
+        SELECT 1 FROM vector_state v
+        WHERE v.path = n.path AND v.content_hash = n.content_hash AND v.model = ?
+    )
+"""
+
+
+def record_embedded(
+    notes: Sequence[tuple[str | Path, str, int | None]],
+    model: str,
+    db: Database | None = None,
+) -> None:
+    """Record that notes are embedded in the vector index.
+
+    Args:
+        notes: (path, content_hash, chunk_count) tuples. A chunk_count of
+            None keeps the count already recorded for the note.
+        model: Embedding settings key the notes were embedded with.
+        db: Optional database instance.
+    """
+    if not notes:
+        return
+    if db is None:
+        db = get_db()
+
+    embedded_at = datetime.now().isoformat()
+    with db.transaction():
+        db.executemany(
+            """
+            INSERT INTO vector_state (path, content_hash, model, chunk_count, embedded_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(path) DO UPDATE SET
+                content_hash = excluded.content_hash,
+                model = excluded.model,
+                chunk_count = COALESCE(excluded.chunk_count, vector_state.chunk_count),
+                embedded_at = excluded.embedded_at
+            """,
+            [
+                (normalize_path(path), content_hash, model, chunk_count, embedded_at)
+                for path, content_hash, chunk_count in notes
+            ],
+        )
+
+
+def forget_embedded(paths: Sequence[str | Path], db: Database | None = None) -> None:
+    """Remove the vector state of notes deleted from the vector index.
+
+    Args:
+        paths: Note paths.
+        db: Optional database instance.
+    """
+    if not paths:
+        return
+    if db is None:
+        db = get_db()
+
+    keys = [normalize_path(path) for path in paths]
+    with db.transaction():
+        for start in range(0, len(keys), _PATH_CHUNK):
+            chunk = keys[start : start + _PATH_CHUNK]
+            db.execute(
+                f"DELETE FROM vector_state WHERE path IN ({','.join('?' * len(chunk))})",
+                tuple(chunk),
+            )
+
+
+def clear_vector_state(db: Database | None = None) -> None:
+    """Forget all vector state (after the vector index is deleted)."""
+    if db is None:
+        db = get_db()
+    with db.transaction():
+        db.execute("DELETE FROM vector_state")
+
+
+def get_vector_state(
+    notebook: str | None = None, db: Database | None = None
+) -> dict[str, tuple[str, str, int | None]]:
+    """Get the recorded vector state by note path.
+
+    Args:
+        notebook: If specified, only notes in this notebook (rows for notes
+            missing from the notes table are only included without it).
+        db: Optional database instance.
+
+    Returns:
+        Dict of normalized path -> (content_hash, model, chunk_count).
+    """
+    if db is None:
+        db = get_db()
+
+    if notebook:
+        rows = db.fetchall(
+            """
+            SELECT v.path, v.content_hash, v.model, v.chunk_count FROM vector_state v
+            JOIN notes n ON n.path = v.path
+            WHERE n.notebook = ?
+            """,
+            (notebook,),
+        )
+    else:
+        rows = db.fetchall(
+            "SELECT path, content_hash, model, chunk_count FROM vector_state"
+        )
+    return {
+        row["path"]: (row["content_hash"], row["model"], row["chunk_count"])
+        for row in rows
+    }
@@ -76,14 +76,15 @@ def run_review(
     """
     from rich.console import Console
 
-    from nb.index.scanner import index_all_notes
+    from nb.index.scanner import index_prioritized
     from nb.utils.editor import open_in_editor
 
     console = Console()
     config = get_config()
 
-    # Ensure index is up to date
-    index_all_notes(index_vectors=False)
+    # Ensure index is up to date (recent notes first; older ones may lag)
+    if index_prioritized(todos_only=True).partial:
+        console.print("[dim]Index partial: older notes are still being indexed.[/dim]")
 
     # Query todos based on scope
     today = date.today()
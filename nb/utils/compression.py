@@ -0,0 +1,120 @@
+"""Compression utilities for note bodies stored in the index."""
+
+from __future__ import annotations
+
+import codecs
+import struct
+import zlib
+
+# Packed text header: codec byte, then the raw UTF-8 length
+_HEADER = struct.Struct(">BI")
+_STORED = 0
+_ZLIB = 1
+
+# Bodies shorter than this are stored as-is (zlib can't win on them)
+MIN_COMPRESS_BYTES = 128
+
+# Bytes decompressed by unpack_text_near()'s first step; each step doubles
+# it up to the max, so early matches are cheap and late ones take few steps
+_NEAR_FIRST_STEP_BYTES = 1024
+_NEAR_MAX_STEP_BYTES = 64 * 1024
+
+
+def pack_text(text: str) -> bytes:
+    """Pack text into a compressed blob.
+
+    The blob starts with a header holding the codec and the raw length,
+    followed by the zlib-compressed UTF-8 text (or the text itself when
+    compression doesn't make it smaller).
+    """
+    raw = text.encode("utf-8")
+    if len(raw) >= MIN_COMPRESS_BYTES:
+        packed = zlib.compress(raw)
+        if len(packed) < len(raw):
+            return _HEADER.pack(_ZLIB, len(raw)) + packed
+    return _HEADER.pack(_STORED, len(raw)) + raw
+
+
+def unpack_text(blob: bytes, max_chars: int | None = None) -> str:
+    """Unpack a blob written by pack_text().
+
+    Args:
+        blob: The packed text.
+        max_chars: If given, only decompress enough of the blob to return
+            (at most) this many leading characters.
+    """
+    codec, length = _HEADER.unpack_from(blob)
+    data = memoryview(blob)[_HEADER.size :]
+    if max_chars is not None:
+        # A character is at most 4 UTF-8 bytes; a cut one is dropped
+        limit = min(length, max_chars * 4)
+        if codec == _ZLIB:
+            raw = zlib.decompressobj().decompress(data, limit)
+        else:
+            raw = bytes(data[:limit])
+        return raw.decode("utf-8", errors="ignore")[:max_chars]
+    if codec == _ZLIB:
+        raw = zlib.decompress(data, bufsize=max(length, 1))
+    else:
+        raw = bytes(data)
+    return raw.decode("utf-8")
+
+
+
+def unpack_text_near(blob: bytes, needles: list[str], after: int = 0) -> str:
+    """Unpack a blob written by pack_text() up to the first needle.
+
+    Decompresses in steps and stops once any of the needles (compared
+    case-insensitively) has been seen and at least ``after`` more
+    characters follow it, so a snippet around the first match doesn't cost
+    a whole large body.
+
+    Args:
+        blob: The packed text.
+        needles: Strings to look for.
+        after: Characters to keep past the start of the first match.
+
+    Returns:
+        A prefix of the text that contains the first match and ``after``
+        characters past it, or the whole text if no needle occurs.
+    """
+    needles = [n.lower() for n in needles if n]
+    if not needles:
+        return unpack_text(blob)
+    codec, _ = _HEADER.unpack_from(blob)
+    # Input left to unpack: a view of the blob, then zlib's unconsumed tail
+    pending: bytes | memoryview = memoryview(blob)[_HEADER.size :]
+    decompressor = zlib.decompressobj() if codec == _ZLIB else None
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    overlap = max(len(n) for n in needles) - 1
+
+    parts: list[str] = []
+    size = 0
+    lowered = ""  # Lowered tail kept for matches across steps
+    lowered_start = 0  # Offset of lowered in the text
+    end: int | None = None
+    step = _NEAR_FIRST_STEP_BYTES
+    while True:
+        if decompressor is not None:
+            raw = decompressor.decompress(pending, step)
+            pending = decompressor.unconsumed_tail
+            done = decompressor.eof or (not pending and not raw)
+        else:
+            raw, pending = bytes(pending[:step]), pending[step:]
+            done = not pending
+        step = min(step * 2, _NEAR_MAX_STEP_BYTES)
+        piece = decoder.decode(raw, final=done)
+        parts.append(piece)
+        size += len(piece)
+
+        if end is None:
+            lowered += piece.lower()
+            hits = [p for p in (lowered.find(n) for n in needles) if p >= 0]
+            if hits:
+                end = lowered_start + min(hits) + after
+            else:
+                keep = min(overlap, len(lowered))
+                lowered_start += len(lowered) - keep
+                lowered = lowered[len(lowered) - keep :]
+        if done or (end is not None and size >= end):
+            return "".join(parts)
@@ -46,11 +46,25 @@ def parse_note_file(path: Path) -> tuple[dict[str, Any], str]:
     Returns a tuple of (frontmatter_dict, body_content).
     If no frontmatter exists, returns empty dict and full content.
     """
+    return parse_note_content(path.read_text(encoding="utf-8"), path)
+
+
+def parse_note_content(text: str, path: Path | None = None) -> tuple[dict[str, Any], str]:
+    """Parse already-loaded markdown text with YAML frontmatter.
+
+    Same as parse_note_file() but works on an in-memory buffer, so callers
+    that have already read the file don't need to read it again.
+
+    Args:
+        text: The raw file content.
+        path: Optional source path, used only for error messages.
+
+    Returns a tuple of (frontmatter_dict, body_content).
+    """
     try:
-        with path.open(encoding="utf-8") as f:
-            post = frontmatter.load(f)
+        post = frontmatter.loads(text)
     except yaml.scanner.ScannerError as e:
-        print(f"Error parsing yaml in {path}: {e!r}")
+        print(f"Error parsing yaml in {path or '<string>'}: {e!r}")
         raise e
 
     return dict(post.metadata), post.content
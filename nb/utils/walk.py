@@ -0,0 +1,341 @@
+"""Filesystem walking for note discovery.
+
+walk_notes() is the single definition of which files under a directory are
+notes: it walks with os.scandir, prunes hidden and .nbignore'd directories
+before descending into them, and yields the os.DirEntry of each markdown
+file so callers can reuse its cached stat data.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+
+_logger = logging.getLogger(__name__)
+
+# fnmatch is case-insensitive on Windows; keep the compiled matcher consistent
+_IGNORE_FLAGS = re.IGNORECASE if os.name == "nt" else 0
+
+# Entries modified this recently (in nanoseconds) can't be trusted to change
+# their mtime again on the next modification (coarse filesystem timestamps)
+RACY_WINDOW_NS = 2_000_000_000
+
+_matcher_cache: dict[Path, tuple[tuple[int, int] | None, IgnoreMatcher]] = {}
+_matcher_cache_lock = threading.Lock()
+
+
+def load_nbignore(notes_root: Path) -> list[str]:
+    """Load ignore patterns from .nbignore file.
+
+    The .nbignore file uses fnmatch-style patterns (similar to .gitignore but simpler).
+    Each line is a pattern, blank lines and lines starting with # are ignored.
+
+    Example .nbignore:
+        # Ignore archive folders
+        archive
+        old_*
+        temp/
+    """
+    ignore_file = notes_root / ".nbignore"
+    if not ignore_file.exists():
+        return []
+
+    patterns = []
+    try:
+        for line in ignore_file.read_text(encoding="utf-8").splitlines():
+            line = line.strip()
+            # Skip empty lines and comments
+            if line and not line.startswith("#"):
+                patterns.append(line)
+    except Exception as e:
+        _logger.debug("Could not read .nbignore file %s: %s", ignore_file, e)
+    return patterns
+
+
+class IgnoreMatcher:
+    """.nbignore patterns compiled into regexes once, instead of fnmatch per file.
+
+    A path is ignored when a pattern matches its full relative path, any
+    trailing part of it (``*/pattern``), or any single path component.
+    The walker checks each directory and file as it reaches it, so the
+    component rule only needs to look at the entry's own name. Patterns
+    ending in ``/`` only match directories.
+    """
+
+    def __init__(self, patterns: list[str]) -> None:
+        self.patterns = list(patterns)
+        path_parts: list[str] = []
+        name_parts: list[str] = []
+        dir_path_parts: list[str] = []
+        dir_name_parts: list[str] = []
+        for pattern in self.patterns:
+            dir_only = pattern.endswith("/")
+            pattern = pattern.rstrip("/")
+            if not pattern:
+                continue
+            regex = fnmatch.translate(pattern)
+            (dir_path_parts if dir_only else path_parts).append(f"(?:.*/)?{regex}")
+            (dir_name_parts if dir_only else name_parts).append(regex)
+
+        self._path_re = _compile(path_parts)
+        self._name_re = _compile(name_parts)
+        self._dir_path_re = _compile(path_parts + dir_path_parts)
+        self._dir_name_re = _compile(name_parts + dir_name_parts)
+
+    def __bool__(self) -> bool:
+        return bool(self.patterns)
+
+    @property
+    def signature(self) -> str:
+        """Short hash of the patterns, to tell when recorded listings are stale."""
+        joined = "\n".join(self.patterns).encode("utf-8")
+        return hashlib.sha256(joined).hexdigest()[:16]
+
+    def match_file(self, rel_path: str, name: str) -> bool:
+        """Check a file, given its "/"-separated relative path and name."""
+        return _matches(self._path_re, rel_path) or _matches(self._name_re, name)
+
+    def match_dir(self, rel_path: str, name: str) -> bool:
+        """Check a directory, given its "/"-separated relative path and name."""
+        return _matches(self._dir_path_re, rel_path) or _matches(
+            self._dir_name_re, name
+        )
+
+    def is_ignored(self, rel_path: str) -> bool:
+        """Check a file path and every directory above it."""
+        parts = rel_path.split("/")
+        for i, part in enumerate(parts[:-1]):
+            if self.match_dir("/".join(parts[: i + 1]), part):
+                return True
+        return self.match_file(rel_path, parts[-1])
+
+
+def _compile(parts: list[str]) -> re.Pattern[str] | None:
+    if not parts:
+        return None
+    return re.compile("|".join(f"(?:{p})" for p in parts), _IGNORE_FLAGS)
+
+
+def _matches(regex: re.Pattern[str] | None, text: str) -> bool:
+    return regex is not None and regex.match(text) is not None
+
+
+def get_ignore_matcher(root: Path) -> IgnoreMatcher:
+    """Get the compiled .nbignore matcher for a root directory.
+
+    Matchers are cached per root and recompiled only when the .nbignore
+    file's size or mtime changes.
+    """
+    try:
+        st = (root / ".nbignore").stat()
+        key: tuple[int, int] | None = (st.st_size, st.st_mtime_ns)
+    except OSError:
+        key = None
+
+    with _matcher_cache_lock:
+        cached = _matcher_cache.get(root)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+    matcher = IgnoreMatcher(load_nbignore(root) if key is not None else [])
+    with _matcher_cache_lock:
+        _matcher_cache[root] = (key, matcher)
+    return matcher
+
+
+def walk_notes(
+    top: Path,
+    root: Path | None = None,
+    ignore: IgnoreMatcher | None = None,
+    suffix: str = ".md",
+) -> Iterator[os.DirEntry[str]]:
+    """Walk a directory tree and yield the markdown files in it.
+
+    Hidden files and directories (starting with ".") are skipped, and
+    directories are pruned before being listed, so ignored subtrees such as
+    ``.git`` or an .nbignore'd archive are never read. Entries come back in
+    directory-listing order; callers that need a stable order should sort.
+
+    Args:
+        top: Directory to walk.
+        root: Directory that .nbignore patterns are relative to (defaults
+            to top). Use the notes root when walking a single notebook.
+        ignore: Compiled .nbignore patterns (see get_ignore_matcher()).
+        suffix: File extension to yield.
+
+    Yields:
+        os.DirEntry for each matching file. ``Path(entry.path)`` gives the
+        path; ``entry.stat()`` is cached, so change detection can reuse it.
+    """
+    stack: list[tuple[str, str]] = [(str(top), _rel_prefix(top, root))]
+    while stack:
+        dir_path, rel_prefix = stack.pop()
+        listed = _list_dir(dir_path, rel_prefix, ignore, suffix)
+        if listed is None:
+            continue
+        subdirs, files = listed
+        yield from files
+
+        # Reverse so directories are visited in listing order
+        stack.extend(
+            (f"{dir_path}{os.sep}{name}", f"{rel_prefix}{name}/")
+            for name in reversed(subdirs)
+        )
+
+
+@dataclass
+class DirListing:
+    """A directory's subdirectories and note files, as of its mtime."""
+
+    mtime_ns: int
+    subdirs: list[str]
+    files: list[str]
+
+
+@dataclass
+class DirManifest:
+    """Directory listings carried from one walk to the next.
+
+    Used by walk_notes_cached(). ``listings`` holds what the previous walk
+    recorded (keyed by directory path); after a walk, ``changed`` holds the
+    listings to store (None means "forget this directory") and removed()
+    the directories that no longer exist.
+    """
+
+    listings: dict[str, DirListing] = field(default_factory=dict)
+    changed: dict[str, DirListing | None] = field(default_factory=dict)
+    visited: set[str] = field(default_factory=set)
+    relisted: int = 0
+
+    def removed(self) -> list[str]:
+        """Directories recorded previously but not reached by the last walk."""
+        return [path for path in self.listings if path not in self.visited]
+
+
+def walk_notes_cached(
+    top: Path,
+    manifest: DirManifest,
+    root: Path | None = None,
+    ignore: IgnoreMatcher | None = None,
+    suffix: str = ".md",
+) -> Iterator[tuple[Path, os.DirEntry[str] | None]]:
+    """Walk like walk_notes(), re-listing only directories that changed.
+
+    Adding, removing or renaming an entry updates its directory's mtime, so
+    a directory whose mtime matches its recorded listing is not listed
+    again: its files and subdirectories come from the manifest. Only one
+    stat per directory is needed for those. Editing a file in place does
+    not touch the directory, so callers must still stat the files
+    themselves to detect modifications.
+
+    The listing is filtered with ``ignore``, so callers must start from an
+    empty manifest when the .nbignore patterns change.
+
+    Args:
+        top: Directory to walk.
+        manifest: Listings from the previous walk; updated in place.
+        root: Directory that .nbignore patterns are relative to.
+        ignore: Compiled .nbignore patterns.
+        suffix: File extension to yield.
+
+    Yields:
+        (path, entry) for each note file. entry is None for files taken
+        from the manifest.
+    """
+    stack: list[tuple[str, str]] = [(str(top), _rel_prefix(top, root or top))]
+    while stack:
+        dir_path, rel_prefix = stack.pop()
+        manifest.visited.add(dir_path)
+        try:
+            st = Path(dir_path).stat()
+        except OSError:
+            continue
+
+        recorded = manifest.listings.get(dir_path)
+        if recorded is not None and recorded.mtime_ns == st.st_mtime_ns:
+            subdirs = recorded.subdirs
+            for name in recorded.files:
+                yield Path(dir_path, name), None
+        else:
+            manifest.relisted += 1
+            listed = _list_dir(dir_path, rel_prefix, ignore, suffix)
+            if listed is None:
+                continue
+            subdirs, files = listed
+            for entry in files:
+                yield Path(entry.path), entry
+            # A directory changed within the racy window could change again
+            # without its mtime moving, so it is listed again next time.
+            racy = time.time_ns() - st.st_mtime_ns < RACY_WINDOW_NS
+            manifest.changed[dir_path] = (
+                None
+                if racy
+                else DirListing(
+                    st.st_mtime_ns, subdirs, [entry.name for entry in files]
+                )
+            )
+
+        stack.extend(
+            (f"{dir_path}{os.sep}{name}", f"{rel_prefix}{name}/")
+            for name in reversed(subdirs)
+        )
+
+
+def _rel_prefix(top: Path, root: Path | None) -> str:
+    """Get top's path relative to root as a "/"-terminated prefix."""
+    if root is None:
+        return ""
+    try:
+        prefix = top.relative_to(root).as_posix()
+    except ValueError:
+        return ""
+    return "" if prefix == "." else prefix + "/"
+
+
+def _list_dir(
+    dir_path: str,
+    rel_prefix: str,
+    ignore: IgnoreMatcher | None,
+    suffix: str,
+) -> tuple[list[str], list[os.DirEntry[str]]] | None:
+    """List one directory, applying the hidden and .nbignore rules.
+
+    Returns:
+        (subdirectory names to descend into, note file entries), or None if
+        the directory can't be read.
+    """
+    try:
+        with os.scandir(dir_path) as it:
+            entries = list(it)
+    except OSError as e:
+        _logger.debug("Could not list directory %s: %s", dir_path, e)
+        return None
+
+    subdirs: list[str] = []
+    files: list[os.DirEntry[str]] = []
+    for entry in entries:
+        name = entry.name
+        if name.startswith("."):
+            continue
+        rel_path = rel_prefix + name
+        try:
+            is_dir = entry.is_dir(follow_symlinks=False)
+        except OSError:
+            continue
+        if is_dir:
+            if ignore and ignore.match_dir(rel_path, name):
+                continue
+            subdirs.append(name)
+        elif name.endswith(suffix) and entry.is_file():
+            if ignore and ignore.match_file(rel_path, name):
+                continue
+            files.append(entry)
+    return subdirs, files
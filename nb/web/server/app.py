@@ -6,6 +6,7 @@ from fastapi import FastAPI, Response
 from fastapi.responses import HTMLResponse
 
 from nb.web.server.routers import (
+    debug,
     graph,
     history,
     notebooks,
@@ -34,6 +35,7 @@ def create_app(settings: AppSettings | None = None) -> FastAPI:
     app.include_router(todos.router)
     app.include_router(graph.router)
     app.include_router(history.router)
+    app.include_router(debug.router)
 
     @app.get("/", response_class=HTMLResponse)
     @app.get("/index.html", response_class=HTMLResponse)
@@ -0,0 +1,31 @@
+"""SQL profile endpoint, active when the server runs with ``--sql-profile``."""
+
+from __future__ import annotations
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+router = APIRouter()
+
+
+@router.get("/api/debug/sql-profile", response_model=None)
+def sql_profile(top: int = 50) -> dict | JSONResponse:
+    """The most expensive SQL statements run since profiling started."""
+    from nb.index.db import get_profiler
+
+    profiler = get_profiler()
+    if profiler is None:
+        return JSONResponse({"error": "SQL profiling is off"}, status_code=404)
+    return profiler.to_dict(top)
+
+
+@router.delete("/api/debug/sql-profile", response_model=None)
+def reset_sql_profile() -> dict | JSONResponse:
+    """Discard the recorded profile and start counting again."""
+    from nb.index.db import get_profiler
+
+    profiler = get_profiler()
+    if profiler is None:
+        return JSONResponse({"error": "SQL profiling is off"}, status_code=404)
+    profiler.reset()
+    return {"success": True}
@@ -26,6 +26,7 @@ def graph(
     only those notebooks' notes, their tags, and the links between them are
     returned. Omit ``notebook`` to include the whole vault.
     """
+    from nb.core.note_links import resolve_pending_links
     from nb.index.db import get_db
 
     db = get_db()
@@ -109,23 +110,15 @@ def graph(
                 }
             )
 
-    # Add note -> note edges (from links)
+    # Add note -> note edges (from links, resolved at index time)
+    resolve_pending_links(db)
     link_rows = db.fetchall(
-        """SELECT source_path, target_path FROM note_links
-           WHERE is_external = 0"""
+        """SELECT source_path, resolved_target_path FROM note_links
+           WHERE resolved_target_path IS NOT NULL AND is_external = 0"""
     )
     for row in link_rows:
         source = normalize_path(row["source_path"])
-        target = normalize_path(row["target_path"])
-
-        # Resolve target to actual path if it's a partial reference
-        if target not in node_ids:
-            target_stem = Path(target).stem
-            for node_id in node_ids:
-                if Path(node_id).stem == target_stem:
-                    target = node_id
-                    break
-
+        target = normalize_path(row["resolved_target_path"])
         if source in node_ids and target in node_ids:
             edges.append({"source": source, "target": target, "type": "link"})
 
@@ -17,6 +17,9 @@ from nb.web.server.settings import AppSettings
 
 router = APIRouter()
 
+# Leading characters of a note body decompressed to build its snippet
+SNIPPET_SOURCE_CHARS = 4000
+
 
 def _recent_notes(db, notebook: str, external: int = 0, limit: int = 3) -> list[dict]:
     """The most recently modified notes in a notebook (for home-page cards)."""
@@ -204,8 +207,10 @@ def notebook_notes(
     if linked_config:
         # List files from linked note - query database for indexed data
         note_rows = db.fetchall(
-            """SELECT path, title, date, source_alias, mtime, content
-               FROM notes WHERE notebook = ? AND external = 1
+            f"""SELECT path, title, date, source_alias, mtime,
+                      note_text(c.body, {SNIPPET_SOURCE_CHARS}) AS content
+               FROM notes n LEFT JOIN note_content c ON c.note_path = n.path
+               WHERE notebook = ? AND external = 1
                ORDER BY COALESCE(date, '') DESC, mtime DESC""",
             (name,),
         )
@@ -270,8 +275,10 @@ def notebook_notes(
     else:
         # Regular notebook - query database for notes with metadata
         note_rows = db.fetchall(
-            """SELECT path, title, date, external, source_alias, mtime, content
-               FROM notes WHERE notebook = ?
+            f"""SELECT path, title, date, external, source_alias, mtime,
+                      note_text(c.body, {SNIPPET_SOURCE_CHARS}) AS content
+               FROM notes n LEFT JOIN note_content c ON c.note_path = n.path
+               WHERE notebook = ?
                ORDER BY COALESCE(date, '') DESC, mtime DESC""",
             (name,),
         )
@@ -6,7 +6,7 @@ import json
 from datetime import date as date_type
 from datetime import timedelta
 
-from fastapi import APIRouter, Body, Depends
+from fastapi import APIRouter, Body, Depends, Response
 from fastapi.responses import JSONResponse
 
 from nb.config import Config
@@ -17,50 +17,85 @@ from nb.web.server.settings import AppSettings
 router = APIRouter()
 
 
-@router.get("/api/todos")
+# Page size bounds for /api/todos?q=...
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+def _todo_to_dict(t, today: date_type) -> dict:
+    """Serialize a todo for the todo list."""
+    return {
+        "id": t.id,
+        "content": t.content,
+        "due": t.due_date.isoformat() if t.due_date else None,
+        "priority": t.priority.value if t.priority else None,
+        "status": t.status.value,
+        "notebook": t.notebook or "unknown",
+        "path": (normalize_path(t.source.path) if t.source and t.source.path else None),
+        "tags": t.tags or [],
+        "created": t.created_date.isoformat() if t.created_date else None,
+        "isOverdue": (
+            t.due_date_only is not None
+            and t.due_date_only < today
+            and t.status.value != "completed"
+        ),
+        "isDueToday": t.due_date_only == today,
+        "isDueThisWeek": (
+            t.due_date_only is not None
+            and today < t.due_date_only <= today + timedelta(days=7)
+        ),
+    }
+
+
+@router.get("/api/todos", response_model=None)
 def list_todos(
+    response: Response,
     include_excluded: bool = False,
+    q: str | None = None,
+    after: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
     settings: AppSettings = Depends(get_settings),
-) -> list[dict]:
+) -> list[dict] | JSONResponse:
     """All todos (open by default; completed when the viewer was launched with -c).
 
     By default todos from notes/links marked ``todo_exclude`` are hidden; pass
     ``include_excluded=true`` to surface them as well.
-    """
-    from nb.index.todos_repo import get_sorted_todos
 
-    todos = get_sorted_todos(
-        completed=None if settings.show_completed else False,
-        exclude_note_excluded=not include_excluded,
-    )
+    With ``q``, todos are filtered, sorted and paged by an nbql query
+    (``due < +7d and tag=work sort by priority``). The cursor of the next
+    page, if any, is returned in the ``X-Next-Cursor`` header; pass it back
+    as ``after``.
+    """
     today = date_type.today()
 
-    return [
-        {
-            "id": t.id,
-            "content": t.content,
-            "due": t.due_date.isoformat() if t.due_date else None,
-            "priority": t.priority.value if t.priority else None,
-            "status": t.status.value,
-            "notebook": t.notebook or "unknown",
-            "path": (
-                normalize_path(t.source.path) if t.source and t.source.path else None
-            ),
-            "tags": t.tags or [],
-            "created": t.created_date.isoformat() if t.created_date else None,
-            "isOverdue": (
-                t.due_date_only is not None
-                and t.due_date_only < today
-                and t.status.value != "completed"
-            ),
-            "isDueToday": t.due_date_only == today,
-            "isDueThisWeek": (
-                t.due_date_only is not None
-                and today < t.due_date_only <= today + timedelta(days=7)
-            ),
-        }
-        for t in todos[:100]
-    ]
+    if q is None:
+        from nb.index.todos_repo import get_sorted_todos
+
+        todos = get_sorted_todos(
+            completed=None if settings.show_completed else False,
+            exclude_note_excluded=not include_excluded,
+        )
+        return [_todo_to_dict(t, today) for t in todos[:DEFAULT_PAGE_SIZE]]
+
+    from nb.index.nbql import Condition, NbqlError, parse, run_query
+
+    try:
+        query = parse(q, target="todo")
+        if query.target != "todo":
+            raise NbqlError("Only todo queries are supported here")
+        if not settings.show_completed and not query.uses_field("status"):
+            query = query.filter(Condition("status", "=", "open"))
+        page = run_query(
+            query,
+            after=after,
+            limit=max(1, min(limit, MAX_PAGE_SIZE)),
+            include_excluded=include_excluded,
+        )
+    except NbqlError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    return [_todo_to_dict(t, today) for t in page.items]
 
 
 @router.get("/api/kanban/boards")
@@ -94,51 +129,25 @@ def kanban_boards(config: Config = Depends(get_app_config)) -> list[dict]:
     return boards
 
 
-@router.get("/api/kanban/column")
-def kanban_column(filters: str = "{}", notebook: str | None = None) -> list[dict]:
+@router.get("/api/kanban/column", response_model=None)
+def kanban_column(
+    filters: str = "{}", notebook: str | None = None
+) -> list[dict] | JSONResponse:
     """Todos matching a kanban column's filters."""
-    from nb.index.todos_repo import query_todos
-    from nb.models import TodoStatus
+    from nb.index.nbql import NbqlError, query_from_kanban_filters, run_query
 
     try:
         parsed = json.loads(filters)
     except json.JSONDecodeError:
         parsed = {}
 
-    today = date_type.today()
-
-    kwargs: dict = {"parent_only": True, "exclude_note_excluded": True}
-
-    if notebook:
-        kwargs["notebooks"] = [notebook]
-
-    status_val = parsed.get("status")
-    if status_val:
-        kwargs["status"] = TodoStatus(status_val)
-    else:
-        kwargs["completed"] = False
-
-    if parsed.get("due_today"):
-        kwargs["due_start"] = today
-        kwargs["due_end"] = today
-
-    if parsed.get("due_this_week"):
-        kwargs["due_start"] = today
-        kwargs["due_end"] = today + timedelta(days=7)
-
-    if parsed.get("overdue"):
-        kwargs["overdue"] = True
-
-    if parsed.get("priority"):
-        kwargs["priority"] = parsed["priority"]
-
-    if parsed.get("tags") and len(parsed["tags"]) > 0:
-        kwargs["tag"] = parsed["tags"][0]
-
-    todos = query_todos(**kwargs)
-
-    if parsed.get("no_due_date"):
-        todos = [t for t in todos if t.due_date is None]
+    try:
+        query = query_from_kanban_filters(
+            parsed, notebooks=[notebook] if notebook else None
+        )
+        todos = run_query(query, limit=50).items
+    except NbqlError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
 
     return [
         {
@@ -150,7 +159,7 @@ def kanban_column(filters: str = "{}", notebook: str | None = None) -> list[dict
             "notebook": t.notebook,
             "tags": t.tags,
         }
-        for t in todos[:50]
+        for t in todos
     ]
 
 
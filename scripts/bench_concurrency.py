@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Benchmark read latency while a full reindex is writing.
+
+Generates a synthetic vault (see bench_index.py), then times a web-style
+read (a page of open todos) from a second thread, first on an idle index and
+then while `index_all_notes(force=True)` rewrites every note. The reindex
+runs twice: with the WAL read pool, and with reads forced through the
+writer connection as before it existed.
+
+Usage:
+    python scripts/bench_concurrency.py [--notes 2000] [--batch-size 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from bench_index import make_vault  # noqa: E402
+
+
+def measure_reads(stop: threading.Event, min_reads: int = 0) -> list[float]:
+    """Read a page of open todos until stop is set, returning latencies in ms."""
+    from nb.index.db import get_db
+
+    db = get_db()
+    latencies: list[float] = []
+    while not stop.is_set() or len(latencies) < min_reads:
+        start = time.perf_counter()
+        db.fetchall(
+            "SELECT * FROM todos WHERE completed = 0 ORDER BY due_date LIMIT 50"
+        )
+        latencies.append((time.perf_counter() - start) * 1000)
+        time.sleep(0.005)
+    return latencies
+
+
+def run(batch_size: int, read_pool: bool) -> tuple[list[float], list[float]]:
+    """Time reads on an idle index and during a forced reindex."""
+    from nb.index import db as db_module
+    from nb.index import scanner
+
+    db = db_module.get_db()
+    if not read_pool:
+        # Reads fall back to the writer connection and its lock
+        db._wal = False
+
+    stop = threading.Event()
+    stop.set()
+    idle = measure_reads(stop, min_reads=50)
+
+    stop.clear()
+    results: list[float] = []
+    reader = threading.Thread(target=lambda: results.extend(measure_reads(stop)))
+    reader.start()
+    scanner.WRITE_BATCH_SIZE = batch_size
+    scanner.index_all_notes(force=True, index_vectors=False, max_workers=1)
+    stop.set()
+    reader.join()
+    db_module.reset_db()
+    return idle, results
+
+
+def summary(latencies: list[float]) -> str:
+    ordered = sorted(latencies)
+    p95 = ordered[int(len(ordered) * 0.95) - 1] if len(ordered) >= 20 else ordered[-1]
+    return (
+        f"median {statistics.median(ordered):7.2f}ms  p95 {p95:7.2f}ms  "
+        f"max {ordered[-1]:7.2f}ms  ({len(ordered)} reads)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=2000, help="Notes to generate")
+    parser.add_argument(
+        "--batch-size", type=int, default=200, help="Notes per transaction"
+    )
+    args = parser.parse_args()
+
+    import nb.config as config_module
+    from nb.config import Config, NotebookConfig
+    from nb.index import db as db_module
+    from nb.index import scanner
+
+    with tempfile.TemporaryDirectory() as tmp:
+        notes_root = Path(tmp) / "notes"
+        make_vault(notes_root, args.notes)
+        config_module._config = Config(
+            notes_root=notes_root,
+            editor="echo",
+            notebooks=[NotebookConfig(name="projects")],
+        )
+        db_module.reset_db()
+        scanner.index_all_notes(index_vectors=False)
+        db_module.reset_db()
+
+        print(f"Open-todo reads during a reindex of {args.notes} notes:")
+        for label, read_pool in (("writer only", False), ("WAL read pool", True)):
+            idle, busy = run(args.batch_size, read_pool)
+            print(f"  {label}:")
+            print(f"    idle:       {summary(idle)}")
+            print(f"    reindexing: {summary(busy)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Benchmark a full reindex of a synthetic vault.
+
+Generates N notes (each with frontmatter, todos and links) in a temporary
+notes root, then times `index_all_notes(force=True)` with per-note commits
+(a write batch size of 1, close to the old behaviour) and with batched commits
+through Database.bulk(). Vector indexing is disabled so only parsing and
+SQLite writes are measured.
+
+Usage:
+    python scripts/bench_index.py [--notes 2000] [--workers 1] [--batch-size 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+
+def make_vault(notes_root: Path, count: int) -> None:
+    """Write count synthetic notes under notes_root/projects."""
+    notebook = notes_root / "projects"
+    notebook.mkdir(parents=True)
+    for i in range(count):
+        todos = "".join(
+            f"- [ ] Task {j} of note {i} @due(2025-02-01) #work\n" for j in range(5)
+        )
+        (notebook / f"note-{i:05d}.md").write_text(
+            f"---\ntags: [bench, n{i % 10}]\ndate: 2025-01-01\n---\n"
+            f"# Note {i}\n\nSee [[projects/note-{(i + 1) % count:05d}]].\n\n{todos}",
+            encoding="utf-8",
+        )
+
+
+def run(notes_root: Path, batch_size: int, workers: int) -> float:
+    """Reindex the vault from an empty database and return the wall time."""
+    from nb.index import db as db_module
+    from nb.index import scanner
+
+    db_module.reset_db()
+    db_path = notes_root / ".nb" / "index.db"
+    if db_path.exists():
+        db_path.unlink()
+
+    scanner.WRITE_BATCH_SIZE = batch_size
+    start = time.perf_counter()
+    scanner.index_all_notes(force=True, index_vectors=False, max_workers=workers)
+    elapsed = time.perf_counter() - start
+    db_module.reset_db()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=2000, help="Notes to generate")
+    parser.add_argument("--workers", type=int, default=1, help="Parser processes")
+    parser.add_argument(
+        "--batch-size", type=int, default=200, help="Notes per transaction"
+    )
+    args = parser.parse_args()
+
+    import nb.config as config_module
+    from nb.config import Config, NotebookConfig
+
+    with tempfile.TemporaryDirectory() as tmp:
+        notes_root = Path(tmp) / "notes"
+        make_vault(notes_root, args.notes)
+        config_module._config = Config(
+            notes_root=notes_root,
+            editor="echo",
+            notebooks=[NotebookConfig(name="projects")],
+        )
+
+        per_note = run(notes_root, 1, args.workers)
+        batched = run(notes_root, args.batch_size, args.workers)
+
+    print(f"Full reindex of {args.notes} notes ({args.workers} worker(s)):")
+    print(f"  commit per note:        {per_note:7.2f}s")
+    print(f"  batch of {args.batch_size:<5} notes:    {batched:7.2f}s")
+    print(f"  speedup:                {per_note / batched:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Benchmark index size and metadata-query latency with large note bodies.
+
+Generates a synthetic vault (see bench_index.py) where every 20th note is a
+large clipped article, indexes it, and reports the database size and the
+median latency of queries that only need note metadata (the sidebar tree, a
+notebook listing, a todo/notes join, a full pass over notes) and of a
+keyword search, which reads bodies.
+
+Usage:
+    python scripts/bench_note_content.py [--notes 2000] [--article-kib 64]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from bench_index import make_vault  # noqa: E402
+
+QUERIES = {
+    "tree": "SELECT path, title, notebook FROM notes ORDER BY path",
+    "notebook listing": """SELECT path, title, date, mtime FROM notes
+        WHERE notebook = 'projects' ORDER BY COALESCE(date, '') DESC, mtime DESC""",
+    "todo join": """SELECT t.id, n.title FROM todos t
+        JOIN notes n ON n.path = t.note_path WHERE n.notebook = 'projects'""",
+    "notes full pass": "SELECT COUNT(*), MAX(mtime), MAX(title) FROM notes",
+}
+
+
+def add_articles(notes_root: Path, count: int, size_kib: int) -> None:
+    """Append a large pseudo-random article to every 20th note."""
+    rng = random.Random(0)
+    words = [
+        "".join(rng.choices("abcdefghijklmnopqrstuvwxyz", k=rng.randint(2, 9)))
+        for _ in range(3000)
+    ]
+    for i in range(0, count, 20):
+        text = []
+        size = 0
+        while size < size_kib * 1024:
+            sentence = " ".join(rng.choices(words, k=rng.randint(8, 20))) + ".\n"
+            text.append(sentence)
+            size += len(sentence)
+        path = notes_root / "projects" / f"note-{i:05d}.md"
+        with path.open("a", encoding="utf-8") as f:
+            f.write("\n## Clipped\n\n" + "".join(text))
+
+
+def time_query(db, sql: str, runs: int = 30) -> float:
+    """Median wall time of a query in milliseconds."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        db.fetchall(sql)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=2000, help="Notes to generate")
+    parser.add_argument(
+        "--article-kib", type=int, default=64, help="Size of each large note"
+    )
+    args = parser.parse_args()
+
+    import nb.config as config_module
+    from nb.config import Config, NotebookConfig
+    from nb.index import db as db_module
+    from nb.index import scanner
+    from nb.index.fts_repo import search_notes_fts
+    from nb.index.search import KEYWORD_SNIPPET_CHARS
+
+    with tempfile.TemporaryDirectory() as tmp:
+        notes_root = Path(tmp) / "notes"
+        make_vault(notes_root, args.notes)
+        add_articles(notes_root, args.notes, args.article_kib)
+        config_module._config = Config(
+            notes_root=notes_root,
+            editor="echo",
+            notebooks=[NotebookConfig(name="projects")],
+        )
+
+        start = time.perf_counter()
+        scanner.index_all_notes(force=True, index_vectors=False)
+        elapsed = time.perf_counter() - start
+
+        db = db_module.get_db()
+        db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        db.connect().execute("VACUUM")
+        size = db.path.stat().st_size
+
+        print(f"{args.notes} notes, every 20th with a {args.article_kib} KiB article")
+        print(f"  full index:            {elapsed:8.2f}s")
+        print(f"  database size:         {size / 1024 / 1024:8.2f} MiB")
+        for name, sql in QUERIES.items():
+            print(f"  {name + ':':<22} {time_query(db, sql):8.2f} ms")
+        times = []
+        for _ in range(30):
+            start = time.perf_counter()
+            search_notes_fts(
+                ["note", "clipped"], limit=20, context=KEYWORD_SNIPPET_CHARS
+            )
+            times.append((time.perf_counter() - start) * 1000)
+        print(f"  {'keyword search:':<22} {statistics.median(times):8.2f} ms")
+        db_module.reset_db()
+
+
+if __name__ == "__main__":
+    main()
@@ -108,7 +108,9 @@ def temp_config(temp_notes_root: Path) -> Generator[Config]:
 
 
 @pytest.fixture
-def mock_config(temp_config: Config, monkeypatch: pytest.MonkeyPatch) -> Config:
+def mock_config(
+    temp_config: Config, monkeypatch: pytest.MonkeyPatch
+) -> Generator[Config]:
     """Mock get_config() to return temp_config.
 
     This patches get_config in BOTH nb.config AND all modules that import it
@@ -127,7 +129,9 @@ def mock_config(temp_config: Config, monkeypatch: pytest.MonkeyPatch) -> Config:
     monkeypatch.setattr(notebooks_module, "get_config", lambda: temp_config)
     monkeypatch.setattr(note_links_module, "get_config", lambda: temp_config)
     monkeypatch.setattr(summarize_module, "get_config", lambda: temp_config)
-    return temp_config
+    yield temp_config
+    # Let a background index finish before the patches are undone
+    scanner_module.wait_for_background_index()
 
 
 @pytest.fixture
@@ -269,7 +273,9 @@ def cli_config(tmp_path: Path) -> Generator[Config]:
 
 
 @pytest.fixture
-def mock_cli_config(cli_config: Config, monkeypatch: pytest.MonkeyPatch) -> Config:
+def mock_cli_config(
+    cli_config: Config, monkeypatch: pytest.MonkeyPatch
+) -> Generator[Config]:
     """Mock get_config() to return cli_config for CLI tests.
 
     This patches get_config in BOTH nb.config AND all modules that import it
@@ -288,7 +294,9 @@ def mock_cli_config(cli_config: Config, monkeypatch: pytest.MonkeyPatch) -> Conf
     monkeypatch.setattr(notebooks_module, "get_config", lambda: cli_config)
     monkeypatch.setattr(note_links_module, "get_config", lambda: cli_config)
     monkeypatch.setattr(summarize_module, "get_config", lambda: cli_config)
-    return cli_config
+    yield cli_config
+    # Let a background index finish before the patches are undone
+    scanner_module.wait_for_background_index()
 
 
 @pytest.fixture
@@ -116,6 +116,21 @@ class TestIndexCommand:
 
         assert result.exit_code == 0
 
+    def test_index_status_and_resume(
+        self, cli_runner: CliRunner, mock_cli_config: Config
+    ):
+        notes_root = mock_cli_config.notes_root
+        (notes_root / "projects" / "note.md").write_text("# Test Note\n")
+
+        result = cli_runner.invoke(cli, ["index", "--resume"])
+        assert "No interrupted index run" in result.output
+
+        cli_runner.invoke(cli, ["index"])
+        result = cli_runner.invoke(cli, ["index", "--status"])
+
+        assert result.exit_code == 0
+        assert "files: done 1/1" in result.output
+
 
 class TestTodoCommands:
     """Tests for todo subcommands."""
@@ -19,7 +19,7 @@ class TestSearchCommand:
 
         result = cli_runner.invoke(cli, ["search", "--keyword", "Keyword"])
         assert result.exit_code == 0
-        # Should find the match
+        assert "search-test.md" in result.output
 
     def test_search_with_tag_filter(
         self, cli_runner: CliRunner, mock_cli_config: Config
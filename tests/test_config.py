@@ -389,6 +389,10 @@ class TestParseEmbeddings:
         assert result.provider == "openai"
         assert result.api_key == "sk-xxx"
 
+    def test_cache_size(self):
+        assert _parse_embeddings(None).cache_size_mb == 512
+        assert _parse_embeddings({"cache_size_mb": 0}).cache_size_mb == 0
+
 
 class TestLoadConfig:
     """Tests for load_config function."""
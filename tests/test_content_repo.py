@@ -0,0 +1,75 @@
+"""Tests for note body storage (note_content)."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from nb.core.notes import delete_note
+from nb.index.content_repo import get_note_content
+from nb.index.db import (
+    MIGRATIONS,
+    Database,
+    apply_migrations,
+    get_db,
+    set_schema_version,
+)
+from nb.index.fts_repo import find_notes_containing
+from nb.index.scanner import index_all_notes
+
+BODY = "# Plan\n\n" + "The quick brown fox jumps over the lazy dog.\n" * 50
+
+
+class TestNoteContent:
+    """Tests for storing note bodies outside the notes table."""
+
+    def test_indexed_body_stored_packed(self, mock_config, create_note):
+        create_note("projects", "plan.md", BODY)
+        index_all_notes(index_vectors=False)
+
+        row = get_db().fetchone(
+            "SELECT body, note_text(body) AS text, note_text(body, 6) AS head "
+            "FROM note_content WHERE note_path = ?",
+            ("projects/plan.md",),
+        )
+
+        assert get_note_content("projects/plan.md") == BODY
+        assert row["text"] == BODY
+        assert row["head"] == "# Plan"
+        assert len(row["body"]) < len(BODY) // 4
+
+    def test_full_text_index_follows_edits(self, mock_config, create_note):
+        plan = create_note("projects", "plan.md", BODY)
+        create_note("projects", "other.md", "Nothing to see here\n")
+        index_all_notes(index_vectors=False)
+        assert find_notes_containing(["lazy dog"]) == {"projects/plan.md"}
+
+        plan.write_text("# Plan\n\nA sleepy cat.\n", encoding="utf-8")
+        index_all_notes(index_vectors=False)
+        assert find_notes_containing(["lazy dog"]) == set()
+        assert find_notes_containing(["sleepy cat"]) == {"projects/plan.md"}
+
+        delete_note(plan, mock_config.notes_root)
+        assert find_notes_containing(["sleepy cat"]) == set()
+        assert get_note_content("projects/plan.md") is None
+
+    def test_migration_moves_bodies(self, tmp_path: Path):
+        db = Database(tmp_path / "test.db")
+        try:
+            for version in range(1, 29):
+                db.connect().executescript(MIGRATIONS[version])
+            set_schema_version(db, 28)
+            db.executemany(
+                "INSERT INTO notes (path, title, content) VALUES (?, ?, ?)",
+                [("a.md", "A", BODY), ("b.md", "B", "")],
+            )
+            db.commit()
+
+            apply_migrations(db)
+
+            columns = {row["name"] for row in db.fetchall("PRAGMA table_info(notes)")}
+            assert "content" not in columns
+            assert get_note_content("a.md", db=db) == BODY
+            assert get_note_content("b.md", db=db) is None
+            assert find_notes_containing(["brown fox"], db=db) == {"a.md"}
+        finally:
+            db.close()
@@ -0,0 +1,136 @@
+"""Tests for the full-text index (notes_fts) and its uses."""
+
+import os
+import re
+import time
+
+from nb.index.content_repo import set_note_content
+from nb.index.db import get_db
+from nb.index.fts_repo import find_notes_containing, search_notes_fts
+from nb.index.scanner import index_all_notes
+from nb.index.search import (
+    _prefilter_grep_files,
+    _required_literals,
+    grep_notes,
+    keyword_search,
+)
+
+
+def _add_note(path: str, content: str, notebook: str = "projects") -> None:
+    db = get_db()
+    db.execute(
+        "INSERT OR REPLACE INTO notes (path, title, notebook) VALUES (?, ?, ?)",
+        (path, path, notebook),
+    )
+    set_note_content(path, content, db=db)
+    db.commit()
+
+
+class TestFindNotesContaining:
+    """Tests for find_notes_containing function."""
+
+    def test_substring_match_case_insensitive(self, mock_config):
+        _add_note("projects/a.md", "The Quick brown fox")
+        _add_note("projects/b.md", "A slow turtle")
+
+        assert find_notes_containing(["quick BROWN"]) == {"projects/a.md"}
+        assert find_notes_containing(["uic", "row"]) == {"projects/a.md"}
+        assert find_notes_containing(["fox", "turtle"]) == set()
+
+    def test_short_terms_not_looked_up(self, mock_config):
+        assert find_notes_containing(["ab", ""]) is None
+
+    def test_follows_replace_and_delete(self, mock_config):
+        _add_note("projects/a.md", "first version")
+        _add_note("projects/a.md", "second version")
+
+        assert find_notes_containing(["first"]) == set()
+        assert find_notes_containing(["second"]) == {"projects/a.md"}
+
+        get_db().execute("DELETE FROM notes WHERE path = ?", ("projects/a.md",))
+        get_db().commit()
+        assert find_notes_containing(["second"]) == set()
+
+
+class TestSearchNotesFts:
+    """Tests for search_notes_fts function."""
+
+    def test_ranks_and_filters(self, mock_config):
+        _add_note("projects/a.md", "kiwi kiwi kiwi and mango")
+        _add_note("projects/b.md", "one kiwi among many other words here")
+        _add_note("work/c.md", "kiwi", notebook="work")
+
+        rows = search_notes_fts(["kiwi"], notebook="projects")
+
+        assert [row["path"] for row in rows] == ["projects/a.md", "projects/b.md"]
+
+    def test_content_unpacked_near_first_match(self, mock_config):
+        body = "intro " + "filler " * 1000 + "the Kiwi grove " + "more " * 100_000
+        _add_note("projects/a.md", body)
+
+        full = search_notes_fts(["kiwi"])[0]["content"]
+        near = search_notes_fts(["kiwi"], context=200)[0]["content"]
+
+        assert full == body
+        assert "the Kiwi grove" in near
+        assert body.startswith(near)
+        assert len(near) < len(body) // 10
+
+
+class TestRequiredLiterals:
+    """Tests for _required_literals function."""
+
+    def test_literal_runs(self):
+        assert _required_literals("hello world") == ["hello world"]
+        assert _required_literals(r"def \w+\(\):") == ["def ", "():"]
+        assert _required_literals("foo.*bar") == ["foo", "bar"]
+
+    def test_optional_parts_dropped(self):
+        assert _required_literals("colou?r") == ["colo", "r"]
+        assert _required_literals("(draft|final) report") == [" report"]
+        assert _required_literals("x[abc]yz") == ["x", "yz"]
+
+    def test_top_level_alternation(self):
+        assert _required_literals("foo|bar") == []
+
+
+class TestGrepPrefilter:
+    """Tests for grep_notes with the full-text prefilter."""
+
+    def test_finds_indexed_matches(self, mock_config, create_note):
+        a = create_note("projects", "a.md", "# A\n\nneedle in a haystack\n")
+        b = create_note("projects", "b.md", "# B\n\nonly hay\n")
+        # Freshly written files aren't trusted by the manifest (racy stat)
+        past = time.time() - 60
+        for path in (a, b):
+            os.utime(path, (past, past))
+        index_all_notes(index_vectors=False)
+
+        regex = re.compile(r"need\w+ in", re.IGNORECASE)
+        assert _prefilter_grep_files(regex, [a, b], mock_config.notes_root) == [a]
+        results = grep_notes(regex.pattern, mock_config.notes_root)
+        assert [r.path.name for r in results] == ["a.md"]
+
+    def test_changed_files_still_read(self, mock_config, create_note):
+        path = create_note("projects", "a.md", "# A\n\nold text\n")
+        index_all_notes(index_vectors=False)
+        path.write_text("# A\n\nnew needle\n", encoding="utf-8")
+
+        results = grep_notes("needle", mock_config.notes_root)
+
+        assert [r.line_content for r in results] == ["new needle"]
+
+
+class TestKeywordSearch:
+    """Tests for keyword_search function."""
+
+    def test_search_without_vector_store(self, mock_config, create_note):
+        create_note("projects", "a.md", "# Alpha\n\nzebra crossing\n")
+        create_note("projects", "b.md", "# Beta\n\nnothing here\n")
+        index_all_notes(index_vectors=False)
+
+        results = keyword_search("zebra", score_threshold=0)
+
+        assert [r.path for r in results] == ["projects/a.md"]
+        assert results[0].score == 1.0
+        assert "zebra crossing" in results[0].snippet
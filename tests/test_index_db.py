@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import pytest
@@ -165,6 +166,136 @@ class TestDatabase:
         finally:
             db.close()
 
+    def test_wal_mode(self, tmp_path: Path):
+        db = Database(tmp_path / "test.db")
+
+        try:
+            assert db.fetchone("PRAGMA journal_mode")[0] == "wal"
+            assert db.fetchone("PRAGMA foreign_keys")[0] == 1
+        finally:
+            db.close()
+
+    def test_own_uncommitted_writes_visible(self, tmp_path: Path):
+        db = Database(tmp_path / "test.db")
+
+        def read_elsewhere() -> list[str]:
+            return [r["name"] for r in db.fetchall("SELECT name FROM test")]
+
+        try:
+            db.execute("CREATE TABLE test (name TEXT)")
+            db.execute("INSERT INTO test (name) VALUES ('pending')")
+            assert db.fetchone("SELECT name FROM test")["name"] == "pending"
+
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                assert pool.submit(read_elsewhere).result() == []
+                db.commit()
+                assert pool.submit(read_elsewhere).result() == ["pending"]
+        finally:
+            db.close()
+
+    def test_reads_not_blocked_by_bulk_session(self, tmp_path: Path):
+        db = Database(tmp_path / "test.db")
+
+        try:
+            db.execute("CREATE TABLE test (name TEXT)")
+            db.execute("INSERT INTO test (name) VALUES ('committed')")
+            db.commit()
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                with db.bulk(batch_size=100, max_seconds=60) as bulk:
+                    with bulk.item():
+                        db.execute("INSERT INTO test (name) VALUES ('batched')")
+                    # The batch holds the writer lock until it commits
+                    future = pool.submit(db.fetchall, "SELECT name FROM test")
+                    rows = future.result(timeout=5)
+                    assert [r["name"] for r in rows] == ["committed"]
+        finally:
+            db.close()
+
+
+class TestBulkWriter:
+    """Tests for Database.bulk() sessions."""
+
+    @pytest.fixture
+    def db(self, tmp_path: Path):
+        db = Database(tmp_path / "test.db")
+        db.execute("CREATE TABLE test (id INTEGER PRIMARY KEY, name TEXT)")
+        db.commit()
+        yield db
+        db.close()
+
+    @staticmethod
+    def _committed_names(db: Database) -> list[str]:
+        # A second connection only sees committed rows
+        other = Database(db.path)
+        try:
+            return [
+                r["name"] for r in other.fetchall("SELECT name FROM test ORDER BY id")
+            ]
+        finally:
+            other.close()
+
+    def test_commits_once_per_batch(self, db: Database):
+        with db.bulk(batch_size=3, max_seconds=60) as bulk:
+            for i in range(4):
+                with bulk.item():
+                    db.execute("INSERT INTO test (name) VALUES (?)", (f"n{i}",))
+                    db.commit()  # Deferred
+                if i == 1:
+                    assert self._committed_names(db) == []
+            assert self._committed_names(db) == ["n0", "n1", "n2"]
+
+        assert self._committed_names(db) == ["n0", "n1", "n2", "n3"]
+        assert bulk.batches == 2
+        assert bulk.committed == 4
+
+    def test_flushes_on_time_window(self, db: Database):
+        with db.bulk(batch_size=100, max_seconds=0) as bulk:
+            with bulk.item():
+                db.execute("INSERT INTO test (name) VALUES ('a')")
+            assert self._committed_names(db) == ["a"]
+
+    def test_failed_item_rolled_back_alone(self, db: Database):
+        with db.bulk() as bulk:
+            with bulk.item():
+                db.execute("INSERT INTO test (name) VALUES ('good')")
+            with pytest.raises(ValueError):
+                with bulk.item():
+                    db.execute("INSERT INTO test (name) VALUES ('bad')")
+                    raise ValueError("boom")
+            with bulk.item():
+                db.execute("INSERT INTO test (name) VALUES ('also good')")
+
+        assert self._committed_names(db) == ["good", "also good"]
+        assert bulk.rolled_back == 1
+
+    def test_error_rolls_back_current_batch_only(self, db: Database):
+        with pytest.raises(RuntimeError):
+            with db.bulk(batch_size=2, max_seconds=60) as bulk:
+                for name in ("a", "b", "c"):
+                    with bulk.item():
+                        db.execute("INSERT INTO test (name) VALUES (?)", (name,))
+                raise RuntimeError("interrupted")
+
+        assert self._committed_names(db) == ["a", "b"]
+        assert bulk.rolled_back == 1
+
+    def test_nested_session_and_transaction_join_outer(self, db: Database):
+        with db.bulk(batch_size=100, max_seconds=60) as outer:
+            with db.bulk() as inner:
+                assert inner is outer
+            with db.transaction() as conn:
+                conn.execute("INSERT INTO test (name) VALUES ('x')")
+            assert self._committed_names(db) == []
+
+        assert self._committed_names(db) == ["x"]
+
+    def test_commit_outside_session_not_deferred(self, db: Database):
+        with db.bulk():
+            pass
+        db.execute("INSERT INTO test (name) VALUES ('after')")
+        db.commit()
+        assert self._committed_names(db) == ["after"]
+
 
 class TestSchemaVersion:
     """Tests for schema version functions."""
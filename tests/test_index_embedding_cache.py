@@ -0,0 +1,134 @@
+"""Tests for nb.index.embedding_cache module."""
+
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from nb.config import EmbeddingsConfig
+from nb.index.embedding_cache import EmbeddingCache, attach_cache, cache_namespace
+
+DIM = 4
+VECTOR_BYTES = DIM * 4
+
+
+def _vectors(*values: float) -> np.ndarray:
+    return np.array([[v] * DIM for v in values], dtype=np.float32)
+
+
+@pytest.fixture
+def cache(tmp_path: Path):
+    cache = EmbeddingCache(tmp_path / "embedding_cache.db", max_bytes=1024 * 1024)
+    yield cache
+    cache.close()
+
+
+class FakeProvider:
+    """Embedding provider that records what it was asked to embed."""
+
+    def __init__(self):
+        self.requests: list[list[str]] = []
+
+    async def embed_batch(
+        self, texts, batch_size=None, progress_callback=None, *, task="document"
+    ):
+        self.requests.append(list(texts))
+        return np.array([[len(t)] * DIM for t in texts], dtype=np.float32)
+
+    def embed_sync(self, texts, batch_size=None, *, task="document"):
+        return asyncio.run(self.embed_batch(texts, batch_size, task=task))
+
+
+class TestEmbeddingCache:
+    """Tests for EmbeddingCache."""
+
+    def test_round_trip_and_counters(self, cache):
+        assert cache.get_many("ns", ["a", "b"]) == [None, None]
+        cache.put_many("ns", ["a", "b"], _vectors(1.0, 2.0))
+
+        vectors = cache.get_many("ns", ["b", "a", "c"])
+
+        assert vectors[0].tolist() == [2.0] * DIM
+        assert vectors[1].tolist() == [1.0] * DIM
+        assert vectors[2] is None
+        assert (cache.hits, cache.misses) == (2, 3)
+
+    def test_namespaces_are_separate(self, cache):
+        cache.put_many("openai|small", ["a"], _vectors(1.0))
+        assert cache.get_many("openai|large", ["a"]) == [None]
+
+    def test_persists_across_instances(self, tmp_path: Path):
+        path = tmp_path / "embedding_cache.db"
+        first = EmbeddingCache(path, max_bytes=1024)
+        first.put_many("ns", ["a"], _vectors(1.0))
+        first.close()
+
+        second = EmbeddingCache(path, max_bytes=1024)
+        assert second.size_bytes == VECTOR_BYTES
+        assert second.get_many("ns", ["a"])[0] is not None
+        second.close()
+
+    def test_evicts_least_recently_used(self, tmp_path: Path, monkeypatch):
+        clock = iter(range(100))
+        monkeypatch.setattr("nb.index.embedding_cache.time.time", lambda: next(clock))
+        cache = EmbeddingCache(tmp_path / "c.db", max_bytes=3 * VECTOR_BYTES)
+
+        cache.put_many("ns", ["a"], _vectors(1.0))
+        cache.put_many("ns", ["b"], _vectors(2.0))
+        cache.put_many("ns", ["c"], _vectors(3.0))
+        cache.get_many("ns", ["a"])  # "b" and "c" are now the least recently used
+        cache.put_many("ns", ["d"], _vectors(4.0))
+
+        # Evicted down to 90% of the limit, oldest first
+        assert cache.get_many("ns", ["b", "c"]) == [None, None]
+        assert all(v is not None for v in cache.get_many("ns", ["a", "d"]))
+        assert cache.evictions == 2
+        assert cache.size_bytes == 2 * VECTOR_BYTES
+        cache.close()
+
+
+class TestAttachCache:
+    """Tests for attach_cache."""
+
+    def test_only_missing_texts_embedded(self, cache):
+        provider = FakeProvider()
+        attach_cache(provider, cache, EmbeddingsConfig())
+
+        first = provider.embed_sync(["one", "three"])
+        second = provider.embed_sync(["three", "seven", "seven"])
+
+        assert provider.requests == [["one", "three"], ["seven"]]
+        assert first.tolist() == [[3.0] * DIM, [5.0] * DIM]
+        assert second.tolist() == [[5.0] * DIM, [5.0] * DIM, [5.0] * DIM]
+
+    def test_rebuild_costs_no_calls(self, cache):
+        texts = [f"chunk {i}" for i in range(50)]
+        provider = FakeProvider()
+        attach_cache(provider, cache, EmbeddingsConfig())
+        provider.embed_sync(texts)
+
+        # A fresh provider (e.g. after the vector store was reset) hits the cache
+        rebuilt = FakeProvider()
+        attach_cache(rebuilt, cache, EmbeddingsConfig())
+        rebuilt.embed_sync(texts)
+
+        assert rebuilt.requests == []
+
+    def test_queries_and_models_keyed_separately(self, cache):
+        provider = FakeProvider()
+        attach_cache(provider, cache, EmbeddingsConfig())
+        provider.embed_sync(["text"])
+        provider.embed_sync(["text"], task="query")
+
+        other = FakeProvider()
+        attach_cache(other, cache, EmbeddingsConfig(model="other-model"))
+        other.embed_sync(["text"])
+
+        assert provider.requests == [["text"], ["text"]]
+        assert other.requests == [["text"]]
+        assert cache_namespace(EmbeddingsConfig()) != cache_namespace(
+            EmbeddingsConfig(chunk_size=200)
+        )
@@ -0,0 +1,208 @@
+"""Tests for index database maintenance (nb index --optimize)."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from nb.cli import cli
+from nb.config import Config
+from nb.index.db import Database, init_db
+from nb.index.jobs_repo import (
+    JOB_DONE,
+    JOB_OPTIMIZE,
+    create_job,
+    finish_job,
+    get_recent_jobs,
+    get_unfinished_job,
+)
+from nb.index.maintenance import get_db_stats, optimize_db, optimize_due
+
+
+@pytest.fixture
+def db(tmp_path: Path):
+    database = Database(tmp_path / "test.db")
+    init_db(database)
+    yield database
+    database.close()
+
+
+def _add_notes(db: Database, count: int, notebook: str = "work") -> None:
+    db.executemany(
+        "INSERT INTO notes (path, title, notebook, date, mtime) VALUES (?, ?, ?, ?, ?)",
+        [
+            (f"{notebook}/n{i}.md", "x" * 500, notebook, "2025-01-01", float(i))
+            for i in range(count)
+        ],
+    )
+    db.commit()
+
+
+def _plan(db: Database, sql: str, params: tuple = ()) -> str:
+    rows = db.fetchall(f"EXPLAIN QUERY PLAN {sql}", params)
+    return " | ".join(row["detail"] for row in rows)
+
+
+class TestDbStats:
+    """Tests for get_db_stats."""
+
+    def test_page_counts(self, db):
+        _add_notes(db, 50)
+
+        stats = get_db_stats(db)
+
+        assert stats.page_size > 0
+        assert stats.page_count > 0
+        assert stats.size_bytes == stats.page_size * stats.page_count
+        assert 0 <= stats.free_ratio < 1
+
+    def test_per_table_usage(self, db):
+        _add_notes(db, 200)
+
+        stats = get_db_stats(db)
+
+        notes = next(t for t in stats.tables if t.name == "notes")
+        assert notes.pages > 1
+        assert 0 < notes.fill_ratio <= 1
+        assert stats.tables == sorted(stats.tables, key=lambda t: -t.pages)
+
+
+class TestOptimize:
+    """Tests for optimize_db."""
+
+    def test_analyzes_and_records_job(self, db):
+        _add_notes(db, 20)
+
+        result = optimize_db(db=db)
+
+        assert db.fetchone("SELECT COUNT(*) FROM sqlite_stat1")[0] > 0
+        assert not result.vacuumed
+        jobs = get_recent_jobs(1, kind=JOB_OPTIMIZE, db=db)
+        assert jobs[0].status == JOB_DONE
+
+    def test_vacuums_fragmented_database(self, db):
+        _add_notes(db, 2000)
+        db.execute("DELETE FROM notes")
+        db.commit()
+        assert get_db_stats(db).free_ratio > 0.5
+
+        result = optimize_db(db=db)
+
+        assert result.vacuumed
+        assert result.after.freelist_count == 0
+        assert result.after.page_count < result.before.page_count
+
+    def test_vacuum_can_be_skipped(self, db):
+        _add_notes(db, 2000)
+        db.execute("DELETE FROM notes")
+        db.commit()
+
+        result = optimize_db(vacuum=False, db=db)
+
+        assert not result.vacuumed
+        assert result.after.freelist_count > 0
+
+    def test_optimize_jobs_not_resumed(self, db):
+        job_id = create_job(JOB_OPTIMIZE, db=db)
+        finish_job(job_id, interrupted=True, db=db)
+
+        assert get_unfinished_job(db=db) is None
+        assert not get_recent_jobs(1, db=db)[0].resumable
+
+
+class TestOptimizeDue:
+    """Tests for optimize_due."""
+
+    def test_due_without_previous_pass(self, db):
+        assert optimize_due(24, db=db)
+
+    def test_not_due_after_pass(self, db):
+        optimize_db(db=db)
+
+        assert not optimize_due(24, db=db)
+
+    def test_due_after_interval(self, db):
+        optimize_db(db=db)
+        old = (datetime.now() - timedelta(hours=25)).isoformat()
+        db.execute("UPDATE index_jobs SET started_at = ?", (old,))
+        db.commit()
+
+        assert optimize_due(24, db=db)
+
+    def test_disabled(self, db):
+        assert not optimize_due(0, db=db)
+
+
+class TestHotQueryIndexes:
+    """The listing and history queries are served by indexes, without sorts."""
+
+    def test_note_tree(self, db):
+        plan = _plan(
+            db,
+            """SELECT path, title FROM notes
+               ORDER BY notebook, COALESCE(date, '') DESC, mtime DESC""",
+        )
+
+        assert "idx_notes_listing" in plan
+        assert "TEMP B-TREE" not in plan
+
+    def test_notebook_listing(self, db):
+        plan = _plan(
+            db,
+            """SELECT path FROM notes WHERE notebook = ?
+               ORDER BY COALESCE(date, '') DESC, mtime DESC""",
+            ("work",),
+        )
+
+        assert "idx_notes_listing" in plan
+        assert "TEMP B-TREE" not in plan
+
+    def test_recent_notes(self, db):
+        plan = _plan(
+            db,
+            "SELECT path FROM notes WHERE notebook = ? ORDER BY mtime DESC LIMIT 3",
+            ("work",),
+        )
+
+        assert "idx_notes_recent" in plan
+        assert "TEMP B-TREE" not in plan
+
+    def test_view_history(self, db):
+        recent = _plan(
+            db, "SELECT note_path, viewed_at FROM note_views ORDER BY viewed_at DESC"
+        )
+        last_viewed = _plan(
+            db,
+            "SELECT note_path, MAX(viewed_at) FROM note_views GROUP BY note_path",
+        )
+
+        assert "COVERING INDEX idx_note_views_time_note" in recent
+        assert "COVERING INDEX idx_note_views_note_time" in last_viewed
+
+
+class TestOptimizeCommand:
+    """Tests for nb index --optimize."""
+
+    def test_reports_database(self, mock_cli_config: Config):
+        result = CliRunner().invoke(cli, ["index", "--optimize"])
+
+        assert result.exit_code == 0, result.output
+        assert "Optimized" in result.output
+        assert "pages of" in result.output
+
+    def test_vacuum_requires_optimize(self, mock_cli_config: Config):
+        result = CliRunner().invoke(cli, ["index", "--vacuum"])
+
+        assert result.exit_code == 1
+        assert "--vacuum requires --optimize" in result.output
+
+    def test_shown_in_status(self, mock_cli_config: Config):
+        runner = CliRunner()
+        runner.invoke(cli, ["index", "--optimize", "--vacuum"])
+
+        result = runner.invoke(cli, ["index", "--status"])
+
+        assert "optimize: done" in result.output
@@ -0,0 +1,155 @@
+"""Tests for the SQL statement profiler."""
+
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+from fastapi.testclient import TestClient
+
+from nb.cli import cli
+from nb.config import Config
+from nb.index.db import (
+    Database,
+    get_profiler,
+    init_db,
+    start_profiling,
+    stop_profiling,
+)
+from nb.index.profiler import normalize_sql
+from nb.web.server import create_app
+
+
+@pytest.fixture(autouse=True)
+def _stop_profiling():
+    """Never leave a profiler running into other tests."""
+    yield
+    stop_profiling()
+
+
+@pytest.fixture
+def db(tmp_path: Path):
+    database = Database(tmp_path / "test.db")
+    init_db(database)
+    yield database
+    database.close()
+
+
+class TestNormalizeSql:
+    """Tests for normalize_sql."""
+
+    def test_literals_and_whitespace(self):
+        sql = """SELECT * FROM todos
+                 WHERE status = 'pending' AND priority > 2 LIMIT 10"""
+
+        assert normalize_sql(sql) == (
+            "SELECT * FROM todos WHERE status = ? AND priority > ? LIMIT ?"
+        )
+
+    def test_in_lists_collapse(self):
+        short = normalize_sql("SELECT tag FROM todo_tags WHERE todo_id IN (?, ?)")
+        long = normalize_sql("SELECT tag FROM todo_tags WHERE todo_id IN (?,?,?,?)")
+
+        assert short == long
+        assert short.endswith("IN (?...)")
+
+    def test_identifiers_kept(self):
+        sql = "SELECT t1.id FROM todos t1 WHERE t1.note_path = ?"
+
+        assert normalize_sql(sql) == sql
+
+
+class TestProfiling:
+    """Tests for profiling statements run through Database."""
+
+    def test_off_by_default(self, db):
+        db.fetchall("SELECT * FROM notes")
+
+        assert get_profiler() is None
+
+    def test_records_by_shape(self, db):
+        profiler = start_profiling()
+        for i in range(3):
+            db.execute(
+                "INSERT INTO notes (path, title) VALUES (?, ?)", (f"n{i}.md", "T")
+            )
+        db.commit()
+        db.fetchall("SELECT path FROM notes WHERE title = 'T'")
+        db.fetchall("SELECT path FROM notes WHERE title = 'U'")
+        db.fetchone("SELECT path FROM notes WHERE path = ?", ("n1.md",))
+
+        stats = {s.sql: s for s in profiler.top(50)}
+        insert = stats["INSERT INTO notes (path, title) VALUES (?...)"]
+        select = stats["SELECT path FROM notes WHERE title = ?"]
+        assert insert.count == 3
+        assert insert.rows == 3
+        assert select.count == 2
+        assert select.rows == 3
+        assert stats["SELECT path FROM notes WHERE path = ?"].rows == 1
+        assert select.p95_ms >= 0
+
+    def test_slow_statements_explained(self, db, caplog):
+        start_profiling(slow_ms=0)
+
+        with caplog.at_level(logging.WARNING, logger="nb.index.profiler"):
+            db.fetchall("SELECT path FROM notes WHERE title = ?", ("T",))
+            db.fetchone("SELECT title FROM notes WHERE path = ?", ("a.md",))
+
+        stats = {s.sql: s for s in get_profiler().top(50)}
+        scan = stats["SELECT path FROM notes WHERE title = ?"]
+        lookup = stats["SELECT title FROM notes WHERE path = ?"]
+        assert scan.full_scans == ["SCAN notes"]
+        assert lookup.plan and lookup.full_scans == []
+        assert "Full table scan" in caplog.text
+
+    def test_stop_keeps_results(self, db):
+        start_profiling()
+        db.fetchall("SELECT * FROM notes")
+
+        profiler = stop_profiling()
+        db.fetchall("SELECT * FROM note_tags")
+
+        assert profiler is not None
+        assert [s.sql for s in profiler.top()] == ["SELECT * FROM notes"]
+        assert profiler.to_dict()["statements"] == 1
+
+
+class TestSqlProfileCommand:
+    """Tests for nb debug sql-profile."""
+
+    def test_profiles_wrapped_command(self, mock_cli_config: Config):
+        (mock_cli_config.notes_root / "work" / "todo.md").write_text(
+            "- [ ] Call Bob\n", encoding="utf-8"
+        )
+
+        result = CliRunner().invoke(
+            cli, ["debug", "sql-profile", "--top", "3", "--", "todo"]
+        )
+
+        assert result.exit_code == 0, result.output
+        assert "Call Bob" in result.output
+        assert "SQL profile" in result.output
+        assert get_profiler() is None
+
+
+class TestSqlProfileEndpoint:
+    """Tests for the /api/debug/sql-profile endpoint."""
+
+    def test_off(self, mock_cli_config: Config):
+        resp = TestClient(create_app()).get("/api/debug/sql-profile")
+
+        assert resp.status_code == 404
+
+    def test_on(self, mock_cli_config: Config):
+        start_profiling()
+        client = TestClient(create_app())
+        client.get("/api/notebooks")
+
+        data = client.get("/api/debug/sql-profile").json()
+
+        assert data["statements"] > 0
+        assert {"sql", "count", "total_ms", "p95_ms", "rows"} <= set(data["top"][0])
+        assert client.delete("/api/debug/sql-profile").json() == {"success": True}
+        assert client.get("/api/debug/sql-profile").json()["statements"] == 0
@@ -2,8 +2,13 @@
 
 from __future__ import annotations
 
+import os
+import threading
+import time
+
 import pytest
 
+from nb.config import get_config
 from nb.index import scanner as scanner_module
 from nb.index.db import get_db, reset_db
 from nb.index.scanner import (
@@ -12,7 +17,9 @@ from nb.index.scanner import (
     index_note,
     index_todos_from_file,
     needs_reindex,
+    plan_index,
     remove_deleted_notes,
+    remove_notes_from_index,
     scan_notes,
 )
 from nb.index.search import reset_search
@@ -262,6 +269,73 @@ See [[other-note]] and [[path/to/note|Display]].
 
         assert row["title"] == "New Title"
 
+    def test_reads_file_once(self, db_fixture, create_note, monkeypatch):
+        """Frontmatter, links, todos and attachments all come from one read."""
+        from pathlib import Path
+
+        notes_root = db_fixture.notes_root
+
+        content = """\
+---
+tags: [work]
+---
+
+# Note
+
+See [[other]].
+
+- [ ] Todo @due(today)
+@attach: https://example.com
+"""
+        note_path = create_note("projects", "test.md", content)
+
+        # Path.read_text() and Path.read_bytes() both go through Path.open()
+        reads: list[Path] = []
+        real_open = Path.open
+
+        def count_open(self, mode="r", *args, **kwargs):
+            if "r" in mode:
+                reads.append(self)
+            return real_open(self, mode, *args, **kwargs)
+
+        monkeypatch.setattr(Path, "open", count_open)
+
+        index_note(note_path, notes_root, index_vectors=False)
+
+        assert [p for p in reads if p == note_path] == [note_path]
+
+        db = get_db()
+        todo = db.fetchone("SELECT * FROM todos")
+        assert todo["due_date"] is not None
+        tags = db.fetchall("SELECT tag FROM todo_tags WHERE todo_id = ?", (todo["id"],))
+        assert [t["tag"] for t in tags] == ["work"]
+        assert db.fetchone("SELECT COUNT(*) AS cnt FROM attachments")["cnt"] == 1
+
+    def test_normalized_due_date_hash_matches_file(self, db_fixture, create_note):
+        notes_root = db_fixture.notes_root
+
+        note_path = create_note(
+            "projects", "test.md", "# Note\n\n- [ ] Todo @due(today)\n"
+        )
+
+        index_note(note_path, notes_root, index_vectors=False)
+
+        assert "@due(today)" not in note_path.read_text()
+        assert needs_reindex(note_path, notes_root) is False
+
+    def test_crlf_hash_matches_file_hash(self, db_fixture, create_note):
+        notes_root = db_fixture.notes_root
+
+        note_path = create_note("projects", "test.md", "")
+        note_path.write_bytes(b"# Note\r\n\r\nBody\r\n")
+
+        index_note(note_path, notes_root, index_vectors=False)
+
+        db = get_db()
+        rel_path = normalize_path(note_path.relative_to(notes_root))
+        row = db.fetchone("SELECT content_hash FROM notes WHERE path = ?", (rel_path,))
+        assert row["content_hash"] == get_file_hash(note_path)
+
 
 class TestIndexAllNotes:
     """Tests for index_all_notes function."""
@@ -309,6 +383,342 @@ class TestIndexAllNotes:
         assert count == 2
 
 
+def _age(path, seconds=60):
+    """Push a file's mtime into the past so it's outside the racy window."""
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns - seconds * 1_000_000_000))
+
+
+class TestStatManifest:
+    """Tests for stat-manifest change detection."""
+
+    @pytest.fixture
+    def no_hashing(self, monkeypatch):
+        calls = []
+
+        def fake_hash(path):
+            calls.append(path)
+            return "mismatch"
+
+        monkeypatch.setattr(scanner_module, "get_file_hash", fake_hash)
+        return calls
+
+    def test_unchanged_stat_skips_hashing(self, db_fixture, create_note, monkeypatch):
+        notes_root = db_fixture.notes_root
+        note_path = create_note("projects", "test.md", "# Test\n")
+        _age(note_path)
+        index_note(note_path, notes_root, index_vectors=False)
+
+        calls = []
+        monkeypatch.setattr(
+            scanner_module, "get_file_hash", lambda p: calls.append(p) or ""
+        )
+
+        assert needs_reindex(note_path, notes_root) is False
+        assert plan_index(notes_root).to_index == []
+        assert calls == []
+
+    def test_recent_file_not_trusted(self, db_fixture, create_note):
+        notes_root = db_fixture.notes_root
+        note_path = create_note("projects", "test.md", "# Test\n")
+        index_note(note_path, notes_root, index_vectors=False)
+
+        db = get_db()
+        rel_path = normalize_path(note_path.relative_to(notes_root))
+        row = db.fetchone("SELECT * FROM file_manifest WHERE path = ?", (rel_path,))
+        assert row is None
+
+    def test_touch_refreshes_manifest_without_reindex(self, db_fixture, create_note):
+        notes_root = db_fixture.notes_root
+        note_path = create_note("projects", "test.md", "# Test\n")
+        index_note(note_path, notes_root, index_vectors=False)
+
+        # Same content, new mtime: hash is the tiebreaker
+        _age(note_path, seconds=120)
+        plan = plan_index(notes_root)
+        assert plan.to_index == []
+
+        db = get_db()
+        rel_path = normalize_path(note_path.relative_to(notes_root))
+        row = db.fetchone("SELECT * FROM file_manifest WHERE path = ?", (rel_path,))
+        assert row["mtime_ns"] == note_path.stat().st_mtime_ns
+
+    def test_detects_change_with_restored_mtime(self, db_fixture, create_note):
+        notes_root = db_fixture.notes_root
+        note_path = create_note("projects", "test.md", "# Test\n")
+        _age(note_path)
+        index_note(note_path, notes_root, index_vectors=False)
+
+        st = note_path.stat()
+        note_path.write_text("# Test, but longer\n")
+        os.utime(note_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+        assert plan_index(notes_root).to_index == [note_path]
+
+    def test_paranoid_always_hashes(self, db_fixture, create_note, no_hashing):
+        notes_root = db_fixture.notes_root
+        note_path = create_note("projects", "test.md", "# Test\n")
+        _age(note_path)
+        index_note(note_path, notes_root, index_vectors=False)
+
+        assert plan_index(notes_root).to_index == []
+        assert no_hashing == []
+
+        assert plan_index(notes_root, paranoid=True).to_index == [note_path]
+        assert no_hashing == [note_path]
+
+    def test_paranoid_from_config(self, db_fixture, create_note, no_hashing):
+        notes_root = db_fixture.notes_root
+        note_path = create_note("projects", "test.md", "# Test\n")
+        _age(note_path)
+        index_note(note_path, notes_root, index_vectors=False)
+
+        db_fixture.index.paranoid = True
+        assert needs_reindex(note_path, notes_root) is True
+
+    def test_index_all_notes_reuses_plan(self, db_fixture, create_note, monkeypatch):
+        notes_root = db_fixture.notes_root
+        create_note("projects", "note1.md", "# Note 1\n")
+        create_note("projects", "note2.md", "# Note 2\n")
+
+        plan = plan_index(notes_root)
+        assert len(plan.to_index) == 2
+
+        def fail(*args, **kwargs):
+            raise AssertionError("vault scanned twice")
+
+        monkeypatch.setattr(scanner_module, "scan_notes", fail)
+        assert index_all_notes(plan=plan, index_vectors=False) == 2
+
+    def test_manifest_removed_with_note(self, db_fixture, create_note):
+        notes_root = db_fixture.notes_root
+        note_path = create_note("projects", "test.md", "# Test\n")
+        _age(note_path)
+        index_note(note_path, notes_root, index_vectors=False)
+
+        note_path.unlink()
+        remove_deleted_notes(notes_root)
+
+        db = get_db()
+        assert db.fetchone("SELECT COUNT(*) AS cnt FROM file_manifest")["cnt"] == 0
+
+
+class TestDirManifest:
+    """Tests for directory-listing reuse in plan_index()."""
+
+    @pytest.fixture
+    def scandir_calls(self, monkeypatch):
+        calls = []
+        real_scandir = os.scandir
+
+        def recording_scandir(path):
+            calls.append(path)
+            return real_scandir(path)
+
+        monkeypatch.setattr(os, "scandir", recording_scandir)
+        return calls
+
+    def _age_tree(self, root):
+        for path in [root, *root.rglob("*")]:
+            _age(path)
+
+    def test_unchanged_tree_not_listed(self, db_fixture, create_note, scandir_calls):
+        notes_root = db_fixture.notes_root
+        create_note("daily", "2024-01-01.md", "# Old\n")
+        create_note("projects", "plan.md", "# Plan\n")
+        self._age_tree(notes_root)
+        index_all_notes(notes_root, index_vectors=False)
+
+        scandir_calls.clear()
+        plan = plan_index(notes_root)
+
+        assert plan.to_index == []
+        assert len(plan.files) == 2
+        assert scandir_calls == []
+
+    def test_new_file_found_by_relisting_its_directory(
+        self, db_fixture, create_note, scandir_calls
+    ):
+        notes_root = db_fixture.notes_root
+        create_note("daily", "2024-01-01.md", "# Old\n")
+        create_note("projects", "plan.md", "# Plan\n")
+        self._age_tree(notes_root)
+        index_all_notes(notes_root, index_vectors=False)
+
+        new_note = create_note("projects", "new.md", "# New\n")
+        scandir_calls.clear()
+        plan = plan_index(notes_root)
+
+        assert plan.to_index == [new_note]
+        assert scandir_calls == [str(notes_root / "projects")]
+
+    def test_edit_in_place_still_detected(self, db_fixture, create_note):
+        notes_root = db_fixture.notes_root
+        note_path = create_note("projects", "plan.md", "# Plan\n")
+        self._age_tree(notes_root)
+        index_all_notes(notes_root, index_vectors=False)
+
+        note_path.write_text("# Plan\n\n- [ ] New task\n")
+
+        assert plan_index(notes_root).to_index == [note_path]
+
+    def test_nbignore_change_invalidates_listings(self, db_fixture, create_note):
+        notes_root = db_fixture.notes_root
+        create_note("projects", "plan.md", "# Plan\n")
+        create_note("archive", "old.md", "# Old\n")
+        self._age_tree(notes_root)
+        plan_index(notes_root)
+
+        (notes_root / ".nbignore").write_text("archive\n")
+        _age(notes_root)
+
+        files = plan_index(notes_root).files
+        assert [f.name for f in files] == ["plan.md"]
+
+    def test_force_rewalks_everything(self, db_fixture, create_note, scandir_calls):
+        notes_root = db_fixture.notes_root
+        create_note("projects", "plan.md", "# Plan\n")
+        self._age_tree(notes_root)
+        plan_index(notes_root)
+
+        scandir_calls.clear()
+        plan_index(notes_root, force=True)
+        assert len(scandir_calls) >= 2
+
+
+class TestParallelIndexing:
+    """Tests for process-pool parsing with a single writer."""
+
+    @pytest.fixture
+    def many_notes(self, db_fixture, create_note, monkeypatch):
+        monkeypatch.setattr(scanner_module, "PROCESS_POOL_THRESHOLD", 2)
+        monkeypatch.setattr(scanner_module, "WRITE_BATCH_SIZE", 3)
+        for i in range(8):
+            create_note(
+                "projects",
+                f"note{i}.md",
+                f"---\ntags: [t{i}]\n---\n# Note {i}\n\n- [ ] Task {i} @due(2025-01-0{i + 1})\n",
+            )
+        return db_fixture
+
+    def test_process_pool_matches_sequential(self, many_notes):
+        notes_root = many_notes.notes_root
+
+        count = index_all_notes(notes_root, max_workers=2, index_vectors=False)
+        assert count == 8
+
+        db = get_db()
+        parallel = {
+            "notes": db.fetchall(
+                "SELECT path, title, content_hash FROM notes ORDER BY path"
+            ),
+            "tags": db.fetchall(
+                "SELECT note_path, tag FROM note_tags ORDER BY note_path"
+            ),
+            "todos": db.fetchall("SELECT id, content, due_date FROM todos ORDER BY id"),
+        }
+
+        count = index_all_notes(
+            notes_root, force=True, max_workers=1, index_vectors=False
+        )
+        assert count == 8
+        sequential = {
+            "notes": db.fetchall(
+                "SELECT path, title, content_hash FROM notes ORDER BY path"
+            ),
+            "tags": db.fetchall(
+                "SELECT note_path, tag FROM note_tags ORDER BY note_path"
+            ),
+            "todos": db.fetchall("SELECT id, content, due_date FROM todos ORDER BY id"),
+        }
+
+        assert len(parallel["todos"]) == 8
+        assert {k: [tuple(r) for r in v] for k, v in parallel.items()} == {
+            k: [tuple(r) for r in v] for k, v in sequential.items()
+        }
+
+    def test_progress_reported_per_note(self, many_notes):
+        calls = []
+        index_all_notes(
+            many_notes.notes_root,
+            max_workers=2,
+            index_vectors=False,
+            on_progress=calls.append,
+        )
+        assert calls == [1] * 8
+
+    def test_workers_from_config(self, many_notes, monkeypatch):
+        seen = []
+        monkeypatch.setattr(
+            scanner_module,
+            "_index_notes_parallel",
+            lambda files, root, vectors, workers, progress, job=None: (
+                seen.append(workers) or 0
+            ),
+        )
+
+        many_notes.index.workers = 3
+        index_all_notes(many_notes.notes_root, index_vectors=False)
+        assert seen == [3]
+
+        many_notes.index.workers = 1
+        assert index_all_notes(many_notes.notes_root, index_vectors=False) == 8
+        assert seen == [3]
+
+
+class TestEmbeddingStage:
+    """Tests for batched, pipelined vector embedding."""
+
+    @pytest.fixture
+    def batches(self, monkeypatch):
+        batches = []
+
+        def fake_embed(batch):
+            batches.append([note for note, _ in batch])
+            return len(batch)
+
+        monkeypatch.setattr(scanner_module, "_embed_batch", fake_embed)
+        return batches
+
+    def test_flushes_on_token_budget(self, batches):
+        # 40 chars ~ 10 tokens per note, so every third note fills the budget
+        stage = scanner_module._EmbeddingStage(token_budget=30, flush_interval=60)
+        for i in range(7):
+            stage.put(f"note{i}", "x" * 40)
+        stage.put("empty", "")
+        stage.close()
+
+        assert [len(b) for b in batches] == [3, 3, 1]
+        assert stage.indexed == 7
+        assert stage.flushes == 3
+
+    def test_flushes_on_timeout(self, batches):
+        stage = scanner_module._EmbeddingStage(token_budget=10_000, flush_interval=0.05)
+        stage.put("note0", "content")
+        for _ in range(100):
+            if batches:
+                break
+            time.sleep(0.01)
+        assert batches == [["note0"]]
+
+        stage.put("note1", "content")
+        stage.close()
+        assert batches == [["note0"], ["note1"]]
+
+    def test_index_all_notes_batches_embeddings(self, db_fixture, create_note, batches):
+        scanner_module.ENABLE_VECTOR_INDEXING = True
+        for i in range(5):
+            create_note("projects", f"note{i}.md", f"# Note {i}\n")
+
+        count = index_all_notes(db_fixture.notes_root)
+
+        assert count == 5
+        assert len(batches) == 1
+        assert sorted(note.title for note in batches[0]) == [
+            f"Note {i}" for i in range(5)
+        ]
+
+
 class TestIndexTodosFromFile:
     """Tests for index_todos_from_file function."""
 
@@ -459,6 +869,75 @@ class TestRemoveDeletedNotes:
 
         assert removed == 0
 
+    def test_reuses_plan_walk(self, db_fixture, create_note, monkeypatch):
+        """With a plan, deletions come from its walk, not a new scan or exists()."""
+        notes_root = db_fixture.notes_root
+
+        note1 = create_note("projects", "note1.md", "# Note 1\n")
+        create_note("projects", "note2.md", "# Note 2\n")
+        index_all_notes(notes_root, index_vectors=False)
+
+        note1.unlink()
+        plan = plan_index(notes_root)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("vault walked again")
+
+        monkeypatch.setattr(scanner_module, "_scan_note_entries", fail)
+
+        assert remove_deleted_notes(notes_root, plan=plan) == 1
+        paths = [row["path"] for row in get_db().fetchall("SELECT path FROM notes")]
+        assert paths == ["projects/note2.md"]
+
+    def test_vector_deletes_batched(self, db_fixture, create_note, monkeypatch):
+        """Vectors for all deleted notes are removed in a single call."""
+        notes_root = db_fixture.notes_root
+
+        notes = [create_note("projects", f"note{i}.md", "# Note\n") for i in range(3)]
+        index_all_notes(notes_root, index_vectors=False)
+        notes[0].unlink()
+        notes[1].unlink()
+
+        calls = []
+
+        class FakeSearch:
+            def delete_notes(self, paths):
+                calls.append(sorted(paths))
+
+        import nb.index.search as search_module
+
+        monkeypatch.setattr(scanner_module, "ENABLE_VECTOR_INDEXING", True)
+        monkeypatch.setattr(search_module, "get_search", lambda: FakeSearch())
+
+        assert remove_deleted_notes(notes_root) == 2
+        assert calls == [["projects/note0.md", "projects/note1.md"]]
+
+
+class TestRemoveNotesFromIndex:
+    """Tests for remove_notes_from_index (used for daemon delete events)."""
+
+    def test_removes_absolute_paths(self, db_fixture, create_note):
+        notes_root = db_fixture.notes_root
+
+        note1 = create_note("projects", "note1.md", "# Note 1\n- [ ] Gone\n")
+        note2 = create_note("projects", "note2.md", "# Note 2\n- [ ] Also gone\n")
+        create_note("projects", "note3.md", "# Note 3\n- [ ] Kept\n")
+        index_all_notes(notes_root, index_vectors=False)
+
+        note1.unlink()
+        note2.unlink()
+        removed = remove_notes_from_index([note1, note2], notes_root)
+
+        assert removed == 2
+        db = get_db()
+        paths = [row["path"] for row in db.fetchall("SELECT path FROM notes")]
+        assert paths == ["projects/note3.md"]
+        todos = db.fetchall("SELECT content FROM todos")
+        assert [t["content"] for t in todos] == ["Kept"]
+
+    def test_empty_is_noop(self, db_fixture):
+        assert remove_notes_from_index([], db_fixture.notes_root) == 0
+
 
 class TestTodoDatePreservation:
     """Tests for preserving todo created_date and completed_date on reindex."""
@@ -560,14 +1039,12 @@ class TestTodoDatePreservation:
         db.commit()
 
         # Add a new todo to the file
-        note_path.write_text(
-            """\
+        note_path.write_text("""\
 # Tasks
 
 - [ ] Original task
 - [ ] New task
-"""
-        )
+""")
 
         # Re-index
         index_note(note_path, notes_root, index_vectors=False)
@@ -646,3 +1123,325 @@ class TestInboxDetection:
 
         assert len(todos) == 1
         assert todos[0]["source_type"] == "note"
+
+
+class TestSearchIndexStreaming:
+    """Tests for rebuild_search_index and sync_search_index."""
+
+    class FakeSearch:
+        def __init__(self, present=()):
+            self.present = set(present)
+            self.batches: list[list[tuple]] = []
+            self.db = self
+
+        def exists(self, ids):
+            return [doc_id in self.present for doc_id in ids]
+
+        def index_notes_batch(self, notes):
+            self.batches.append(
+                [(str(note.path), note.tags, content) for note, content in notes]
+            )
+            return len(notes)
+
+    @pytest.fixture
+    def vault(self, db_fixture, create_note, monkeypatch):
+        for i in range(7):
+            create_note(
+                "projects",
+                f"note{i}.md",
+                f"---\ntags: [tag{i}, shared]\n---\n# Note {i}\n",
+            )
+        index_all_notes(db_fixture.notes_root, index_vectors=False)
+
+        import nb.index.search as search_module
+
+        monkeypatch.setattr(scanner_module, "ENABLE_VECTOR_INDEXING", True)
+        monkeypatch.setattr(scanner_module, "SEARCH_PAGE_SIZE", 3)
+
+        def install(search):
+            monkeypatch.setattr(search_module, "get_search", lambda: search)
+            return search
+
+        return install
+
+    def test_rebuild_streams_pages_with_tags(self, vault, monkeypatch):
+        search = vault(self.FakeSearch())
+        db = get_db()
+        queries = []
+        real_fetchall = db.fetchall
+        monkeypatch.setattr(
+            db,
+            "fetchall",
+            lambda sql, params=(): queries.append(sql) or real_fetchall(sql, params),
+        )
+
+        assert scanner_module.rebuild_search_index(batch_size=4) == 7
+
+        # One query per page of 3 notes; no per-note tag lookups
+        assert len(queries) == 3
+        indexed = [item for batch in search.batches for item in batch]
+        assert [len(batch) for batch in search.batches] == [4, 3]
+        assert indexed[0][0] == "projects/note0.md"
+        assert sorted(indexed[0][1]) == ["shared", "tag0"]
+
+    def test_sync_indexes_only_missing(self, vault):
+        present = {f"projects/note{i}.md" for i in (0, 2, 3, 6)}
+        search = vault(self.FakeSearch(present=present))
+
+        assert scanner_module.sync_search_index() == 3
+        synced = [path for batch in search.batches for path, _, _ in batch]
+        assert synced == ["projects/note1.md", "projects/note4.md", "projects/note5.md"]
+
+    def test_embed_changed_uses_vector_state(self, vault):
+        from nb.index.embedding_cache import embedding_settings_key
+        from nb.index.vector_state_repo import record_embedded
+
+        db = get_db()
+        model = embedding_settings_key(get_config().embeddings)
+        rows = db.fetchall("SELECT path, content_hash FROM notes ORDER BY path")
+        # note1 embedded at an older revision, note2 with other settings
+        record_embedded(
+            [(row["path"], row["content_hash"], 1) for row in rows[3:]]
+            + [(rows[0]["path"], rows[0]["content_hash"], 1)]
+            + [(rows[1]["path"], "old-hash", 1)],
+            model,
+        )
+        record_embedded([(rows[2]["path"], rows[2]["content_hash"], 1)], "other")
+        search = vault(self.FakeSearch())
+
+        assert scanner_module.count_notes_to_embed() == 2
+        assert scanner_module.embed_changed_notes() == 2
+        synced = [path for batch in search.batches for path, _, _ in batch]
+        assert synced == ["projects/note1.md", "projects/note2.md"]
+
+
+class TestIndexJobs:
+    """Tests for checkpointed, resumable index runs."""
+
+    def test_files_job_checkpoints_each_file(self, db_fixture, create_note):
+        from nb.index.jobs_repo import get_job, get_job_items
+
+        for i in range(3):
+            create_note("projects", f"note{i}.md", f"# Note {i}\n")
+        plan = plan_index(db_fixture.notes_root)
+        job_id = scanner_module.create_files_job(plan)
+
+        assert scanner_module.run_index_job(job_id) == 3
+        job = get_job(job_id)
+        assert job.status == "done"
+        assert job.done == 3
+        assert get_job_items(job_id) == []
+
+    def test_interrupted_job_resumes_remaining_files(
+        self, db_fixture, create_note, monkeypatch
+    ):
+        from nb.index.jobs_repo import get_job, get_unfinished_job
+
+        for i in range(4):
+            create_note("projects", f"note{i}.md", f"# Note {i}\n")
+        plan = plan_index(db_fixture.notes_root)
+        job_id = scanner_module.create_files_job(plan)
+        # Commit every note, so the checkpoint is the last finished file
+        monkeypatch.setattr(scanner_module, "WRITE_BATCH_SIZE", 1)
+
+        real_queued = scanner_module._index_note_queued
+        seen = []
+
+        def interrupt_third(path, notes_root, embedder):
+            if len(seen) == 2:
+                raise KeyboardInterrupt
+            seen.append(path.name)
+            real_queued(path, notes_root, embedder)
+
+        monkeypatch.setattr(scanner_module, "_index_note_queued", interrupt_third)
+        with pytest.raises(KeyboardInterrupt):
+            scanner_module.run_index_job(job_id)
+
+        job = get_unfinished_job()
+        assert job.id == job_id
+        assert job.remaining == 2
+
+        monkeypatch.setattr(scanner_module, "_index_note_queued", real_queued)
+        assert scanner_module.run_index_job(job_id) == 2
+        assert get_job(job_id).done == 4
+        paths = [row["path"] for row in get_db().fetchall("SELECT path FROM notes")]
+        assert len(paths) == 4
+
+
+class TestIndexPrioritized:
+    """Tests for two-phase, recency-prioritized indexing."""
+
+    def test_small_batch_indexed_in_full(self, db_fixture, create_note):
+        for i in range(3):
+            create_note("projects", f"note{i}.md", f"# Note {i}\n")
+
+        result = scanner_module.index_prioritized()
+
+        assert result.indexed == 3
+        assert not result.partial
+
+    def test_recent_notes_and_inbox_first(self, db_fixture, create_note, monkeypatch):
+        from nb.index.jobs_repo import get_job
+
+        monkeypatch.setattr(scanner_module, "PRIORITY_FOREGROUND_LIMIT", 2)
+        ten_days = 10 * 24 * 60 * 60
+        for i in range(4):
+            _age(create_note("projects", f"old{i}.md", f"# Old {i}\n"), ten_days)
+        create_note("projects", "recent.md", "# Recent\n")
+        inbox = db_fixture.notes_root / "todo.md"
+        inbox.write_text("- [ ] Inbox task\n")
+        _age(inbox, ten_days)
+
+        result = scanner_module.index_prioritized()
+
+        assert result.indexed == 2
+        assert result.pending == 4
+        assert result.partial
+        assert scanner_module.wait_for_background_index(timeout=30)
+        assert get_job(result.job).done == 4
+        paths = {row["path"] for row in get_db().fetchall("SELECT path FROM notes")}
+        assert len(paths) == 6
+
+    def test_tail_doesnt_hold_up_exit(self, db_fixture, create_note, monkeypatch):
+        from nb.index.jobs_repo import get_unfinished_job
+
+        monkeypatch.setattr(scanner_module, "PRIORITY_FOREGROUND_LIMIT", 1)
+        ten_days = 10 * 24 * 60 * 60
+        for i in range(3):
+            _age(create_note("projects", f"old{i}.md", f"# Old {i}\n"), ten_days)
+        started, release = threading.Event(), threading.Event()
+        real_queued = scanner_module._index_note_queued
+
+        def blocked(*args, **kwargs):
+            started.set()
+            release.wait(30)
+            return real_queued(*args, **kwargs)
+
+        monkeypatch.setattr(scanner_module, "_index_note_queued", blocked)
+
+        result = scanner_module.index_prioritized()
+
+        # The process can exit without waiting, leaving the files queued
+        assert scanner_module._background_index.daemon
+        assert started.wait(30)
+        job = get_unfinished_job()
+        assert job.id == result.job
+        assert job.remaining == 3
+
+        release.set()
+        assert scanner_module.wait_for_background_index(timeout=30)
+
+    def test_tail_takes_over_interrupted_job(self, db_fixture, create_note, monkeypatch):
+        from nb.index.jobs_repo import (
+            JOB_DONE,
+            JOB_FILES,
+            create_job,
+            finish_job,
+            get_job,
+        )
+
+        monkeypatch.setattr(scanner_module, "PRIORITY_FOREGROUND_LIMIT", 1)
+        ten_days = 10 * 24 * 60 * 60
+        paths = [
+            create_note("projects", f"old{i}.md", f"# Old {i}\n") for i in range(3)
+        ]
+        for path in paths:
+            _age(path, ten_days)
+        leftover = create_job(JOB_FILES, [str(paths[0])])
+        finish_job(leftover, interrupted=True)
+
+        result = scanner_module.index_prioritized()
+
+        assert result.job == leftover
+        assert scanner_module.wait_for_background_index(timeout=30)
+        job = get_job(leftover)
+        assert job.status == JOB_DONE
+        assert (job.total, job.done) == (3, 3)
+
+    def test_foreground_order(self, db_fixture, create_note, monkeypatch):
+        monkeypatch.setattr(scanner_module, "PRIORITY_FOREGROUND_LIMIT", 2)
+        ten_days = 10 * 24 * 60 * 60
+        old = create_note("projects", "old.md", "# Old\n")
+        _age(old, ten_days)
+        newer = create_note("projects", "newer.md", "# Newer\n")
+        newest = create_note("projects", "newest.md", "# Newest\n")
+        _age(newer, 60)
+        inbox = db_fixture.notes_root / "todo.md"
+        inbox.write_text("- [ ] Inbox task\n")
+        _age(inbox, ten_days)
+
+        now, later = scanner_module._prioritize(plan_index(db_fixture.notes_root))
+
+        assert [path.name for path in now] == ["todo.md", "newest.md"]
+        assert sorted(path.name for path in later) == ["newer.md", "old.md"]
+
+
+class TestTodosOnlyIndexing:
+    """Tests for the todo-only fast path."""
+
+    def test_candidate_without_marker_not_decoded(self, tmp_path):
+        plain = tmp_path / "plain.md"
+        plain.write_text("# Plain\n\nNo tasks here.\n")
+        tasks = tmp_path / "tasks.md"
+        tasks.write_text("# Tasks\n\n- [ ] Do it\n")
+
+        assert scanner_module.read_todo_candidate(plain) == ""
+        assert "Do it" in scanner_module.read_todo_candidate(tasks)
+        assert scanner_module.read_todo_candidate(tmp_path / "missing.md") is None
+
+    def test_todos_indexed_without_note_row(self, db_fixture, create_note):
+        from nb.index.todos_repo import query_todos
+
+        path = create_note(
+            "projects", "tasks.md", "---\ntags: [work]\n---\n\n- [ ] Ship it\n"
+        )
+
+        count = scanner_module.index_todos_only([path], db_fixture.notes_root)
+
+        assert count == 1
+        todos = query_todos()
+        assert [todo.content for todo in todos] == ["Ship it"]
+        assert "work" in todos[0].tags
+        assert get_db().fetchone("SELECT COUNT(*) as cnt FROM notes")["cnt"] == 0
+        # Still stale for the full pass
+        assert plan_index(db_fixture.notes_root).to_index == [path]
+
+    def test_prioritized_todos_only(self, db_fixture, create_note):
+        from nb.index.todos_repo import query_todos
+
+        create_note("projects", "tasks.md", "# Tasks\n\n- [ ] Ship it\n")
+        create_note("projects", "plain.md", "# Plain\n")
+
+        result = scanner_module.index_prioritized(todos_only=True)
+
+        assert result.indexed == 2
+        assert not result.partial
+        assert result.job is None
+        assert [todo.content for todo in query_todos()] == ["Ship it"]
+        # Full metadata is left to the next full pass
+        assert get_db().fetchone("SELECT COUNT(*) as cnt FROM notes")["cnt"] == 0
+        assert len(plan_index(db_fixture.notes_root).to_index) == 2
+
+        scanner_module.index_all_notes(index_vectors=False)
+
+        assert get_db().fetchone("SELECT COUNT(*) as cnt FROM notes")["cnt"] == 2
+        assert [todo.content for todo in query_todos()] == ["Ship it"]
+
+    def test_prioritized_todos_only_tail(self, db_fixture, create_note, monkeypatch):
+        from nb.index.jobs_repo import get_job
+
+        monkeypatch.setattr(scanner_module, "PRIORITY_FOREGROUND_LIMIT", 1)
+        ten_days = 10 * 24 * 60 * 60
+        for i in range(3):
+            _age(create_note("projects", f"old{i}.md", f"- [ ] Old {i}\n"), ten_days)
+        create_note("projects", "recent.md", "- [ ] Recent\n")
+
+        result = scanner_module.index_prioritized(todos_only=True)
+
+        assert result.indexed == 1
+        assert result.pending == 3
+        assert scanner_module.wait_for_background_index(timeout=30)
+        # Only the files past the foreground limit are indexed in full
+        assert get_job(result.job).total == 3
+        paths = {row["path"] for row in get_db().fetchall("SELECT path FROM notes")}
+        assert paths == {f"projects/old{i}.md" for i in range(3)}
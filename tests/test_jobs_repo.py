@@ -0,0 +1,91 @@
+"""Tests for index job repository operations."""
+
+from nb.index.jobs_repo import (
+    JOB_DAEMON,
+    JOB_DONE,
+    JOB_FILES,
+    JOB_HISTORY,
+    JOB_INTERRUPTED,
+    complete_job_items,
+    create_job,
+    enqueue_job_items,
+    fail_job_item,
+    finish_job,
+    get_job,
+    get_job_items,
+    get_recent_jobs,
+    get_unfinished_job,
+)
+
+
+class TestJobQueue:
+    """Tests for queueing and completing job items."""
+
+    def test_create_with_items(self, mock_config):
+        job_id = create_job(JOB_FILES, ["b.md", "a.md"], notebook="daily")
+
+        job = get_job(job_id)
+        assert job.kind == JOB_FILES
+        assert job.notebook == "daily"
+        assert job.total == 2
+        assert job.done == 0
+        assert get_job_items(job_id) == ["a.md", "b.md"]
+
+    def test_enqueue_ignores_duplicates(self, mock_config):
+        job_id = create_job(JOB_DAEMON, ["a.md"])
+        enqueue_job_items(job_id, ["a.md", "b.md"])
+
+        assert get_job(job_id).total == 2
+
+    def test_complete_removes_items(self, mock_config):
+        job_id = create_job(JOB_FILES, ["a.md", "b.md", "c.md"])
+        complete_job_items(job_id, ["a.md", "c.md"])
+
+        job = get_job(job_id)
+        assert job.done == 2
+        assert job.remaining == 1
+        assert get_job_items(job_id) == ["b.md"]
+
+    def test_failed_item_stays_queued(self, mock_config):
+        job_id = create_job(JOB_FILES, ["a.md"])
+        fail_job_item(job_id, "a.md", "boom")
+        fail_job_item(job_id, "a.md", "boom again")
+
+        assert get_job(job_id).failed == 1
+        assert get_job_items(job_id) == ["a.md"]
+
+        complete_job_items(job_id, ["a.md"])
+        job = get_job(job_id)
+        assert job.failed == 0
+        assert job.done == 1
+
+
+class TestJobStatus:
+    """Tests for finishing and finding jobs."""
+
+    def test_interrupted_job_is_unfinished(self, mock_config):
+        done_id = create_job(JOB_FILES, ["a.md"])
+        finish_job(done_id)
+        interrupted_id = create_job(JOB_FILES, ["b.md"])
+        finish_job(interrupted_id, interrupted=True)
+
+        job = get_unfinished_job()
+        assert job.id == interrupted_id
+        assert job.status == JOB_INTERRUPTED
+        assert job.resumable
+        assert get_job(done_id).status == JOB_DONE
+        assert get_job(done_id).finished_at is not None
+
+    def test_daemon_jobs_not_resumed_by_cli(self, mock_config):
+        create_job(JOB_DAEMON, ["a.md"])
+
+        assert get_unfinished_job() is None
+        assert get_unfinished_job(JOB_DAEMON) is not None
+
+    def test_old_finished_jobs_pruned(self, mock_config):
+        for _ in range(JOB_HISTORY + 2):
+            finish_job(create_job(JOB_FILES, ["a.md"]))
+        create_job(JOB_FILES)
+
+        jobs = get_recent_jobs(limit=100)
+        assert len(jobs) == JOB_HISTORY + 1
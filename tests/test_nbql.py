@@ -0,0 +1,309 @@
+"""Tests for the nbql query language."""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+import pytest
+from click.testing import CliRunner
+
+from nb.cli import cli
+from nb.config import Config
+from nb.index.db import get_db
+from nb.index.nbql import (
+    And,
+    Condition,
+    NbqlError,
+    Not,
+    Or,
+    Query,
+    SortKey,
+    compile_query,
+    count_query,
+    explain_query,
+    parse,
+    query_from_kanban_filters,
+    run_query,
+)
+from nb.index.scanner import index_all_notes
+
+TODAY = date(2025, 3, 10)
+
+TASKS = """# Tasks
+
+- [ ] Ship release #work @due(2025-03-11) @priority(1)
+- [ ] Write docs #work #docs @due(2025-03-20) @priority(2)
+- [^] Review PR #work @due(2025-03-09)
+- [ ] Tidy desk #home
+- [x] Book flights #home @due(2025-03-01)
+"""
+
+
+def _contents(items) -> list[str]:
+    return [t.content for t in items]
+
+
+@pytest.fixture
+def tasks(mock_config, create_note):
+    create_note("work", "tasks.md", TASKS)
+    index_all_notes(index_vectors=False)
+
+
+class TestParse:
+    """Tests for the parser."""
+
+    def test_conditions_and_precedence(self):
+        query = parse("todo where tag=work and not (due < +7d or priority=1)")
+
+        assert query.target == "todo"
+        assert query.where == And(
+            (
+                Condition("tag", "=", "work"),
+                Not(
+                    Or(
+                        (
+                            Condition("due", "<", "+7d"),
+                            Condition("priority", "=", "1"),
+                        )
+                    )
+                ),
+            )
+        )
+
+    def test_sort_and_limit(self):
+        query = parse("note where tag=meeting sort by date desc, title limit 5")
+
+        assert query.sort == (SortKey("date", True), SortKey("title"))
+        assert query.limit == 5
+
+    def test_quoted_values_and_verb_fields(self):
+        query = parse("note where links-to 'API design'")
+
+        assert query.where == Condition("links-to", "=", "API design")
+
+    def test_bare_conditions_with_target(self):
+        query = parse("due < +7d", target="todo")
+
+        assert query == Query("todo", Condition("due", "<", "+7d"))
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            "",
+            "task where due < today",
+            "todo where",
+            "todo where due <",
+            "todo where (tag=work",
+            "todo where tag=work limit x",
+        ],
+    )
+    def test_syntax_errors(self, text):
+        with pytest.raises(NbqlError):
+            parse(text)
+
+
+class TestCompile:
+    """Tests for SQL compilation."""
+
+    def test_single_parameterized_statement(self):
+        compiled = compile_query(
+            "todo where tag=work and due < +7d", limit=20, today=TODAY
+        )
+
+        assert compiled.sql.startswith("SELECT t.*")
+        assert "t.todo_exclude = 0" in compiled.sql
+        assert "'work'" not in compiled.sql
+        assert compiled.params == ("work", "2025-03-17", 21)
+
+    def test_date_equality_is_a_range(self):
+        compiled = compile_query("todo where due = today", today=TODAY)
+
+        assert "t.due_date >= ? AND t.due_date < ?" in compiled.sql
+        assert compiled.params == ("2025-03-10", "2025-03-11")
+
+    def test_include_excluded(self):
+        compiled = compile_query("todo", include_excluded=True)
+
+        assert "todo_exclude" not in compiled.sql
+
+    @pytest.mark.parametrize(
+        ("text", "message"),
+        [
+            ("todo where color=red", "Unknown todo field"),
+            ("todo where status=blocked", "Unknown status"),
+            ("todo where priority=urgent", "Unknown priority"),
+            ("todo where tag < work", "isn't supported"),
+            ("todo where due < someday-ish", "Not a date"),
+            ("todo sort by tag", "Can't sort by tag"),
+        ],
+    )
+    def test_invalid_queries(self, text, message):
+        with pytest.raises(NbqlError, match=message):
+            compile_query(text)
+
+    def test_served_by_indexes(self, mock_config):
+        plan = explain_query("note where notebook=work sort by modified desc")
+
+        assert any("idx_notes_recent" in detail for detail in plan)
+
+
+class TestRunTodos:
+    """Tests for running todo queries."""
+
+    def test_filters(self, tasks):
+        page = run_query("todo where status=open and tag=work sort by due")
+
+        assert _contents(page.items) == ["Review PR", "Ship release", "Write docs"]
+        assert page.next_cursor is None
+
+    def test_hydrates_tags(self, tasks):
+        page = run_query("todo where tag=docs")
+
+        assert page.items[0].tags == ["docs", "work"]
+
+    def test_not_matches_missing_values(self, tasks):
+        page = run_query("todo where status=open and not priority=1 sort by text")
+
+        assert _contents(page.items) == ["Review PR", "Tidy desk", "Write docs"]
+
+    def test_missing_values_sort_last(self, tasks):
+        page = run_query("todo where status=open sort by priority desc")
+
+        assert _contents(page.items)[:2] == ["Write docs", "Ship release"]
+        assert set(_contents(page.items)[2:]) == {"Review PR", "Tidy desk"}
+
+    def test_keyset_pages(self, tasks):
+        query = "todo sort by due"
+        seen: list[str] = []
+        after = None
+        while True:
+            page = run_query(query, after=after, limit=2)
+            seen.extend(_contents(page.items))
+            if page.next_cursor is None:
+                break
+            after = page.next_cursor
+
+        assert seen == _contents(run_query(query).items)
+        assert len(seen) == 5
+
+    def test_bad_cursor(self, tasks):
+        with pytest.raises(NbqlError):
+            run_query("todo", after="not-a-cursor")
+
+    @pytest.mark.parametrize("note", ["work/tasks.md", "work/tasks", "work\\tasks"])
+    def test_note_equality(self, tasks, note):
+        page = run_query(f"todo where note={note!r} and tag=home")
+
+        assert _contents(page.items) == ["Book flights", "Tidy desk"]
+
+    def test_count(self, tasks):
+        assert count_query("todo where tag=home") == 2
+
+
+class TestRunNotes:
+    """Tests for running note queries."""
+
+    def test_links_to(self, mock_config, create_note):
+        create_note("work", "api.md", "# API design\n\nDetails.\n")
+        create_note(
+            "work", "plan.md", "---\ntags: [planning]\n---\n# Plan\n\nSee [[api]].\n"
+        )
+        create_note("work", "other.md", "# Other\n\nNothing here.\n")
+        index_all_notes(index_vectors=False)
+
+        by_title = run_query("note where links-to 'API design'")
+        by_path = run_query("note where links-to work/api")
+
+        assert [n.title for n in by_title.items] == ["Plan"]
+        assert [n.title for n in by_path.items] == ["Plan"]
+        assert by_title.items[0].tags == ["planning"]
+
+    def test_modified_range(self, mock_config, create_note):
+        create_note("work", "old.md", "# Old\n")
+        create_note("work", "new.md", "# New\n")
+        index_all_notes(index_vectors=False)
+        old = (date.today() - timedelta(days=30)).isoformat()
+        get_db().execute(
+            "UPDATE notes SET mtime = strftime('%s', ?) WHERE path = 'work/old.md'",
+            (old,),
+        )
+        get_db().commit()
+
+        page = run_query("note where modified > -7d")
+
+        assert [n.title for n in page.items] == ["New"]
+
+
+class TestKanbanFilters:
+    """Tests for translating kanban column filters."""
+
+    def test_default_column_is_open_todos(self):
+        query = query_from_kanban_filters({})
+
+        assert query.where == Condition("status", "=", "open")
+
+    def test_column_filters(self, tasks):
+        query = query_from_kanban_filters(
+            {"tags": ["work"], "no_due_date": False, "query": "priority <= 2"},
+            notebooks=["work"],
+        )
+
+        assert _contents(run_query(query).items) == ["Ship release", "Write docs"]
+
+    def test_no_due_date(self, tasks):
+        query = query_from_kanban_filters({"no_due_date": True})
+
+        assert _contents(run_query(query).items) == ["Tidy desk"]
+
+
+class TestQueryCommand:
+    """Tests for nb query."""
+
+    def test_lists_results(self, mock_cli_config: Config):
+        (mock_cli_config.notes_root / "work" / "tasks.md").write_text(TASKS)
+
+        result = CliRunner().invoke(cli, ["query", "todo where tag=home"])
+
+        assert result.exit_code == 0, result.output
+        assert "Tidy desk" in result.output
+        assert "Ship release" not in result.output
+
+    def test_lists_subtasks(self, mock_cli_config: Config):
+        (mock_cli_config.notes_root / "work" / "tasks.md").write_text(
+            "- [ ] Plan trip #home\n    - [ ] Pack bags\n"
+        )
+
+        result = CliRunner().invoke(cli, ["query", "todo where text='Plan trip'"])
+
+        assert result.exit_code == 0, result.output
+        assert "Pack bags" in result.output
+
+    def test_next_page_hint(self, mock_cli_config: Config):
+        (mock_cli_config.notes_root / "work" / "tasks.md").write_text(TASKS)
+
+        result = CliRunner().invoke(cli, ["query", "todo", "--limit", "2"])
+
+        assert "--after" in result.output
+
+    def test_explain(self, mock_cli_config: Config):
+        result = CliRunner().invoke(cli, ["query", "note where title=x", "--explain"])
+
+        assert result.exit_code == 0, result.output
+        assert "SELECT n.*" in result.output
+        assert "(full scan)" in result.output
+
+    def test_invalid_query(self, mock_cli_config: Config):
+        result = CliRunner().invoke(cli, ["query", "todo where color=red"])
+
+        assert result.exit_code == 1
+        assert "Invalid query" in result.output
+
+    def test_todo_query_option(self, mock_cli_config: Config):
+        (mock_cli_config.notes_root / "work" / "tasks.md").write_text(TASKS)
+
+        result = CliRunner().invoke(cli, ["todo", "-q", "tag=home"])
+
+        assert result.exit_code == 0, result.output
+        assert "Tidy desk" in result.output
+        assert "Book flights" not in result.output
+        assert "Ship release" not in result.output
@@ -452,3 +452,84 @@ class TestLinkStats:
         assert "external" in stats
         assert "wiki" in stats
         assert "markdown" in stats
+
+
+class TestResolvedTargets:
+    """Tests for link targets resolved at index time."""
+
+    def _resolved(self) -> dict[str, str | None]:
+        from nb.core.note_links import resolve_pending_links
+        from nb.index.db import get_db
+
+        resolve_pending_links()
+        rows = get_db().fetchall(
+            "SELECT target_path, resolved_target_path FROM note_links"
+        )
+        return {row["target_path"]: row["resolved_target_path"] for row in rows}
+
+    def test_targets_resolved(self, mock_config, temp_notes_root, create_note):
+        from nb.core.aliases import add_note_alias
+
+        target = create_note("projects", "plan.md", "Plan")
+        source = create_note(
+            "daily",
+            "source.md",
+            "[[plan]] [[projects/plan]] [p](../projects/plan.md) [[home]] "
+            "[[missing]] [x](https://example.com)",
+        )
+        index_note(target, temp_notes_root)
+        add_note_alias("home", target)
+        index_note(source, temp_notes_root)
+
+        resolved = self._resolved()
+
+        assert resolved["plan"] == "projects/plan.md"
+        assert resolved["projects/plan"] == "projects/plan.md"
+        assert resolved["../projects/plan.md"] == "projects/plan.md"
+        assert resolved["home"] == "projects/plan.md"
+        assert resolved["missing"] is None
+        assert resolved["https://example.com"] is None
+
+    def test_created_and_deleted_notes(
+        self, mock_config, temp_notes_root, create_note
+    ):
+        from nb.core.note_links import get_backlinks, get_broken_links
+        from nb.core.notes import delete_note
+
+        source = create_note("daily", "source.md", "See [[later]]")
+        index_note(source, temp_notes_root)
+        assert [b.target for b in get_broken_links()] == ["later"]
+
+        target = create_note("projects", "later.md", "Later")
+        index_note(target, temp_notes_root)
+
+        assert get_broken_links() == []
+        assert [b.source_path.name for b in get_backlinks(target)] == ["source.md"]
+
+        delete_note(target, temp_notes_root)
+
+        assert [b.target for b in get_broken_links()] == ["later"]
+
+    def test_only_links_that_could_name_a_new_note_are_invalidated(
+        self, mock_config, temp_notes_root, create_note
+    ):
+        from nb.index.db import get_db
+
+        source = create_note("daily", "source.md", "[[later]] [[missing]]")
+        index_note(source, temp_notes_root)
+        self._resolved()
+
+        def pending() -> list[str]:
+            rows = get_db().fetchall(
+                "SELECT target_path FROM note_links WHERE resolved = 0"
+            )
+            return [row["target_path"] for row in rows]
+
+        # Reindexing an existing note updates it in place
+        other = create_note("projects", "other.md", "Other")
+        index_note(other, temp_notes_root)
+        index_note(other, temp_notes_root)
+        assert pending() == []
+
+        index_note(create_note("projects", "later.md", "Later"), temp_notes_root)
+        assert pending() == ["later"]
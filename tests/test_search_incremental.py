@@ -0,0 +1,186 @@
+"""Tests for incremental (chunk-level) re-embedding in NoteSearch."""
+
+from __future__ import annotations
+
+import hashlib
+from dataclasses import replace
+from datetime import date
+from pathlib import Path
+from types import SimpleNamespace
+
+from nb.index.search import NoteSearch
+from nb.models import Note
+
+
+class FakeVectorDB:
+    """In-memory stand-in for VectorDB that reuses vectors like localvectordb.
+
+    Notes are chunked by paragraph; on upsert a chunk keeps its vector id
+    when the stored chunk at the same index has the same hash.
+    """
+
+    def __init__(self):
+        self.docs: dict[str, SimpleNamespace] = {}
+        self.embedded_texts: list[str] = []
+        self.upserted_ids: list[str] = []
+        self.updates: list[tuple[str, dict]] = []
+        self._next_id = 0
+
+    def close(self):
+        pass
+
+    def exists(self, ids):
+        return [doc_id in self.docs for doc_id in ids]
+
+    def get(self, ids):
+        return [self.docs[doc_id] for doc_id in ids]
+
+    def get_chunks(self, doc_id):
+        doc = self.docs.get(doc_id)
+        return list(doc.chunks) if doc else []
+
+    def update(self, doc_id, metadata=None):
+        self.updates.append((doc_id, metadata))
+        self.docs[doc_id].metadata.update(metadata)
+        return True
+
+    def upsert(self, documents, metadata, ids):
+        for text, meta, doc_id in zip(documents, metadata, ids, strict=True):
+            self.upserted_ids.append(doc_id)
+            old = self.get_chunks(doc_id)
+            chunks = []
+            for index, part in enumerate(text.split("\n\n")):
+                digest = hashlib.sha256(part.encode("utf-8")).hexdigest()
+                if index < len(old) and old[index].content_hash == digest:
+                    faiss_id = old[index].faiss_id
+                else:
+                    self.embedded_texts.append(part)
+                    faiss_id = self._next_id
+                    self._next_id += 1
+                chunks.append(SimpleNamespace(content_hash=digest, faiss_id=faiss_id))
+            self.docs[doc_id] = SimpleNamespace(
+                id=doc_id,
+                content_hash=hashlib.sha256(text.encode("utf-8")).hexdigest(),
+                metadata=dict(meta),
+                chunks=chunks,
+            )
+        return ids
+
+
+def _make_note(title: str = "Journal") -> Note:
+    return Note(
+        id="abc12345",
+        path=Path("daily/journal.md"),
+        title=title,
+        date=date(2025, 1, 1),
+        tags=["log"],
+        links=[],
+        attachments=[],
+        notebook="daily",
+        content_hash="",
+    )
+
+
+def _search(mock_config) -> tuple[NoteSearch, FakeVectorDB]:
+    search = NoteSearch(mock_config)
+    fake = FakeVectorDB()
+    search._db = fake
+    return search, fake
+
+
+def _journal(paragraphs: int) -> str:
+    return "\n\n".join(f"Entry {i}: wrote some notes." for i in range(paragraphs))
+
+
+class TestIncrementalEmbedding:
+    """Tests for NoteSearch._upsert_changed."""
+
+    def test_append_embeds_only_new_chunk(self, mock_config):
+        search, fake = _search(mock_config)
+        note = _make_note()
+        search.index_note(note, _journal(300))
+        assert len(fake.embedded_texts) == 300
+
+        fake.embedded_texts.clear()
+        search.index_note(note, _journal(300) + "\n\nAppended line.")
+
+        assert fake.embedded_texts == ["Appended line."]
+        assert search.chunk_stats.embedded == 301
+        assert search.chunk_stats.reused == 300
+        assert search.chunk_stats.removed == 0
+
+    def test_removed_chunks_counted(self, mock_config):
+        search, _ = _search(mock_config)
+        note = _make_note()
+        search.index_note(note, _journal(5))
+        search.index_note(note, _journal(3))
+
+        assert search.chunk_stats.reused == 3
+        assert search.chunk_stats.removed == 2
+
+    def test_unchanged_text_skips_upsert(self, mock_config):
+        search, fake = _search(mock_config)
+        note = _make_note()
+        search.index_note(note, _journal(10))
+        fake.upserted_ids.clear()
+
+        search.index_note(note, _journal(10))
+
+        assert fake.upserted_ids == []
+        assert fake.updates == []
+        assert search.chunk_stats.unchanged_notes == 1
+
+    def test_metadata_only_change_updates_in_place(self, mock_config):
+        search, fake = _search(mock_config)
+        search.index_note(_make_note(), _journal(10))
+        fake.upserted_ids.clear()
+        fake.embedded_texts.clear()
+
+        search.index_note(_make_note(title="Renamed"), _journal(10))
+
+        assert fake.upserted_ids == []
+        assert fake.embedded_texts == []
+        assert [doc_id for doc_id, _ in fake.updates] == ["daily/journal.md"]
+        assert fake.updates[0][1]["title"] == "Renamed"
+
+    def test_batch_upserts_only_changed_notes(self, mock_config):
+        search, fake = _search(mock_config)
+        other = replace(_make_note(), path=Path("daily/other.md"))
+        search.index_notes_batch([(_make_note(), "One"), (other, "Two")])
+        fake.upserted_ids.clear()
+
+        indexed = search.index_notes_batch(
+            [(_make_note(), "One"), (other, "Two\n\nThree")]
+        )
+
+        assert indexed == 2
+        assert fake.upserted_ids == ["daily/other.md"]
+
+
+class TestVectorState:
+    """Tests for vector_state bookkeeping in NoteSearch."""
+
+    def test_index_and_delete_update_state(self, mock_config):
+        from nb.index.vector_state_repo import get_vector_state
+
+        search, _ = _search(mock_config)
+        note = replace(_make_note(), content_hash="rev1")
+        search.index_note(note, _journal(3))
+
+        state = get_vector_state()
+        assert state["daily/journal.md"][0] == "rev1"
+        assert state["daily/journal.md"][2] == 3
+
+        search.delete_note("daily/journal.md")
+        assert get_vector_state() == {}
+
+    def test_deferred_state_written_on_flush(self, mock_config):
+        from nb.index.vector_state_repo import get_vector_state
+
+        search, _ = _search(mock_config)
+        note = replace(_make_note(), content_hash="rev1")
+        search.index_notes_batch([(note, _journal(2))], defer_state=True)
+        assert get_vector_state() == {}
+
+        search.flush_state()
+        assert list(get_vector_state()) == ["daily/journal.md"]
@@ -0,0 +1,231 @@
+"""Tests for todo repository operations."""
+
+from datetime import date
+
+from nb.core.notes import delete_note
+from nb.index.db import get_db
+from nb.index.scanner import index_all_notes
+from nb.index.todos_repo import (
+    attach_todo_children,
+    get_extended_todo_stats,
+    get_tag_stats,
+    get_todo_by_id,
+    get_todo_children,
+    query_todos,
+    update_todo_due_date_db,
+    update_todo_status,
+)
+from nb.models import TodoStatus
+
+TREE = """# Plan
+
+## Launch
+
+- [ ] Ship release #work #urgent
+  - [ ] Write notes #docs
+    - [ ] Proofread
+  - [x] Tag build
+- [ ] Tidy desk #home
+"""
+
+
+def _count_queries(monkeypatch) -> list[str]:
+    db = get_db()
+    queries: list[str] = []
+    fetchall = db.fetchall
+
+    def counting_fetchall(sql, params=()):
+        queries.append(sql)
+        return fetchall(sql, params)
+
+    monkeypatch.setattr(db, "fetchall", counting_fetchall)
+    return queries
+
+
+def _by_content(todos):
+    return {todo.content: todo for todo in todos}
+
+
+class TestQueryTodos:
+    """Tests for query_todos hydration."""
+
+    def test_tags_and_sections_loaded(self, mock_config):
+        note_dir = mock_config.notes_root / "projects" / "launch" / "web"
+        note_dir.mkdir(parents=True)
+        (note_dir / "plan.md").write_text(TREE, encoding="utf-8")
+        index_all_notes(index_vectors=False)
+
+        todos = _by_content(query_todos(parent_only=False))
+
+        assert todos["Ship release"].tags == ["urgent", "work"]
+        assert todos["Ship release"].sections == ["launch", "web"]
+        assert todos["Tidy desk"].tags == ["home"]
+        assert todos["Proofread"].tags == []
+
+    def test_constant_query_count(self, mock_config, create_note, monkeypatch):
+        for i in range(10):
+            create_note("projects", f"plan{i}.md", TREE)
+        index_all_notes(index_vectors=False)
+        queries = _count_queries(monkeypatch)
+
+        todos = query_todos(parent_only=False)
+
+        assert len(todos) == 50
+        # The todos, their tags and their sections
+        assert len(queries) == 3
+
+    def test_get_todo_by_id(self, mock_config, create_note):
+        create_note("projects", "plan.md", TREE)
+        index_all_notes(index_vectors=False)
+        todo_id = _by_content(query_todos(parent_only=False))["Write notes"].id
+
+        todo = get_todo_by_id(todo_id)
+
+        assert todo.content == "Write notes"
+        assert todo.tags == ["docs"]
+
+
+class TestTodoChildren:
+    """Tests for get_todo_children and attach_todo_children."""
+
+    def test_subtree_loaded(self, mock_config, create_note, monkeypatch):
+        create_note("projects", "plan.md", TREE)
+        index_all_notes(index_vectors=False)
+        parent = _by_content(query_todos(parent_only=True))["Ship release"]
+        queries = _count_queries(monkeypatch)
+
+        children = get_todo_children(parent.id)
+
+        assert [c.content for c in children] == ["Write notes", "Tag build"]
+        assert [c.content for c in children[0].children] == ["Proofread"]
+        assert children[0].tags == ["docs"]
+        assert len(queries) == 3
+
+    def test_attach_children(self, mock_config, create_note):
+        create_note("projects", "plan.md", TREE)
+        index_all_notes(index_vectors=False)
+        roots = attach_todo_children(query_todos(parent_only=True))
+
+        by_content = _by_content(roots)
+        assert len(by_content["Ship release"].children) == 2
+        assert by_content["Tidy desk"].children == []
+
+
+class TestTodoExclude:
+    """Tests for the note key and todo_exclude flag stored on todos."""
+
+    def test_note_key_and_flag_stored(self, mock_config, create_note):
+        create_note("projects", "plan.md", TREE)
+        create_note(
+            "projects", "hidden.md", "---\ntodo_exclude: true\n---\n\n- [ ] Secret\n"
+        )
+        index_all_notes(index_vectors=False)
+
+        rows = get_db().fetchall("SELECT content, note_path, todo_exclude FROM todos")
+        by_content = {row["content"]: row for row in rows}
+
+        assert by_content["Ship release"]["note_path"] == "projects/plan.md"
+        assert by_content["Ship release"]["todo_exclude"] == 0
+        assert by_content["Secret"]["note_path"] == "projects/hidden.md"
+        assert by_content["Secret"]["todo_exclude"] == 1
+        contents = {t.content for t in query_todos(parent_only=False)}
+        assert "Secret" not in contents
+        assert "Ship release" in contents
+
+    def test_flag_follows_note(self, mock_config, create_note):
+        create_note("projects", "plan.md", TREE)
+        index_all_notes(index_vectors=False)
+        db = get_db()
+
+        db.execute(
+            "UPDATE notes SET todo_exclude = 1 WHERE path = ?", ("projects/plan.md",)
+        )
+        db.commit()
+
+        assert query_todos(parent_only=False) == []
+        assert len(query_todos(parent_only=False, exclude_note_excluded=False)) == 5
+
+
+# The stats aggregates, recomputed from the base tables
+AGGREGATE_CHECKS = {
+    "todo_counts": (
+        "SELECT project, priority, status, due_day, count FROM todo_counts",
+        """SELECT COALESCE(project, ''), COALESCE(priority, 0), COALESCE(status, ''),
+                  COALESCE(DATE(due_date), ''), COUNT(*)
+           FROM todos WHERE parent_id IS NULL GROUP BY 1, 2, 3, 4""",
+    ),
+    "todo_activity": (
+        "SELECT day, project, created, completed FROM todo_activity",
+        """SELECT day, project, SUM(created), SUM(completed) FROM (
+               SELECT DATE(created_date) AS day, COALESCE(project, '') AS project,
+                      1 AS created, 0 AS completed
+               FROM todos WHERE parent_id IS NULL AND created_date IS NOT NULL
+               UNION ALL
+               SELECT DATE(completed_date), COALESCE(project, ''), 0, 1
+               FROM todos WHERE parent_id IS NULL AND completed_date IS NOT NULL
+           ) GROUP BY 1, 2""",
+    ),
+    "todo_tag_counts": (
+        "SELECT tag, project, source_path, completed, count FROM todo_tag_counts",
+        """SELECT tt.tag, COALESCE(t.project, ''), t.source_path,
+                  t.status IS 'completed', COUNT(*)
+           FROM todo_tags tt JOIN todos t ON t.id = tt.todo_id
+           WHERE t.parent_id IS NULL GROUP BY 1, 2, 3, 4""",
+    ),
+    "note_tag_counts": (
+        "SELECT tag, notebook, count FROM note_tag_counts",
+        """SELECT nt.tag, COALESCE(n.notebook, ''), COUNT(*)
+           FROM note_tags nt JOIN notes n ON n.path = nt.note_path GROUP BY 1, 2""",
+    ),
+}
+
+
+def _assert_aggregates_consistent() -> None:
+    db = get_db()
+    for table, (stored, expected) in AGGREGATE_CHECKS.items():
+        assert sorted(map(tuple, db.fetchall(stored))) == sorted(
+            map(tuple, db.fetchall(expected))
+        ), table
+
+
+class TestStatsAggregates:
+    """Tests for the trigger-maintained stats aggregates."""
+
+    def test_follow_index_and_updates(self, mock_config, create_note):
+        plan = create_note("projects", "plan.md", "---\ntags: [launch]\n---\n" + TREE)
+        create_note("work", "todo.md", "- [ ] Call Bob #work @due(2020-01-01)\n")
+        index_all_notes(index_vectors=False)
+        _assert_aggregates_consistent()
+
+        todos = _by_content(query_todos(parent_only=False))
+        update_todo_status(todos["Ship release"].id, TodoStatus.COMPLETED)
+        update_todo_due_date_db(todos["Tidy desk"].id, date(2030, 1, 1))
+        _assert_aggregates_consistent()
+
+        plan.write_text("# Plan\n\n- [ ] Ship release #work\n", encoding="utf-8")
+        index_all_notes(index_vectors=False)
+        _assert_aggregates_consistent()
+
+        delete_note(plan, mock_config.notes_root)
+        _assert_aggregates_consistent()
+
+    def test_stats_read_aggregates(self, mock_config, create_note):
+        create_note("projects", "plan.md", TREE)
+        create_note("work", "todo.md", "- [ ] Call Bob #work @due(2020-01-01)\n")
+        index_all_notes(index_vectors=False)
+
+        stats = get_extended_todo_stats()
+        tags = {t["tag"]: t for t in get_tag_stats(include_sources=True)}
+
+        assert stats["total"] == 3
+        assert stats["overdue"] == 1
+        assert stats["by_notebook"]["work"] == {
+            "total": 1,
+            "completed": 0,
+            "overdue": 1,
+        }
+        assert tags["work"]["todo_count"] == 2
+        assert sorted(s["notebook"] for s in tags["work"]["sources"]) == [
+            "projects",
+            "work",
+        ]
@@ -0,0 +1,61 @@
+"""Tests for nb.utils.compression module."""
+
+from __future__ import annotations
+
+from nb.utils.compression import (
+    MIN_COMPRESS_BYTES,
+    pack_text,
+    unpack_text,
+    unpack_text_near,
+)
+
+LONG = "# Meeting notes\n\n" + "Discussed the roadmap — next steps ✓\n" * 200
+
+
+class TestPackText:
+    """Tests for pack_text and unpack_text."""
+
+    def test_round_trip(self):
+        for text in ["", "short", LONG]:
+            assert unpack_text(pack_text(text)) == text
+
+    def test_long_text_compressed(self):
+        assert len(pack_text(LONG)) < len(LONG.encode("utf-8")) // 4
+
+    def test_short_text_stored(self):
+        text = "x" * (MIN_COMPRESS_BYTES - 1)
+
+        assert pack_text(text).endswith(text.encode("utf-8"))
+
+    def test_prefix(self):
+        for text in [LONG, "ünïcödé " * 10]:
+            blob = pack_text(text)
+            assert unpack_text(blob, max_chars=25) == text[:25]
+            assert unpack_text(blob, max_chars=10**6) == text
+
+
+class TestUnpackTextNear:
+    """Tests for unpack_text_near."""
+
+    def test_stops_after_first_match(self):
+        text = "intro " + "filler words " * 20_000 + "Needle"
+        head = "x" * 50 + "First Match here " + "y" * 500_000
+        blob = pack_text(head + text)
+
+        result = unpack_text_near(blob, ["first match"], after=100)
+
+        assert result == (head + text)[: len(result)]
+        assert len(head) > len(result) >= 50 + 100
+
+    def test_match_across_steps(self):
+        text = "a" * (1024 - 3) + "needle" + "b" * 200_000
+        blob = pack_text(text)
+
+        result = unpack_text_near(blob, ["NEEDLE"], after=10)
+
+        assert "needle" in result
+        assert len(result) < len(text)
+
+    def test_whole_text_without_match(self):
+        for text in [LONG, "short stored text"]:
+            assert unpack_text_near(pack_text(text), ["absent"], after=10) == text
@@ -0,0 +1,191 @@
+"""Tests for nb.utils.walk module."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+
+from nb.utils.walk import (
+    DirManifest,
+    IgnoreMatcher,
+    get_ignore_matcher,
+    walk_notes,
+    walk_notes_cached,
+)
+
+
+def _touch(root: Path, rel: str) -> None:
+    path = root / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("# Note\n")
+
+
+def _age_dirs(root: Path, seconds: int = 60) -> None:
+    """Backdate every directory's mtime so listings aren't treated as racy."""
+    for path in [root, *(p for p in root.rglob("*") if p.is_dir())]:
+        st = path.stat()
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns - seconds * 1_000_000_000))
+
+
+def _walk(top: Path, **kwargs) -> list[str]:
+    root = kwargs.get("root") or top
+    return sorted(
+        Path(entry.path).relative_to(root).as_posix()
+        for entry in walk_notes(top, **kwargs)
+    )
+
+
+class TestIgnoreMatcher:
+    """Tests for IgnoreMatcher."""
+
+    @pytest.mark.parametrize(
+        ("pattern", "path", "ignored"),
+        [
+            ("archive", "archive/old.md", True),
+            ("archive", "projects/archive/old.md", True),
+            ("archive", "projects/archived/old.md", False),
+            ("old_*", "projects/old_stuff/note.md", True),
+            ("*.tmp.md", "daily/x.tmp.md", True),
+            ("projects/drafts", "projects/drafts/a.md", True),
+            ("projects/drafts", "work/projects/drafts/a.md", True),
+            ("projects/drafts", "drafts/a.md", False),
+            ("temp/", "temp/a.md", True),
+            ("temp/", "notes/temp", False),
+        ],
+    )
+    def test_is_ignored(self, pattern: str, path: str, ignored: bool):
+        assert IgnoreMatcher([pattern]).is_ignored(path) is ignored
+
+    def test_empty_matcher_is_falsy(self):
+        assert not IgnoreMatcher([])
+        assert IgnoreMatcher(["x"])
+
+    def test_cached_until_nbignore_changes(self, tmp_path: Path):
+        (tmp_path / ".nbignore").write_text("archive\n")
+        first = get_ignore_matcher(tmp_path)
+        assert get_ignore_matcher(tmp_path) is first
+
+        (tmp_path / ".nbignore").write_text("archive\ndrafts\n")
+        second = get_ignore_matcher(tmp_path)
+        assert second is not first
+        assert second.patterns == ["archive", "drafts"]
+
+
+class TestWalkNotes:
+    """Tests for walk_notes."""
+
+    def test_finds_markdown_files(self, tmp_path: Path):
+        _touch(tmp_path, "a.md")
+        _touch(tmp_path, "projects/b.md")
+        _touch(tmp_path, "projects/deep/c.md")
+        (tmp_path / "projects" / "image.png").write_bytes(b"")
+
+        assert _walk(tmp_path) == ["a.md", "projects/b.md", "projects/deep/c.md"]
+
+    def test_skips_hidden(self, tmp_path: Path):
+        _touch(tmp_path, "visible.md")
+        _touch(tmp_path, ".hidden.md")
+        _touch(tmp_path, ".git/notes.md")
+        _touch(tmp_path, "projects/.trash/old.md")
+
+        assert _walk(tmp_path) == ["visible.md"]
+
+    def test_prunes_ignored_directories(self, tmp_path: Path, monkeypatch):
+        _touch(tmp_path, "keep/a.md")
+        _touch(tmp_path, "archive/2020/b.md")
+
+        listed = []
+        real_scandir = os.scandir
+
+        def recording_scandir(path):
+            listed.append(Path(path).name)
+            return real_scandir(path)
+
+        monkeypatch.setattr(os, "scandir", recording_scandir)
+
+        assert _walk(tmp_path, ignore=IgnoreMatcher(["archive"])) == ["keep/a.md"]
+        assert "archive" not in listed
+        assert "2020" not in listed
+
+    def test_patterns_relative_to_root(self, tmp_path: Path):
+        _touch(tmp_path, "projects/drafts/a.md")
+        _touch(tmp_path, "projects/b.md")
+
+        result = _walk(
+            tmp_path / "projects",
+            root=tmp_path,
+            ignore=IgnoreMatcher(["projects/drafts"]),
+        )
+        assert result == ["projects/b.md"]
+
+    def test_entries_carry_stat(self, tmp_path: Path):
+        _touch(tmp_path, "a.md")
+        (entry,) = walk_notes(tmp_path)
+        assert entry.stat().st_size == (tmp_path / "a.md").stat().st_size
+
+
+class TestWalkNotesCached:
+    """Tests for walk_notes_cached and DirManifest."""
+
+    @staticmethod
+    def _walk(root: Path, manifest: DirManifest) -> list[str]:
+        return sorted(
+            path.relative_to(root).as_posix()
+            for path, _ in walk_notes_cached(root, manifest)
+        )
+
+    @staticmethod
+    def _carry(manifest: DirManifest) -> DirManifest:
+        listings = {
+            path: listing
+            for path, listing in {**manifest.listings, **manifest.changed}.items()
+            if listing is not None and path not in manifest.removed()
+        }
+        return DirManifest(listings=listings)
+
+    def test_unchanged_directories_not_listed(self, tmp_path: Path):
+        _touch(tmp_path, "daily/2024/a.md")
+        _touch(tmp_path, "daily/2025/b.md")
+        _age_dirs(tmp_path)
+
+        first = DirManifest()
+        assert self._walk(tmp_path, first) == ["daily/2024/a.md", "daily/2025/b.md"]
+        assert first.relisted == 4
+
+        second = self._carry(first)
+        assert self._walk(tmp_path, second) == ["daily/2024/a.md", "daily/2025/b.md"]
+        assert second.relisted == 0
+        assert second.changed == {}
+
+    def test_only_changed_directory_relisted(self, tmp_path: Path):
+        _touch(tmp_path, "daily/2024/a.md")
+        _touch(tmp_path, "daily/2025/b.md")
+        _age_dirs(tmp_path)
+        first = DirManifest()
+        self._walk(tmp_path, first)
+
+        _touch(tmp_path, "daily/2025/c.md")
+        second = self._carry(first)
+        assert self._walk(tmp_path, second) == [
+            "daily/2024/a.md",
+            "daily/2025/b.md",
+            "daily/2025/c.md",
+        ]
+        assert second.relisted == 1
+        # Just modified, so it will be listed again next time
+        assert second.changed == {str(tmp_path / "daily" / "2025"): None}
+
+    def test_removed_directories_reported(self, tmp_path: Path):
+        _touch(tmp_path, "old/a.md")
+        _touch(tmp_path, "keep/b.md")
+        _age_dirs(tmp_path)
+        first = DirManifest()
+        self._walk(tmp_path, first)
+
+        (tmp_path / "old" / "a.md").unlink()
+        (tmp_path / "old").rmdir()
+        second = self._carry(first)
+        assert self._walk(tmp_path, second) == ["keep/b.md"]
+        assert second.removed() == [str(tmp_path / "old")]
@@ -0,0 +1,77 @@
+"""Tests for vector state repository operations."""
+
+from nb.index.db import get_db
+from nb.index.vector_state_repo import (
+    clear_vector_state,
+    forget_embedded,
+    get_vector_state,
+    record_embedded,
+)
+
+
+class TestRecordEmbedded:
+    """Tests for record_embedded function."""
+
+    def test_records_state(self, mock_config):
+        record_embedded([("daily/a.md", "hash-a", 3)], "model")
+
+        assert get_vector_state() == {"daily/a.md": ("hash-a", "model", 3)}
+
+    def test_updates_existing(self, mock_config):
+        record_embedded([("daily/a.md", "hash-a", 3)], "model")
+        record_embedded([("daily/a.md", "hash-b", 4)], "other")
+
+        assert get_vector_state() == {"daily/a.md": ("hash-b", "other", 4)}
+
+    def test_unknown_chunk_count_keeps_previous(self, mock_config):
+        record_embedded([("daily/a.md", "hash-a", 3)], "model")
+        record_embedded([("daily/a.md", "hash-a", None)], "model")
+
+        assert get_vector_state()["daily/a.md"][2] == 3
+
+    def test_normalizes_paths(self, mock_config):
+        record_embedded([("daily\\a.md", "hash-a", 1)], "model")
+
+        assert list(get_vector_state()) == ["daily/a.md"]
+
+
+class TestForgetEmbedded:
+    """Tests for forget_embedded and clear_vector_state."""
+
+    def test_forgets_paths(self, mock_config):
+        record_embedded(
+            [(f"daily/{i}.md", "hash", 1) for i in range(3)],
+            "model",
+        )
+
+        forget_embedded(["daily/0.md", "daily/2.md"])
+
+        assert list(get_vector_state()) == ["daily/1.md"]
+
+    def test_clear(self, mock_config):
+        record_embedded([("daily/a.md", "hash-a", 1)], "model")
+
+        clear_vector_state()
+
+        assert get_vector_state() == {}
+
+
+class TestGetVectorState:
+    """Tests for get_vector_state notebook filtering."""
+
+    def test_filters_by_notebook(self, mock_config):
+        db = get_db()
+        db.execute(
+            "INSERT INTO notes (path, notebook, content_hash) VALUES (?, ?, ?)",
+            ("daily/a.md", "daily", "hash-a"),
+        )
+        db.execute(
+            "INSERT INTO notes (path, notebook, content_hash) VALUES (?, ?, ?)",
+            ("work/b.md", "work", "hash-b"),
+        )
+        db.commit()
+        record_embedded(
+            [("daily/a.md", "hash-a", 1), ("work/b.md", "hash-b", 1)], "model"
+        )
+
+        assert list(get_vector_state("work")) == ["work/b.md"]
@@ -319,6 +319,47 @@ class TestGetEndpoints:
             assert data[0]["status"] == "pending"
             assert data[0]["path"] == "projects/test.md"
 
+    def test_api_todos_query(self, client: TestClient, mock_web_config: Config):
+        from nb.index.scanner import index_all_notes
+
+        (mock_web_config.notes_root / "projects" / "tasks.md").write_text(
+            "- [ ] One #work @due(2025-01-01)\n"
+            "- [ ] Two #work @due(2025-01-02)\n"
+            "- [ ] Three #home\n"
+            "- [x] Four #work\n",
+            encoding="utf-8",
+        )
+        index_all_notes(index_vectors=False)
+
+        first = client.get("/api/todos", params={"q": "tag=work", "limit": 1})
+        second = client.get(
+            "/api/todos",
+            params={"q": "tag=work", "limit": 1, "after": first.headers["X-Next-Cursor"]},
+        )
+
+        assert [t["content"] for t in first.json()] == ["One"]
+        assert [t["content"] for t in second.json()] == ["Two"]
+        assert "X-Next-Cursor" not in second.headers
+
+    def test_api_todos_invalid_query(self, client: TestClient):
+        resp = client.get("/api/todos", params={"q": "color=red"})
+        assert resp.status_code == 400
+        assert "Unknown todo field" in resp.json()["error"]
+
+    def test_api_kanban_column(self, client: TestClient, mock_web_config: Config):
+        from nb.index.scanner import index_all_notes
+
+        (mock_web_config.notes_root / "projects" / "tasks.md").write_text(
+            "- [ ] Dated @due(2025-01-01)\n- [ ] Undated\n", encoding="utf-8"
+        )
+        index_all_notes(index_vectors=False)
+
+        resp = client.get(
+            "/api/kanban/column", params={"filters": '{"no_due_date": true}'}
+        )
+
+        assert [t["content"] for t in resp.json()] == ["Undated"]
+
     def test_api_startup_no_scope(self, client: TestClient):
         resp = client.get("/api/startup")
         assert resp.status_code == 200